@@ -0,0 +1,3 @@
+"""
+Benchmarks of the dashboard against a synthetic local database
+"""
@@ -0,0 +1,241 @@
+"""
+Compare two benchmark result files and flag performance regressions
+
+Each entry's samples (repeated runs of one query, rerun or load level)
+are compared with a one-sided Mann-Whitney U test. An entry regresses
+when the candidate is slower with statistical significance AND its
+median moved by more than the threshold, so noise on fast queries and
+tiny but real slowdowns are both ignored. An entry whose candidate run
+recorded failed calls fails the gate whatever its timings.
+"""
+import argparse
+import math
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from benchmarks.results import load_results
+
+# Verdicts
+REGRESSION = 'REGRESSION'
+FAILED = 'FAILED'
+IMPROVED = 'improved'
+UNCHANGED = '~'
+MISSING = 'missing'
+NEW = 'new'
+
+
+def _average_ranks(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """1-based ranks with ties sharing their average rank, and the size of each tie group"""
+    unique, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    # Last rank of each group of equal values, minus half the group's spread
+    upper = np.cumsum(counts)
+    average = upper - (counts - 1) / 2
+    return average[inverse], counts
+
+
+def mann_whitney_u(baseline: List[float], candidate: List[float]) -> Tuple[float, float]:
+    """
+    One-sided Mann-Whitney U test that the candidate tends to be slower
+
+    Uses the normal approximation with tie and continuity corrections,
+    which is adequate from about five samples per side.
+
+    Args:
+        baseline: Baseline samples
+        candidate: Candidate samples
+
+    Returns:
+        tuple: (U of the candidate, p-value of "candidate > baseline");
+            p is 1.0 when either side has no samples or all values tie
+    """
+    x = np.asarray(candidate, dtype=float)
+    y = np.asarray(baseline, dtype=float)
+    n1, n2 = len(x), len(y)
+    if n1 == 0 or n2 == 0:
+        return 0.0, 1.0
+    ranks, ties = _average_ranks(np.concatenate([x, y]))
+    u = float(ranks[:n1].sum() - n1 * (n1 + 1) / 2)
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - float((ties ** 3 - ties).sum()) / (n * (n - 1)))
+    if variance <= 0:
+        return u, 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return u, 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def compare_entry(baseline: List[float], candidate: List[float], threshold: float = 0.10,
+                  alpha: float = 0.05, min_ms: float = 1.0) -> Dict:
+    """
+    Verdict on one entry
+
+    Args:
+        baseline: Baseline samples (ms)
+        candidate: Candidate samples (ms)
+        threshold: Relative change of the median that matters (0.10 = 10%)
+        alpha: Significance level of each one-sided test
+        min_ms: Absolute change of the median below which nothing is flagged
+
+    Returns:
+        dict: base_ms, candidate_ms (medians), change, p_slower, p_faster, verdict
+    """
+    base_ms = float(np.median(baseline))
+    candidate_ms = float(np.median(candidate))
+    change = (candidate_ms - base_ms) / base_ms if base_ms else 0.0
+    _, p_slower = mann_whitney_u(baseline, candidate)
+    _, p_faster = mann_whitney_u(candidate, baseline)
+    large = abs(candidate_ms - base_ms) >= min_ms and abs(change) > threshold
+    if large and change > 0 and p_slower < alpha:
+        verdict = REGRESSION
+    elif large and change < 0 and p_faster < alpha:
+        verdict = IMPROVED
+    else:
+        verdict = UNCHANGED
+    return {'base_ms': base_ms, 'candidate_ms': candidate_ms, 'change': change,
+            'p_slower': p_slower, 'p_faster': p_faster, 'verdict': verdict}
+
+
+def _error_count(result: Dict) -> int:
+    """Failed calls of an entry ('error_count' from the load test, else the harness count or a message list)"""
+    if 'error_count' in result:
+        return int(result['error_count'])
+    errors = result.get('errors') or 0
+    return len(errors) if isinstance(errors, list) else int(errors)
+
+
+def _entries(results: Dict, sections: bool) -> Dict[str, Tuple[List[float], int]]:
+    """Name -> (samples, failed calls), with rerun sections as 'interaction / section' when requested"""
+    entries = {}
+    for name, result in results.items():
+        entries[name] = (result.get('samples_ms', []), _error_count(result))
+        if sections:
+            for section, summary in result.get('sections', {}).items():
+                entries[f"{name} / {section}"] = (summary.get('samples_ms', []), 0)
+    return entries
+
+
+def compare_results(baseline: Dict, candidate: Dict, threshold: float = 0.10, alpha: float = 0.05,
+                    min_ms: float = 1.0, sections: bool = False) -> List[Dict]:
+    """
+    Compare every entry of two result files
+
+    Args:
+        baseline: Baseline result file contents
+        candidate: Candidate result file contents
+        threshold: See compare_entry
+        alpha: See compare_entry
+        min_ms: See compare_entry
+        sections: Also compare the per-section timings of reruns
+
+    Returns:
+        list: One dict per entry (name, verdict, 'errors' of the candidate
+            and compare_entry fields when both runs have samples), in
+            baseline order followed by entries only the candidate has.
+            FAILED when the candidate recorded failed calls, MISSING when
+            it has no samples, NEW when only the candidate has samples.
+    """
+    base = _entries(baseline['results'], sections)
+    cand = _entries(candidate['results'], sections)
+    rows = []
+    for name in list(base) + [name for name in cand if name not in base]:
+        base_samples, _ = base.get(name, ([], 0))
+        cand_samples, errors = cand.get(name, ([], 0))
+        row = {'name': name, 'errors': errors}
+        if base_samples and cand_samples:
+            row.update(compare_entry(base_samples, cand_samples, threshold, alpha, min_ms))
+        if errors:
+            row['verdict'] = FAILED
+        elif not cand_samples:
+            row['verdict'] = MISSING
+        elif not base_samples:
+            row['verdict'] = NEW
+        rows.append(row)
+    return rows
+
+
+def meta_warnings(baseline: Dict, candidate: Dict) -> List[str]:
+    """Differences between the runs that make the comparison less meaningful"""
+    base, cand = baseline.get('meta', {}), candidate.get('meta', {})
+    warnings = []
+    if base.get('kind') != cand.get('kind'):
+        warnings.append(f"different benchmarks: {base.get('kind')} vs {cand.get('kind')}")
+    for key in ('tables', 'flags', 'database', 'machine', 'cache'):
+        if base.get(key) != cand.get(key):
+            warnings.append(f"{key} differ: {base.get(key)} vs {cand.get(key)}")
+    for label, meta in (('baseline', base), ('candidate', cand)):
+        if meta.get('dirty'):
+            warnings.append(f"{label} was run with uncommitted changes")
+    return warnings
+
+
+def _run_label(results: Dict) -> str:
+    meta = results.get('meta', {})
+    return f"{meta.get('commit', 'unknown')[:10]}{'-dirty' if meta.get('dirty') else ''} ({meta.get('timestamp', '?')})"
+
+
+def format_report(baseline: Dict, candidate: Dict, rows: List[Dict], threshold: float, alpha: float) -> str:
+    """Plain-text report, regressions first"""
+    lines = [
+        f"Benchmark comparison ({baseline.get('meta', {}).get('kind', '?')})",
+        f"  baseline:  {_run_label(baseline)}",
+        f"  candidate: {_run_label(candidate)}",
+        f"  flagged when the median changes by more than {threshold:.0%} with one-sided Mann-Whitney p < {alpha}",
+        "",
+    ]
+    for warning in meta_warnings(baseline, candidate):
+        lines.append(f"⚠️ {warning}")
+    if lines[-1] != "":
+        lines.append("")
+
+    order = {FAILED: 0, REGRESSION: 1, IMPROVED: 2, UNCHANGED: 3, MISSING: 4, NEW: 5}
+    compared = sorted(rows, key=lambda r: (order[r['verdict']], -abs(r.get('change', 0))))
+    width = max([len(r['name']) for r in rows] + [5])
+    lines.append(f"{'entry':{width}}  {'base p50':>10}  {'cand p50':>10}  {'change':>8}  {'p':>7}  verdict")
+    for row in compared:
+        verdict = f"{row['verdict']} ({row['errors']} failed calls)" if row['verdict'] == FAILED else row['verdict']
+        if 'change' not in row:
+            lines.append(f"{row['name']:{width}}  {'':>10}  {'':>10}  {'':>8}  {'':>7}  {verdict}")
+            continue
+        p = row['p_faster'] if row['change'] < 0 else row['p_slower']
+        lines.append(f"{row['name']:{width}}  {row['base_ms']:>8.1f}ms  {row['candidate_ms']:>8.1f}ms  "
+                     f"{row['change']:>+8.1%}  {p:>7.4f}  {verdict}")
+
+    counts = {verdict: sum(r['verdict'] == verdict for r in rows) for verdict in order}
+    lines += ["", (f"{counts[FAILED]} failed, " if counts[FAILED] else "")
+                  + f"{counts[REGRESSION]} regressed, {counts[IMPROVED]} improved, {counts[UNCHANGED]} unchanged"
+                  + (f", {counts[MISSING]} missing" if counts[MISSING] else "")
+                  + (f", {counts[NEW]} new" if counts[NEW] else "")]
+    return "\n".join(lines)
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files and flag regressions "
+                                                 "and failing queries")
+    parser.add_argument('baseline', help="Result JSON of the reference commit")
+    parser.add_argument('candidate', help="Result JSON of the commit under test")
+    parser.add_argument('--threshold', type=float, default=0.10, help="Relative median change to flag (0.10 = 10%%)")
+    parser.add_argument('--alpha', type=float, default=0.05, help="Significance level")
+    parser.add_argument('--min-ms', type=float, default=1.0, help="Ignore median changes smaller than this")
+    parser.add_argument('--sections', action='store_true', help="Also gate on per-section rerun timings")
+    parser.add_argument('--output', default=None, help="Also write the report to this file")
+    args = parser.parse_args()
+
+    baseline, candidate = load_results(args.baseline), load_results(args.candidate)
+    rows = compare_results(baseline, candidate, args.threshold, args.alpha, args.min_ms, args.sections)
+    report = format_report(baseline, candidate, rows, args.threshold, args.alpha)
+    print(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report + "\n")
+    sys.exit(1 if any(row['verdict'] in (REGRESSION, FAILED) for row in rows) else 0)
+
+
+if __name__ == "__main__":
+    main()
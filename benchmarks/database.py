@@ -0,0 +1,66 @@
+"""
+Connection settings of the local benchmark database
+"""
+import os
+import sys
+from typing import Any, Dict
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.analytics.utils.postgres_connection import PostgreSQLConnection
+
+# Benchmarks only ever connect through BENCH_POSTGRES_* (never the app's
+# POSTGRES_* defaults), so a missing variable cannot point a load at the
+# production database.
+BENCH_CONFIG: Dict[str, Any] = {
+    'host': os.getenv('BENCH_POSTGRES_HOST', 'localhost'),
+    'port': int(os.getenv('BENCH_POSTGRES_PORT', '5432')),
+    'database': os.getenv('BENCH_POSTGRES_DB', 'etsy_bench'),
+    'user': os.getenv('BENCH_POSTGRES_USER', 'postgres'),
+    'password': os.getenv('BENCH_POSTGRES_PASSWORD', 'postgres'),
+}
+
+_APP_ENV = {
+    'POSTGRES_HOST': 'host',
+    'POSTGRES_PORT': 'port',
+    'POSTGRES_DB': 'database',
+    'POSTGRES_USER': 'user',
+    'POSTGRES_PASSWORD': 'password',
+}
+
+
+def use_bench_database() -> Dict[str, Any]:
+    """
+    Point the dashboard's own connections at the benchmark database
+
+    Must run before the first dashboard query: connections read POSTGRES_*
+    when they are created.
+
+    Returns:
+        dict: The benchmark connection settings
+    """
+    for env, key in _APP_ENV.items():
+        os.environ[env] = str(BENCH_CONFIG[key])
+    return BENCH_CONFIG
+
+
+def bench_connection() -> PostgreSQLConnection:
+    """A connection to the benchmark database"""
+    return PostgreSQLConnection(dict(BENCH_CONFIG))
+
+
+def describe_database() -> str:
+    """host:port/database of the benchmark database (for logs and results)"""
+    return f"{BENCH_CONFIG['host']}:{BENCH_CONFIG['port']}/{BENCH_CONFIG['database']}"
+
+
+def table_rows() -> Dict[str, int]:
+    """Estimated rows of each fact table (planner statistics), to record the data scale"""
+    conn = bench_connection()
+    df = conn.execute_query("""SELECT relname, reltuples::bigint AS rows FROM pg_class
+        WHERE relkind IN ('r', 'p') AND relname LIKE 'fact\\_%' AND relnamespace = current_schema()::regnamespace
+        ORDER BY relname""")
+    conn.disconnect()
+    return {str(row.relname): int(row.rows) for row in df.itertuples(index=False)}
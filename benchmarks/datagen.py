@@ -0,0 +1,580 @@
+"""
+Deterministic synthetic star schema for benchmarks
+
+The same settings always produce the same rows: every block of days draws
+from its own random stream derived from the seed, so a database generated
+on one machine can be regenerated exactly on another.
+"""
+import argparse
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from benchmarks.database import BENCH_CONFIG, bench_connection, describe_database, use_bench_database
+from benchmarks.schema import BENCH_SCHEMA_DDL, drop_bench_tables, sync_key_sequences
+from src.analytics.etl.bulk_copy import copy_dataframe
+from src.analytics.warehouse.schema import INDEXES, index_ddl
+
+# Named sizes (approximate fact_sales rows)
+SCALES: Dict[str, int] = {
+    '10k': 10_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+    '10m': 10_000_000,
+    '50m': 50_000_000,
+}
+
+# Random streams derived from the seed (spawn keys)
+_STREAM_DAYS, _STREAM_PRODUCTS, _STREAM_ORDERS, _STREAM_BANK = range(4)
+
+# (state, country, weight) of ship-to addresses
+GEOGRAPHIES: List[Tuple[str, str, float]] = [
+    ('California', 'United States', 12), ('Texas', 'United States', 8), ('New York', 'United States', 7),
+    ('Florida', 'United States', 7), ('Illinois', 'United States', 4), ('Pennsylvania', 'United States', 4),
+    ('Ohio', 'United States', 3), ('Washington', 'United States', 3), ('Michigan', 'United States', 3),
+    ('Georgia', 'United States', 3), ('Massachusetts', 'United States', 2), ('Oregon', 'United States', 2),
+    ('Colorado', 'United States', 2), ('Arizona', 'United States', 2), ('Virginia', 'United States', 2),
+    ('England', 'United Kingdom', 6), ('Scotland', 'United Kingdom', 1), ('Ontario', 'Canada', 4),
+    ('British Columbia', 'Canada', 2), ('New South Wales', 'Australia', 3), ('Victoria', 'Australia', 2),
+    (None, 'Germany', 4), (None, 'France', 3), (None, 'Netherlands', 2), (None, 'Italy', 1),
+    (None, 'Spain', 1), (None, 'Japan', 1), (None, 'Vietnam', 1),
+]
+# Countries whose orders carry VAT on Etsy fees
+VAT_COUNTRIES = {'United Kingdom', 'Germany', 'France', 'Netherlands', 'Italy', 'Spain'}
+
+PRODUCT_SUBJECTS = ['Bunny', 'Bear', 'Octopus', 'Cat', 'Dinosaur', 'Whale', 'Frog', 'Fox', 'Penguin', 'Duck',
+                    'Elephant', 'Turtle', 'Mushroom', 'Bee', 'Axolotl', 'Sheep', 'Owl', 'Dragon']
+PRODUCT_KINDS = ['Crochet Pattern', 'Amigurumi Pattern', 'Plush Pattern', 'Keychain Pattern', 'Pattern Bundle']
+
+FIRST_NAMES = ['Emma', 'Olivia', 'Ava', 'Sophia', 'Mia', 'Amelia', 'Harper', 'Liam', 'Noah', 'Lucas',
+               'Chloe', 'Grace', 'Lily', 'Hannah', 'Sarah', 'Anna', 'Julia', 'Laura', 'Marie', 'Emily']
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Wilson',
+              'Anderson', 'Taylor', 'Thomas', 'Moore', 'Martin', 'Lee', 'Walker', 'Hall', 'Young']
+
+# GL account -> (statement descriptions, typical debit in VND); descriptions
+# use the wording bank_loader's GL_RULES classify into that account
+DEBIT_ACCOUNTS: Dict[str, Tuple[List[str], float]] = {
+    '6211': (['Mua len soi', 'Chuyển khoản tiền len', 'Thanh toán mua len'], 2_500_000),
+    '6221': (['Chi phí concept design', 'Chuyển khoản thiết kế concept'], 3_000_000),
+    '6222': (['Chi phí làm chart móc', 'Chuyển khoản làm chart'], 2_000_000),
+    '6223': (['Chi phí quay video', 'Chuyển khoản quay video sản phẩm'], 1_500_000),
+    '6224': (['Chi phí chụp ảnh', 'Chuyển khoản chụp + quay'], 1_800_000),
+    '6225': (['Viết pattern', 'Chuyển khoản dịch chart'], 2_200_000),
+    '6273': (['Tiền điện tháng', 'Tiền nước', 'Cước internet'], 900_000),
+    '6411': (['Lương nhân viên bán hàng', 'Chuyển khoản lương'], 8_000_000),
+    '6412': (['Mua bao bì đóng gói', 'Mua hộp quà'], 700_000),
+    '6413': (['Phí sàn tool san', 'Chuyển khoản phí sàn'], 600_000),
+    '6414': (['Mua dụng cụ', 'Thanh toán tool'], 500_000),
+    '6421': (['Lương quản lý', 'Chuyển khoản nhân viên quản lý'], 12_000_000),
+    '6428': (['Chi phí quảng cáo', 'Chuyển khoản marketing đăng bài'], 3_500_000),
+}
+DEBIT_WEIGHTS = [14, 4, 6, 3, 3, 4, 6, 8, 10, 5, 5, 4, 8]
+CREDIT_DESCRIPTIONS = ['ETSY PAYMENTS PAYOUT', 'Nhận chuyển khoản Payoneer Etsy', 'Chuyển khoản từ Payoneer']
+
+MONTH_NAMES = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September',
+               'October', 'November', 'December']
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+@dataclass
+class GeneratorConfig:
+    """
+    Size and shape of a synthetic data set
+
+    Attributes:
+        sales_rows: Approximate fact_sales rows (order lines)
+        start: First sale date
+        end: Last sale date
+        seed: Random seed
+        repeat_rate: Share of orders placed by returning customers
+        items_per_order: Mean order lines per order
+        bank_accounts: Number of bank accounts
+        bank_rows_per_order: Bank statement lines per order
+        chunk_orders: Orders generated and loaded per block of days
+    """
+    sales_rows: int = 100_000
+    start: date = date(2023, 1, 1)
+    end: date = date(2025, 12, 31)
+    seed: int = 42
+    repeat_rate: float = 0.35
+    items_per_order: float = 1.4
+    bank_accounts: int = 3
+    bank_rows_per_order: float = 0.05
+    chunk_orders: int = 250_000
+    days: pd.DatetimeIndex = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.days = pd.date_range(self.start, self.end, freq='D')
+
+    @property
+    def orders(self) -> int:
+        return max(1, round(self.sales_rows / self.items_per_order))
+
+    @property
+    def products(self) -> int:
+        return int(np.clip(self.sales_rows // 500, 20, 20_000))
+
+    def rng(self, stream: int, block: int = 0) -> np.random.Generator:
+        """Random generator of one stream and block, independent of the others"""
+        return np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key=(stream, block)))
+
+    def as_dict(self) -> Dict:
+        return {'sales_rows': self.sales_rows, 'start': self.start.isoformat(), 'end': self.end.isoformat(),
+                'seed': self.seed, 'repeat_rate': self.repeat_rate, 'items_per_order': self.items_per_order,
+                'bank_accounts': self.bank_accounts, 'bank_rows_per_order': self.bank_rows_per_order}
+
+
+def _date_keys(days: pd.DatetimeIndex) -> np.ndarray:
+    return (days.year * 10000 + days.month * 100 + days.day).to_numpy(dtype=np.int64)
+
+
+def _money(values: np.ndarray) -> np.ndarray:
+    return np.round(values, 2)
+
+
+# =============================================================================
+# DIMENSIONS
+# =============================================================================
+
+def time_rows(config: GeneratorConfig) -> pd.DataFrame:
+    """dim_time for whole years around the sales period"""
+    days = pd.date_range(date(config.start.year, 1, 1), date(config.end.year, 12, 31), freq='D')
+    return pd.DataFrame({
+        'time_key': _date_keys(days),
+        'full_date': days.date,
+        'day_of_month': days.day,
+        'day_of_week': days.dayofweek + 1,
+        'day_name': np.array(DAY_NAMES)[days.dayofweek],
+        'month': days.month,
+        'month_name': np.array(MONTH_NAMES)[days.month - 1],
+        'quarter': days.quarter,
+        'year': days.year,
+    })
+
+
+def geography_rows() -> pd.DataFrame:
+    return pd.DataFrame({
+        'geography_key': np.arange(1, len(GEOGRAPHIES) + 1),
+        'state_name': [g[0] for g in GEOGRAPHIES],
+        'country_name': [g[1] for g in GEOGRAPHIES],
+    })
+
+
+def product_rows(config: GeneratorConfig) -> Tuple[pd.DataFrame, np.ndarray]:
+    """dim_product and each product's price"""
+    rng = config.rng(_STREAM_PRODUCTS)
+    n = config.products
+    keys = np.arange(1, n + 1)
+    titles = [f"{PRODUCT_SUBJECTS[i % len(PRODUCT_SUBJECTS)]} {PRODUCT_KINDS[(i // len(PRODUCT_SUBJECTS)) % len(PRODUCT_KINDS)]}"
+              f" #{i + 1}" for i in range(n)]
+    prices = _money(rng.lognormal(np.log(6.5), 0.45, n).clip(2.5, 60))
+    df = pd.DataFrame({'product_key': keys, 'listing_id': (1_200_000_000 + keys).astype(str),
+                       'title': titles, 'is_current': True})
+    return df, prices
+
+
+def bank_account_rows(config: GeneratorConfig) -> pd.DataFrame:
+    n = config.bank_accounts
+    keys = np.arange(1, n + 1)
+    names = ['NGUYEN THI MAI', 'TRAN VAN HUNG', 'LE THI HOA', 'PHAM MINH TUAN', 'HOANG THU HA']
+    return pd.DataFrame({
+        'bank_account_key': keys,
+        'account_number': [f"1903{7000000 + 1117 * k:07d}{k:03d}" for k in keys],
+        'account_name': [names[(k - 1) % len(names)] for k in keys],
+        'cif_number': [f"{41000000 + 37 * k}" for k in keys],
+        'customer_address': [f"{12 + k} Nguyễn Trãi, Thanh Xuân, Hà Nội" for k in keys],
+        'opening_date': date(config.start.year - 1, 6, 1),
+        'currency_code': ['USD' if k % 4 == 0 else 'VND' for k in keys],
+    })
+
+
+def customer_rows(keys: np.ndarray) -> pd.DataFrame:
+    """dim_customer members; attributes are derived from the key alone"""
+    first = np.array(FIRST_NAMES, dtype=object)[keys % len(FIRST_NAMES)]
+    last = np.array(LAST_NAMES, dtype=object)[(keys // len(FIRST_NAMES)) % len(LAST_NAMES)]
+    return pd.DataFrame({
+        'customer_key': keys,
+        'buyer_username': 'buyer' + pd.Series(keys).astype(str),
+        'buyer_user_id': (900_000_000 + keys).astype(str),
+        'full_name': first + ' ' + last,
+    })
+
+
+def customer_geography(keys: np.ndarray) -> np.ndarray:
+    """Stable geography_key of each customer (a hash of the key into the weights)"""
+    weights = np.array([g[2] for g in GEOGRAPHIES], dtype=float)
+    cumulative = np.cumsum(weights / weights.sum())
+    uniform = ((keys.astype(np.uint64) * np.uint64(2654435761)) % np.uint64(2 ** 32)) / 2 ** 32
+    return np.minimum(np.searchsorted(cumulative, uniform), len(GEOGRAPHIES) - 1) + 1
+
+
+# =============================================================================
+# FACTS, ONE BLOCK OF DAYS AT A TIME
+# =============================================================================
+
+def daily_order_counts(config: GeneratorConfig) -> np.ndarray:
+    """Orders per day: yearly growth, a Q4 peak and weekend dips"""
+    days = config.days
+    trend = np.linspace(0.7, 1.3, len(days))
+    season = 1 + 0.8 * np.isin(days.month, [11, 12]) + 0.2 * np.isin(days.month, [1, 9, 10])
+    weekday = np.where(days.dayofweek >= 5, 0.85, 1.0)
+    weights = trend * season * weekday
+    return config.rng(_STREAM_DAYS).multinomial(config.orders, weights / weights.sum())
+
+
+def day_blocks(config: GeneratorConfig, counts: np.ndarray) -> Iterator[Tuple[int, int, int]]:
+    """(first day, end day, first order index) of consecutive days holding about chunk_orders orders"""
+    first_day, first_order, orders = 0, 0, 0
+    for day, count in enumerate(counts):
+        orders += count
+        if orders >= config.chunk_orders or day == len(counts) - 1:
+            yield first_day, day + 1, first_order
+            first_day, first_order, orders = day + 1, first_order + orders, 0
+
+
+class SyntheticStarSchema:
+    """
+    Generates the fact rows block by block
+
+    Returning customers are drawn by picking an earlier order at random
+    and reusing its customer, so frequent buyers are picked more often and
+    order counts per customer follow the long tail seen in real shops.
+    """
+
+    def __init__(self, config: GeneratorConfig):
+        self.config = config
+        self.counts = daily_order_counts(config)
+        self.date_keys = _date_keys(config.days)
+        self.products, self.prices = product_rows(config)
+        self.titles = self.products['title'].to_numpy(dtype=object)
+        self.geography = geography_rows()
+        self.vat_geography = self.geography['country_name'].isin(VAT_COUNTRIES).to_numpy()
+        # Customer of every order so far (returning customers are drawn from it)
+        self.order_customers = np.zeros(int(self.counts.sum()), dtype=np.int64)
+        self.next_customer = 1
+        self.next_sales_key = 1
+        self.next_fft_key = 1
+        self.next_bank_key = 1
+        self.balances = np.full(config.bank_accounts, 50_000_000.0)
+
+    def blocks(self) -> Iterator[Dict[str, pd.DataFrame]]:
+        """Rows per table for each block of days, in date order"""
+        for block, (first_day, end_day, first_order) in enumerate(day_blocks(self.config, self.counts)):
+            yield self._block(block, first_day, end_day, first_order)
+
+    def _customers(self, rng: np.random.Generator, first_order: int, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Customer of each order of a block, and the keys of new customers"""
+        index = first_order + np.arange(n)
+        returning = rng.random(n) < self.config.repeat_rate
+        returning &= index > 0
+        customers = self.order_customers[first_order:first_order + n]
+        new_count = int((~returning).sum())
+        new_keys = np.arange(self.next_customer, self.next_customer + new_count)
+        self.next_customer += new_count
+        customers[~returning] = new_keys
+
+        # An earlier order may be in this block and itself returning; keep
+        # following picks until every order has a customer
+        picks = (rng.random(n) * np.maximum(index, 1)).astype(np.int64)
+        pending = np.flatnonzero(returning)
+        while pending.size:
+            source = self.order_customers[picks[pending]]
+            customers[pending] = source
+            pending = pending[source == 0]
+        return customers, new_keys
+
+    def _block(self, block: int, first_day: int, end_day: int, first_order: int) -> Dict[str, pd.DataFrame]:
+        config = self.config
+        rng = config.rng(_STREAM_ORDERS, block)
+        day_counts = self.counts[first_day:end_day]
+        n_orders = int(day_counts.sum())
+        order_dates = np.repeat(self.date_keys[first_day:end_day], day_counts)
+        order_keys = first_order + 1 + np.arange(n_orders)
+        customers, new_customers = self._customers(rng, first_order, n_orders)
+        geography = customer_geography(customers)
+
+        # Order lines
+        lines = 1 + rng.poisson(config.items_per_order - 1, n_orders)
+        line_order = np.repeat(np.arange(n_orders), lines)
+        n_lines = len(line_order)
+        product_index = (rng.zipf(1.3, n_lines) - 1 + block) % config.products
+        quantity = 1 + (rng.random(n_lines) < 0.12)
+        price = self.prices[product_index]
+        item_total = _money(price * quantity)
+        discount = np.where(rng.random(n_lines) < 0.15, _money(item_total * 0.2), 0.0)
+        shipping_discount = np.where(rng.random(n_lines) < 0.05, 1.5, 0.0)
+        sales_keys = self.next_sales_key + np.arange(n_lines)
+        self.next_sales_key += n_lines
+        sales = pd.DataFrame({
+            'sales_key': sales_keys,
+            'transaction_id': (3_000_000_000 + sales_keys).astype(str),
+            'sale_date_key': order_dates[line_order],
+            'customer_key': customers[line_order],
+            'product_key': product_index + 1,
+            'geography_key': geography[line_order],
+            'order_key': order_keys[line_order],
+            'quantity': quantity,
+            'price': price,
+            'item_total': item_total,
+            'discount_amount': discount,
+            'shipping_discount': shipping_discount,
+        })
+
+        # Orders and payments
+        order_total = _money(np.bincount(line_order, weights=item_total - discount, minlength=n_orders))
+        shipping = np.where(rng.random(n_orders) < 0.3, _money(rng.uniform(3, 9, n_orders)), 0.0)
+        gross = order_total + shipping
+        fees = _money(gross * 0.03 + 0.25)
+        order_ids = pd.Series(2_900_000_000 + order_keys).astype(str)
+        adjusted = np.where(rng.random(n_orders) < 0.03, _money(fees * 0.5), 0.0)
+        orders = pd.DataFrame({
+            'order_key': order_keys,
+            'order_id': order_ids,
+            'card_processing_fees': fees,
+            'adjusted_card_processing_fees': adjusted,
+        })
+        payments = pd.DataFrame({
+            'payment_key': order_keys,
+            'payment_id': (5_000_000_000 + order_keys).astype(str),
+            'payment_date_key': order_dates,
+            'order_key': order_keys,
+            'customer_key': customers,
+            'gross_amount': gross,
+            'fees': fees,
+            'net_amount': _money(gross - fees),
+            'posted_fees': fees,
+            'adjusted_fees': adjusted,
+        })
+
+        return {
+            'dim_customer': customer_rows(new_customers),
+            'dim_order': orders,
+            'fact_sales': sales,
+            'fact_payments': payments,
+            'fact_financial_transactions': self._financial_rows(
+                rng, first_day, end_day, order_dates, order_ids, order_total, shipping, fees, geography,
+                line_order, item_total, product_index),
+            'fact_bank_transactions': self._bank_rows(block, first_day, end_day, n_orders),
+        }
+
+    def _financial_rows(self, rng, first_day, end_day, order_dates, order_ids, order_total, shipping, fees, geography,
+                        line_order, item_total, product_index) -> pd.DataFrame:
+        """Etsy statement lines: sales, refunds, fees, VAT and marketing"""
+        n_orders = len(order_dates)
+        parts = []
+
+        def add(date_keys, kind, titles, amount=0.0, fees_and_taxes=0.0):
+            size = len(date_keys)
+            parts.append(pd.DataFrame({
+                'transaction_date_key': date_keys,
+                'transaction_type': kind,
+                'transaction_title': titles,
+                'amount': np.broadcast_to(amount, size),
+                'fees_and_taxes': np.broadcast_to(fees_and_taxes, size),
+            }))
+
+        add(order_dates, 'Sale', 'Payment for Order #' + order_ids, amount=order_total)
+        refunded = rng.random(n_orders) < 0.02
+        add(order_dates[refunded], 'Refund', 'Refund to buyer for Order #' + order_ids[refunded],
+            amount=-order_total[refunded])
+
+        line_dates = order_dates[line_order]
+        add(line_dates, 'Fee', 'Transaction fee: ' + self.titles[product_index], fees_and_taxes=-_money(item_total * 0.065))
+        add(line_dates, 'Fee', 'Listing fee', fees_and_taxes=-0.2)
+        add(order_dates, 'Fee', 'Processing fee', fees_and_taxes=-fees)
+        us = geography <= 15
+        add(order_dates[us], 'Fee', 'Regulatory Operating fee', fees_and_taxes=-_money(order_total[us] * 0.011))
+        if shipping.any():
+            shipped = shipping > 0
+            add(order_dates[shipped], 'Fee', 'Transaction fee: Shipping',
+                fees_and_taxes=-_money(shipping[shipped] * 0.065))
+
+        vat = self.vat_geography[geography - 1]
+        add(order_dates[vat], 'VAT', 'VAT: auto-renew sold', fees_and_taxes=-0.04)
+        add(order_dates[vat], 'VAT', 'VAT: Processing Fee', fees_and_taxes=-_money(fees[vat] * 0.2))
+        shipped_vat = vat & (shipping > 0)
+        add(order_dates[shipped_vat], 'VAT', 'VAT: shipping_transaction',
+            fees_and_taxes=-_money(shipping[shipped_vat] * 0.013))
+
+        # Daily ads spend and monthly subscription lines
+        days = self.config.days[first_day:end_day]
+        day_keys = self.date_keys[first_day:end_day]
+        add(day_keys, 'Marketing', 'Etsy Ads', fees_and_taxes=-_money(1 + self.counts[first_day:end_day] * 0.6))
+        month_starts = day_keys[days.day == 1]
+        add(month_starts, 'VAT', 'VAT: Etsy Plus subscription', fees_and_taxes=-2.0)
+        add(month_starts, 'VAT', 'VAT: listing', fees_and_taxes=-0.8)
+        add(month_starts, 'VAT', 'VAT: listing credit', fees_and_taxes=0.15)
+        add(month_starts, 'VAT', 'VAT: transaction credit', fees_and_taxes=0.1)
+
+        fft = pd.concat(parts, ignore_index=True).sort_values('transaction_date_key', kind='stable')
+        fft.insert(0, 'financial_transaction_key', self.next_fft_key + np.arange(len(fft)))
+        self.next_fft_key += len(fft)
+        return fft
+
+    def _bank_rows(self, block: int, first_day: int, end_day: int, n_orders: int) -> pd.DataFrame:
+        """Bank statement lines with running balances per account"""
+        config = self.config
+        rng = config.rng(_STREAM_BANK, block)
+        n = max(1, round(n_orders * config.bank_rows_per_order))
+        account_weights = 0.6 ** np.arange(config.bank_accounts)
+        accounts = rng.choice(config.bank_accounts, n, p=account_weights / account_weights.sum())
+        day_index = np.sort(rng.integers(first_day, end_day, n))
+        order = np.lexsort((accounts, day_index))
+        accounts, day_index = accounts[order], day_index[order]
+
+        credit = rng.random(n) < 0.25
+        gl_codes = np.array(list(DEBIT_ACCOUNTS))
+        gl_pick = rng.choice(len(gl_codes), n, p=np.array(DEBIT_WEIGHTS) / sum(DEBIT_WEIGHTS))
+        typical = np.array([DEBIT_ACCOUNTS[c][1] for c in gl_codes])[gl_pick]
+        amounts = np.round(rng.lognormal(0, 0.5, n) * np.where(credit, 11_000_000, typical), -3)
+        credit_amount = np.where(credit, amounts, 0.0)
+        debit_amount = np.where(credit, 0.0, amounts)
+
+        # Running balance per account, carried over from the previous block
+        balance = np.empty(n)
+        for account in range(config.bank_accounts):
+            mask = accounts == account
+            balance[mask] = self.balances[account] + np.cumsum(credit_amount[mask] - debit_amount[mask])
+            if mask.any():
+                self.balances[account] = balance[mask][-1]
+
+        descriptions = np.empty(n, dtype=object)
+        variant = rng.integers(0, 3, n)
+        for i, code in enumerate(gl_codes):
+            mask = ~credit & (gl_pick == i)
+            texts = DEBIT_ACCOUNTS[code][0]
+            descriptions[mask] = np.array(texts, dtype=object)[variant[mask] % len(texts)]
+        descriptions[credit] = np.array(CREDIT_DESCRIPTIONS, dtype=object)[variant[credit]]
+
+        keys = self.next_bank_key + np.arange(n)
+        self.next_bank_key += n
+        date_keys = self.date_keys[day_index]
+        return pd.DataFrame({
+            'bank_transaction_key': keys,
+            'bank_account_key': accounts + 1,
+            'transaction_date_key': date_keys,
+            'reference_number': 'FT' + pd.Series(date_keys % 1_000_000).astype(str).str.zfill(6)
+                                + pd.Series(keys).astype(str).str.zfill(8),
+            'transaction_description': descriptions,
+            'credit_amount': credit_amount,
+            'debit_amount': debit_amount,
+            'balance_after_transaction': balance,
+            'pl_account_number': np.where(credit, None, gl_codes[gl_pick].astype(object)),
+        })
+
+
+# =============================================================================
+# LOADING
+# =============================================================================
+
+def _check_target(force: bool):
+    """Refuse to drop tables in a database that does not look like a benchmark database"""
+    if 'bench' not in BENCH_CONFIG['database'] and not force:
+        raise SystemExit(f"Refusing to reset {describe_database()}: the database name does not contain "
+                         f"'bench' (use --force if this really is a scratch database)")
+
+
+def generate(config: GeneratorConfig, derived: bool = True, force: bool = False) -> Dict:
+    """
+    Recreate the star schema in the benchmark database and fill it
+
+    Existing benchmark tables are always dropped first: surrogate keys
+    start at 1 in every run, so a data set cannot be appended to another.
+
+    Args:
+        config: Data set size and shape
+        derived: Build rollups, the account summary and the search index
+            afterwards, so feature flags can be benchmarked too
+        force: Allow resetting a database whose name lacks 'bench'
+
+    Returns:
+        dict: Rows loaded per table and timings
+    """
+    _check_target(force)
+    use_bench_database()
+    started = time.perf_counter()
+    conn = bench_connection()
+    conn.connect()
+    rows: Dict[str, int] = {}
+
+    with conn.connection, conn.connection.cursor() as cur:
+        drop_bench_tables(cur)
+        cur.execute(BENCH_SCHEMA_DDL)
+        products, _ = product_rows(config)
+        for table, df in [('dim_time', time_rows(config)), ('dim_geography', geography_rows()),
+                          ('dim_product', products), ('dim_bank_account', bank_account_rows(config))]:
+            rows[table] = copy_dataframe(cur, df, table)
+
+    generator = SyntheticStarSchema(config)
+    for block in generator.blocks():
+        # One transaction per block keeps memory and WAL bounded
+        with conn.connection, conn.connection.cursor() as cur:
+            for table, df in block.items():
+                rows[table] = rows.get(table, 0) + copy_dataframe(cur, df, table)
+        print(f"  ... {rows['fact_sales']:,} sales rows", flush=True)
+    with conn.connection, conn.connection.cursor() as cur:
+        sync_key_sequences(cur)
+    loaded = time.perf_counter()
+
+    previous_autocommit = conn.connection.autocommit
+    conn.connection.autocommit = True
+    try:
+        with conn.connection.cursor() as cur:
+            for index in INDEXES:
+                cur.execute(index_ddl(index))
+            cur.execute("ANALYZE")
+    finally:
+        conn.connection.autocommit = previous_autocommit
+
+    if derived:
+        from src.analytics.warehouse.rollups import refresh_rollups
+        from src.analytics.warehouse.account_summary import refresh_account_summary
+        from src.analytics.warehouse.transaction_search import apply_transaction_search
+        refresh_rollups(connection=conn)
+        refresh_account_summary(connection=conn)
+        apply_transaction_search(conn, concurrently=False)
+    conn.disconnect()
+
+    return {'rows': rows, 'load_seconds': round(loaded - started, 1),
+            'total_seconds': round(time.perf_counter() - started, 1)}
+
+
+def _scale(text: str) -> int:
+    return SCALES[text.lower()] if text.lower() in SCALES else int(text)
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Generate the synthetic benchmark database")
+    parser.add_argument('--scale', type=_scale, default=SCALES['100k'],
+                        help=f"fact_sales rows: {', '.join(SCALES)} or a number")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--start', type=date.fromisoformat, default=date(2023, 1, 1))
+    parser.add_argument('--end', type=date.fromisoformat, default=date(2025, 12, 31))
+    parser.add_argument('--repeat-rate', type=float, default=0.35, help="Share of orders from returning customers")
+    parser.add_argument('--bank-accounts', type=int, default=3)
+    parser.add_argument('--no-derived', action='store_true', help="Skip rollups, account summary and search index")
+    parser.add_argument('--force', action='store_true', help="Reset even if the database name lacks 'bench'")
+    args = parser.parse_args()
+
+    config = GeneratorConfig(sales_rows=args.scale, start=args.start, end=args.end, seed=args.seed,
+                             repeat_rate=args.repeat_rate, bank_accounts=args.bank_accounts)
+    print(f"Generating {config.sales_rows:,} sales rows into {describe_database()}")
+    stats = generate(config, derived=not args.no_derived, force=args.force)
+    for table, count in stats['rows'].items():
+        print(f"  {table:30s} {count:>12,}")
+    print(f"Loaded in {stats['load_seconds']}s, ready in {stats['total_seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
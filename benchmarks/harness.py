@@ -0,0 +1,147 @@
+"""
+Time every dashboard data function against the benchmark database
+"""
+import argparse
+import fnmatch
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from benchmarks.database import bench_connection, describe_database, table_rows, use_bench_database
+from benchmarks.results import run_metadata, summarize, write_results
+from src.analytics.utils.postgres_connection import add_query_error_listener, remove_query_error_listener
+
+CACHE_MODES = ('cold', 'warm')
+
+
+def _row_count(result) -> Optional[int]:
+    """Rows returned by a data function (None when it does not return a frame)"""
+    if isinstance(result, pd.DataFrame):
+        return len(result)
+    if isinstance(result, (tuple, list)):
+        counts = [len(r) for r in result if isinstance(r, pd.DataFrame)]
+        return sum(counts) if counts else None
+    return None
+
+
+def default_account_number() -> Optional[str]:
+    """Account with the most transactions, for the statement queries"""
+    conn = bench_connection()
+    df = conn.execute_query("""SELECT dba.account_number FROM dim_bank_account dba
+        JOIN fact_bank_transactions fbt ON fbt.bank_account_key = dba.bank_account_key
+        GROUP BY dba.account_number ORDER BY COUNT(*) DESC LIMIT 1""")
+    conn.disconnect()
+    return None if df.empty else str(df.iloc[0, 0])
+
+
+def time_queries(start_date: str, end_date: str, account_number: Optional[str] = None, repeats: int = 5,
+                 warmup: int = 1, cache: str = 'cold', only: Optional[List[str]] = None) -> Dict[str, Dict]:
+    """
+    Time each registered data function
+
+    In 'cold' mode Streamlit's data cache is cleared before every call, so
+    each sample includes the database round trip and post-processing. In
+    'warm' mode only the first (warmup) call misses. Shared resources such
+    as the fact cube are loaded once, as in a running app.
+
+    A call during which a query failed (the app shows st.error and carries
+    on with an empty frame) or that raised is counted in 'errors' and not
+    timed, so a broken query never looks fast.
+
+    Args:
+        start_date: 'YYYY-MM-DD' sidebar start date
+        end_date: 'YYYY-MM-DD' sidebar end date
+        account_number: Bank account for the statement queries
+        repeats: Timed calls per function
+        warmup: Untimed calls per function before the timed ones
+        cache: One of CACHE_MODES
+        only: fnmatch patterns of function names to run (all by default)
+
+    Returns:
+        dict: Function name -> summarize() of its successful samples plus
+            'rows', 'errors' (failed calls, warmup included) and 'error'
+            (first failure message, or None)
+    """
+    import streamlit as st
+    from src.analytics.dashboard.chart_registry import registered_queries
+
+    failures: List[str] = []
+
+    def record_failure(query, params, error):
+        failures.append(f"{type(error).__name__}: {error}")
+
+    results: Dict[str, Dict] = {}
+    add_query_error_listener(record_failure)
+    try:
+        for name, function, kwargs in registered_queries(start_date, end_date, ('all', 'new', 'return'),
+                                                         account_number):
+            if only and not any(fnmatch.fnmatch(name, pattern) for pattern in only):
+                continue
+            st.cache_data.clear()
+            samples = []
+            rows = None
+            errors = []
+            for i in range(warmup + repeats):
+                if cache == 'cold' or errors:
+                    # A failed call may have cached its empty result
+                    st.cache_data.clear()
+                failures.clear()
+                started = time.perf_counter()
+                try:
+                    result = function(**kwargs)
+                except Exception as e:
+                    failures.append(f"{type(e).__name__}: {e}")
+                elapsed = (time.perf_counter() - started) * 1000
+                if failures:
+                    errors.append(failures[0])
+                    continue
+                if i >= warmup:
+                    samples.append(elapsed)
+                rows = _row_count(result)
+            results[name] = {**summarize(samples), 'rows': rows, 'errors': len(errors),
+                             'error': errors[0] if errors else None}
+            if samples:
+                print(f"{results[name]['p50_ms']:10.1f} ms p50 {results[name]['p95_ms']:10.1f} ms p95  {name}"
+                      + (f"  ({len(errors)} failed calls)" if errors else ""), flush=True)
+            else:
+                print(f"{'FAILED':>36}  {name}: {errors[0]}", flush=True)
+    finally:
+        remove_query_error_listener(record_failure)
+    return results
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Time dashboard data functions on the benchmark database")
+    parser.add_argument('--start', default='2025-01-01', help="Sidebar start date")
+    parser.add_argument('--end', default='2025-12-31', help="Sidebar end date")
+    parser.add_argument('--account', default=None, help="Account number for statement queries "
+                                                        "(default: the busiest account)")
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--cache', choices=CACHE_MODES, default='cold')
+    parser.add_argument('--only', nargs='+', default=None, help="Function name patterns, e.g. 'total_*'")
+    parser.add_argument('--output', default=None, help="Result JSON (default: benchmarks/results/...)")
+    args = parser.parse_args()
+
+    use_bench_database()
+    account_number = args.account or default_account_number()
+    print(f"Timing data functions on {describe_database()} ({args.cache} cache, {args.repeats} repeats)")
+    results = time_queries(args.start, args.end, account_number, args.repeats, args.warmup, args.cache, args.only)
+    meta = run_metadata('queries', start_date=args.start, end_date=args.end, account_number=account_number,
+                        repeats=args.repeats, warmup=args.warmup, cache=args.cache, tables=table_rows())
+    print(f"Results written to {write_results(meta, results, args.output)}")
+    failed = [name for name, result in results.items() if result['errors']]
+    if failed:
+        print(f"⚠️ {len(failed)} functions had failing queries: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+Concurrent-session load test of the dashboard data functions
+
+Each simulated analyst is a thread that walks through a sequence of
+filter changes and, after each change, calls every data function the
+dashboard calls on a rerun, exactly as a Streamlit session thread would
+(shared data cache, shared connection). No browser is involved.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from datetime import date
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from benchmarks.database import bench_connection, describe_database, table_rows, use_bench_database
+from benchmarks.results import run_metadata, summarize, write_results
+from src.analytics.utils.postgres_connection import add_query_listener, remove_query_listener
+
+CUSTOMER_TYPES = ('all', 'new', 'return')
+LIFESPANS = (6, 12, 24, 36)
+VIEW_MODES = ('month', 'year', 'month_year')
+# Data function arguments set from the Customer Lifespan slider
+LIFESPAN_ARGUMENTS = ('lifespan_months', 'customer_lifespan_months')
+
+# Seconds between pg_stat_activity samples
+MONITOR_INTERVAL = 0.2
+
+# Error messages kept per level (all failed calls are counted)
+ERROR_SAMPLES = 20
+
+# Queries issued by the data function running on each thread
+_thread_queries = threading.local()
+
+
+def _count_query(query: str, params: Optional[tuple]):
+    if hasattr(_thread_queries, 'count'):
+        _thread_queries.count += 1
+
+
+def _period(year: int, month: Optional[int]) -> Tuple[str, str]:
+    """Sidebar start/end dates of a year or a month"""
+    if month is None:
+        return f"{year}-01-01", f"{year}-12-31"
+    end = date(year + (month == 12), month % 12 + 1, 1).toordinal() - 1
+    return f"{year}-{month:02d}-01", date.fromordinal(end).isoformat()
+
+
+def session_states(seed: int, session: int, steps: int, years: List[int]) -> List[Dict]:
+    """
+    Filter states one analyst goes through, one widget change per step
+
+    Args:
+        seed: Load test seed
+        session: Session number (each gets its own sequence)
+        steps: Filter changes after the first load
+        years: Years with data
+
+    Returns:
+        list: steps + 1 states (year, month, customer_type, lifespan, view_mode)
+    """
+    rng = np.random.default_rng([seed, session])
+    state = {'year': years[-1], 'month': None, 'customer_type': 'all', 'lifespan': 12, 'view_mode': 'month'}
+    states = [dict(state)]
+    for _ in range(steps):
+        change = rng.choice(['year', 'month', 'customer_type', 'lifespan', 'view_mode'], p=[0.25, 0.3, 0.2, 0.1, 0.15])
+        if change == 'year':
+            state['year'] = int(rng.choice(years))
+        elif change == 'month':
+            state['month'] = None if rng.random() < 0.3 else int(rng.integers(1, 13))
+        elif change == 'customer_type':
+            state['customer_type'] = str(rng.choice(CUSTOMER_TYPES))
+        elif change == 'lifespan':
+            state['lifespan'] = int(rng.choice(LIFESPANS))
+        else:
+            state['view_mode'] = str(rng.choice(VIEW_MODES))
+        states.append(dict(state))
+    return states
+
+
+def rerun_calls(state: Dict) -> List[Tuple[str, Callable, Dict]]:
+    """Data functions (with arguments) one dashboard rerun calls in a filter state"""
+    from src.analytics.dashboard.chart_registry import registered_queries
+
+    start_date, end_date = _period(state['year'], state['month'])
+    calls = []
+    for name, function, kwargs in registered_queries(start_date, end_date, (state['customer_type'],)):
+        # P&L functions are registered once per view mode; a rerun uses one
+        variant = name.rsplit('[', 1)[-1].rstrip(']') if name.endswith(']') else None
+        if variant in VIEW_MODES and variant != state['view_mode']:
+            continue
+        # The Customer Lifespan slider feeds both CLV and the CAC:CLV ratio
+        for argument in LIFESPAN_ARGUMENTS:
+            if argument in kwargs:
+                kwargs = {**kwargs, argument: state['lifespan']}
+        calls.append((name, function, kwargs))
+    return calls
+
+
+class _Monitor(threading.Thread):
+    """Samples the benchmark database's connections while the load runs"""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.stop = threading.Event()
+        self.samples: List[Tuple[int, int]] = []
+
+    def run(self):
+        conn = bench_connection()
+        while not self.stop.is_set():
+            df = conn.execute_query("""SELECT COUNT(*) AS total, COUNT(*) FILTER (WHERE state = 'active') AS active
+                FROM pg_stat_activity WHERE datname = current_database() AND pid <> pg_backend_pid()""")
+            if not df.empty:
+                self.samples.append((int(df.iloc[0]['total']), int(df.iloc[0]['active'])))
+            self.stop.wait(MONITOR_INTERVAL)
+        conn.disconnect()
+
+
+def _buffer_counters() -> Tuple[int, int]:
+    """Shared buffer hits and reads of the benchmark database so far"""
+    conn = bench_connection()
+    df = conn.execute_query("SELECT blks_hit, blks_read FROM pg_stat_database WHERE datname = current_database()")
+    conn.disconnect()
+    return (0, 0) if df.empty else (int(df.iloc[0]['blks_hit']), int(df.iloc[0]['blks_read']))
+
+
+def run_level(sessions: int, steps: int, years: List[int], seed: int = 42, think_ms: float = 0.0,
+              clear_cache: bool = True) -> Dict:
+    """
+    Run N concurrent sessions to completion
+
+    Args:
+        sessions: Concurrent sessions
+        steps: Filter changes per session (after its first load)
+        years: Years with data
+        seed: Load test seed
+        think_ms: Pause between reruns of one session
+        clear_cache: Start with an empty Streamlit data cache
+
+    Returns:
+        dict: summarize() of rerun latencies plus throughput, call
+            latencies, cache hit ratios, connection usage, 'error_count'
+            (failed calls) and 'errors' (the first ERROR_SAMPLES messages)
+    """
+    import streamlit as st
+
+    if clear_cache:
+        st.cache_data.clear()
+    reruns: List[float] = []
+    calls: List[Tuple[float, int]] = []
+    errors: List[str] = []
+    lock = threading.Lock()
+
+    def session(number: int):
+        _thread_queries.count = 0
+        for state in session_states(seed, number, steps, years):
+            started = time.perf_counter()
+            for name, function, kwargs in rerun_calls(state):
+                before = _thread_queries.count
+                call_started = time.perf_counter()
+                try:
+                    function(**kwargs)
+                except Exception as e:
+                    with lock:
+                        errors.append(f"{name}: {e}")
+                with lock:
+                    calls.append(((time.perf_counter() - call_started) * 1000, _thread_queries.count - before))
+            with lock:
+                reruns.append((time.perf_counter() - started) * 1000)
+            if think_ms:
+                time.sleep(think_ms / 1000)
+
+    monitor = _Monitor()
+    hits_before, reads_before = _buffer_counters()
+    add_query_listener(_count_query)
+    monitor.start()
+    started = time.perf_counter()
+    threads = [threading.Thread(target=session, args=(n,), name=f"session-{n}") for n in range(sessions)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        elapsed = time.perf_counter() - started
+        monitor.stop.set()
+        monitor.join()
+        remove_query_listener(_count_query)
+    hits_after, reads_after = _buffer_counters()
+
+    call_ms = np.array([c[0] for c in calls])
+    queries = np.array([c[1] for c in calls])
+    hits, reads = hits_after - hits_before, reads_after - reads_before
+    connections = np.array(monitor.samples or [(0, 0)])
+    return {
+        **summarize(reruns),
+        'sessions': sessions,
+        'seconds': round(elapsed, 3),
+        'reruns_per_second': round(len(reruns) / elapsed, 3),
+        'calls_per_second': round(len(calls) / elapsed, 3),
+        'call_p50_ms': round(float(np.percentile(call_ms, 50)), 3) if calls else None,
+        'call_p95_ms': round(float(np.percentile(call_ms, 95)), 3) if calls else None,
+        'call_p99_ms': round(float(np.percentile(call_ms, 99)), 3) if calls else None,
+        'queries': int(queries.sum()),
+        'cache_hit_ratio': round(float((queries == 0).mean()), 4) if calls else None,
+        'buffer_hit_ratio': round(hits / (hits + reads), 4) if hits + reads else None,
+        'connections_peak': int(connections[:, 0].max()),
+        'connections_mean': round(float(connections[:, 0].mean()), 2),
+        'active_peak': int(connections[:, 1].max()),
+        'active_mean': round(float(connections[:, 1].mean()), 2),
+        'error_count': len(errors),
+        'errors': errors[:ERROR_SAMPLES],
+    }
+
+
+def data_years() -> List[int]:
+    """Years that have sales in the benchmark database"""
+    conn = bench_connection()
+    df = conn.execute_query("""SELECT DISTINCT dt.year FROM fact_sales fs
+        JOIN dim_time dt ON fs.sale_date_key = dt.time_key ORDER BY dt.year""")
+    conn.disconnect()
+    return [int(y) for y in df['year']] if not df.empty else [date.today().year]
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Load test the dashboard data functions with concurrent sessions")
+    parser.add_argument('--sessions', nargs='+', type=int, default=[1, 2, 4, 8, 16],
+                        help="Concurrency levels, run in order")
+    parser.add_argument('--steps', type=int, default=10, help="Filter changes per session")
+    parser.add_argument('--think-ms', type=float, default=0.0, help="Pause between reruns of a session")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--warm', action='store_true', help="Keep the data cache between levels")
+    parser.add_argument('--output', default=None, help="Result JSON (default: benchmarks/results/...)")
+    args = parser.parse_args()
+
+    use_bench_database()
+    years = data_years()
+    print(f"Load testing {describe_database()} (years {years[0]}-{years[-1]}, {args.steps} steps per session)")
+    print(f"{'sessions':>8} {'reruns/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'call p99':>9} "
+          f"{'cache hit':>9} {'buf hit':>8} {'conns':>6} {'active':>6}")
+    results: Dict[str, Dict] = {}
+    for sessions in args.sessions:
+        level = run_level(sessions, args.steps, years, args.seed, args.think_ms, clear_cache=not args.warm)
+        results[f"sessions={sessions}"] = level
+        buffer_hit = f"{level['buffer_hit_ratio']:.1%}" if level['buffer_hit_ratio'] is not None else '-'
+        print(f"{sessions:>8} {level['reruns_per_second']:>9.2f} {level['p50_ms']:>9.0f} {level['p95_ms']:>9.0f} "
+              f"{level['call_p99_ms']:>9.0f} {level['cache_hit_ratio']:>9.1%} {buffer_hit:>8} "
+              f"{level['connections_peak']:>6} {level['active_peak']:>6}", flush=True)
+        for error in level['errors']:
+            print(f"  ⚠️ {error}")
+        if level['error_count'] > len(level['errors']):
+            print(f"  ⚠️ ... {level['error_count'] - len(level['errors'])} more failed calls")
+
+    meta = run_metadata('load', steps=args.steps, think_ms=args.think_ms, seed=args.seed, warm=args.warm,
+                        years=years, tables=table_rows())
+    print(f"Results written to {write_results(meta, results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
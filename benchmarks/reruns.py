@@ -0,0 +1,156 @@
+"""
+End-to-end rerun latency of the Streamlit app, driven headlessly with AppTest
+
+Each session starts the app, then replays the same interactions a user
+would make. Every rerun is timed as a whole (queries, pandas, Plotly
+figures and HTML tables) and broken down by the sections marked with
+src.analytics.utils.perf.mark_section.
+"""
+import argparse
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from benchmarks.database import describe_database, table_rows, use_bench_database
+from benchmarks.results import run_metadata, summarize, write_results
+from src.analytics.utils.perf import PERF_SECTIONS_ENV, PERF_SECTIONS_STATE_KEY
+from src.analytics.utils.postgres_connection import add_query_listener, remove_query_listener
+
+APP_SCRIPT = os.path.join(project_root, 'src', 'analytics', 'streamlit_run.py')
+
+# Seconds a single rerun may take before AppTest gives up
+RERUN_TIMEOUT = 600
+
+# (name, widget change before the rerun), replayed in order in each session;
+# the change receives the AppTest and the year to select
+INTERACTIONS: List[Tuple[str, Optional[Callable]]] = [
+    ('initial_load', None),
+    ('change_year', lambda at, year: at.selectbox(key='selected_year').select(year)),
+    ('toggle_customer_type', lambda at, year: at.selectbox(key='customer_type').select('new')),
+    ('move_lifespan_slider', lambda at, year: at.slider(key='customer_lifespan_months').set_value(24)),
+    ('switch_pl_view', lambda at, year: at.selectbox(key='pl_view_mode').select('Year')),
+]
+
+
+def run_session(year: int, clear_cache: bool = True) -> Dict[str, Dict]:
+    """
+    One simulated user session
+
+    Args:
+        year: Year picked by the change_year interaction
+        clear_cache: Start with an empty Streamlit data cache
+
+    Returns:
+        dict: Interaction -> {'ms', 'queries', 'sections'}
+
+    Raises:
+        RuntimeError: If a rerun raised an exception
+    """
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    if clear_cache:
+        st.cache_data.clear()
+    queries = []
+
+    def count_query(query, params):
+        queries.append(query)
+
+    at = AppTest.from_file(APP_SCRIPT, default_timeout=RERUN_TIMEOUT)
+    timings: Dict[str, Dict] = {}
+    add_query_listener(count_query)
+    try:
+        for name, change in INTERACTIONS:
+            if change is not None:
+                change(at, year)
+            queries.clear()
+            started = time.perf_counter()
+            at.run()
+            elapsed = (time.perf_counter() - started) * 1000
+            if at.exception:
+                raise RuntimeError(f"{name}: {at.exception[0].message}")
+            # Section timings are kept in the session that ran
+            sections = at.session_state[PERF_SECTIONS_STATE_KEY] if PERF_SECTIONS_STATE_KEY in at.session_state else {}
+            timings[name] = {'ms': elapsed, 'queries': len(queries), 'sections': dict(sections)}
+    finally:
+        remove_query_listener(count_query)
+    return timings
+
+
+def time_reruns(year: int, sessions: int = 5, warmup: int = 1, cache: str = 'cold') -> Dict[str, Dict]:
+    """
+    Time every interaction over several sessions
+
+    Args:
+        year: Year picked by the change_year interaction
+        sessions: Timed sessions
+        warmup: Untimed sessions first (imports, shared resources)
+        cache: 'cold' clears the data cache before each session, 'warm'
+            keeps what earlier sessions cached
+
+    Returns:
+        dict: Interaction -> summarize() of rerun times, plus 'queries'
+            (per rerun) and 'sections' (section -> summarize())
+    """
+    os.environ[PERF_SECTIONS_ENV] = '1'
+    samples: Dict[str, List[Dict]] = {name: [] for name, _ in INTERACTIONS}
+    for session in range(warmup + sessions):
+        timings = run_session(year, clear_cache=(cache == 'cold'))
+        if session < warmup:
+            continue
+        for name, timing in timings.items():
+            samples[name].append(timing)
+        print(f"  session {session - warmup + 1}/{sessions}: "
+              + ", ".join(f"{name} {t['ms']:.0f} ms" for name, t in timings.items()), flush=True)
+
+    results: Dict[str, Dict] = {}
+    for name, runs in samples.items():
+        sections: Dict[str, List[float]] = {}
+        for run in runs:
+            for section, ms in run['sections'].items():
+                sections.setdefault(section, []).append(ms)
+        results[name] = {
+            **summarize([run['ms'] for run in runs]),
+            'queries': max((run['queries'] for run in runs), default=0),
+            'sections': {section: summarize(values) for section, values in sections.items()},
+        }
+    return results
+
+
+def print_breakdown(results: Dict[str, Dict]):
+    """Median rerun time of each interaction with its slowest sections"""
+    for name, result in results.items():
+        print(f"\n{name}: p50 {result['p50_ms']:.0f} ms, p95 {result['p95_ms']:.0f} ms, "
+              f"{result['queries']} queries")
+        sections = sorted(result['sections'].items(), key=lambda item: item[1]['p50_ms'], reverse=True)
+        for section, summary in sections:
+            share = summary['p50_ms'] / result['p50_ms'] * 100 if result['p50_ms'] else 0
+            print(f"  {summary['p50_ms']:9.1f} ms {share:5.1f}%  {section}")
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Time full app reruns on the benchmark database")
+    parser.add_argument('--year', type=int, default=2025, help="Year picked by the change_year step")
+    parser.add_argument('--sessions', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--cache', choices=('cold', 'warm'), default='cold')
+    parser.add_argument('--output', default=None, help="Result JSON (default: benchmarks/results/...)")
+    args = parser.parse_args()
+
+    use_bench_database()
+    print(f"Timing reruns on {describe_database()} ({args.cache} cache, {args.sessions} sessions)")
+    results = time_reruns(args.year, args.sessions, args.warmup, args.cache)
+    print_breakdown(results)
+    meta = run_metadata('reruns', year=args.year, sessions=args.sessions, warmup=args.warmup, cache=args.cache,
+                        interactions=[name for name, _ in INTERACTIONS], tables=table_rows())
+    print(f"\nResults written to {write_results(meta, results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark result files: run metadata, latency summaries and JSON I/O
+
+Every benchmark writes {'meta': {...}, 'results': {name: summary}}, where
+a summary keeps the raw samples so runs can be compared statistically.
+"""
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from benchmarks.database import describe_database
+
+RESULTS_DIR = os.path.join(project_root, 'benchmarks', 'results')
+
+# Environment variables recorded with each run (the app's feature flags)
+FLAG_ENV_PREFIX = 'ANALYTICS_'
+
+
+def git_revision() -> Dict:
+    """Commit, branch and whether the working tree has uncommitted changes"""
+    def git(*args) -> str:
+        try:
+            return subprocess.run(['git', *args], cwd=project_root, capture_output=True, text=True,
+                                  check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ''
+
+    return {
+        'commit': git('rev-parse', 'HEAD') or 'unknown',
+        'branch': git('rev-parse', '--abbrev-ref', 'HEAD'),
+        'dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+    }
+
+
+def run_metadata(kind: str, **extra) -> Dict:
+    """
+    Description of a benchmark run
+
+    Args:
+        kind: Benchmark name ('queries', 'reruns', 'load', ...)
+        **extra: Benchmark-specific settings (scale, repeats, ...)
+
+    Returns:
+        dict: Metadata stored under 'meta' in the result file
+    """
+    return {
+        'kind': kind,
+        **git_revision(),
+        'timestamp': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'python': platform.python_version(),
+        'machine': platform.node(),
+        'database': describe_database(),
+        'flags': {name: value for name, value in sorted(os.environ.items()) if name.startswith(FLAG_ENV_PREFIX)},
+        **extra,
+    }
+
+
+def summarize(samples_ms: List[float]) -> Dict:
+    """
+    Latency summary of repeated measurements
+
+    Args:
+        samples_ms: One duration per repetition, in milliseconds
+
+    Returns:
+        dict: samples_ms, n, p50_ms, p95_ms, mean_ms, min_ms, max_ms
+    """
+    samples = np.asarray(samples_ms, dtype=float)
+    if samples.size == 0:
+        return {'samples_ms': [], 'n': 0}
+    return {
+        'samples_ms': [round(float(s), 3) for s in samples],
+        'n': int(samples.size),
+        'p50_ms': round(float(np.percentile(samples, 50)), 3),
+        'p95_ms': round(float(np.percentile(samples, 95)), 3),
+        'mean_ms': round(float(samples.mean()), 3),
+        'min_ms': round(float(samples.min()), 3),
+        'max_ms': round(float(samples.max()), 3),
+    }
+
+
+def default_output_path(meta: Dict) -> str:
+    """results/<kind>_<commit>_<timestamp>.json"""
+    stamp = meta['timestamp'].replace('-', '').replace(':', '')
+    dirty = '-dirty' if meta.get('dirty') else ''
+    return os.path.join(RESULTS_DIR, f"{meta['kind']}_{meta['commit'][:10]}{dirty}_{stamp}.json")
+
+
+def write_results(meta: Dict, results: Dict, path: Optional[str] = None) -> str:
+    """
+    Write a result file
+
+    Args:
+        meta: Result of run_metadata
+        results: Name -> summary
+        path: Output file (default_output_path by default)
+
+    Returns:
+        str: Path written
+    """
+    path = path or default_output_path(meta)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'meta': meta, 'results': results}, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def load_results(path: str) -> Dict:
+    """Read a result file written by write_results"""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,151 @@
+"""
+Star schema created in the benchmark database
+
+Columns are the ones the loaders write and the dashboard reads.
+Surrogate keys are serial columns, as the loaders insert without them;
+the generator writes explicit keys and then moves the sequences past
+them (sync_key_sequences). Indexes are not declared here: the generator applies
+src.analytics.warehouse.schema.INDEXES after loading, so the benchmark
+always runs with the indexes the app declares at that commit.
+"""
+from typing import Dict, List
+
+# Creation order (dimensions before facts); dropped in reverse
+BENCH_TABLES: List[str] = [
+    'dim_time', 'dim_customer', 'dim_product', 'dim_geography', 'dim_order', 'dim_bank_account',
+    'fact_sales', 'fact_payments', 'fact_financial_transactions', 'fact_bank_transactions',
+]
+
+# Tables derived from the facts by the warehouse tools; dropped on reset so
+# they are rebuilt from the new data
+DERIVED_TABLES: List[str] = [
+    'rollup_sales_daily', 'rollup_sales_monthly', 'rollup_orders_daily', 'rollup_orders_monthly',
+    'rollup_payments_daily', 'rollup_payments_monthly', 'bank_account_summary',
+    'etl_loads', 'etl_row_hashes', 'etl_watermarks',
+]
+
+BENCH_SCHEMA_DDL = """
+CREATE TABLE IF NOT EXISTS dim_time (
+    time_key        INTEGER PRIMARY KEY,
+    full_date       DATE NOT NULL,
+    day_of_month    SMALLINT NOT NULL,
+    day_of_week     SMALLINT NOT NULL,
+    day_name        TEXT NOT NULL,
+    month           SMALLINT NOT NULL,
+    month_name      TEXT NOT NULL,
+    quarter         SMALLINT NOT NULL,
+    year            SMALLINT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS dim_customer (
+    customer_key    BIGSERIAL PRIMARY KEY,
+    buyer_username  TEXT NOT NULL,
+    buyer_user_id   TEXT,
+    full_name       TEXT
+);
+
+CREATE TABLE IF NOT EXISTS dim_product (
+    product_key     BIGSERIAL PRIMARY KEY,
+    listing_id      TEXT NOT NULL,
+    title           TEXT,
+    is_current      BOOLEAN NOT NULL DEFAULT true
+);
+
+CREATE TABLE IF NOT EXISTS dim_geography (
+    geography_key   BIGSERIAL PRIMARY KEY,
+    state_name      TEXT,
+    country_name    TEXT
+);
+
+CREATE TABLE IF NOT EXISTS dim_order (
+    order_key                       BIGSERIAL PRIMARY KEY,
+    order_id                        TEXT NOT NULL,
+    card_processing_fees            NUMERIC(12, 2),
+    adjusted_card_processing_fees   NUMERIC(12, 2)
+);
+
+CREATE TABLE IF NOT EXISTS dim_bank_account (
+    bank_account_key    BIGSERIAL PRIMARY KEY,
+    account_number      TEXT NOT NULL,
+    account_name        TEXT,
+    cif_number          TEXT,
+    customer_address    TEXT,
+    opening_date        DATE,
+    currency_code       TEXT
+);
+
+CREATE TABLE IF NOT EXISTS fact_sales (
+    sales_key           BIGSERIAL PRIMARY KEY,
+    transaction_id      TEXT NOT NULL,
+    sale_date_key       INTEGER NOT NULL REFERENCES dim_time (time_key),
+    customer_key        BIGINT REFERENCES dim_customer (customer_key),
+    product_key         BIGINT REFERENCES dim_product (product_key),
+    geography_key       BIGINT REFERENCES dim_geography (geography_key),
+    order_key           BIGINT REFERENCES dim_order (order_key),
+    quantity            INTEGER,
+    price               NUMERIC(12, 2),
+    item_total          NUMERIC(12, 2),
+    discount_amount     NUMERIC(12, 2),
+    shipping_discount   NUMERIC(12, 2)
+);
+
+CREATE TABLE IF NOT EXISTS fact_payments (
+    payment_key         BIGSERIAL PRIMARY KEY,
+    payment_id          TEXT NOT NULL,
+    payment_date_key    INTEGER NOT NULL REFERENCES dim_time (time_key),
+    order_key           BIGINT REFERENCES dim_order (order_key),
+    customer_key        BIGINT REFERENCES dim_customer (customer_key),
+    gross_amount        NUMERIC(12, 2),
+    fees                NUMERIC(12, 2),
+    net_amount          NUMERIC(12, 2),
+    posted_fees         NUMERIC(12, 2),
+    adjusted_fees       NUMERIC(12, 2)
+);
+
+CREATE TABLE IF NOT EXISTS fact_financial_transactions (
+    financial_transaction_key   BIGSERIAL PRIMARY KEY,
+    transaction_date_key        INTEGER NOT NULL REFERENCES dim_time (time_key),
+    transaction_type            TEXT NOT NULL,
+    transaction_title           TEXT,
+    amount                      NUMERIC(12, 2),
+    fees_and_taxes              NUMERIC(12, 2)
+);
+
+CREATE TABLE IF NOT EXISTS fact_bank_transactions (
+    bank_transaction_key        BIGSERIAL PRIMARY KEY,
+    bank_account_key            BIGINT NOT NULL REFERENCES dim_bank_account (bank_account_key),
+    transaction_date_key        INTEGER NOT NULL REFERENCES dim_time (time_key),
+    reference_number            TEXT,
+    transaction_description     TEXT,
+    credit_amount               NUMERIC(18, 2),
+    debit_amount                NUMERIC(18, 2),
+    balance_after_transaction   NUMERIC(18, 2),
+    pl_account_number           TEXT
+);
+"""
+
+# Table -> serial surrogate key
+SERIAL_KEYS: Dict[str, str] = {
+    'dim_customer': 'customer_key',
+    'dim_product': 'product_key',
+    'dim_geography': 'geography_key',
+    'dim_order': 'order_key',
+    'dim_bank_account': 'bank_account_key',
+    'fact_sales': 'sales_key',
+    'fact_payments': 'payment_key',
+    'fact_financial_transactions': 'financial_transaction_key',
+    'fact_bank_transactions': 'bank_transaction_key',
+}
+
+
+def sync_key_sequences(cur):
+    """Move each key sequence past the largest key, so later loader inserts do not collide"""
+    for table, key in SERIAL_KEYS.items():
+        cur.execute(f"SELECT setval(pg_get_serial_sequence(%s, %s), COALESCE(MAX({key}), 0) + 1, false) "
+                    f"FROM {table}", (table, key))
+
+
+def drop_bench_tables(cur):
+    """Drop the star schema and every table derived from it"""
+    for table in DERIVED_TABLES + BENCH_TABLES[::-1]:
+        cur.execute(f"DROP TABLE IF EXISTS {table} CASCADE")
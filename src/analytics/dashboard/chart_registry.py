@@ -0,0 +1,132 @@
+"""
+Registry of dashboard data functions and the arguments the UI calls them with
+"""
+import os
+import sys
+from datetime import date
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.insert(0, project_root)
+
+from src.analytics.dashboard.charts.get_total_revenue import get_total_revenue
+from src.analytics.dashboard.charts.get_total_orders import get_total_orders
+from src.analytics.dashboard.charts.get_total_customers import get_total_customers
+from src.analytics.dashboard.charts.get_average_order_value import get_average_order_value
+from src.analytics.dashboard.charts.get_revenue_by_month import get_revenue_by_month
+from src.analytics.dashboard.charts.get_profit_by_month import get_profit_by_month
+from src.analytics.dashboard.charts.get_new_vs_returning_customer_sales import get_new_vs_returning_customer_sales
+from src.analytics.dashboard.charts.get_new_customers_over_time import get_new_customers_over_time
+from src.analytics.dashboard.charts.get_customers_by_location import get_customers_by_location
+from src.analytics.dashboard.charts.get_total_sales_by_product import get_total_sales_by_product
+from src.analytics.dashboard.charts.get_customer_acquisition_cost import get_customer_acquisition_cost
+from src.analytics.dashboard.charts.get_customer_lifetime_value import get_customer_lifetime_value
+from src.analytics.dashboard.charts.get_customer_retention_rate import get_customer_retention_rate
+from src.analytics.dashboard.charts.get_total_orders_by_month import get_total_orders_by_month
+from src.analytics.dashboard.charts.get_average_order_value_over_time import get_average_order_value_over_time
+from src.analytics.dashboard.charts.get_revenue_comparison_by_month import get_revenue_comparison_by_month
+from src.analytics.dashboard.charts.get_cac_clv_ratio_over_time import get_cac_clv_ratio_over_time
+from src.analytics.dashboard.profit_loss_statement.profit_loss_summary_table import get_profit_loss_summary_table
+from src.analytics.dashboard.profit_loss_statement.profit_loss_line_chart import get_profit_loss_line_chart_data
+from src.analytics.dashboard.profit_loss_statement.profit_loss_bar_chart import get_revenue_expenses_profit_bar_data
+from src.analytics.reports.streamlit_account_statement import (
+    get_bank_account_table_data, get_bank_account_info, get_account_statement_data,
+    get_account_statement_page, get_bank_account_summary_page, get_transaction_search_page
+)
+from src.analytics.warehouse.account_summary import account_summary_enabled
+from src.analytics.warehouse.transaction_search import transaction_search_enabled
+
+# Typical search of the transaction search box (a common description phrase)
+TRANSACTION_SEARCH_SAMPLE = 'chuyen khoan'
+
+# Default of the Customer Lifespan (months) slider
+DEFAULT_LIFESPAN_MONTHS = 12
+
+# Chart functions filtered by date range and customer type
+CUSTOMER_TYPE_CHARTS: List[Tuple[str, Callable]] = [
+    ('total_revenue', get_total_revenue),
+    ('total_orders', get_total_orders),
+    ('total_customers', get_total_customers),
+    ('average_order_value', get_average_order_value),
+    ('revenue_by_month', get_revenue_by_month),
+    ('profit_by_month', get_profit_by_month),
+    ('new_vs_returning_customer_sales', get_new_vs_returning_customer_sales),
+    ('new_customers_over_time', get_new_customers_over_time),
+    ('customers_by_location', get_customers_by_location),
+    ('total_sales_by_product', get_total_sales_by_product),
+    ('customer_lifetime_value', get_customer_lifetime_value),
+    ('customer_retention_rate', get_customer_retention_rate),
+    ('total_orders_by_month', get_total_orders_by_month),
+    ('average_order_value_over_time', get_average_order_value_over_time),
+]
+
+# Further sidebar arguments some customer type charts receive
+CUSTOMER_TYPE_CHART_KWARGS: Dict[str, Dict] = {
+    'customer_lifetime_value': {'customer_lifespan_months': DEFAULT_LIFESPAN_MONTHS},
+}
+
+# P&L functions filtered by date range and view mode
+PROFIT_LOSS_CHARTS: List[Tuple[str, Callable]] = [
+    ('profit_loss_summary_table', get_profit_loss_summary_table),
+    ('profit_loss_line_chart', get_profit_loss_line_chart_data),
+    ('revenue_expenses_profit_bar', get_revenue_expenses_profit_bar_data),
+]
+
+
+def _previous_month(year: int, month: int) -> Tuple[int, int]:
+    return (year - 1, 12) if month == 1 else (year, month - 1)
+
+
+def registered_queries(start_date: str, end_date: str, customer_types: Tuple[str, ...] = ('all',),
+                       account_number: Optional[str] = None) -> List[Tuple[str, Callable, Dict]]:
+    """
+    Every data function with the arguments the dashboard passes it
+
+    Args:
+        start_date: 'YYYY-MM-DD' sidebar start date
+        end_date: 'YYYY-MM-DD' sidebar end date
+        customer_types: Customer filters to include ('all', 'new', 'return')
+        account_number: Bank account for the Account Statement queries
+            (statement queries are skipped when None)
+
+    Returns:
+        list: (name, function, kwargs) tuples
+    """
+    queries = []
+    for customer_type in customer_types:
+        for name, function in CUSTOMER_TYPE_CHARTS:
+            kwargs = {'start_date': start_date, 'end_date': end_date, 'customer_type': customer_type,
+                      **CUSTOMER_TYPE_CHART_KWARGS.get(name, {})}
+            queries.append((f"{name}[{customer_type}]", function, kwargs))
+
+    queries.append(('customer_acquisition_cost', get_customer_acquisition_cost,
+                    {'start_date': start_date, 'end_date': end_date}))
+    queries.append(('cac_clv_ratio_over_time', get_cac_clv_ratio_over_time,
+                    {'start_date': start_date, 'end_date': end_date, 'lifespan_months': DEFAULT_LIFESPAN_MONTHS}))
+
+    # Month comparison: end month against the month before it
+    end = date.fromisoformat(end_date)
+    prev_year, prev_month = _previous_month(end.year, end.month)
+    queries.append(('revenue_comparison_by_month', get_revenue_comparison_by_month,
+                    {'month1_year': end.year, 'month1_month': end.month,
+                     'month2_year': prev_year, 'month2_month': prev_month}))
+
+    for view_mode in ('month', 'year', 'month_year'):
+        for name, function in PROFIT_LOSS_CHARTS:
+            kwargs = {'start_date': start_date, 'end_date': end_date, 'view_mode': view_mode}
+            queries.append((f"{name}[{view_mode}]", function, kwargs))
+
+    queries.append(('bank_account_table', get_bank_account_table_data, {}))
+    if account_summary_enabled():
+        queries.append(('bank_account_summary_page', get_bank_account_summary_page, {}))
+    if transaction_search_enabled():
+        queries.append(('transaction_search', get_transaction_search_page, {'text': TRANSACTION_SEARCH_SAMPLE}))
+    if account_number:
+        queries.append(('bank_account_info', get_bank_account_info, {'account_number': account_number}))
+        queries.append(('account_statement', get_account_statement_data,
+                        {'account_number': account_number, 'from_date': start_date, 'to_date': end_date}))
+        queries.append(('account_statement_page', get_account_statement_page,
+                        {'account_number': account_number, 'from_date': start_date, 'to_date': end_date}))
+
+    return queries
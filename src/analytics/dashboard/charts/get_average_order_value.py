@@ -9,6 +9,9 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(o
 sys.path.insert(0, project_root)
 
 from src.analytics.utils.postgres_connection import execute_query_with_cache
+from src.analytics.utils.fact_cube import fact_cube_enabled, get_fact_cube
+from src.analytics.warehouse.rollups import rollups_enabled, rollup_source
+from src.analytics.warehouse.partitions import partition_key_filter
 
 def execute_query(sql: str, params: tuple = None) -> pd.DataFrame:
     """Execute SQL query and return DataFrame"""
@@ -16,6 +19,16 @@ def execute_query(sql: str, params: tuple = None) -> pd.DataFrame:
 
 def get_average_order_value(start_date: str = None, end_date: str = None, customer_type: str = 'all'):
     """Get average order value"""
+    if fact_cube_enabled():
+        return get_fact_cube().average_order_value(start_date, end_date, customer_type)
+    
+    if rollups_enabled():
+        table, where, params = rollup_source('orders', start_date, end_date, customer_type)
+        sql = f"""SELECT ROUND(SUM(r.revenue) / NULLIF(SUM(r.orders), 0), 2) as "AOV (USD)"
+                FROM {table} r
+                WHERE {where}"""
+        return execute_query(sql, tuple(params) if params else None)
+    
     sql = """SELECT ROUND(SUM(COALESCE(fs.item_total, 0) - COALESCE(fs.discount_amount, 0)) / COUNT(DISTINCT fs.order_key), 2) as "AOV (USD)" 
             FROM fact_sales fs 
             JOIN dim_time dt ON fs.sale_date_key = dt.time_key
@@ -28,6 +41,9 @@ def get_average_order_value(start_date: str = None, end_date: str = None, custom
     if end_date:
         sql += " AND dt.full_date <= %s"
         params.append(end_date)
+    key_filter, key_params = partition_key_filter('fs.sale_date_key', start_date, end_date)
+    sql += key_filter
+    params += key_params
     
     if customer_type == 'new':
         sql += """ AND fs.customer_key IN (
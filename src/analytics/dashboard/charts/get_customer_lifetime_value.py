@@ -9,6 +9,7 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(o
 sys.path.insert(0, project_root)
 
 from src.analytics.utils.postgres_connection import execute_query_with_cache
+from src.analytics.utils.distinct_sketch import approx_distinct_enabled, get_distinct_sketches
 
 def execute_query(sql: str, params: tuple = None) -> pd.DataFrame:
     """Execute SQL query and return DataFrame"""
@@ -23,10 +24,7 @@ def get_customer_lifetime_value(start_date: str = None, end_date: str = None, cu
                      FROM fact_sales fs 
                      JOIN dim_time dt ON fs.sale_date_key = dt.time_key
                      WHERE 1=1 AND dt.full_date >= %s AND dt.full_date <= %s) * 1.0 / 
-                    NULLIF((SELECT COUNT(DISTINCT fs.customer_key) 
-                            FROM fact_sales fs 
-                            JOIN dim_time dt ON fs.sale_date_key = dt.time_key
-                            WHERE 1=1 AND dt.full_date >= %s AND dt.full_date <= %s), 0)
+                    NULLIF({customer_count}, 0)
                     *
                     -- Customer Lifespan
                     %s
@@ -47,19 +45,28 @@ def get_customer_lifetime_value(start_date: str = None, end_date: str = None, cu
                         JOIN dim_time dt ON fs.sale_date_key = dt.time_key
                         WHERE 1=1 AND dt.full_date >= %s AND dt.full_date <= %s
                     ) * 1.0 / 
-                    NULLIF((SELECT COUNT(DISTINCT fs.customer_key) 
-                            FROM fact_sales fs 
-                            JOIN dim_time dt ON fs.sale_date_key = dt.time_key
-                            WHERE 1=1 AND dt.full_date >= %s AND dt.full_date <= %s), 0)
+                    NULLIF({customer_count}, 0)
                 )
             , 2) AS "CLV (USD)" """
     
-    params = []
-    if start_date and end_date:
-        params = [start_date, end_date, start_date, end_date, customer_lifespan_months, start_date, end_date, start_date, end_date]
-    else:
+    if not (start_date and end_date):
         # Use default date range if not provided
-        params = ['2025-01-01', '2025-12-31', '2025-01-01', '2025-12-31', customer_lifespan_months, '2025-01-01', '2025-12-31', '2025-01-01', '2025-12-31']
+        start_date, end_date = '2025-01-01', '2025-12-31'
+    
+    # Distinct customers in range: approximate sketch or exact subquery
+    if approx_distinct_enabled():
+        customer_count_sql = "%s"
+        customer_count_params = [get_distinct_sketches().count_customers(start_date, end_date)]
+    else:
+        customer_count_sql = """(SELECT COUNT(DISTINCT fs.customer_key) 
+                            FROM fact_sales fs 
+                            JOIN dim_time dt ON fs.sale_date_key = dt.time_key
+                            WHERE 1=1 AND dt.full_date >= %s AND dt.full_date <= %s)"""
+        customer_count_params = [start_date, end_date]
+    sql = sql.format(customer_count=customer_count_sql)
+    
+    params = ([start_date, end_date] + customer_count_params + [customer_lifespan_months]
+              + [start_date, end_date] + customer_count_params)
     
     return execute_query(sql, tuple(params))
 
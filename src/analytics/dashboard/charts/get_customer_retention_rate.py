@@ -9,6 +9,8 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(o
 sys.path.insert(0, project_root)
 
 from src.analytics.utils.postgres_connection import execute_query_with_cache
+from src.analytics.utils.fact_cube import fact_cube_enabled, get_fact_cube
+from src.analytics.warehouse.partitions import partition_key_filter
 
 def execute_query(sql: str, params: tuple = None) -> pd.DataFrame:
     """Execute SQL query and return DataFrame"""
@@ -16,6 +18,9 @@ def execute_query(sql: str, params: tuple = None) -> pd.DataFrame:
 
 def get_customer_retention_rate(start_date: str = None, end_date: str = None, customer_type: str = 'all'):
     """Get customer retention rate"""
+    if fact_cube_enabled():
+        return get_fact_cube().customer_retention_rate(start_date, end_date, customer_type)
+    
     sql = """SELECT ROUND(
                 COUNT(DISTINCT CASE WHEN order_count > 1 THEN fs.customer_key END) * 100.0 / NULLIF(COUNT(DISTINCT fs.customer_key), 0),
             2) AS "Retention Rate (%)"
@@ -31,6 +36,9 @@ def get_customer_retention_rate(start_date: str = None, end_date: str = None, cu
     if end_date:
         sql += " AND dt.full_date <= %s"
         params.append(end_date)
+    key_filter, key_params = partition_key_filter('fs.sale_date_key', start_date, end_date)
+    sql += key_filter
+    params += key_params
     
     if customer_type == 'new':
         sql += """ AND fs.customer_key IN (
@@ -9,6 +9,8 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(o
 sys.path.insert(0, project_root)
 
 from src.analytics.utils.postgres_connection import execute_query_with_cache
+from src.analytics.utils.fact_cube import fact_cube_enabled, get_fact_cube
+from src.analytics.warehouse.partitions import partition_key_filter
 
 def execute_query(sql: str, params: tuple = None) -> pd.DataFrame:
     """Execute SQL query and return DataFrame"""
@@ -16,6 +18,9 @@ def execute_query(sql: str, params: tuple = None) -> pd.DataFrame:
 
 def get_customers_by_location(start_date: str = None, end_date: str = None, customer_type: str = 'all'):
     """Get customers by location"""
+    if fact_cube_enabled():
+        return get_fact_cube().customers_by_location(start_date, end_date, customer_type)
+    
     sql = """SELECT dg.state_name as "State", 
                    COUNT(DISTINCT fs.customer_key) as "Customers", 
                    ROUND(COALESCE(SUM(COALESCE(fs.item_total, 0) - COALESCE(fs.discount_amount, 0)), 0), 2) as "Revenue (USD)" 
@@ -31,6 +36,9 @@ def get_customers_by_location(start_date: str = None, end_date: str = None, cust
     if end_date:
         sql += " AND dt.full_date <= %s"
         params.append(end_date)
+    key_filter, key_params = partition_key_filter('fs.sale_date_key', start_date, end_date)
+    sql += key_filter
+    params += key_params
     
     if customer_type == 'new':
         sql += """ AND fs.customer_key IN (
@@ -9,6 +9,8 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(o
 sys.path.insert(0, project_root)
 
 from src.analytics.utils.postgres_connection import execute_query_with_cache
+from src.analytics.utils.fact_cube import fact_cube_enabled, get_fact_cube
+from src.analytics.warehouse.partitions import partition_key_filter
 
 def execute_query(sql: str, params: tuple = None) -> pd.DataFrame:
     """Execute SQL query and return DataFrame"""
@@ -16,6 +18,9 @@ def execute_query(sql: str, params: tuple = None) -> pd.DataFrame:
 
 def get_new_customers_over_time(start_date: str = None, end_date: str = None, customer_type: str = 'all'):
     """Get new customers over time"""
+    if fact_cube_enabled():
+        return get_fact_cube().new_customers_over_time(start_date, end_date, customer_type)
+    
     sql = """SELECT dtime.full_date as "Date", COUNT(DISTINCT fs.customer_key) as "New Customers" 
            FROM fact_sales fs 
            JOIN dim_time dtime ON fs.sale_date_key = dtime.time_key 
@@ -33,6 +38,9 @@ def get_new_customers_over_time(start_date: str = None, end_date: str = None, cu
     if end_date:
         sql += " AND dtime.full_date <= %s"
         params.append(end_date)
+    key_filter, key_params = partition_key_filter('fs.sale_date_key', start_date, end_date)
+    sql += key_filter
+    params += key_params
     
     if customer_type == 'new':
         sql += """ AND fs.customer_key IN (
@@ -9,6 +9,9 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(o
 sys.path.insert(0, project_root)
 
 from src.analytics.utils.postgres_connection import execute_query_with_cache
+from src.analytics.warehouse.rollups import rollups_enabled, rollup_source
+from src.analytics.utils.aggregate_store import aggregate_store_enabled, get_aggregate_store, month_label
+from src.analytics.warehouse.partitions import partition_key_filter
 
 def execute_query(sql: str, params: tuple = None) -> pd.DataFrame:
     """Execute SQL query and return DataFrame"""
@@ -16,6 +19,24 @@ def execute_query(sql: str, params: tuple = None) -> pd.DataFrame:
 
 def get_profit_by_month(start_date: str = None, end_date: str = None, customer_type: str = 'all'):
     """Get profit by month based on fact_payments.net_amount"""
+    if rollups_enabled():
+        table, where, params = rollup_source('payments', start_date, end_date)
+        sql = f"""SELECT r.year || '-' || LPAD(r.month::text, 2, '0') as "Month",
+                       ROUND(COALESCE(SUM(r.net_amount), 0), 2) as "Profit (USD)"
+                FROM {table} r
+                WHERE {where}
+                GROUP BY r.year, r.month
+                ORDER BY r.year, r.month"""
+        return execute_query(sql, tuple(params) if params else None)
+
+    if aggregate_store_enabled():
+        monthly = get_aggregate_store().monthly(start_date, end_date)
+        monthly = monthly[monthly['payment_rows'] > 0]
+        return pd.DataFrame({
+            "Month": month_label(monthly),
+            "Profit (USD)": monthly['net_amount'].round(2)
+        }).reset_index(drop=True)
+
     sql = """
     SELECT 
         dt.year || '-' || LPAD(dt.month::text, 2, '0') as "Month",
@@ -34,6 +55,9 @@ def get_profit_by_month(start_date: str = None, end_date: str = None, customer_t
     if end_date:
         sql += " AND dt.full_date <= %s"
         params.append(end_date)
+    key_filter, key_params = partition_key_filter('fp.payment_date_key', start_date, end_date)
+    sql += key_filter
+    params += key_params
 
     sql += """
     GROUP BY dt.year, dt.month
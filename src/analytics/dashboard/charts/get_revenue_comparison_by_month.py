@@ -12,6 +12,7 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(o
 sys.path.insert(0, project_root)
 
 from src.analytics.utils.postgres_connection import execute_query
+from src.analytics.utils.aggregate_store import aggregate_store_enabled, get_aggregate_store
 
 def get_revenue_comparison_by_month(month1_year, month1_month, month2_year, month2_month):
     """
@@ -89,6 +90,14 @@ def get_revenue_comparison_by_month(month1_year, month1_month, month2_year, mont
 
 def get_month_aggregates(month_start, month_end):
     """Return aggregates for a month: orders_count, revenue, profit."""
+    if aggregate_store_enabled():
+        totals = get_aggregate_store().totals(str(month_start), str(month_end))
+        return {
+            "orders_count": int(totals['orders']),
+            "revenue": totals['gross_amount'],
+            "profit": totals['net_amount'],
+        }
+
     # Orders count from fact_sales (distinct orders)
     orders_sql = """
     SELECT COUNT(DISTINCT fs.order_key) AS orders_count
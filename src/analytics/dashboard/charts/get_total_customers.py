@@ -9,6 +9,9 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(o
 sys.path.insert(0, project_root)
 
 from src.analytics.utils.postgres_connection import execute_query_with_cache
+from src.analytics.utils.fact_cube import fact_cube_enabled, get_fact_cube
+from src.analytics.utils.distinct_sketch import approx_distinct_enabled, get_distinct_sketches
+from src.analytics.warehouse.partitions import partition_key_filter
 
 def execute_query(sql: str, params: tuple = None) -> pd.DataFrame:
     """Execute SQL query and return DataFrame"""
@@ -16,6 +19,12 @@ def execute_query(sql: str, params: tuple = None) -> pd.DataFrame:
 
 def get_total_customers(start_date: str = None, end_date: str = None, customer_type: str = 'all'):
     """Get total customers"""
+    if fact_cube_enabled():
+        return get_fact_cube().total_customers(start_date, end_date, customer_type)
+    
+    if customer_type == 'all' and approx_distinct_enabled():
+        return pd.DataFrame({"Total Customers": [get_distinct_sketches().count_customers(start_date, end_date)]})
+    
     sql = """SELECT COUNT(DISTINCT fs.customer_key) as "Total Customers" 
             FROM fact_sales fs 
             JOIN dim_time dt ON fs.sale_date_key = dt.time_key
@@ -28,6 +37,9 @@ def get_total_customers(start_date: str = None, end_date: str = None, customer_t
     if end_date:
         sql += " AND dt.full_date <= %s"
         params.append(end_date)
+    key_filter, key_params = partition_key_filter('fs.sale_date_key', start_date, end_date)
+    sql += key_filter
+    params += key_params
     
     if customer_type == 'new':
         sql += """ AND fs.customer_key IN (
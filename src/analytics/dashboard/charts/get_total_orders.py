@@ -9,6 +9,11 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(o
 sys.path.insert(0, project_root)
 
 from src.analytics.utils.postgres_connection import execute_query_with_cache
+from src.analytics.utils.fact_cube import fact_cube_enabled, get_fact_cube
+from src.analytics.warehouse.rollups import rollups_enabled, rollup_source
+from src.analytics.utils.aggregate_store import aggregate_store_enabled, get_aggregate_store
+from src.analytics.utils.distinct_sketch import approx_distinct_enabled, get_distinct_sketches
+from src.analytics.warehouse.partitions import partition_key_filter
 
 def execute_query(sql: str, params: tuple = None) -> pd.DataFrame:
     """Execute SQL query and return DataFrame"""
@@ -16,6 +21,23 @@ def execute_query(sql: str, params: tuple = None) -> pd.DataFrame:
 
 def get_total_orders(start_date: str = None, end_date: str = None, customer_type: str = 'all'):
     """Get total orders"""
+    if fact_cube_enabled():
+        return get_fact_cube().total_orders(start_date, end_date, customer_type)
+    
+    if rollups_enabled():
+        table, where, params = rollup_source('orders', start_date, end_date, customer_type)
+        sql = f"""SELECT COALESCE(SUM(r.orders), 0) as "Total Orders"
+                FROM {table} r
+                WHERE {where}"""
+        return execute_query(sql, tuple(params) if params else None)
+    
+    if customer_type == 'all' and aggregate_store_enabled():
+        totals = get_aggregate_store().totals(start_date, end_date)
+        return pd.DataFrame({"Total Orders": [int(totals['orders'])]})
+    
+    if customer_type == 'all' and approx_distinct_enabled():
+        return pd.DataFrame({"Total Orders": [get_distinct_sketches().count_orders(start_date, end_date)]})
+    
     sql = """SELECT COUNT(DISTINCT fs.order_key) as "Total Orders" 
             FROM fact_sales fs 
             JOIN dim_time dt ON fs.sale_date_key = dt.time_key
@@ -28,6 +50,9 @@ def get_total_orders(start_date: str = None, end_date: str = None, customer_type
     if end_date:
         sql += " AND dt.full_date <= %s"
         params.append(end_date)
+    key_filter, key_params = partition_key_filter('fs.sale_date_key', start_date, end_date)
+    sql += key_filter
+    params += key_params
     
     if customer_type == 'new':
         sql += """ AND fs.customer_key IN (
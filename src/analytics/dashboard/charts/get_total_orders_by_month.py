@@ -9,6 +9,10 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(o
 sys.path.insert(0, project_root)
 
 from src.analytics.utils.postgres_connection import execute_query_with_cache
+from src.analytics.utils.fact_cube import fact_cube_enabled, get_fact_cube
+from src.analytics.warehouse.rollups import rollups_enabled, rollup_source
+from src.analytics.utils.aggregate_store import aggregate_store_enabled, get_aggregate_store, month_label
+from src.analytics.warehouse.partitions import partition_key_filter
 
 def execute_query(sql: str, params: tuple = None) -> pd.DataFrame:
     """Execute SQL query and return DataFrame"""
@@ -16,6 +20,27 @@ def execute_query(sql: str, params: tuple = None) -> pd.DataFrame:
 
 def get_total_orders_by_month(start_date: str = None, end_date: str = None, customer_type: str = 'all'):
     """Get total orders by month"""
+    if fact_cube_enabled():
+        return get_fact_cube().total_orders_by_month(start_date, end_date, customer_type)
+    
+    if rollups_enabled():
+        table, where, params = rollup_source('orders', start_date, end_date, customer_type)
+        sql = f"""SELECT r.year || '-' || LPAD(r.month::text, 2, '0') as "Month",
+                       SUM(r.orders) as "Orders"
+                FROM {table} r
+                WHERE {where}
+                GROUP BY r.year, r.month
+                ORDER BY r.year, r.month"""
+        return execute_query(sql, tuple(params) if params else None)
+    
+    if customer_type == 'all' and aggregate_store_enabled():
+        monthly = get_aggregate_store().monthly(start_date, end_date)
+        monthly = monthly[monthly['sales_rows'] > 0]
+        return pd.DataFrame({
+            "Month": month_label(monthly),
+            "Orders": monthly['orders'].astype(int)
+        }).reset_index(drop=True)
+    
     sql = """SELECT dt.year || '-' || LPAD(dt.month::text, 2, '0') as "Month",
                    COUNT(DISTINCT fs.order_key) as "Orders" 
             FROM fact_sales fs 
@@ -29,6 +54,9 @@ def get_total_orders_by_month(start_date: str = None, end_date: str = None, cust
     if end_date:
         sql += " AND dt.full_date <= %s"
         params.append(end_date)
+    key_filter, key_params = partition_key_filter('fs.sale_date_key', start_date, end_date)
+    sql += key_filter
+    params += key_params
     
     if customer_type == 'new':
         sql += """ AND fs.customer_key IN (
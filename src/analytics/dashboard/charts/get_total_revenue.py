@@ -9,6 +9,10 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(o
 sys.path.insert(0, project_root)
 
 from src.analytics.utils.postgres_connection import execute_query_with_cache
+from src.analytics.utils.fact_cube import fact_cube_enabled, get_fact_cube
+from src.analytics.warehouse.rollups import rollups_enabled, rollup_source
+from src.analytics.utils.aggregate_store import aggregate_store_enabled, get_aggregate_store
+from src.analytics.warehouse.partitions import partition_key_filter
 
 def execute_query(sql: str, params: tuple = None) -> pd.DataFrame:
     """Execute SQL query and return DataFrame"""
@@ -16,6 +20,20 @@ def execute_query(sql: str, params: tuple = None) -> pd.DataFrame:
 
 def get_total_revenue(start_date: str = None, end_date: str = None, customer_type: str = 'all'):
     """Get total revenue"""
+    if fact_cube_enabled():
+        return get_fact_cube().total_revenue(start_date, end_date, customer_type)
+    
+    if rollups_enabled():
+        table, where, params = rollup_source('orders', start_date, end_date, customer_type)
+        sql = f"""SELECT ROUND(COALESCE(SUM(r.revenue), 0), 2) as "Total Revenue (USD)"
+                FROM {table} r
+                WHERE {where}"""
+        return execute_query(sql, tuple(params) if params else None)
+    
+    if customer_type == 'all' and aggregate_store_enabled():
+        totals = get_aggregate_store().totals(start_date, end_date)
+        return pd.DataFrame({"Total Revenue (USD)": [round(totals['revenue'], 2)]})
+    
     sql = """SELECT ROUND(COALESCE(SUM(COALESCE(fs.item_total, 0) - COALESCE(fs.discount_amount, 0)), 0), 2) as "Total Revenue (USD)" 
             FROM fact_sales fs 
             JOIN dim_time dt ON fs.sale_date_key = dt.time_key
@@ -28,6 +46,9 @@ def get_total_revenue(start_date: str = None, end_date: str = None, customer_typ
     if end_date:
         sql += " AND dt.full_date <= %s"
         params.append(end_date)
+    key_filter, key_params = partition_key_filter('fs.sale_date_key', start_date, end_date)
+    sql += key_filter
+    params += key_params
     
     if customer_type == 'new':
         sql += """ AND fs.customer_key IN (
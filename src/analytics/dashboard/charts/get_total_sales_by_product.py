@@ -9,6 +9,9 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(o
 sys.path.insert(0, project_root)
 
 from src.analytics.utils.postgres_connection import execute_query_with_cache
+from src.analytics.utils.fact_cube import fact_cube_enabled, get_fact_cube
+from src.analytics.warehouse.rollups import rollups_enabled, rollup_source
+from src.analytics.warehouse.partitions import partition_key_filter
 
 def execute_query(sql: str, params: tuple = None) -> pd.DataFrame:
     """Execute SQL query and return DataFrame"""
@@ -16,6 +19,21 @@ def execute_query(sql: str, params: tuple = None) -> pd.DataFrame:
 
 def get_total_sales_by_product(start_date: str = None, end_date: str = None, customer_type: str = 'all'):
     """Get total sales by product"""
+    if fact_cube_enabled():
+        return get_fact_cube().total_sales_by_product(start_date, end_date, customer_type)
+    
+    if rollups_enabled():
+        table, where, params = rollup_source('sales', start_date, end_date, customer_type)
+        sql = f"""SELECT CASE WHEN LENGTH(dp.title) > 30 THEN LEFT(dp.title, 27) || '...' ELSE dp.title END as "Product",
+                       ROUND(COALESCE(SUM(r.revenue), 0), 2) as "Revenue (USD)"
+                FROM {table} r
+                JOIN dim_product dp ON r.product_key = dp.product_key
+                WHERE dp.is_current = true AND {where}
+                GROUP BY 1
+                ORDER BY SUM(r.revenue) DESC
+                LIMIT 10"""
+        return execute_query(sql, tuple(params) if params else None)
+    
     sql = """SELECT CASE WHEN LENGTH(dp.title) > 30 THEN LEFT(dp.title, 27) || '...' ELSE dp.title END as "Product", 
                    ROUND(COALESCE(SUM(COALESCE(fs.item_total, 0) - COALESCE(fs.discount_amount, 0)), 0), 2) as "Revenue (USD)" 
             FROM fact_sales fs 
@@ -30,6 +48,9 @@ def get_total_sales_by_product(start_date: str = None, end_date: str = None, cus
     if end_date:
         sql += " AND dt.full_date <= %s"
         params.append(end_date)
+    key_filter, key_params = partition_key_filter('fs.sale_date_key', start_date, end_date)
+    sql += key_filter
+    params += key_params
     
     if customer_type == 'new':
         sql += """ AND fs.customer_key IN (
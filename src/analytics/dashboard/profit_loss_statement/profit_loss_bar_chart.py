@@ -8,6 +8,7 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(o
 sys.path.insert(0, project_root)
 
 from src.analytics.utils.postgres_connection import execute_query_with_cache
+from src.analytics.warehouse.partitions import partition_key_filter
 
 def execute_query(sql: str, params: tuple = None) -> pd.DataFrame:
     """Execute SQL query and return DataFrame"""
@@ -22,6 +23,7 @@ def get_revenue_expenses_profit_bar_data(start_date: str = None, end_date: str =
         date_filter += f" AND dt.full_date >= '{start_date}'"
     if end_date:
         date_filter += f" AND dt.full_date <= '{end_date}'"
+    fft_key_filter, _ = partition_key_filter('fft.transaction_date_key', start_date, end_date, inline=True)
     
     
     # Select keys based on view_mode
@@ -57,7 +59,7 @@ def get_revenue_expenses_profit_bar_data(start_date: str = None, end_date: str =
     
     FROM fact_financial_transactions fft
     JOIN dim_time dt ON fft.transaction_date_key = dt.time_key
-    WHERE 1=1 {date_filter}
+    WHERE 1=1 {date_filter}{fft_key_filter}
     {key_group_order}
     """
     
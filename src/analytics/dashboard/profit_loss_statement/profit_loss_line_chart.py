@@ -8,6 +8,7 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(o
 sys.path.insert(0, project_root)
 
 from src.analytics.utils.postgres_connection import execute_query_with_cache
+from src.analytics.warehouse.partitions import partition_key_filter
 
 def execute_query(sql: str, params: tuple = None) -> pd.DataFrame:
     """Execute SQL query and return DataFrame"""
@@ -22,6 +23,8 @@ def get_profit_loss_line_chart_data(start_date: str = None, end_date: str = None
         date_filter += f" AND dt.full_date >= '{start_date}'"
     if end_date:
         date_filter += f" AND dt.full_date <= '{end_date}'"
+    fft_key_filter, _ = partition_key_filter('fft.transaction_date_key', start_date, end_date, inline=True)
+    fbt_key_filter, _ = partition_key_filter('fbt.transaction_date_key', start_date, end_date, inline=True)
     
     
     # Select keys based on view_mode
@@ -154,7 +157,7 @@ def get_profit_loss_line_chart_data(start_date: str = None, end_date: str = None
     
     FROM fact_financial_transactions fft
     JOIN dim_time dt ON fft.transaction_date_key = dt.time_key
-    WHERE 1=1 {date_filter}
+    WHERE 1=1 {date_filter}{fft_key_filter}
     {key_group_order}
     """
     
@@ -186,7 +189,7 @@ def get_profit_loss_line_chart_data(start_date: str = None, end_date: str = None
         COALESCE(SUM(fbt.debit_amount), 0) as cost_of_goods
     FROM fact_bank_transactions fbt
     JOIN dim_time dt ON fbt.transaction_date_key = dt.time_key
-    WHERE 1=1 {date_filter}
+    WHERE 1=1 {date_filter}{fbt_key_filter}
     {key_group_order}
     """
     
@@ -237,11 +240,11 @@ def get_profit_loss_line_chart_data(start_date: str = None, end_date: str = None
         # Group by period and sum values to ensure only one value per period per line item
         if view_mode == 'month':
             # For monthly view, group by month only (aggregate across all years)
-            period_values = monthly_data.groupby(['month', 'month_name'])[column_name].sum().reset_index()
+            period_values = monthly_data.groupby(['month', 'month_name'], observed=True)[column_name].sum().reset_index()
             period_values = period_values.sort_values(['month'])
         elif view_mode == 'month_year':
             # For month/year view, use year and month directly
-            period_values = monthly_data.groupby(['year', 'month', 'month_name'])[column_name].sum().reset_index()
+            period_values = monthly_data.groupby(['year', 'month', 'month_name'], observed=True)[column_name].sum().reset_index()
             period_values = period_values.sort_values(['year', 'month'])
         else:
             # For yearly view, use year directly
@@ -14,6 +14,7 @@ sys.path.insert(0, project_root)
 from src.analytics.dashboard.profit_loss_statement.profit_loss_summary_table import get_profit_loss_summary_table, render_profit_loss_summary_table_description
 from src.analytics.dashboard.profit_loss_statement.profit_loss_line_chart import get_profit_loss_line_chart_data
 from src.analytics.dashboard.profit_loss_statement.profit_loss_bar_chart import get_revenue_expenses_profit_bar_data
+from src.analytics.utils.perf import mark_section
 
 def create_description_button(button_key, description_key, text="📋 Show Description", width='stretch'):
     """Create a description button with proper callback"""
@@ -24,6 +25,7 @@ def create_description_button(button_key, description_key, text="📋 Show Descr
 
 def render_profit_loss_statement(start_date_str=None, end_date_str=None, customer_type=None):
     """Render the complete Profit & Loss Statement tab"""
+    mark_section('profit_loss.filters')
     
     st.header("💰 Profit & Loss Statement")
     
@@ -77,6 +79,8 @@ def render_profit_loss_statement(start_date_str=None, end_date_str=None, custome
     start_date_str = start_date.strftime('%Y-%m-%d') if start_date else None
     end_date_str = end_date.strftime('%Y-%m-%d') if end_date else None
     
+    mark_section('profit_loss.summary_table')
+    
     # =============================================================================
     # PROFIT & LOSS SUMMARY TABLE SECTION
     # =============================================================================
@@ -527,6 +531,8 @@ def render_profit_loss_statement(start_date_str=None, end_date_str=None, custome
     
     st.markdown("---")
     
+    mark_section('profit_loss.line_chart')
+    
     # =============================================================================
     # PROFIT & LOSS LINE CHART SECTION
     # =============================================================================
@@ -688,6 +694,8 @@ def render_profit_loss_statement(start_date_str=None, end_date_str=None, custome
     
     st.markdown("---")
     
+    mark_section('profit_loss.bar_chart')
+    
     # =============================================================================
     # REVENUE EXPENSES PROFIT STACKED BAR CHART SECTION
     # =============================================================================
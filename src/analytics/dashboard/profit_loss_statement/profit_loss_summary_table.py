@@ -9,36 +9,105 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(o
 sys.path.insert(0, project_root)
 
 from src.analytics.utils.postgres_connection import execute_query_with_cache
+from src.analytics.warehouse.partitions import partition_key_filter
 
 def execute_query(sql: str, params: tuple = None) -> pd.DataFrame:
     """Execute SQL query and return DataFrame"""
     return execute_query_with_cache(sql, params, ttl=300)
 
-def get_profit_loss_summary_table(start_date: str = None, end_date: str = None, view_mode: str = 'month'):
-    """Get Profit and Loss Summary Table data with monthly or yearly breakdown"""
-    
+# Grouping per view mode: (SELECT keys, GROUP BY/ORDER BY clause, key columns)
+PL_VIEW_KEYS = {
+    'year': ("dt.year", "GROUP BY dt.year ORDER BY dt.year", ['year']),
+    # For month/year view: group by year and month
+    'month_year': ("dt.year, dt.month, dt.month_name",
+                   "GROUP BY dt.year, dt.month, dt.month_name ORDER BY dt.year, dt.month",
+                   ['year', 'month', 'month_name']),
+    # For month view: group by month only (aggregate across all years)
+    'month': ("dt.month, dt.month_name", "GROUP BY dt.month, dt.month_name ORDER BY dt.month",
+              ['month', 'month_name']),
+}
+
+# Daily grain, from which every view mode and period can be re-aggregated
+PL_DAILY_KEYS = ("dt.full_date, dt.year, dt.month, dt.month_name",
+                 "GROUP BY dt.full_date, dt.year, dt.month, dt.month_name ORDER BY dt.full_date",
+                 ['full_date', 'year', 'month', 'month_name'])
+
+COGS_COLUMNS = ['cost_of_goods', 'material_cost', 'concept_design_cost', 'chart_hook_spin_cost',
+                'spinning_cost', 'photo_spin_cost', 'pattern_translation_cost']
+ADDITIONAL_COST_COLUMNS = ['general_production_cost', 'staff_cost', 'material_packaging_cost',
+                           'platform_tool_cost', 'tool_cost', 'management_staff_cost', 'marketing_staff_cost']
+
+# Line items in display order (label, component column or None for headers)
+PL_LINE_ITEMS = [
+    ("Revenue (Sales)", None),
+    ("Revenue", 'revenue'),
+    ("", None),
+    ("Refund Cost", 'refund_cost'),
+    ("COGS (Cost of Goods Sold)", None),
+    ("Cost of Goods", 'cost_of_goods'),
+    ('  - Chi phí len (Chi phí nguyên liệu, vật liệu trực tiếp)', 'material_cost'),
+    ('  - Chi phí làm concept design (Chi phí nhân công trực tiếp)', 'concept_design_cost'),
+    ('  - Chi phí làm chart + móc + quay (optional) (Chi phí nhân công trực tiếp)', 'chart_hook_spin_cost'),
+    ('  - Chi phí quay (Chi phí nhân công trực tiếp)', 'spinning_cost'),
+    ('  - Chi phí chụp + quay (Chi phí nhân công trực tiếp)', 'photo_spin_cost'),
+    ('  - Chi phí viết pattern - dịch chart (Chi phí nhân công trực tiếp)', 'pattern_translation_cost'),
+    ("Operating Expenses", None),
+    ("Etsy Fees", 'total_etsy_fees'),
+    ('  - Transaction Fee', 'transaction_fee'),
+    ('  - Processing Fee', 'processing_fee'),
+    ('  - Regulatory Operating Fee', 'regulatory_fee'),
+    ('  - Listing Fee', 'listing_fee'),
+    ('  - Marketing', 'marketing_fee'),
+    ('  - VAT', 'total_vat_fees'),
+    ('    --- auto-renew sold', 'vat_auto_renew_sold'),
+    ('    --- shipping_transaction', 'vat_shipping_transaction'),
+    ('    --- Processing Fee', 'vat_processing_fee'),
+    ('    --- transaction credit', 'vat_transaction_credit'),
+    ('    --- listing credit', 'vat_listing_credit'),
+    ('    --- listing', 'vat_listing'),
+    ('    --- Etsy Plus subscription', 'vat_etsy_plus_subscription'),
+    ("Chi phí sản xuất chung", 'general_production_cost'),
+    ("Chi phí nhân viên (Chi phí bán hàng)", 'staff_cost'),
+    ("Chi phí nguyên vật liệu, bao bì (Chi phí bán hàng)", 'material_packaging_cost'),
+    ("Chi phí dụng cụ tool sàn (Chi phí bán hàng)", 'platform_tool_cost'),
+    ("Chi phí dụng cụ tool (Chi phí bán hàng)", 'tool_cost'),
+    ("Chi phí nhân viên quản lý (Chi phí quản lý doanh nghiệp)", 'management_staff_cost'),
+    ("Chi phí nhân viên marketing - đăng và quản lí kênh (Chi phí quản lý doanh nghiệp)", 'marketing_staff_cost'),
+    ("Net Income (Profit)", None),
+    ("Profit", 'net_profit')
+]
+
+PL_HEADER_ROWS = {
+    'Revenue (Sales)',
+    '',
+    'COGS (Cost of Goods Sold)',
+    'Operating Expenses',
+    'Net Income (Profit)'
+}
+
+def pl_view_keys(view_mode: str) -> tuple:
+    """Grouping keys of a view mode ('month' for unknown modes)"""
+    return PL_VIEW_KEYS.get(view_mode, PL_VIEW_KEYS['month'])
+
+def pl_date_filters(start_date: str = None, end_date: str = None) -> tuple:
+    """WHERE fragments (fact_financial_transactions, fact_bank_transactions) for a date range"""
     # Base date filter for all queries
     date_filter = ""
     if start_date:
         date_filter += f" AND dt.full_date >= '{start_date}'"
     if end_date:
         date_filter += f" AND dt.full_date <= '{end_date}'"
+    fft_key_filter, _ = partition_key_filter('fft.transaction_date_key', start_date, end_date, inline=True)
+    fbt_key_filter, _ = partition_key_filter('fbt.transaction_date_key', start_date, end_date, inline=True)
+    return date_filter + fft_key_filter, date_filter + fbt_key_filter
+
+def pl_component_queries(key_select: str, key_group_order: str, fft_where: str, fbt_where: str) -> tuple:
+    """
+    SQL for the three P&L component sets, grouped by the given keys
     
-    
-    # Select keys based on view_mode
-    if view_mode == 'year':
-        key_select = "dt.year"
-        key_group_order = "GROUP BY dt.year ORDER BY dt.year"
-    elif view_mode == 'month_year':
-        # For month/year view: group by year and month
-        key_select = "dt.year, dt.month, dt.month_name"
-        key_group_order = "GROUP BY dt.year, dt.month, dt.month_name ORDER BY dt.year, dt.month"
-    else:
-        # For month view: group by month only (aggregate across all years)
-        key_select = "dt.month, dt.month_name"
-        key_group_order = "GROUP BY dt.month, dt.month_name ORDER BY dt.month"
-    
-    # Get data with all components
+    Returns:
+        tuple: (Etsy revenue/fees SQL, COGS SQL, additional costs SQL)
+    """
     monthly_pl_sql = f"""
     SELECT 
         {key_select},
@@ -152,36 +221,10 @@ def get_profit_loss_summary_table(start_date: str = None, end_date: str = None,
     
     FROM fact_financial_transactions fft
     JOIN dim_time dt ON fft.transaction_date_key = dt.time_key
-    WHERE 1=1 {date_filter}
+    WHERE 1=1 {fft_where}
     {key_group_order}
     """
     
-    monthly_data = execute_query(monthly_pl_sql, None)
-    
-    if monthly_data.empty:
-        # Return empty structure if no data
-        return pd.DataFrame({
-            'Line Item': [],
-        })
-    
-    # Calculate derived fields
-    # Calculate total VAT fees first
-    monthly_data['total_vat_fees'] = (monthly_data['vat_auto_renew_sold'] + 
-                                    monthly_data['vat_shipping_transaction'] + 
-                                    monthly_data['vat_processing_fee'] + 
-                                    monthly_data['vat_transaction_credit'] + 
-                                    monthly_data['vat_listing_credit'] + 
-                                    monthly_data['vat_listing'] + 
-                                    monthly_data['vat_etsy_plus_subscription'])
-    
-    # Calculate total Etsy fees (now includes VAT)
-    monthly_data['total_etsy_fees'] = (monthly_data['transaction_fee'] + 
-                                     monthly_data['processing_fee'] + 
-                                     monthly_data['regulatory_fee'] + 
-                                     monthly_data['listing_fee'] +
-                                     monthly_data['marketing_fee'] +
-                                     monthly_data['total_vat_fees'])
-    
     # Calculate Cost of Goods from fact_bank_transactions with specific PL account numbers
     cogs_sql = f"""
     SELECT 
@@ -226,7 +269,7 @@ def get_profit_loss_summary_table(start_date: str = None, end_date: str = None,
         COALESCE(SUM(fbt.debit_amount), 0) as cost_of_goods
     FROM fact_bank_transactions fbt
     JOIN dim_time dt ON fbt.transaction_date_key = dt.time_key
-    WHERE 1=1 {date_filter}
+    WHERE 1=1 {fbt_where}
     AND fbt.pl_account_number IN ('6211', '6221', '6222', '6223', '6224', '6225')
     {key_group_order}
     """
@@ -279,125 +322,87 @@ def get_profit_loss_summary_table(start_date: str = None, end_date: str = None,
     
     FROM fact_bank_transactions fbt
     JOIN dim_time dt ON fbt.transaction_date_key = dt.time_key
-    WHERE 1=1 {date_filter}
+    WHERE 1=1 {fbt_where}
     AND fbt.pl_account_number IN ('6273', '6411', '6412', '6413', '6414', '6421', '6428')
     {key_group_order}
     """
     
-    cogs_data = execute_query(cogs_sql, None)
-    additional_costs_data = execute_query(additional_costs_sql, None)
+    return monthly_pl_sql, cogs_sql, additional_costs_sql
+
+def add_fee_totals(monthly_data: pd.DataFrame) -> pd.DataFrame:
+    """Add total VAT and total Etsy fee columns to the revenue/fees components"""
+    # Calculate total VAT fees first
+    monthly_data['total_vat_fees'] = (monthly_data['vat_auto_renew_sold'] + 
+                                    monthly_data['vat_shipping_transaction'] + 
+                                    monthly_data['vat_processing_fee'] + 
+                                    monthly_data['vat_transaction_credit'] + 
+                                    monthly_data['vat_listing_credit'] + 
+                                    monthly_data['vat_listing'] + 
+                                    monthly_data['vat_etsy_plus_subscription'])
     
+    # Calculate total Etsy fees (now includes VAT)
+    monthly_data['total_etsy_fees'] = (monthly_data['transaction_fee'] + 
+                                     monthly_data['processing_fee'] + 
+                                     monthly_data['regulatory_fee'] + 
+                                     monthly_data['listing_fee'] +
+                                     monthly_data['marketing_fee'] +
+                                     monthly_data['total_vat_fees'])
+    
+    return monthly_data
+
+def merge_pl_components(monthly_data: pd.DataFrame, cogs_data: pd.DataFrame,
+                        additional_costs_data: pd.DataFrame, merge_cols: list) -> pd.DataFrame:
+    """Left-join the cost components onto the revenue/fees components (missing costs are 0)"""
     # Merge cost of goods data with main data
     if not cogs_data.empty:
-        # Merge based on the grouping keys
-        if view_mode == 'year':
-            merge_cols = ['year']
-        elif view_mode == 'month_year':
-            merge_cols = ['year', 'month', 'month_name']
-        else:
-            merge_cols = ['month', 'month_name']
-        
         monthly_data = monthly_data.merge(cogs_data, on=merge_cols, how='left')
         # Fill NaN values for all COGS columns
-        monthly_data['cost_of_goods'] = monthly_data['cost_of_goods'].fillna(0)
-        monthly_data['material_cost'] = monthly_data['material_cost'].fillna(0)
-        monthly_data['concept_design_cost'] = monthly_data['concept_design_cost'].fillna(0)
-        monthly_data['chart_hook_spin_cost'] = monthly_data['chart_hook_spin_cost'].fillna(0)
-        monthly_data['spinning_cost'] = monthly_data['spinning_cost'].fillna(0)
-        monthly_data['photo_spin_cost'] = monthly_data['photo_spin_cost'].fillna(0)
-        monthly_data['pattern_translation_cost'] = monthly_data['pattern_translation_cost'].fillna(0)
+        monthly_data[COGS_COLUMNS] = monthly_data[COGS_COLUMNS].fillna(0)
     else:
-        monthly_data['cost_of_goods'] = 0
-        monthly_data['material_cost'] = 0
-        monthly_data['concept_design_cost'] = 0
-        monthly_data['chart_hook_spin_cost'] = 0
-        monthly_data['spinning_cost'] = 0
-        monthly_data['photo_spin_cost'] = 0
-        monthly_data['pattern_translation_cost'] = 0
+        monthly_data[COGS_COLUMNS] = 0
     
     # Merge additional costs data with main data
     if not additional_costs_data.empty:
-        # Merge based on the grouping keys
-        if view_mode == 'year':
-            merge_cols = ['year']
-        elif view_mode == 'month_year':
-            merge_cols = ['year', 'month', 'month_name']
-        else:
-            merge_cols = ['month', 'month_name']
-        
         monthly_data = monthly_data.merge(additional_costs_data, on=merge_cols, how='left')
-        monthly_data['general_production_cost'] = monthly_data['general_production_cost'].fillna(0)
-        monthly_data['staff_cost'] = monthly_data['staff_cost'].fillna(0)
-        monthly_data['material_packaging_cost'] = monthly_data['material_packaging_cost'].fillna(0)
-        monthly_data['platform_tool_cost'] = monthly_data['platform_tool_cost'].fillna(0)
-        monthly_data['tool_cost'] = monthly_data['tool_cost'].fillna(0)
-        monthly_data['management_staff_cost'] = monthly_data['management_staff_cost'].fillna(0)
-        monthly_data['marketing_staff_cost'] = monthly_data['marketing_staff_cost'].fillna(0)
+        monthly_data[ADDITIONAL_COST_COLUMNS] = monthly_data[ADDITIONAL_COST_COLUMNS].fillna(0)
     else:
-        monthly_data['general_production_cost'] = 0
-        monthly_data['staff_cost'] = 0
-        monthly_data['material_packaging_cost'] = 0
-        monthly_data['platform_tool_cost'] = 0
-        monthly_data['tool_cost'] = 0
-        monthly_data['management_staff_cost'] = 0
-        monthly_data['marketing_staff_cost'] = 0
+        monthly_data[ADDITIONAL_COST_COLUMNS] = 0
     
     monthly_data['net_profit'] = 0     # Empty as requested
+    return monthly_data
+
+def pl_summary_from_components(monthly_data: pd.DataFrame, view_mode: str = 'month') -> pd.DataFrame:
+    """
+    Transpose merged P&L components into the summary table
+    
+    Args:
+        monthly_data: One row per period with the key columns of the view
+            mode and every component column (see merge_pl_components)
+        view_mode: 'month', 'year' or 'month_year'
+        
+    Returns:
+        pd.DataFrame: 'Line Item' plus one column per period and 'Full Year'
+    """
+    if monthly_data.empty:
+        return pd.DataFrame({
+            'Line Item': [],
+        })
+    monthly_data = monthly_data.copy()
     
     # Format key for display
     if view_mode == 'year':
         monthly_data['col_key'] = monthly_data['year'].astype(str)
     elif view_mode == 'month_year':
         # For month/year view: combine year and month name
-        monthly_data['col_key'] = monthly_data['year'].astype(str) + ' ' + monthly_data['month_name']
+        monthly_data['col_key'] = monthly_data['year'].astype(str) + ' ' + monthly_data['month_name'].astype(str)
     else:
         # For month view: use month name as key
-        monthly_data['col_key'] = monthly_data['month_name']
-    
-    # Prepare data for transposition with category headers
-    ordered_items_with_headers = [
-        ("Revenue (Sales)", None),
-        ("Revenue", 'revenue'),
-        ("", None),
-        ("Refund Cost", 'refund_cost'),
-        ("COGS (Cost of Goods Sold)", None),
-        ("Cost of Goods", 'cost_of_goods'),
-        ('  - Chi phí len (Chi phí nguyên liệu, vật liệu trực tiếp)', 'material_cost'),
-        ('  - Chi phí làm concept design (Chi phí nhân công trực tiếp)', 'concept_design_cost'),
-        ('  - Chi phí làm chart + móc + quay (optional) (Chi phí nhân công trực tiếp)', 'chart_hook_spin_cost'),
-        ('  - Chi phí quay (Chi phí nhân công trực tiếp)', 'spinning_cost'),
-        ('  - Chi phí chụp + quay (Chi phí nhân công trực tiếp)', 'photo_spin_cost'),
-        ('  - Chi phí viết pattern - dịch chart (Chi phí nhân công trực tiếp)', 'pattern_translation_cost'),
-        ("Operating Expenses", None),
-        ("Etsy Fees", 'total_etsy_fees'),
-        ('  - Transaction Fee', 'transaction_fee'),
-        ('  - Processing Fee', 'processing_fee'),
-        ('  - Regulatory Operating Fee', 'regulatory_fee'),
-        ('  - Listing Fee', 'listing_fee'),
-        ('  - Marketing', 'marketing_fee'),
-        ('  - VAT', 'total_vat_fees'),
-        ('    --- auto-renew sold', 'vat_auto_renew_sold'),
-        ('    --- shipping_transaction', 'vat_shipping_transaction'),
-        ('    --- Processing Fee', 'vat_processing_fee'),
-        ('    --- transaction credit', 'vat_transaction_credit'),
-        ('    --- listing credit', 'vat_listing_credit'),
-        ('    --- listing', 'vat_listing'),
-        ('    --- Etsy Plus subscription', 'vat_etsy_plus_subscription'),
-        ("Chi phí sản xuất chung", 'general_production_cost'),
-        ("Chi phí nhân viên (Chi phí bán hàng)", 'staff_cost'),
-        ("Chi phí nguyên vật liệu, bao bì (Chi phí bán hàng)", 'material_packaging_cost'),
-        ("Chi phí dụng cụ tool sàn (Chi phí bán hàng)", 'platform_tool_cost'),
-        ("Chi phí dụng cụ tool (Chi phí bán hàng)", 'tool_cost'),
-        ("Chi phí nhân viên quản lý (Chi phí quản lý doanh nghiệp)", 'management_staff_cost'),
-        ("Chi phí nhân viên marketing - đăng và quản lí kênh (Chi phí quản lý doanh nghiệp)", 'marketing_staff_cost'),
-        ("Net Income (Profit)", None),
-        ("Profit", 'net_profit')
-    ]
+        monthly_data['col_key'] = monthly_data['month_name'].astype(str)
     
     # Create transposed structure
     result_data = []
     
-    for line_item, column_name in ordered_items_with_headers:
+    for line_item, column_name in PL_LINE_ITEMS:
         row_data = {'Line Item': line_item}
         
         # Add each period as a column
@@ -420,14 +425,7 @@ def get_profit_loss_summary_table(start_date: str = None, end_date: str = None,
     
     # Prepare masks and numeric columns
     numeric_columns = [col for col in result_df.columns if col != 'Line Item']
-    header_rows = set([
-        'Revenue (Sales)',
-        '',
-        'COGS (Cost of Goods Sold)',
-        'Operating Expenses',
-        'Net Income (Profit)'
-    ])
-    is_header = result_df['Line Item'].isin(header_rows)
+    is_header = result_df['Line Item'].isin(PL_HEADER_ROWS)
     
     # For header rows: leave numeric cells blank (NaN) except Full Year
     result_df.loc[is_header, numeric_columns] = pd.NA
@@ -441,6 +439,30 @@ def get_profit_loss_summary_table(start_date: str = None, end_date: str = None,
     
     return result_df
 
+
+def get_profit_loss_summary_table(start_date: str = None, end_date: str = None, view_mode: str = 'month'):
+    """Get Profit and Loss Summary Table data with monthly or yearly breakdown"""
+    fft_where, fbt_where = pl_date_filters(start_date, end_date)
+    key_select, key_group_order, merge_cols = pl_view_keys(view_mode)
+    monthly_pl_sql, cogs_sql, additional_costs_sql = pl_component_queries(
+        key_select, key_group_order, fft_where, fbt_where)
+    
+    monthly_data = execute_query(monthly_pl_sql, None)
+    
+    if monthly_data.empty:
+        # Return empty structure if no data
+        return pd.DataFrame({
+            'Line Item': [],
+        })
+    
+    monthly_data = add_fee_totals(monthly_data)
+    
+    cogs_data = execute_query(cogs_sql, None)
+    additional_costs_data = execute_query(additional_costs_sql, None)
+    monthly_data = merge_pl_components(monthly_data, cogs_data, additional_costs_data, merge_cols)
+    
+    return pl_summary_from_components(monthly_data, view_mode)
+
 def render_profit_loss_summary_table_description(start_date_str, end_date_str):
     """Render description for profit and loss summary table"""
     if st.session_state.get('show_profit_loss_summary_table_description', False):
@@ -11,6 +11,10 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(o
 sys.path.insert(0, project_root)
 
 from src.analytics.utils.postgres_connection import execute_query_with_cache
+from src.analytics.utils.fact_cube import get_fact_cube
+from src.analytics.utils.aggregate_store import get_aggregate_store
+from src.analytics.utils.distinct_sketch import get_distinct_sketches
+from src.analytics.utils.perf import mark_section
 
 # Import chart functions
 from src.analytics.dashboard.charts.get_total_revenue import get_total_revenue, render_get_total_revenue_description
@@ -66,6 +70,7 @@ def get_customer_type_display(customer_type):
 
 def render_dashboard():
     """Render dashboard tab content"""
+    mark_section('dashboard.filters')
     
     # Sidebar filters
     st.sidebar.header("📊 Dashboard Filters")
@@ -148,15 +153,20 @@ def render_dashboard():
     customer_type = st.sidebar.selectbox(
         "Customer Type",
         options=['all', 'new', 'return'],
-        format_func=lambda x: {'all': 'All Customers', 'new': 'New Customers', 'return': 'Returning Customers'}[x]
+        format_func=lambda x: {'all': 'All Customers', 'new': 'New Customers', 'return': 'Returning Customers'}[x],
+        key="customer_type"
     )
     
     # Customer lifespan for CLV
-    customer_lifespan_months = st.sidebar.slider("Customer Lifespan (months)", min_value=1, max_value=60, value=12)
+    customer_lifespan_months = st.sidebar.slider("Customer Lifespan (months)", min_value=1, max_value=60, value=12,
+                                                key="customer_lifespan_months")
     
     # Refresh button
     if st.sidebar.button("🔄 Refresh Data", type="primary", key="dashboard_refresh"):
         st.cache_data.clear()
+        get_fact_cube.clear()
+        get_aggregate_store().invalidate()
+        get_distinct_sketches.clear()
         st.rerun()
     
     # Main content
@@ -166,6 +176,8 @@ def render_dashboard():
     start_date_str = start_date.strftime('%Y-%m-%d') if start_date else None
     end_date_str = end_date.strftime('%Y-%m-%d') if end_date else None
     
+    mark_section('dashboard.core_kpis')
+    
     # =============================================================================
     # CORE KPIs SECTION
     # =============================================================================
@@ -225,6 +237,8 @@ def render_dashboard():
     
     st.markdown("---")
     
+    mark_section('dashboard.revenue')
+    
     # =============================================================================
     # REVENUE CHARTS SECTION
     # =============================================================================
@@ -317,6 +331,8 @@ def render_dashboard():
     
     st.markdown("---")
     
+    mark_section('dashboard.customers')
+    
     # =============================================================================
     # CUSTOMER ANALYTICS SECTION
     # =============================================================================
@@ -458,6 +474,8 @@ def render_dashboard():
     
     st.markdown("---")
     
+    mark_section('dashboard.products')
+    
     # =============================================================================
     # PRODUCT ANALYTICS SECTION
     # =============================================================================
@@ -506,6 +524,8 @@ def render_dashboard():
     
     st.markdown("---")
     
+    mark_section('dashboard.financial')
+    
     # =============================================================================
     # FINANCIAL ANALYTICS SECTION
     # =============================================================================
@@ -595,6 +615,8 @@ def render_dashboard():
     
     st.markdown("---")
     
+    mark_section('dashboard.orders')
+    
     # =============================================================================
     # ORDER ANALYTICS SECTION
     # =============================================================================
@@ -682,6 +704,8 @@ def render_dashboard():
     
     st.markdown("---")
     
+    mark_section('dashboard.revenue_comparison')
+    
     # =============================================================================
     # REVENUE COMPARISON SECTION
     # =============================================================================
@@ -0,0 +1,365 @@
+"""
+Bank statement loader with GL account classification for fact_bank_transactions
+"""
+import argparse
+import os
+import re
+import sys
+import time
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.insert(0, project_root)
+
+from src.analytics.utils.postgres_connection import PostgreSQLConnection
+from src.analytics.etl.bulk_copy import upsert_dimension, upsert_facts
+from src.analytics.etl.watermarks import (
+    changed_files, changed_rows, create_watermark_tables, publish_load, record_files,
+    record_row_hashes, refresh_downstream
+)
+from src.analytics.warehouse.partitions import ensure_future_partitions
+from src.analytics.warehouse.account_summary import refresh_account_summary
+
+# Statement export header -> normalized column (same labels as the
+# Account Statement report)
+STATEMENT_COLUMNS: Dict[str, str] = {
+    'Ngày GD': 'transaction_date',
+    'Mã giao dịch': 'reference_number',
+    'Số tài khoản': 'account_number',
+    'Tên tài khoản': 'account_name',
+    'Phát sinh có': 'credit_amount',
+    'Phát sinh nợ': 'debit_amount',
+    'Số dư': 'balance_after_transaction',
+    'Diễn giải': 'transaction_description',
+    'Tài khoản': 'pl_account_number',
+}
+
+# GL accounts for outgoing payments, highest priority first. Keywords are
+# matched at word boundaries on lower-cased descriptions:
+# - keywords written with diacritics match only the same diacritics
+#   ("lương" is salary, "lượng" is not)
+# - keywords without diacritics match the accent-stripped description, so
+#   they must be phrases or words that stay unambiguous without accents
+#   ("mua len", not "len", which also matches "nạp tiền lên")
+GL_RULES: List[Tuple[str, List[str]]] = [
+    ('6225', ['viet pattern', 'dich chart', 'pattern']),
+    ('6224', ['chup quay', 'chup + quay', 'chup anh', 'chup hinh', 'chup san pham', 'chụp']),
+    ('6221', ['concept design', 'concept', 'thiet ke']),
+    ('6222', ['lam chart', 'chart', 'moc len', 'móc']),
+    ('6223', ['quay video', 'quay phim', 'chi phi quay']),
+    ('6211', ['mua len', 'tien mua len', 'soi len', 'cuon len', 'chi phi len', 'yarn']),
+    ('6428', ['marketing', 'quang cao', 'ads', 'dang bai', 'quan li kenh', 'quan ly kenh']),
+    ('6421', ['nhan vien quan ly', 'luong quan ly']),
+    ('6411', ['nhan vien ban hang', 'luong nhan vien', 'tien luong', 'lương']),
+    ('6412', ['bao bi', 'dong goi', 'hop qua', 'nguyen vat lieu']),
+    ('6413', ['tool san', 'phi san']),
+    ('6414', ['dung cu', 'mua tool']),
+    ('6273', ['san xuat chung', 'tien dien', 'tien nuoc', 'internet']),
+]
+
+BALANCE_TOLERANCE = 0.005
+
+# Watermark/row-hash source name and fact identity
+SOURCE = 'bank:fact_bank_transactions'
+FACT_NATURAL_KEY = ['bank_account_key', 'reference_number']
+FACT_COLUMNS = ['bank_account_key', 'transaction_date_key', 'reference_number', 'transaction_description',
+                'credit_amount', 'debit_amount', 'balance_after_transaction', 'pl_account_number']
+
+
+def strip_accents(text: str) -> str:
+    """Lower-case Vietnamese text without diacritics (đ -> d)"""
+    text = unicodedata.normalize('NFD', text.lower().replace('đ', 'd'))
+    return ''.join(ch for ch in text if unicodedata.category(ch) != 'Mn')
+
+
+def _lower(text: str) -> str:
+    """Lower-case text with diacritics in composed form"""
+    return unicodedata.normalize('NFC', text.lower())
+
+
+def _keyword_pattern(keywords: List[str]) -> Optional[re.Pattern]:
+    """One alternation of keywords at word boundaries, longest first"""
+    if not keywords:
+        return None
+    # Longest keywords first so "quan ly kenh" is preferred over shorter overlaps
+    alternatives = sorted(keywords, key=len, reverse=True)
+    return re.compile(r'(?<!\w)(' + '|'.join(re.escape(k) for k in alternatives) + r')(?!\w)')
+
+
+class GLClassifier:
+    """All GL keywords compiled into two regular expressions.
+
+    Keywords with diacritics are matched against the lower-cased
+    descriptions and the others against the accent-stripped ones. Every
+    description is scanned once by each; when several keywords match, the
+    rule listed first in GL_RULES wins.
+    """
+
+    def __init__(self, rules: List[Tuple[str, List[str]]] = GL_RULES):
+        """
+        Compile the rules
+
+        Args:
+            rules: (account, keywords) pairs, highest priority first
+        """
+        self.priority: Dict[str, Tuple[int, str]] = {}
+        for rank, (account, keywords) in enumerate(rules):
+            for keyword in keywords:
+                self.priority.setdefault(_lower(keyword), (rank, account))
+        accented = [k for k in self.priority if strip_accents(k) != k]
+        plain = [k for k in self.priority if strip_accents(k) == k]
+        self.accented_pattern = _keyword_pattern(accented)
+        self.pattern = _keyword_pattern(plain)
+
+    def classify(self, descriptions: pd.Series) -> pd.Series:
+        """
+        GL account per description (None when no rule matches)
+
+        Args:
+            descriptions: Transaction descriptions
+
+        Returns:
+            pd.Series: Account numbers aligned with descriptions
+        """
+        # Statements repeat the same descriptions, so work on unique values
+        unique = pd.Series(descriptions.dropna().unique())
+        if unique.empty:
+            return pd.Series(None, index=descriptions.index, dtype=object)
+
+        lowered = unique.map(_lower)
+        found = []
+        if self.accented_pattern is not None:
+            found.append(lowered.str.findall(self.accented_pattern))
+        if self.pattern is not None:
+            found.append(lowered.map(strip_accents).str.findall(self.pattern))
+        matches = pd.concat(found).explode().dropna() if found else pd.Series(dtype=object)
+        ranked = matches.map(self.priority)
+        best = {}
+        if not ranked.empty:
+            ranks = pd.DataFrame(ranked.tolist(), index=ranked.index, columns=['rank', 'account'])
+            first = ranks.sort_values('rank', kind='stable').groupby(level=0).first()['account']
+            best = dict(zip(unique[first.index], first))
+        accounts = descriptions.map(best).astype(object)
+        return accounts.where(accounts.notna(), None)
+
+
+def parse_amounts(values: pd.Series) -> pd.Series:
+    """Amounts in either 1.000.000,50 or 1,000,000.50 notation"""
+    text = values.astype(str).str.replace(r'[^\d,.\-]', '', regex=True)
+    decimal_comma = text.str.contains(r',\d{1,2}$')
+    comma_style = text.str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+    point_style = text.str.replace(r'[.,](?=\d{3}(?:[.,]|$))', '', regex=True).str.replace(',', '', regex=False)
+    return pd.to_numeric(comma_style.where(decimal_comma, point_style), errors='coerce').fillna(0.0)
+
+
+def parse_statement(path: str, account_number: Optional[str] = None) -> pd.DataFrame:
+    """
+    Read a statement export (CSV) into normalized columns
+
+    Args:
+        path: CSV file path
+        account_number: Account for files without a 'Số tài khoản' column
+
+    Returns:
+        pd.DataFrame: Normalized rows in file order
+    """
+    df = pd.read_csv(path, dtype=str, keep_default_na=False, na_values=[''], encoding='utf-8-sig')
+    df = df.rename(columns=lambda c: STATEMENT_COLUMNS.get(c.strip(), c.strip()))
+    for column in STATEMENT_COLUMNS.values():
+        if column not in df.columns:
+            df[column] = None
+    if account_number:
+        df['account_number'] = df['account_number'].fillna(account_number)
+
+    df['transaction_date'] = pd.to_datetime(df['transaction_date'], format='%d/%m/%Y', errors='coerce').fillna(
+        pd.to_datetime(df['transaction_date'], format='mixed', dayfirst=True, errors='coerce')).dt.date
+    for column in ('credit_amount', 'debit_amount', 'balance_after_transaction'):
+        df[column] = parse_amounts(df[column])
+    df['source_row'] = np.arange(len(df))
+    return df[list(STATEMENT_COLUMNS.values()) + ['source_row']]
+
+
+def combine_statements(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenate parsed statements into one row per transaction, in date order
+
+    Overlapping exports repeat transactions, so rows sharing an account
+    and reference number keep the copy from the latest file (like the
+    Etsy loader); rows without a reference are kept as they are. Rows are
+    then ordered by account and date, keeping file order within a day, so
+    the running balance check does not depend on the order of the paths.
+
+    Args:
+        frames: Outputs of parse_statement, oldest file first
+
+    Returns:
+        pd.DataFrame: Combined rows with source_row renumbered in the new order
+    """
+    columns = list(STATEMENT_COLUMNS.values()) + ['source_row']
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+    key = ['account_number', 'reference_number']
+    df = df[df['reference_number'].isna() | ~df.duplicated(subset=key, keep='last')]
+    df = df.assign(_date=pd.to_datetime(df['transaction_date']), _position=np.arange(len(df)))
+    df = df.sort_values(['account_number', '_date', '_position'], kind='stable', na_position='last')
+    df = df.drop(columns=['_date', '_position']).reset_index(drop=True)
+    df['source_row'] = np.arange(len(df))
+    return df
+
+
+def verify_running_balance(df: pd.DataFrame, tolerance: float = BALANCE_TOLERANCE) -> pd.DataFrame:
+    """
+    Rows whose balance does not follow from the previous row
+
+    Each account's rows are checked in statement order:
+    balance[i] == balance[i-1] + credit[i] - debit[i].
+
+    Args:
+        df: Normalized statement rows
+        tolerance: Allowed absolute difference
+
+    Returns:
+        pd.DataFrame: Offending rows with an 'expected_balance' column
+    """
+    ordered = df.sort_values(['account_number', 'source_row'], kind='stable')
+    balance = ordered['balance_after_transaction'].to_numpy(dtype=float)
+    delta = ordered['credit_amount'].to_numpy(dtype=float) - ordered['debit_amount'].to_numpy(dtype=float)
+    accounts = ordered['account_number'].to_numpy()
+
+    expected = np.empty_like(balance)
+    expected[0:1] = balance[0:1]
+    expected[1:] = balance[:-1] + delta[1:]
+    # First row of each account has no predecessor to check against
+    same_account = np.ones(len(balance), dtype=bool)
+    same_account[0:1] = False
+    same_account[1:] = accounts[1:] == accounts[:-1]
+
+    bad = same_account & (np.abs(balance - expected) > tolerance)
+    return ordered[bad].assign(expected_balance=expected[bad])
+
+
+def load_statements(paths: List[str], account_number: Optional[str] = None, allow_mismatch: bool = False,
+                    full: bool = False, refresh: bool = True,
+                    connection: Optional[PostgreSQLConnection] = None) -> Dict:
+    """
+    Classify and load bank statement exports into fact_bank_transactions
+
+    Files unchanged since the last load are skipped and only new or
+    changed rows (by content hash) are upserted.
+
+    Args:
+        paths: Statement CSV files
+        account_number: Account for files without an account column
+        allow_mismatch: Load even when running balances do not reconcile
+        full: Read every file even if its watermark is unchanged
+        refresh: Refresh rollups for the affected dates and the account
+            summary for the loaded accounts after commit
+        connection: Connection to use (a fresh one by default)
+
+    Returns:
+        dict: Load statistics including the affected date keys
+    """
+    started = time.perf_counter()
+    conn = connection or PostgreSQLConnection()
+    if not conn.connection or conn.connection.closed:
+        conn.connect()
+    ensure_future_partitions(connection=conn)
+
+    with conn.connection, conn.connection.cursor() as cur:
+        create_watermark_tables(cur)
+        if not full:
+            paths = changed_files(cur, SOURCE, paths)
+
+    frames = [parse_statement(path, account_number) for path in paths]
+    reads = {path: len(frame) for path, frame in zip(paths, frames)}
+    df = combine_statements(frames)
+
+    mismatches = verify_running_balance(df)
+    if len(mismatches) and not allow_mismatch:
+        first = mismatches.iloc[0]
+        raise ValueError(f"{len(mismatches)} running balance mismatches, first at {first['reference_number']} "
+                         f"({first['balance_after_transaction']} != {first['expected_balance']})")
+
+    # Outgoing payments without an explicit account are classified
+    needs_account = df['pl_account_number'].isna() & (df['debit_amount'] > 0)
+    classified = GLClassifier().classify(df.loc[needs_account, 'transaction_description'])
+    df.loc[needs_account, 'pl_account_number'] = classified
+    classified_at = time.perf_counter()
+
+    with conn.connection, conn.connection.cursor() as cur:
+        accounts = df[['account_number', 'account_name']].dropna(subset=['account_number'])
+        accounts = accounts.groupby('account_number', sort=False).last().reset_index()
+        key_map = upsert_dimension(cur, accounts, 'dim_bank_account', 'bank_account_key',
+                                   ['account_number'], ['account_name'])
+        df = df.merge(key_map.astype({'account_number': str}), on='account_number', how='left')
+
+        dates = df['transaction_date'].dropna()
+        time_keys = pd.DataFrame(columns=['transaction_date', 'transaction_date_key'])
+        if not dates.empty:
+            cur.execute("SELECT full_date, time_key FROM dim_time WHERE full_date BETWEEN %s AND %s",
+                        (min(dates), max(dates)))
+            time_keys = pd.DataFrame(cur.fetchall(), columns=['transaction_date', 'transaction_date_key'])
+        df = df.merge(time_keys, on='transaction_date', how='left')
+
+        facts = df.dropna(subset=['bank_account_key', 'transaction_date_key', 'reference_number']).copy()
+        facts['transaction_date_key'] = facts['transaction_date_key'].astype('Int64')
+        changed = changed_rows(cur, SOURCE, facts, FACT_NATURAL_KEY, FACT_COLUMNS)
+        result = upsert_facts(cur, changed, 'fact_bank_transactions', FACT_NATURAL_KEY, FACT_COLUMNS,
+                              'transaction_date_key')
+        record_row_hashes(cur, SOURCE)
+        record_files(cur, SOURCE, paths, reads)
+        load_id = publish_load(cur, SOURCE, result['date_keys'])
+
+    stats = {
+        'files': len(paths),
+        'rows': len(df),
+        'duplicates': sum(reads.values()) - len(df),
+        'inserted': result['inserted'],
+        'updated': result['updated'],
+        'unchanged': len(facts) - len(changed),
+        'skipped': len(df) - len(facts),
+        'missing_reference': int(df['reference_number'].isna().sum()),
+        'balance_mismatches': len(mismatches),
+        'classified': int(classified.notna().sum()),
+        'unclassified': int(classified.isna().sum()),
+        'load_id': load_id,
+        'affected_date_keys': sorted(result['date_keys']),
+        'classify_seconds': round(classified_at - started, 3),
+    }
+    if refresh and result['date_keys']:
+        stats['rollups'] = refresh_downstream(result['date_keys'], conn)
+    if refresh and len(key_map):
+        # Recomputes only the accounts present in the loaded files
+        stats['account_summary'] = refresh_account_summary(key_map['bank_account_key'], conn)
+    stats['seconds'] = round(time.perf_counter() - started, 3)
+    return stats
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Load bank statement exports into fact_bank_transactions")
+    parser.add_argument('paths', nargs='+', help="Statement CSV files")
+    parser.add_argument('--account', default=None, help="Account number for files without an account column")
+    parser.add_argument('--allow-mismatch', action='store_true', help="Load even if running balances do not reconcile")
+    parser.add_argument('--full', action='store_true', help="Re-read files even if unchanged since the last load")
+    parser.add_argument('--no-refresh', action='store_true', help="Do not refresh rollups and the account summary")
+    args = parser.parse_args()
+
+    stats = load_statements(args.paths, args.account, args.allow_mismatch, full=args.full, refresh=not args.no_refresh)
+    print(f"Read {stats['rows']} rows from {stats['files']} changed files in {stats['seconds']}s "
+          f"(parse + classify {stats['classify_seconds']}s)")
+    print(f"Inserted: {stats['inserted']}, updated: {stats['updated']}, unchanged: {stats['unchanged']}, "
+          f"duplicates dropped: {stats['duplicates']}")
+    print(f"Classified: {stats['classified']}, unclassified: {stats['unclassified']}, "
+          f"balance mismatches: {stats['balance_mismatches']}")
+    if stats['skipped']:
+        print(f"⚠️ Skipped {stats['skipped']} rows without a reference number, account or known date "
+              f"({stats['missing_reference']} without a reference number)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+COPY-based bulk loading helpers for warehouse tables
+"""
+import io
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+COPY_CHUNK_ROWS = 100_000
+
+
+def copy_dataframe(cur, df: pd.DataFrame, table: str, columns: Optional[List[str]] = None,
+                   chunk_rows: int = COPY_CHUNK_ROWS) -> int:
+    """
+    Stream a DataFrame into a table with COPY FROM STDIN (CSV)
+
+    Missing values are written as empty unquoted fields, which COPY reads
+    as NULL. Integer key columns should use the nullable Int64 dtype so
+    they are not written as floats.
+
+    Args:
+        cur: psycopg2 cursor
+        df: Rows to load
+        table: Target table
+        columns: Columns to load (all DataFrame columns by default)
+        chunk_rows: Rows serialized per COPY buffer
+
+    Returns:
+        int: Number of rows copied
+    """
+    columns = columns or list(df.columns)
+    statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    for start in range(0, len(df), chunk_rows):
+        buffer = io.StringIO()
+        df.iloc[start:start + chunk_rows][columns].to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+        cur.copy_expert(statement, buffer)
+    return len(df)
+
+
+def create_stage_table(cur, stage: str, target: str, columns: List[str]):
+    """
+    Create an empty temp table with the target's column types
+
+    Only types are copied (no NOT NULL, defaults or keys), so partial rows
+    can be staged. The table is dropped at commit.
+
+    Args:
+        cur: psycopg2 cursor
+        stage: Temp table name
+        target: Table whose column types are used
+        columns: Columns to include
+    """
+    cur.execute(f"DROP TABLE IF EXISTS {stage}")
+    cur.execute(f"CREATE TEMP TABLE {stage} ON COMMIT DROP AS "
+                f"SELECT {', '.join(columns)} FROM {target} WITH NO DATA")
+
+
+def _match(left: str, right: str, columns: List[str]) -> str:
+    """
+    NULL-safe equality on natural key columns
+
+    COALESCE keeps the condition hashable, unlike IS NOT DISTINCT FROM, so
+    the anti-joins below run as hash joins.
+    """
+    return " AND ".join(f"COALESCE({left}.{c}::text, '') = COALESCE({right}.{c}::text, '')" for c in columns)
+
+
+def upsert_dimension(cur, df: pd.DataFrame, table: str, surrogate_key: str, natural_key: List[str],
+                     attributes: List[str], current_filter: Optional[str] = None,
+                     insert_defaults: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """
+    Insert new dimension members, update changed attributes, return the key map
+
+    Attribute values that are NULL in the staged rows never overwrite
+    known values, so partial sources (e.g. order ids seen in order items
+    before the orders export) can be loaded in any order.
+
+    Args:
+        cur: psycopg2 cursor
+        df: One row per natural key with natural_key + attributes columns
+        table: Dimension table
+        surrogate_key: Surrogate key column
+        natural_key: Natural key columns
+        attributes: Attribute columns kept up to date
+        current_filter: SQL predicate on alias d selecting current rows
+            (e.g. "d.is_current = true" for slowly changing dimensions)
+        insert_defaults: Extra column -> SQL expression for new rows
+
+    Returns:
+        pd.DataFrame: natural_key columns plus surrogate_key
+    """
+    columns = natural_key + attributes
+    stage = f"stage_{table}"
+    create_stage_table(cur, stage, table, columns)
+    copy_dataframe(cur, df, stage, columns)
+
+    current = f" AND {current_filter}" if current_filter else ""
+    if attributes:
+        changed = " OR ".join(f"(s.{a} IS NOT NULL AND d.{a} IS DISTINCT FROM s.{a})" for a in attributes)
+        cur.execute(f"""
+            UPDATE {table} d
+            SET {', '.join(f'{a} = COALESCE(s.{a}, d.{a})' for a in attributes)}
+            FROM {stage} s
+            WHERE {_match('d', 's', natural_key)}{current} AND ({changed})
+        """)
+
+    defaults = insert_defaults or {}
+    insert_columns = columns + list(defaults)
+    select_columns = [f"s.{c}" for c in columns] + list(defaults.values())
+    cur.execute(f"""
+        INSERT INTO {table} ({', '.join(insert_columns)})
+        SELECT {', '.join(select_columns)}
+        FROM {stage} s
+        WHERE NOT EXISTS (
+            SELECT 1 FROM {table} d WHERE {_match('d', 's', natural_key)}{current}
+        )
+    """)
+
+    cur.execute(f"""
+        SELECT {', '.join(f'd.{c}' for c in natural_key)}, d.{surrogate_key}
+        FROM {table} d
+        JOIN {stage} s ON {_match('d', 's', natural_key)}
+        WHERE 1=1{current}
+    """)
+    key_map = pd.DataFrame(cur.fetchall(), columns=natural_key + [surrogate_key])
+    key_map[surrogate_key] = key_map[surrogate_key].astype('Int64')
+    return key_map
+
+
+def upsert_facts(cur, df: pd.DataFrame, table: str, natural_key: List[str],
+                 columns: List[str], date_key: str) -> Dict:
+    """
+    Update facts whose natural key exists and insert the rest
+
+    Only rows whose values differ are updated, so re-running a load with
+    the same exports writes nothing. Natural key values must not be NULL.
+
+    Args:
+        cur: psycopg2 cursor
+        df: Fact rows with every column in columns
+        table: Fact table
+        natural_key: Columns identifying a fact row
+        columns: Columns to load
+        date_key: Date key column, used to report affected days
+
+    Returns:
+        dict: inserted/updated row counts and the affected date keys
+            (old and new date of updated rows)
+    """
+    if df.empty:
+        return {'inserted': 0, 'updated': 0, 'date_keys': set()}
+
+    stage = f"stage_{table}"
+    create_stage_table(cur, stage, table, columns)
+    copy_dataframe(cur, df, stage, columns)
+
+    match = ' AND '.join(f'f.{c} = s.{c}' for c in natural_key)
+    values = [c for c in columns if c not in natural_key]
+    # Dates the changed rows are moving away from
+    cur.execute(f"SELECT DISTINCT f.{date_key} FROM {table} f JOIN {stage} s ON {match}")
+    old_date_keys = [row[0] for row in cur.fetchall()]
+
+    cur.execute(f"""
+        UPDATE {table} f
+        SET {', '.join(f'{c} = s.{c}' for c in values)}
+        FROM {stage} s
+        WHERE {match}
+          AND ({', '.join(f'f.{c}' for c in values)}) IS DISTINCT FROM ({', '.join(f's.{c}' for c in values)})
+        RETURNING f.{date_key}
+    """)
+    updated = cur.fetchall()
+
+    cur.execute(f"""
+        WITH inserted AS (
+            INSERT INTO {table} ({', '.join(columns)})
+            SELECT {', '.join(f's.{c}' for c in columns)}
+            FROM {stage} s
+            WHERE NOT EXISTS (SELECT 1 FROM {table} f WHERE {match})
+            RETURNING {date_key}
+        )
+        SELECT {date_key} FROM inserted
+    """)
+    inserted = cur.fetchall()
+
+    date_keys = {int(k) for k in old_date_keys if k is not None}
+    date_keys.update(int(row[0]) for row in updated if row[0] is not None)
+    date_keys.update(int(row[0]) for row in inserted if row[0] is not None)
+    return {'inserted': len(inserted), 'updated': len(updated), 'date_keys': date_keys}
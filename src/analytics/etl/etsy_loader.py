@@ -0,0 +1,416 @@
+"""
+Etsy CSV export loader (EtsySoldOrderItems, EtsySoldOrders, EtsyDirectCheckoutPayments)
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.insert(0, project_root)
+
+from src.analytics.utils.postgres_connection import PostgreSQLConnection
+from src.analytics.etl.bulk_copy import upsert_dimension, upsert_facts
+from src.analytics.etl.watermarks import (
+    changed_files, changed_rows, create_watermark_tables, publish_load, record_files,
+    record_row_hashes, refresh_downstream
+)
+from src.analytics.warehouse.partitions import ensure_future_partitions
+
+CSV_CHUNK_ROWS = 50_000
+
+# Etsy export column -> normalized column, per export type. Exports are
+# recognized by file name prefix, e.g. EtsySoldOrderItems2025-1.csv.
+EXPORTS: Dict[str, Dict] = {
+    'sold_order_items': {
+        'prefix': 'EtsySoldOrderItems',
+        'columns': {
+            'Transaction ID': 'transaction_id',
+            'Order ID': 'order_id',
+            'Listing ID': 'listing_id',
+            'Sale Date': 'sale_date',
+            'Item Name': 'title',
+            'Buyer': 'buyer_username',
+            'Quantity': 'quantity',
+            'Price': 'price',
+            'Discount Amount': 'discount_amount',
+            'Shipping Discount': 'shipping_discount',
+            'Item Total': 'item_total',
+            'Ship State': 'state_name',
+            'Ship Country': 'country_name',
+        },
+        'dates': ['sale_date'],
+        'numbers': ['quantity', 'price', 'discount_amount', 'shipping_discount', 'item_total'],
+        'required': ['transaction_id'],
+    },
+    'sold_orders': {
+        'prefix': 'EtsySoldOrders',
+        'columns': {
+            'Order ID': 'order_id',
+            'Sale Date': 'sale_date',
+            'Buyer': 'buyer_username',
+            'Buyer User ID': 'buyer_user_id',
+            'Full Name': 'full_name',
+            'Card Processing Fees': 'card_processing_fees',
+            'Adjusted Card Processing Fees': 'adjusted_card_processing_fees',
+        },
+        'dates': ['sale_date'],
+        'numbers': ['card_processing_fees', 'adjusted_card_processing_fees'],
+        'required': ['order_id'],
+    },
+    'direct_checkout_payments': {
+        'prefix': 'EtsyDirectCheckoutPayments',
+        'columns': {
+            'Payment ID': 'payment_id',
+            'Order ID': 'order_id',
+            'Buyer Username': 'buyer_username',
+            'Order Date': 'payment_date',
+            'Gross Amount': 'gross_amount',
+            'Fees': 'fees',
+            'Net Amount': 'net_amount',
+            'Posted Fees': 'posted_fees',
+            'Adjusted Fees': 'adjusted_fees',
+        },
+        'dates': ['payment_date'],
+        'numbers': ['gross_amount', 'fees', 'net_amount', 'posted_fees', 'adjusted_fees'],
+        'required': ['payment_id'],
+    },
+}
+
+# Warehouse targets: natural keys identify members/rows across reloads
+DIMENSIONS: Dict[str, Dict] = {
+    'dim_customer': {'key': 'customer_key', 'natural': ['buyer_username'],
+                     'attributes': ['buyer_user_id', 'full_name']},
+    'dim_product': {'key': 'product_key', 'natural': ['listing_id'], 'attributes': ['title'],
+                    'current_filter': 'd.is_current = true', 'insert_defaults': {'is_current': 'true'}},
+    'dim_geography': {'key': 'geography_key', 'natural': ['state_name', 'country_name'], 'attributes': []},
+    'dim_order': {'key': 'order_key', 'natural': ['order_id'],
+                  'attributes': ['card_processing_fees', 'adjusted_card_processing_fees']},
+}
+
+FACTS: Dict[str, Dict] = {
+    'fact_sales': {
+        'natural': ['transaction_id'],
+        'date_key': 'sale_date_key',
+        'columns': ['transaction_id', 'sale_date_key', 'customer_key', 'product_key', 'geography_key',
+                    'order_key', 'quantity', 'price', 'item_total', 'discount_amount', 'shipping_discount'],
+    },
+    'fact_payments': {
+        'natural': ['payment_id'],
+        'date_key': 'payment_date_key',
+        'columns': ['payment_id', 'payment_date_key', 'order_key', 'customer_key', 'gross_amount',
+                    'fees', 'net_amount', 'posted_fees', 'adjusted_fees'],
+    },
+}
+
+
+def detect_export(path: str) -> Optional[str]:
+    """Export type of a CSV file from its name, or None"""
+    name = os.path.basename(path)
+    for kind, spec in EXPORTS.items():
+        if name.startswith(spec['prefix']):
+            return kind
+    return None
+
+
+def _parse_dates(values: pd.Series) -> pd.Series:
+    """Etsy dates (MM/DD/YY, MM/DD/YYYY or ISO) to datetime.date"""
+    parsed = pd.to_datetime(values, format='%m/%d/%y', errors='coerce')
+    missing = parsed.isna() & values.notna()
+    if missing.any():
+        parsed[missing] = pd.to_datetime(values[missing], format='mixed', errors='coerce')
+    return parsed.dt.date
+
+
+def _parse_numbers(values: pd.Series) -> pd.Series:
+    """Amounts that may carry currency symbols or thousands separators"""
+    return pd.to_numeric(values.str.replace(r'[^0-9.\-]', '', regex=True), errors='coerce')
+
+
+def parse_export(path: str, chunk_rows: int = CSV_CHUNK_ROWS) -> Dict:
+    """
+    Read one export in chunks and normalize it
+
+    Runs in a worker process; only normalized columns are kept in memory.
+
+    Args:
+        path: CSV file path
+        chunk_rows: Rows per read_csv chunk
+
+    Returns:
+        dict: {'path', 'kind', 'rows': DataFrame, 'read': raw row count}
+    """
+    kind = detect_export(path)
+    spec = EXPORTS[kind]
+    mapping = spec['columns']
+
+    chunks = []
+    read = 0
+    for chunk in pd.read_csv(path, dtype=str, chunksize=chunk_rows, usecols=lambda c: c.strip() in mapping,
+                             keep_default_na=False, na_values=[''], encoding='utf-8-sig'):
+        read += len(chunk)
+        chunk = chunk.rename(columns=lambda c: mapping[c.strip()])
+        for column in mapping.values():
+            if column not in chunk.columns:
+                chunk[column] = None
+        for column in spec['dates']:
+            chunk[column] = _parse_dates(chunk[column])
+        for column in spec['numbers']:
+            chunk[column] = _parse_numbers(chunk[column])
+        for column in mapping.values():
+            if column not in spec['dates'] and column not in spec['numbers']:
+                chunk[column] = chunk[column].str.strip()
+        chunks.append(chunk.dropna(subset=spec['required'])[list(mapping.values())])
+
+    rows = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=list(mapping.values()))
+    return {'path': path, 'kind': kind, 'rows': rows, 'read': read}
+
+
+def parse_exports(paths: List[str], workers: Optional[int] = None) -> Tuple[Dict[str, pd.DataFrame], Dict[str, int]]:
+    """
+    Parse exports in parallel, one file per worker process
+
+    Args:
+        paths: CSV file paths (unrecognized names are skipped)
+        workers: Worker processes (CPU count by default)
+
+    Returns:
+        tuple: (export type -> normalized rows with later files winning on
+            duplicates, path -> rows read)
+    """
+    paths = sorted(p for p in paths if detect_export(p))
+    frames: Dict[str, List[pd.DataFrame]] = {kind: [] for kind in EXPORTS}
+    if len(paths) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(parse_export, paths))
+    else:
+        results = [parse_export(p) for p in paths]
+    reads = {}
+    for result in results:
+        frames[result['kind']].append(result['rows'])
+        reads[result['path']] = result['read']
+
+    parsed = {}
+    for kind, spec in EXPORTS.items():
+        columns = list(spec['columns'].values())
+        df = pd.concat(frames[kind], ignore_index=True) if frames[kind] else pd.DataFrame(columns=columns)
+        # Overlapping monthly exports repeat rows; keep the newest file's copy
+        parsed[kind] = df.drop_duplicates(subset=spec['required'], keep='last')
+    return parsed, reads
+
+
+def _first_known(df: pd.DataFrame, key: List[str], columns: List[str]) -> pd.DataFrame:
+    """One row per natural key, taking the last non-null value of each column"""
+    df = df[key + columns].dropna(subset=key, how='all')
+    if df.empty:
+        return df
+    return df.groupby(key, dropna=False, sort=False).last().reset_index()
+
+
+def build_dimension_rows(parsed: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+    """
+    Dimension members referenced by the parsed exports
+
+    Args:
+        parsed: Output of parse_exports
+
+    Returns:
+        dict: Dimension table -> natural key + attribute rows
+    """
+    items = parsed['sold_order_items']
+    orders = parsed['sold_orders']
+    payments = parsed['direct_checkout_payments']
+
+    customers = pd.concat([
+        items[['buyer_username']],
+        orders[['buyer_username', 'buyer_user_id', 'full_name']],
+        payments[['buyer_username']],
+    ], ignore_index=True)
+    order_ids = pd.concat([
+        items[['order_id']],
+        orders[['order_id', 'card_processing_fees', 'adjusted_card_processing_fees']],
+        payments[['order_id']],
+    ], ignore_index=True)
+
+    rows = {
+        'dim_customer': _first_known(customers, ['buyer_username'], DIMENSIONS['dim_customer']['attributes']),
+        'dim_product': _first_known(items, ['listing_id'], ['title']),
+        'dim_geography': items[['state_name', 'country_name']].drop_duplicates(),
+        'dim_order': _first_known(order_ids, ['order_id'], DIMENSIONS['dim_order']['attributes']),
+    }
+    rows['dim_customer'] = rows['dim_customer'].dropna(subset=['buyer_username'])
+    rows['dim_product'] = rows['dim_product'].dropna(subset=['listing_id'])
+    rows['dim_order'] = rows['dim_order'].dropna(subset=['order_id'])
+    rows['dim_geography'] = rows['dim_geography'].dropna(how='all')
+    return rows
+
+
+def _text_key(values: pd.Series) -> pd.Series:
+    """Natural key values as text, NULL as '' (mirrors the SQL-side match)"""
+    return values.astype(object).map(lambda v: '' if pd.isna(v) else str(v))
+
+
+def _attach_key(df: pd.DataFrame, key_map: pd.DataFrame, natural: List[str]) -> pd.DataFrame:
+    """Resolve a surrogate key by merging on the natural key"""
+    join = [f"_{column}_text" for column in natural]
+    left = df.assign(**{j: _text_key(df[c]) for j, c in zip(join, natural)})
+    right = key_map.drop(columns=natural).assign(**{j: _text_key(key_map[c]) for j, c in zip(join, natural)})
+    return left.merge(right.drop_duplicates(subset=join), on=join, how='left').drop(columns=join)
+
+
+def _date_keys(cur, dates: pd.Series) -> pd.DataFrame:
+    """full_date -> time_key for the date span of a load"""
+    known = dates.dropna()
+    if known.empty:
+        return pd.DataFrame(columns=['full_date', 'time_key'])
+    cur.execute("SELECT full_date, time_key FROM dim_time WHERE full_date BETWEEN %s AND %s",
+                (min(known), max(known)))
+    return pd.DataFrame(cur.fetchall(), columns=['full_date', 'time_key'])
+
+
+def build_fact_rows(parsed: Dict[str, pd.DataFrame], key_maps: Dict[str, pd.DataFrame],
+                    time_keys: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    Fact rows with surrogate keys resolved through the dimension maps
+
+    Args:
+        parsed: Output of parse_exports
+        key_maps: Dimension table -> natural key + surrogate key
+        time_keys: full_date -> time_key
+
+    Returns:
+        dict: Fact table -> rows ready for COPY (rows without a date key dropped)
+    """
+    sales = parsed['sold_order_items']
+    for table in ('dim_customer', 'dim_product', 'dim_geography', 'dim_order'):
+        spec = DIMENSIONS[table]
+        sales = _attach_key(sales, key_maps[table], spec['natural'])
+    sales = sales.merge(time_keys.rename(columns={'full_date': 'sale_date', 'time_key': 'sale_date_key'}),
+                        on='sale_date', how='left')
+
+    payments = parsed['direct_checkout_payments']
+    for table in ('dim_customer', 'dim_order'):
+        spec = DIMENSIONS[table]
+        payments = _attach_key(payments, key_maps[table], spec['natural'])
+    payments = payments.merge(time_keys.rename(columns={'full_date': 'payment_date', 'time_key': 'payment_date_key'}),
+                              on='payment_date', how='left')
+
+    facts = {}
+    for table, df in (('fact_sales', sales), ('fact_payments', payments)):
+        spec = FACTS[table]
+        df = df.dropna(subset=[spec['date_key']]).copy()
+        for column in spec['columns']:
+            if column.endswith('_key'):
+                df[column] = df[column].astype('Int64')
+        facts[table] = df[spec['columns']]
+    return facts
+
+
+def load_exports(paths: List[str], workers: Optional[int] = None, full: bool = False,
+                 refresh: bool = True, connection: Optional[PostgreSQLConnection] = None) -> Dict:
+    """
+    Load Etsy exports into the warehouse in one transaction
+
+    Files whose size and mtime match the last load are skipped. Of the
+    remaining rows only new ones, or ones whose content hash changed, are
+    upserted. The affected date keys are published to etl_loads and the
+    rollups are refreshed for just those days.
+
+    Args:
+        paths: CSV file paths
+        workers: Parser processes (CPU count by default)
+        full: Read every file even if its watermark is unchanged
+        refresh: Refresh rollups for the affected dates after commit
+        connection: Connection to use (a fresh one by default)
+
+    Returns:
+        dict: Load statistics including the affected date keys
+    """
+    started = time.perf_counter()
+    conn = connection or PostgreSQLConnection()
+    if not conn.connection or conn.connection.closed:
+        conn.connect()
+    ensure_future_partitions(connection=conn)
+
+    paths = [p for p in paths if detect_export(p)]
+    with conn.connection, conn.connection.cursor() as cur:
+        create_watermark_tables(cur)
+        if not full:
+            paths = [p for kind in EXPORTS
+                     for p in changed_files(cur, f"etsy:{kind}", [q for q in paths if detect_export(q) == kind])]
+
+    parsed, reads = parse_exports(paths, workers)
+    parsed_at = time.perf_counter()
+
+    stats = {'files': len(paths), 'parsed_rows': {kind: len(df) for kind, df in parsed.items()},
+             'inserted': {}, 'updated': {}, 'unchanged': {}}
+    affected = set()
+    with conn.connection, conn.connection.cursor() as cur:
+        key_maps = {}
+        for table, df in build_dimension_rows(parsed).items():
+            spec = DIMENSIONS[table]
+            key_maps[table] = upsert_dimension(
+                cur, df, table, spec['key'], spec['natural'], spec['attributes'],
+                current_filter=spec.get('current_filter'), insert_defaults=spec.get('insert_defaults'))
+
+        dates = pd.concat([parsed['sold_order_items']['sale_date'],
+                           parsed['direct_checkout_payments']['payment_date']], ignore_index=True)
+        facts = build_fact_rows(parsed, key_maps, _date_keys(cur, dates))
+        stats['skipped_no_date'] = {
+            'fact_sales': len(parsed['sold_order_items']) - len(facts['fact_sales']),
+            'fact_payments': len(parsed['direct_checkout_payments']) - len(facts['fact_payments']),
+        }
+
+        for table, df in facts.items():
+            spec = FACTS[table]
+            source = f"etsy:{table}"
+            changed = changed_rows(cur, source, df, spec['natural'], spec['columns'])
+            result = upsert_facts(cur, changed, table, spec['natural'], spec['columns'], spec['date_key'])
+            record_row_hashes(cur, source)
+            stats['inserted'][table] = result['inserted']
+            stats['updated'][table] = result['updated']
+            stats['unchanged'][table] = len(df) - len(changed)
+            affected |= result['date_keys']
+
+        for kind in EXPORTS:
+            kind_paths = [p for p in paths if detect_export(p) == kind]
+            record_files(cur, f"etsy:{kind}", kind_paths, reads)
+        stats['load_id'] = publish_load(cur, 'etsy', affected)
+
+    stats['affected_date_keys'] = sorted(affected)
+    if refresh and affected:
+        stats['rollups'] = refresh_downstream(affected, conn)
+    stats['parse_seconds'] = round(parsed_at - started, 3)
+    stats['seconds'] = round(time.perf_counter() - started, 3)
+    return stats
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Load Etsy CSV exports into the warehouse")
+    parser.add_argument('paths', nargs='+', help="CSV files or directories containing Etsy exports")
+    parser.add_argument('--workers', type=int, default=None, help="Parser processes (CPU count by default)")
+    parser.add_argument('--full', action='store_true', help="Re-read files even if unchanged since the last load")
+    parser.add_argument('--no-refresh', action='store_true', help="Do not refresh rollups for the affected dates")
+    args = parser.parse_args()
+
+    files = []
+    for path in args.paths:
+        files += sorted(glob.glob(os.path.join(path, '*.csv'))) if os.path.isdir(path) else [path]
+
+    stats = load_exports(files, args.workers, full=args.full, refresh=not args.no_refresh)
+    print(f"Loaded {stats['files']} changed files in {stats['seconds']}s (parsing {stats['parse_seconds']}s)")
+    print(f"Inserted: {stats['inserted']}, updated: {stats['updated']}, unchanged: {stats['unchanged']}")
+    if any(stats['skipped_no_date'].values()):
+        print(f"Skipped (date missing from dim_time): {stats['skipped_no_date']}")
+    print(f"Affected date keys: {len(stats['affected_date_keys'])}")
+
+
+if __name__ == "__main__":
+    main()
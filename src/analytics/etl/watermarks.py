@@ -0,0 +1,255 @@
+"""
+Per-source watermarks, row hashes and change publication for incremental loads
+"""
+import os
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from src.analytics.utils.postgres_connection import PostgreSQLConnection
+from src.analytics.etl.bulk_copy import copy_dataframe
+
+WATERMARK_DDL = """
+CREATE TABLE IF NOT EXISTS etl_watermarks (
+    source        TEXT NOT NULL,
+    file_name     TEXT NOT NULL,
+    file_size     BIGINT NOT NULL,
+    file_mtime    DOUBLE PRECISION NOT NULL,
+    rows_seen     BIGINT NOT NULL DEFAULT 0,
+    loaded_at     TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (source, file_name)
+);
+
+CREATE TABLE IF NOT EXISTS etl_row_hashes (
+    source        TEXT NOT NULL,
+    natural_key   TEXT NOT NULL,
+    row_hash      BIGINT NOT NULL,
+    PRIMARY KEY (source, natural_key)
+);
+
+-- One row per committed load; readers poll load_id to pick up changes
+CREATE TABLE IF NOT EXISTS etl_loads (
+    load_id       BIGSERIAL PRIMARY KEY,
+    source        TEXT NOT NULL,
+    date_keys     BIGINT[] NOT NULL,
+    finished_at   TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+"""
+
+NATURAL_KEY_SEPARATOR = '|'
+
+
+def create_watermark_tables(cur):
+    """Create the ETL bookkeeping tables if they do not exist"""
+    cur.execute(WATERMARK_DDL)
+
+
+# -----------------------------------------------------------------------------
+# File watermarks
+# -----------------------------------------------------------------------------
+def _file_signature(path: str) -> Dict:
+    stat = os.stat(path)
+    return {'file_name': os.path.basename(path), 'file_size': stat.st_size, 'file_mtime': stat.st_mtime}
+
+
+def changed_files(cur, source: str, paths: List[str]) -> List[str]:
+    """
+    Files that are new or differ (size/mtime) from the last load of a source
+
+    Args:
+        cur: psycopg2 cursor
+        source: Source name, e.g. 'etsy:sold_order_items'
+        paths: Candidate files
+
+    Returns:
+        list: Paths that need to be read
+    """
+    cur.execute("SELECT file_name, file_size, file_mtime FROM etl_watermarks WHERE source = %s", (source,))
+    loaded = {name: (size, mtime) for name, size, mtime in cur.fetchall()}
+    changed = []
+    for path in paths:
+        signature = _file_signature(path)
+        if loaded.get(signature['file_name']) != (signature['file_size'], signature['file_mtime']):
+            changed.append(path)
+    return changed
+
+
+def record_files(cur, source: str, paths: List[str], rows_seen: Optional[Dict[str, int]] = None):
+    """
+    Store the watermark of files that were loaded
+
+    Args:
+        cur: psycopg2 cursor
+        source: Source name
+        paths: Loaded files
+        rows_seen: Optional path -> rows read
+    """
+    for path in paths:
+        signature = _file_signature(path)
+        cur.execute("""
+            INSERT INTO etl_watermarks (source, file_name, file_size, file_mtime, rows_seen, loaded_at)
+            VALUES (%s, %s, %s, %s, %s, now())
+            ON CONFLICT (source, file_name) DO UPDATE
+            SET file_size = EXCLUDED.file_size, file_mtime = EXCLUDED.file_mtime,
+                rows_seen = EXCLUDED.rows_seen, loaded_at = EXCLUDED.loaded_at
+        """, (source, signature['file_name'], signature['file_size'], signature['file_mtime'],
+              (rows_seen or {}).get(path, 0)))
+
+
+# -----------------------------------------------------------------------------
+# Row change detection
+# -----------------------------------------------------------------------------
+def natural_key_text(df: pd.DataFrame, natural_key: List[str]) -> pd.Series:
+    """Natural key columns joined into one text key"""
+    parts = [df[column].astype(object).map(lambda v: '' if pd.isna(v) else str(v)) for column in natural_key]
+    text = parts[0]
+    for part in parts[1:]:
+        text = text + NATURAL_KEY_SEPARATOR + part
+    return text
+
+
+def row_hashes(df: pd.DataFrame, columns: List[str]) -> pd.Series:
+    """64-bit content hash per row (vectorized), as signed BIGINT values"""
+    hashed = pd.util.hash_pandas_object(df[columns].astype(str), index=False)
+    return hashed.to_numpy().view('int64')
+
+
+def changed_rows(cur, source: str, df: pd.DataFrame, natural_key: List[str], columns: List[str]) -> pd.DataFrame:
+    """
+    Rows that are new or whose content hash differs from the last load
+
+    Leaves the temp table stage_row_hashes (natural_key, row_hash) with
+    the changed rows' hashes for record_row_hashes.
+
+    Args:
+        cur: psycopg2 cursor
+        source: Source name (hashes are tracked per source)
+        df: Candidate rows
+        natural_key: Columns identifying a row
+        columns: Columns whose content defines a change
+
+    Returns:
+        pd.DataFrame: Subset of df that needs to be written
+    """
+    hashes = pd.DataFrame({
+        'natural_key': natural_key_text(df, natural_key).to_numpy(),
+        'row_hash': row_hashes(df, columns) if len(df) else pd.Series(dtype='int64'),
+    })
+    cur.execute("DROP TABLE IF EXISTS stage_row_hashes")
+    cur.execute("CREATE TEMP TABLE stage_row_hashes (natural_key TEXT, row_hash BIGINT) ON COMMIT DROP")
+    copy_dataframe(cur, hashes, 'stage_row_hashes')
+    cur.execute("""
+        DELETE FROM stage_row_hashes s
+        USING etl_row_hashes h
+        WHERE h.source = %s AND h.natural_key = s.natural_key AND h.row_hash = s.row_hash
+    """, (source,))
+    cur.execute("SELECT natural_key FROM stage_row_hashes")
+    changed = {row[0] for row in cur.fetchall()}
+    return df[hashes['natural_key'].isin(changed).to_numpy()]
+
+
+def record_row_hashes(cur, source: str):
+    """Store the hashes left in stage_row_hashes by changed_rows"""
+    cur.execute("""
+        INSERT INTO etl_row_hashes (source, natural_key, row_hash)
+        SELECT %s, natural_key, row_hash FROM stage_row_hashes
+        ON CONFLICT (source, natural_key) DO UPDATE SET row_hash = EXCLUDED.row_hash
+    """, (source,))
+
+
+# -----------------------------------------------------------------------------
+# Change publication
+# -----------------------------------------------------------------------------
+def publish_load(cur, source: str, date_keys: Iterable[int]) -> Optional[int]:
+    """
+    Record the date keys a committed load touched
+
+    Args:
+        cur: psycopg2 cursor (inside the load transaction)
+        source: Source name
+        date_keys: Affected dim_time keys
+
+    Returns:
+        int: load_id, or None when nothing changed
+    """
+    keys = sorted({int(k) for k in date_keys})
+    if not keys:
+        return None
+    cur.execute("INSERT INTO etl_loads (source, date_keys) VALUES (%s, %s) RETURNING load_id", (source, keys))
+    return cur.fetchone()[0]
+
+
+def dates_changed_since(load_id: Optional[int], connection: PostgreSQLConnection) -> Dict:
+    """
+    Dates touched by loads after load_id
+
+    Args:
+        load_id: Last load already applied by the caller, or None to only
+            fetch the newest load id
+        connection: Connection to use
+
+    Returns:
+        dict: {'load_id': newest load id, 'dates': sorted datetime.date values}
+    """
+    exists = connection.execute_query("SELECT to_regclass('etl_loads') IS NOT NULL AS installed")
+    if exists.empty or not bool(exists.iloc[0, 0]):
+        return {'load_id': load_id, 'dates': []}
+
+    if load_id is None:
+        newest = connection.execute_query("SELECT COALESCE(MAX(load_id), 0) AS newest FROM etl_loads")
+        return {'load_id': int(newest.iloc[0, 0]) if not newest.empty else None, 'dates': []}
+
+    df = connection.execute_query("""
+        SELECT MAX(l.load_id) OVER () AS newest, dt.full_date
+        FROM etl_loads l
+        CROSS JOIN LATERAL UNNEST(l.date_keys) AS k(time_key)
+        JOIN dim_time dt ON dt.time_key = k.time_key
+        WHERE l.load_id > %s
+    """, (load_id,))
+    if df.empty:
+        return {'load_id': load_id, 'dates': []}
+    dates = sorted(set(pd.to_datetime(df['full_date']).dt.date))
+    return {'load_id': int(df['newest'].iloc[0]), 'dates': dates}
+
+
+def months_changed_since(load_id: Optional[int], connection: PostgreSQLConnection) -> Dict:
+    """
+    (year, month) pairs touched by loads after load_id
+
+    Args:
+        load_id: Last load already applied by the caller, or None to only
+            fetch the newest load id
+        connection: Connection to use
+
+    Returns:
+        dict: {'load_id': newest load id, 'months': [(year, month), ...]}
+    """
+    changes = dates_changed_since(load_id, connection)
+    months = sorted({(day.year, day.month) for day in changes['dates']})
+    return {'load_id': changes['load_id'], 'months': months}
+
+
+def refresh_downstream(date_keys: Iterable[int], connection: Optional[PostgreSQLConnection] = None) -> Dict:
+    """
+    Refresh rollups for the affected dates (when rollups are set up)
+
+    Args:
+        date_keys: Affected dim_time keys
+        connection: Connection to use (a fresh one by default)
+
+    Returns:
+        dict: Rollup refresh statistics, or {'rollups': 'not installed'}
+    """
+    from src.analytics.warehouse.rollups import refresh_rollups
+
+    conn = connection or PostgreSQLConnection()
+    if not conn.connection or conn.connection.closed:
+        conn.connect()
+    with conn.connection.cursor() as cur:
+        cur.execute("SELECT to_regclass('rollup_sales_daily') IS NOT NULL")
+        installed = cur.fetchone()[0]
+    conn.connection.rollback()
+    # A partial refresh must not create rollups that were never fully built
+    if not installed:
+        return {'rollups': 'not installed'}
+    return refresh_rollups(list(date_keys), conn)
@@ -0,0 +1,257 @@
+"""
+Batch export of account statements (PDF/CSV) for many bank accounts
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.insert(0, project_root)
+
+from src.analytics.utils.postgres_connection import PostgreSQLConnection
+from src.analytics.reports.statement_pdf import write_statement_pdf, PDF_BATCH_ROWS
+from src.analytics.reports.streamlit_account_statement import (
+    BANK_ACCOUNT_INFO_SQL, account_statement_query, bank_account_info_from_frame
+)
+
+FORMATS = ('pdf', 'csv')
+
+# Largest accounts first, so the slowest statements start early
+ACCOUNTS_SQL = """
+SELECT dba.account_number
+FROM dim_bank_account dba
+JOIN fact_bank_transactions fbt ON fbt.bank_account_key = dba.bank_account_key
+WHERE dba.account_number IS NOT NULL AND dba.account_number <> ''
+GROUP BY dba.account_number
+ORDER BY COUNT(*) DESC
+"""
+
+# One connection per worker process, opened by the pool initializer
+_worker_connection: Optional[PostgreSQLConnection] = None
+
+
+def _query_frame(conn: PostgreSQLConnection, query: str, params: tuple = None) -> pd.DataFrame:
+    """Small query result as a DataFrame, raising on errors (execute_query returns an empty frame)"""
+    return pa.Table.from_batches(list(conn.stream_query(query, params))).to_pandas()
+
+
+def list_accounts(connection: Optional[PostgreSQLConnection] = None) -> List[str]:
+    """
+    Account numbers that have transactions, largest first
+
+    Args:
+        connection: Connection to use (a fresh one by default)
+
+    Returns:
+        list: Account numbers
+
+    Raises:
+        Exception: If the accounts cannot be listed (an empty list always
+            means there are no accounts with transactions)
+    """
+    conn = connection or PostgreSQLConnection()
+    try:
+        df = _query_frame(conn, ACCOUNTS_SQL)
+    finally:
+        if connection is None:
+            conn.disconnect()
+    return [str(a) for a in df['account_number']]
+
+
+def statement_file_name(account_number: str, from_date: Optional[str], to_date: Optional[str], fmt: str) -> str:
+    """File name of one exported statement"""
+    return f"account_statement_{account_number}_{from_date or 'all'}_{to_date or 'present'}.{fmt}"
+
+
+def _init_worker():
+    global _worker_connection
+    _worker_connection = PostgreSQLConnection()
+
+
+def _tee_csv(batches: Iterator[pa.RecordBatch], csv_file, counter: Dict) -> Iterator[pa.RecordBatch]:
+    """Pass batches through while appending them to a CSV file (header included when there are no rows)"""
+    header = True
+    for batch in batches:
+        batch.to_pandas().to_csv(csv_file, index=False, header=header)
+        header = False
+        counter['rows'] += batch.num_rows
+        yield batch
+
+
+def export_account(account_number: str, from_date: Optional[str], to_date: Optional[str],
+                   formats: List[str], directory: str, connection: Optional[PostgreSQLConnection] = None) -> Dict:
+    """
+    Export one account's statement with a single streaming query
+
+    The rows feed the CSV writer and the PDF engine in the same pass. Any
+    query or write error is reported in the result rather than raised, so
+    one account cannot stop the batch, and the account's partial files are
+    removed so a truncated statement is never delivered.
+
+    Args:
+        account_number: Bank account number
+        from_date: Start date (YYYY-MM-DD), optional
+        to_date: End date (YYYY-MM-DD), optional
+        formats: Subset of FORMATS
+        directory: Output directory
+        connection: Connection to use (the worker's connection by default)
+
+    Returns:
+        dict: account, rows, files, bytes, seconds and error (None on success)
+    """
+    started = time.time()
+    conn = connection or _worker_connection or PostgreSQLConnection()
+    files = []
+    counter = {'rows': 0}
+    try:
+        account_info = bank_account_info_from_frame(_query_frame(conn, BANK_ACCOUNT_INFO_SQL, (account_number,)))
+        sql, params = account_statement_query(account_number, from_date, to_date)
+        batches = conn.stream_query(sql, params, PDF_BATCH_ROWS)
+
+        csv_file = None
+        if 'csv' in formats:
+            files.append(os.path.join(directory, statement_file_name(account_number, from_date, to_date, 'csv')))
+            csv_file = open(files[-1], 'w', encoding='utf-8', newline='')
+            batches = _tee_csv(batches, csv_file, counter)
+        try:
+            if 'pdf' in formats:
+                files.append(os.path.join(directory, statement_file_name(account_number, from_date, to_date, 'pdf')))
+                write_statement_pdf(files[-1], account_info, batches, from_date, to_date)
+            else:
+                for _ in batches:
+                    pass
+        finally:
+            if csv_file is not None:
+                csv_file.close()
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        for path in files:
+            if os.path.exists(path):
+                os.remove(path)
+        files = []
+
+    return {
+        'account': account_number,
+        'rows': counter['rows'],
+        'files': files,
+        'bytes': sum(os.path.getsize(f) for f in files if os.path.exists(f)),
+        'seconds': round(time.time() - started, 3),
+        'error': error,
+    }
+
+
+def export_statements(accounts: Optional[List[str]], from_date: Optional[str], to_date: Optional[str],
+                      output: str, formats: List[str] = FORMATS, workers: Optional[int] = None,
+                      progress=None) -> Dict:
+    """
+    Export statements for many accounts in parallel
+
+    Args:
+        accounts: Account numbers (every account with transactions if None;
+            failing to list them raises)
+        from_date: Start date (YYYY-MM-DD), optional
+        to_date: End date (YYYY-MM-DD), optional
+        output: Directory, or a path ending in .zip
+        formats: Subset of FORMATS
+        workers: Worker processes (CPU count by default)
+        progress: Optional callable(result) called as each account finishes
+
+    Returns:
+        dict: Totals (accounts, failed, rows, bytes, seconds, rows_per_second)
+            and per-account results
+    """
+    started = time.time()
+    accounts = accounts or list_accounts()
+    to_zip = output.lower().endswith('.zip')
+    directory = tempfile.mkdtemp(prefix='statements_') if to_zip else output
+    os.makedirs(directory, exist_ok=True)
+
+    results = []
+    archive = zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED) if to_zip else None
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = {pool.submit(export_account, account, from_date, to_date, list(formats), directory): account
+                       for account in accounts}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # The worker itself died (export_account reports its own errors)
+                    result = {'account': futures[future], 'rows': 0, 'files': [], 'bytes': 0, 'seconds': 0.0,
+                              'error': f"{type(e).__name__}: {e}"}
+                if archive is not None:
+                    # Files move into the archive as soon as their account is done
+                    for path in result['files']:
+                        if os.path.exists(path):
+                            archive.write(path, os.path.basename(path))
+                            os.remove(path)
+                results.append(result)
+                if progress is not None:
+                    progress(result)
+    finally:
+        if archive is not None:
+            archive.close()
+            shutil.rmtree(directory, ignore_errors=True)
+
+    seconds = time.time() - started
+    rows = sum(r['rows'] for r in results)
+    return {
+        'accounts': len(results),
+        'failed': sum(1 for r in results if r['error']),
+        'rows': rows,
+        'bytes': os.path.getsize(output) if to_zip else sum(r['bytes'] for r in results),
+        'seconds': round(seconds, 3),
+        'rows_per_second': round(rows / seconds, 1) if seconds else 0.0,
+        'accounts_per_second': round(len(results) / seconds, 2) if seconds else 0.0,
+        'results': results,
+    }
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Export account statements for many bank accounts")
+    parser.add_argument('--from', dest='from_date', default=None, help="Start date (YYYY-MM-DD)")
+    parser.add_argument('--to', dest='to_date', default=None, help="End date (YYYY-MM-DD)")
+    parser.add_argument('--accounts', nargs='*', default=None, help="Account numbers (default: all)")
+    parser.add_argument('--output', required=True, help="Output directory, or a .zip file")
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=list(FORMATS), help="Files per account")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    def report(result):
+        status = f"FAILED: {result['error']}" if result['error'] else f"{result['rows']} rows"
+        print(f"  {result['account']}: {status} in {result['seconds']}s")
+
+    accounts = args.accounts
+    if not accounts:
+        try:
+            accounts = list_accounts()
+        except Exception as e:
+            print(f"❌ Could not list bank accounts: {e}", file=sys.stderr)
+            sys.exit(1)
+        if not accounts:
+            print("No bank account has transactions, nothing to export")
+            return
+
+    stats = export_statements(accounts, args.from_date, args.to_date, args.output,
+                              args.formats, args.workers, progress=report)
+    print(f"Exported {stats['accounts']} accounts ({stats['failed']} failed), {stats['rows']} rows, "
+          f"{stats['bytes'] / 1024 / 1024:.1f} MB in {stats['seconds']}s")
+    print(f"Throughput: {stats['accounts_per_second']} accounts/s, {stats['rows_per_second']} rows/s")
+    if stats['failed']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
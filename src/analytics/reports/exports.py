@@ -0,0 +1,160 @@
+"""
+Chunked CSV and Parquet exports of query results and tables
+"""
+import io
+import os
+import sys
+import tempfile
+from typing import IO, Callable, Iterable, Iterator, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.insert(0, project_root)
+
+from src.analytics.utils.postgres_connection import stream_query, STREAM_BATCH_ROWS
+
+# Format -> (label, MIME type)
+EXPORT_FORMATS = {
+    'csv': ('CSV', 'text/csv'),
+    'parquet': ('Parquet', 'application/vnd.apache.parquet'),
+}
+
+PARQUET_COMPRESSION = 'zstd'
+
+
+def write_csv(output: IO[bytes], batches: Iterable[pa.RecordBatch]) -> int:
+    """
+    Write Arrow batches as UTF-8 CSV, one batch at a time
+
+    The header comes from the first batch, so a result without rows (one
+    empty batch) still produces a file with its columns.
+
+    Args:
+        output: Binary file object to write to
+        batches: Result batches (e.g. from stream_query)
+
+    Returns:
+        int: Number of rows written
+    """
+    text = io.TextIOWrapper(output, encoding='utf-8', newline='')
+    rows = 0
+    header = True
+    try:
+        for batch in batches:
+            batch.to_pandas().to_csv(text, index=False, header=header)
+            header = False
+            rows += batch.num_rows
+        text.flush()
+    finally:
+        # Leave the underlying file open for the caller
+        text.detach()
+    return rows
+
+
+def _writer_schema(schema: pa.Schema) -> pa.Schema:
+    """Schema for a Parquet file; columns that were all NULL in the first batch become text"""
+    return pa.schema([field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                      for field in schema])
+
+
+def write_parquet(output: IO[bytes], batches: Iterable[pa.RecordBatch]) -> int:
+    """
+    Write Arrow batches as a Parquet file, one row group per batch
+
+    Args:
+        output: Binary file object to write to
+        batches: Result batches with a consistent schema
+
+    Returns:
+        int: Number of rows written
+    """
+    writer = None
+    rows = 0
+    try:
+        for batch in batches:
+            if writer is None:
+                writer = pq.ParquetWriter(output, _writer_schema(batch.schema), compression=PARQUET_COMPRESSION)
+            if batch.schema != writer.schema:
+                batch = batch.cast(writer.schema)
+            writer.write_batch(batch)
+            rows += batch.num_rows
+        if writer is None:
+            pq.write_table(pa.table({}), output, compression=PARQUET_COMPRESSION)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+_WRITERS = {'csv': write_csv, 'parquet': write_parquet}
+
+
+def export_file(batches: Iterable[pa.RecordBatch], fmt: str) -> IO[bytes]:
+    """
+    Export batches into a temporary file, rewound for reading
+
+    An error while the batches are produced (e.g. the query failing
+    mid-stream) is raised, so a truncated file is never returned.
+
+    Args:
+        batches: Result batches
+        fmt: Key of EXPORT_FORMATS
+
+    Returns:
+        file: Temporary binary file (deleted when closed)
+    """
+    output = tempfile.TemporaryFile()
+    try:
+        _WRITERS[fmt](output, batches)
+    except Exception:
+        output.close()
+        raise
+    output.seek(0)
+    return output
+
+
+def query_batches(query: str, params: tuple = None) -> Iterator[pa.RecordBatch]:
+    """Query results streamed from a server-side cursor"""
+    return stream_query(query, params, STREAM_BATCH_ROWS)
+
+
+def frame_batches(df: pd.DataFrame) -> Iterator[pa.RecordBatch]:
+    """A DataFrame already in memory, as Arrow batches (one empty batch with the columns if it has no rows)"""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    batches = table.to_batches(max_chunksize=STREAM_BATCH_ROWS)
+    return iter(batches or [pa.RecordBatch.from_pylist([], schema=table.schema)])
+
+
+def export_file_name(stem: str, fmt: str) -> str:
+    """Download file name with a timestamp"""
+    return f"{stem}_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+
+
+def render_export_buttons(label: Optional[str], stem: str, batches: Callable[[], Iterable[pa.RecordBatch]], key: str):
+    """
+    Render one download button per export format
+
+    The file is only generated when a button is clicked. If the query
+    fails the download fails with it instead of serving a partial file.
+
+    Args:
+        label: What is exported (shown on the buttons), optional
+        stem: File name prefix
+        batches: Callable returning the batches to export
+        key: Widget key prefix
+    """
+    columns = st.columns(len(EXPORT_FORMATS))
+    for column, (fmt, (format_label, mime)) in zip(columns, EXPORT_FORMATS.items()):
+        with column:
+            st.download_button(
+                label=" ".join(filter(None, ["📥 Download", label, format_label])),
+                data=lambda fmt=fmt: export_file(batches(), fmt),
+                file_name=export_file_name(stem, fmt),
+                mime=mime,
+                key=f"{key}_{fmt}"
+            )
@@ -0,0 +1,228 @@
+"""
+Content-addressed, byte-budgeted disk cache for generated statement PDFs
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+import streamlit as st
+
+PDF_CACHE_DIR = os.getenv('ANALYTICS_PDF_CACHE_DIR',
+                          os.path.join(tempfile.gettempdir(), 'etsy_analytics_pdf_cache'))
+PDF_CACHE_MAX_BYTES = int(float(os.getenv('ANALYTICS_PDF_CACHE_MB', '512')) * 1024 * 1024)
+PDF_CACHE_WORKERS = 2
+
+# Bump when the PDF layout changes so older files are not served
+PDF_FORMAT_VERSION = 1
+
+
+def pdf_cache_key(account_number: str, from_date: Optional[str], to_date: Optional[str],
+                  data_version: str, account_info: Optional[Dict] = None) -> str:
+    """
+    Content address of a statement PDF
+
+    Args:
+        account_number: Bank account number
+        from_date: Start date (YYYY-MM-DD) or None
+        to_date: End date (YYYY-MM-DD) or None
+        data_version: Fingerprint of the statement rows
+        account_info: Header fields printed on the statement
+
+    Returns:
+        str: Hex digest used as the file name
+    """
+    payload = json.dumps([PDF_FORMAT_VERSION, account_number, from_date, to_date, data_version,
+                          account_info or {}], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class PdfJob:
+    """Background generation of one cached PDF"""
+    key: str
+    total_rows: Optional[int] = None
+    rows_written: int = 0
+    error: Optional[str] = None
+    done: bool = False
+    started_at: float = field(default_factory=time.time)
+
+    @property
+    def progress(self) -> float:
+        """Completed fraction (0..1), estimated from rows written"""
+        if self.done:
+            return 1.0
+        if not self.total_rows:
+            return 0.0
+        return min(self.rows_written / self.total_rows, 0.99)
+
+
+class PdfCache:
+    """Generated PDFs stored on disk by content key, evicted least recently used first"""
+
+    def __init__(self, directory: str = PDF_CACHE_DIR, max_bytes: int = PDF_CACHE_MAX_BYTES,
+                 workers: int = PDF_CACHE_WORKERS):
+        """
+        Initialize the cache
+
+        Args:
+            directory: Where PDFs are stored (shared by every session)
+            max_bytes: Total size kept on disk
+            workers: Concurrent background generations
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, PdfJob] = {}
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pdf_cache')
+
+    def path(self, key: str) -> str:
+        """File path of a key (whether or not it exists)"""
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Path of a cached PDF, marking it as recently used
+
+        Args:
+            key: Content key
+
+        Returns:
+            str: File path, or None when not cached
+        """
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, write: Callable[[str], None]) -> str:
+        """
+        Generate a PDF into the cache
+
+        The file is written under a temporary name and renamed only once
+        write returns, so readers never see a partial PDF and a failed
+        write (including a query error while streaming rows) caches
+        nothing. Eviction never removes the file just written, even when
+        it alone exceeds the budget.
+
+        Args:
+            key: Content key
+            write: Callable(path) that writes the PDF
+
+        Returns:
+            str: Path of the cached PDF
+
+        Raises:
+            Exception: Whatever write raised
+        """
+        path = self.path(key)
+        handle, partial = tempfile.mkstemp(dir=self.directory, suffix='.partial')
+        os.close(handle)
+        try:
+            write(partial)
+            os.replace(partial, path)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+        self.evict(keep=key)
+        return path
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """
+        Remove least recently used PDFs until the cache fits its budget
+
+        Args:
+            keep: Key that is never removed (the PDF just generated)
+
+        Returns:
+            int: Number of files removed
+        """
+        entries = []
+        kept = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith('.pdf'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            if name == f"{keep}.pdf":
+                kept = stat.st_size
+            else:
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = kept + sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+    def submit(self, key: str, write: Callable[[str, Callable[[int], None]], None],
+               total_rows: Optional[int] = None) -> PdfJob:
+        """
+        Generate a PDF in the background unless it is cached or already running
+
+        Args:
+            key: Content key
+            write: Callable(path, on_progress) that writes the PDF and
+                reports rows written through on_progress
+            total_rows: Expected rows, for progress
+
+        Returns:
+            PdfJob: Job shared by every session asking for the same key
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and not job.done:
+                return job
+            if self.get(key):
+                return PdfJob(key=key, total_rows=total_rows, done=True)
+            job = PdfJob(key=key, total_rows=total_rows)
+            self._jobs[key] = job
+        self._executor.submit(self._run, job, write)
+        return job
+
+    def job(self, key: str) -> Optional[PdfJob]:
+        """Job of a key, if one was submitted"""
+        with self._lock:
+            return self._jobs.get(key)
+
+    def _run(self, job: PdfJob, write: Callable[[str, Callable[[int], None]], None]):
+        def on_progress(rows: int):
+            job.rows_written = rows
+
+        try:
+            self.put(job.key, lambda path: write(path, on_progress))
+        except Exception as e:
+            job.error = str(e)
+        finally:
+            job.done = True
+            with self._lock:
+                # Finished jobs are only kept for their error message
+                if job.error is None and self._jobs.get(job.key) is job:
+                    del self._jobs[job.key]
+
+
+@st.cache_resource
+def get_pdf_cache() -> PdfCache:
+    """
+    Get the shared PDF cache (one per process)
+
+    Returns:
+        PdfCache: Cache instance
+    """
+    return PdfCache()
@@ -0,0 +1,250 @@
+"""
+Headless Profit & Loss reports for many periods and view modes
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.insert(0, project_root)
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from src.analytics.utils.postgres_connection import PostgreSQLConnection
+from src.analytics.dashboard.profit_loss_statement.profit_loss_summary_table import (
+    PL_DAILY_KEYS, PL_HEADER_ROWS, add_fee_totals, merge_pl_components, pl_component_queries,
+    pl_date_filters, pl_summary_from_components, pl_view_keys
+)
+from src.analytics.reports.statement_pdf import pdf_fonts
+
+VIEW_MODES = ('month', 'month_year', 'year')
+FORMATS = ('csv', 'parquet', 'pdf')
+
+# Period columns per PDF table; wider reports continue in another table
+PDF_PERIOD_COLUMNS = 12
+
+Period = Tuple[Optional[str], Optional[str]]
+
+
+def parse_period(text: str) -> Period:
+    """
+    Parse 'YYYY-MM-DD:YYYY-MM-DD' (either side may be empty)
+
+    Dates are validated because the P&L queries inline them.
+    """
+    start, _, end = text.partition(':')
+    return (date.fromisoformat(start).isoformat() if start else None,
+            date.fromisoformat(end).isoformat() if end else None)
+
+
+def _covering_range(periods: List[Period]) -> Period:
+    """Smallest date range containing every period (open ends stay open)"""
+    starts = [p[0] for p in periods]
+    ends = [p[1] for p in periods]
+    return (None if None in starts else min(starts)), (None if None in ends else max(ends))
+
+
+def load_daily_components(start_date: Optional[str], end_date: Optional[str],
+                          connection: Optional[PostgreSQLConnection] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Read the P&L components once at daily grain
+
+    Args:
+        start_date: Start date (YYYY-MM-DD), optional
+        end_date: End date (YYYY-MM-DD), optional
+        connection: Connection to use (a fresh one by default)
+
+    Returns:
+        dict: revenue_fees, cogs and additional_costs frames, one row per day
+    """
+    conn = connection or PostgreSQLConnection()
+    fft_where, fbt_where = pl_date_filters(start_date, end_date)
+    key_select, key_group_order, _ = PL_DAILY_KEYS
+    queries = pl_component_queries(key_select, key_group_order, fft_where, fbt_where)
+    revenue_fees, cogs, additional_costs = (conn.execute_query(sql) for sql in queries)
+    if connection is None:
+        conn.disconnect()
+    if not revenue_fees.empty:
+        revenue_fees = add_fee_totals(revenue_fees)
+    return {'revenue_fees': revenue_fees, 'cogs': cogs, 'additional_costs': additional_costs}
+
+
+def _group_period(frame: pd.DataFrame, start_date: Optional[str], end_date: Optional[str],
+                  key_columns: List[str]) -> pd.DataFrame:
+    """Daily rows of a period summed by the view mode keys"""
+    if frame.empty:
+        return frame
+    days = pd.to_datetime(frame['full_date'])
+    mask = pd.Series(True, index=frame.index)
+    if start_date:
+        mask &= days >= pd.Timestamp(start_date)
+    if end_date:
+        mask &= days <= pd.Timestamp(end_date)
+    daily_only = [c for c in PL_DAILY_KEYS[2] if c not in key_columns]
+    return (frame[mask].drop(columns=daily_only)
+            .groupby(key_columns, as_index=False, sort=True, observed=True).sum())
+
+
+def pl_table(daily: Dict[str, pd.DataFrame], start_date: Optional[str] = None, end_date: Optional[str] = None,
+             view_mode: str = 'month') -> pd.DataFrame:
+    """
+    P&L summary table of one period from daily components
+
+    Produces the same table as get_profit_loss_summary_table, without
+    querying the database again.
+
+    Args:
+        daily: Result of load_daily_components covering the period
+        start_date: Start date (YYYY-MM-DD), optional
+        end_date: End date (YYYY-MM-DD), optional
+        view_mode: 'month', 'year' or 'month_year'
+
+    Returns:
+        pd.DataFrame: 'Line Item' plus one column per period and 'Full Year'
+    """
+    key_columns = pl_view_keys(view_mode)[2]
+    revenue_fees, cogs, additional_costs = (
+        _group_period(daily[name], start_date, end_date, key_columns)
+        for name in ('revenue_fees', 'cogs', 'additional_costs')
+    )
+    if revenue_fees.empty:
+        return pd.DataFrame({'Line Item': []})
+    merged = merge_pl_components(revenue_fees, cogs, additional_costs, key_columns)
+    return pl_summary_from_components(merged, view_mode)
+
+
+def build_pl_reports(periods: List[Period], view_modes: List[str] = VIEW_MODES,
+                     connection: Optional[PostgreSQLConnection] = None) -> Dict[Tuple[Optional[str], Optional[str], str], pd.DataFrame]:
+    """
+    P&L tables for every (period, view mode) from a single pass over the data
+
+    Args:
+        periods: (start_date, end_date) pairs
+        view_modes: View modes per period
+        connection: Connection to use (a fresh one by default)
+
+    Returns:
+        dict: (start_date, end_date, view_mode) -> summary table
+    """
+    daily = load_daily_components(*_covering_range(periods), connection=connection)
+    return {(start, end, view_mode): pl_table(daily, start, end, view_mode)
+            for start, end in periods for view_mode in view_modes}
+
+
+def report_name(start_date: Optional[str], end_date: Optional[str], view_mode: str) -> str:
+    """File stem of one report"""
+    return f"profit_loss_{start_date or 'all'}_{end_date or 'present'}_{view_mode}"
+
+
+def _format_amount(value) -> str:
+    return "" if pd.isna(value) else f"{value:,.2f}"
+
+
+def write_pl_pdf(path: str, reports: Dict[Tuple[Optional[str], Optional[str], str], pd.DataFrame]):
+    """
+    Write every report into one PDF, one section per (period, view mode)
+
+    Args:
+        path: Output file
+        reports: Result of build_pl_reports
+    """
+    font_name, font_bold = pdf_fonts()
+    doc = SimpleDocTemplate(path, pagesize=landscape(A4), rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle('PLTitle', parent=styles['Heading2'], fontName=font_bold)
+
+    story = []
+    for (start, end, view_mode), table in reports.items():
+        if story:
+            story.append(PageBreak())
+        story.append(Paragraph(f"Profit &amp; Loss: {start or 'All time'} – {end or 'Present'} ({view_mode})",
+                               title_style))
+        story.append(Spacer(1, 8))
+        if table.empty:
+            story.append(Paragraph("No data for this period.", styles['Normal']))
+            continue
+
+        periods = [c for c in table.columns if c != 'Line Item']
+        for first in range(0, len(periods), PDF_PERIOD_COLUMNS):
+            columns = periods[first:first + PDF_PERIOD_COLUMNS]
+            rows = [['Line Item'] + columns]
+            for label, values in zip(table['Line Item'], table[columns].itertuples(index=False)):
+                rows.append([label] + [_format_amount(v) for v in values])
+            value_width = (doc.width - 3.2 * inch) / len(columns)
+            pdf_table = Table(rows, colWidths=[3.2 * inch] + [value_width] * len(columns), repeatRows=1)
+            style = [
+                ('FONTNAME', (0, 0), (-1, 0), font_bold),
+                ('FONTNAME', (0, 1), (-1, -1), font_name),
+                ('FONTSIZE', (0, 0), (-1, -1), 6),
+                ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ]
+            for row_index, label in enumerate(table['Line Item'], start=1):
+                if label in PL_HEADER_ROWS:
+                    style.append(('FONTNAME', (0, row_index), (-1, row_index), font_bold))
+            pdf_table.setStyle(TableStyle(style))
+            story.append(pdf_table)
+            story.append(Spacer(1, 10))
+
+    doc.build(story)
+
+
+def export_pl_reports(reports: Dict[Tuple[Optional[str], Optional[str], str], pd.DataFrame], output_dir: str,
+                      formats: List[str] = FORMATS) -> List[str]:
+    """
+    Write reports as CSV/Parquet files (one per report) and one combined PDF
+
+    Args:
+        reports: Result of build_pl_reports
+        output_dir: Output directory
+        formats: Subset of FORMATS
+
+    Returns:
+        list: Written file paths
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    files = []
+    for (start, end, view_mode), table in reports.items():
+        stem = os.path.join(output_dir, report_name(start, end, view_mode))
+        if 'csv' in formats:
+            table.to_csv(f"{stem}.csv", index=False)
+            files.append(f"{stem}.csv")
+        if 'parquet' in formats:
+            table.to_parquet(f"{stem}.parquet", index=False)
+            files.append(f"{stem}.parquet")
+    if 'pdf' in formats:
+        files.append(os.path.join(output_dir, 'profit_loss.pdf'))
+        write_pl_pdf(files[-1], reports)
+    return files
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Generate Profit & Loss reports without the dashboard")
+    parser.add_argument('--period', action='append', required=True, type=parse_period,
+                        help="START:END in YYYY-MM-DD (either side may be empty); repeatable")
+    parser.add_argument('--view', nargs='+', choices=VIEW_MODES, default=list(VIEW_MODES), help="View modes")
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=list(FORMATS), help="Output formats")
+    parser.add_argument('--output', required=True, help="Output directory")
+    args = parser.parse_args()
+
+    started = time.time()
+    reports = build_pl_reports(args.period, args.view)
+    files = export_pl_reports(reports, args.output, args.formats)
+    print(f"Built {len(reports)} P&L tables from one pass in {time.time() - started:.2f}s")
+    for path in files:
+        print(f"  {path}")
+
+
+if __name__ == "__main__":
+    main()
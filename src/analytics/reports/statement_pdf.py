@@ -0,0 +1,305 @@
+"""
+Account statement PDF engine (streamed, page-sized tables)
+"""
+import threading
+from typing import IO, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+# Rows fetched per batch when the statement is streamed into a PDF
+PDF_BATCH_ROWS = 2000
+
+PDF_TRANSACTION_HEADER = ['Ngày GD\n(Transaction Date)', 'Mã giao dịch\n(Reference No.)', 'Số tài khoản truy vấn\n(Account Number)', 'Tên tài khoản truy vấn\n(Account Name)', 'Ngày mở tài khoản\n(Opening Date)', 'Phát sinh có\n(Credit Amount)', 'Phát sinh nợ\n(Debit Amount)', 'Số dư\n(Balance)', 'Diễn giải\n(Description)']
+PDF_COLUMN_WIDTHS = [1*inch, 1.2*inch, 1*inch, 1.2*inch, 1*inch, 1*inch, 1*inch, 1*inch, 2*inch]
+
+# Fixed row heights make the number of rows per page known in advance, so
+# every transaction table is exactly one page and is never split
+PDF_HEADER_HEIGHT = 28
+PDF_ROW_HEIGHT = 16
+# Frame padding of SimpleDocTemplate (6pt top and bottom) plus rounding slack
+PDF_FRAME_SLACK = 13
+
+DESCRIPTION_MAX_CHARS = 80
+
+_fonts: Optional[Tuple[str, str]] = None
+_fonts_lock = threading.Lock()
+
+
+def pdf_fonts() -> Tuple[str, str]:
+    """
+    Register Times New Roman once per process
+
+    Returns:
+        tuple: (regular, bold) font names, Helvetica when the TTF files
+            are not available
+    """
+    global _fonts
+    with _fonts_lock:
+        if _fonts is None:
+            try:
+                # Try to register Times New Roman (common on Windows)
+                pdfmetrics.registerFont(TTFont('Times-Roman', 'times.ttf'))
+                pdfmetrics.registerFont(TTFont('Times-Bold', 'timesbd.ttf'))
+                _fonts = ('Times-Roman', 'Times-Bold')
+            except Exception:
+                # Fallback to default fonts
+                _fonts = ('Helvetica', 'Helvetica-Bold')
+        return _fonts
+
+
+class _StreamingStory(list):
+    """Flowable list refilled from a generator while the document is built"""
+
+    def __init__(self, flowables: list, pending: Iterator):
+        super().__init__(flowables)
+        self._pending = pending
+
+    def __len__(self):
+        # SimpleDocTemplate.build pops flowables from the front and checks len()
+        # before each one, so only a couple of flowables are kept ahead
+        while super().__len__() < 2 and self._pending is not None:
+            try:
+                self.append(next(self._pending))
+            except StopIteration:
+                self._pending = None
+        return super().__len__()
+
+
+def _statement_frames(account_data) -> Iterator[pd.DataFrame]:
+    """Statement rows as DataFrames from a DataFrame or an iterable of Arrow batches"""
+    if isinstance(account_data, pd.DataFrame):
+        yield account_data
+        return
+    for batch in account_data:
+        yield batch.to_pandas()
+
+
+def _text_column(frame: pd.DataFrame, column: str) -> np.ndarray:
+    """Column as a NumPy array of str, NULL as ''"""
+    values = frame[column].astype(object)
+    return values.where(values.notna(), '').astype(str).to_numpy()
+
+
+def _amount_column(frame: pd.DataFrame, column: str) -> np.ndarray:
+    """Column as float64 (Decimal values converted), NULL as NaN"""
+    return pd.to_numeric(frame[column], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+
+
+def format_transaction_rows(frame: pd.DataFrame, currency_symbol: str) -> List[list]:
+    """
+    Statement rows as PDF table cells, built column by column
+
+    Args:
+        frame: Statement rows (columns of get_account_statement_data)
+        currency_symbol: Prefix for amounts
+
+    Returns:
+        list: One list of cell strings per row
+    """
+    credit = _amount_column(frame, 'Phát sinh có').tolist()
+    debit = _amount_column(frame, 'Phát sinh nợ').tolist()
+    balance = _amount_column(frame, 'Số dư').tolist()
+    descriptions = _text_column(frame, 'Diễn giải').tolist()
+    columns = [
+        _text_column(frame, 'Ngày GD').tolist(),
+        _text_column(frame, 'Mã giao dịch').tolist(),
+        _text_column(frame, 'Số tài khoản truy vấn').tolist(),
+        _text_column(frame, 'Tên tài khoản truy vấn').tolist(),
+        _text_column(frame, 'Ngày mở tài khoản').tolist(),
+        [f"{currency_symbol}{v:,.0f}" if v > 0 else "" for v in credit],
+        [f"{currency_symbol}{v:,.0f}" if v > 0 else "" for v in debit],
+        [f"{currency_symbol}{v:,.0f}" if v == v else "" for v in balance],
+        [d[:DESCRIPTION_MAX_CHARS] + "..." if len(d) > DESCRIPTION_MAX_CHARS else d for d in descriptions],
+    ]
+    return [list(row) for row in zip(*columns)]
+
+
+def _transaction_table(rows: List[list], font_name: str, font_bold: str) -> Table:
+    """One page of transactions with the column header"""
+    transaction_table = Table([PDF_TRANSACTION_HEADER] + rows, colWidths=PDF_COLUMN_WIDTHS,
+                              rowHeights=[PDF_HEADER_HEIGHT] + [PDF_ROW_HEIGHT] * len(rows), repeatRows=1)
+    transaction_table.setStyle(TableStyle([
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), font_bold),
+        ('FONTNAME', (0, 1), (-1, -1), font_name),
+        ('FONTSIZE', (0, 0), (-1, 0), 8),
+        ('FONTSIZE', (0, 1), (-1, -1), 8),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 4),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ]))
+    return transaction_table
+
+
+def _rows_per_page(height: float) -> int:
+    return max(1, int((height - PDF_FRAME_SLACK - PDF_HEADER_HEIGHT) // PDF_ROW_HEIGHT))
+
+
+def _transaction_tables(frames: Iterable[pd.DataFrame], currency_symbol: str, font_name: str, font_bold: str,
+                        first_page_rows: int, page_rows: int, empty_flowable) -> Iterator:
+    """Yield page-sized transaction tables (empty_flowable if there are no rows)"""
+    pending: List[list] = []
+    capacity = first_page_rows
+    rows_seen = 0
+    for frame in frames:
+        pending.extend(format_transaction_rows(frame, currency_symbol))
+        rows_seen += len(frame)
+        while len(pending) >= capacity:
+            yield _transaction_table(pending[:capacity], font_name, font_bold)
+            del pending[:capacity]
+            capacity = page_rows
+    if pending:
+        yield _transaction_table(pending, font_name, font_bold)
+    if rows_seen == 0:
+        yield empty_flowable
+
+
+def _statement_header(account_info: dict, from_date: Optional[str], to_date: Optional[str],
+                      font_name: str, font_bold: str) -> Tuple[list, ParagraphStyle]:
+    """Title, period and account information flowables"""
+    # Get styles
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontName=font_bold,
+        fontSize=16,
+        spaceAfter=20,
+        alignment=1  # Center alignment
+    )
+
+    normal_style = ParagraphStyle(
+        'Normal',
+        parent=styles['Normal'],
+        fontName=font_name,
+        fontSize=14,
+        spaceAfter=6
+    )
+
+    # Build content
+    story = []
+
+    # Title
+    story.append(Paragraph("SAO KÊ TÀI KHOẢN/ ACCOUNT STATEMENT", title_style))
+    story.append(Spacer(1, 10))
+
+    # Time generated - centered
+    current_time = pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
+    time_style = ParagraphStyle(
+        'TimeGenerated',
+        parent=styles['Normal'],
+        fontName=font_name,
+        fontSize=14,
+        spaceAfter=10,
+        alignment=1  # Center alignment
+    )
+    story.append(Paragraph(f"Thời gian xuất/ Time generated: {current_time}", time_style))
+    story.append(Spacer(1, 10))
+
+    # Date range - centered and on same line
+    date_range_style = ParagraphStyle(
+        'DateRange',
+        parent=styles['Normal'],
+        fontName=font_name,
+        fontSize=14,
+        spaceAfter=15,
+        alignment=1  # Center alignment
+    )
+    from_date_str = from_date or 'All time'
+    to_date_str = to_date or 'Present'
+    story.append(Paragraph(f"Từ ngày/ From: {from_date_str} &nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp; Đến ngày/ To: {to_date_str}", date_range_style))
+    story.append(Spacer(1, 15))
+
+    # Bank Account Information - Paired format with right alignment
+    # Create a table for better alignment control
+    account_info_data = [
+        [
+            f"Số tài khoản/ Account Number: {account_info['account_number']}", 
+            f"Loại tiền/ Currency: {account_info['currency_code']}"
+        ],
+        [
+            f"Tên tài khoản/ Account Name: {account_info['account_name']}", 
+            f"CIF Number: {account_info['cif_number']}"
+        ],
+        [
+            f"Địa chỉ/ Address: {account_info['customer_address']}", 
+            ""
+        ]
+    ]
+    
+    account_info_table = Table(account_info_data, colWidths=[4*inch, 4*inch])
+    account_info_table.setStyle(TableStyle([
+        ('ALIGN', (0, 0), (0, -1), 'LEFT'),    # Left column - left aligned
+        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),   # Right column - right aligned
+        ('FONTNAME', (0, 0), (-1, -1), font_name),
+        ('FONTSIZE', (0, 0), (-1, -1), 14),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ]))
+    
+    story.append(account_info_table)
+    story.append(Spacer(1, 15))
+
+    return story, normal_style
+
+
+def write_statement_pdf(output: Union[str, IO[bytes]], account_info: dict,
+                        account_data: Union[pd.DataFrame, Iterable[pa.RecordBatch]],
+                        from_date: str = None, to_date: str = None, on_progress=None) -> int:
+    """
+    Write an account statement PDF
+
+    Transactions are consumed while the document is built and laid out in
+    tables of exactly one page each, so memory and time stay proportional
+    to a page rather than to the whole statement.
+
+    Args:
+        output: File path or binary file object
+        account_info: Result of get_bank_account_info
+        account_data: Statement DataFrame, or Arrow batches from
+            stream_account_statement_data
+        from_date: Start date label
+        to_date: End date label
+        on_progress: Optional callable(rows_written)
+
+    Returns:
+        int: Number of pages
+    """
+    doc = SimpleDocTemplate(output, pagesize=landscape(A4), rightMargin=50, leftMargin=50, topMargin=50, bottomMargin=50)
+    font_name, font_bold = pdf_fonts()
+    story, normal_style = _statement_header(account_info, from_date, to_date, font_name, font_bold)
+
+    # Height left on the first page under the header flowables
+    used = 0.0
+    for flowable in story:
+        used += flowable.wrap(doc.width, doc.height)[1] + flowable.getSpaceBefore() + flowable.getSpaceAfter()
+    first_page_rows = _rows_per_page(doc.height - used)
+    page_rows = _rows_per_page(doc.height)
+
+    currency_symbol = "₫" if account_info.get('currency_code', 'VND') == 'VND' else "$"
+    frames = _statement_frames(account_data)
+    if on_progress is not None:
+        frames = _report_progress(frames, on_progress)
+    transactions = _transaction_tables(frames, currency_symbol, font_name, font_bold, first_page_rows, page_rows,
+                                       Paragraph("No transaction data available for the selected period.", normal_style))
+
+    doc.build(_StreamingStory(story, transactions))
+    return doc.page
+
+
+def _report_progress(frames: Iterable[pd.DataFrame], on_progress) -> Iterator[pd.DataFrame]:
+    rows = 0
+    for frame in frames:
+        yield frame
+        rows += len(frame)
+        on_progress(rows)
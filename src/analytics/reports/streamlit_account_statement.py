@@ -5,22 +5,31 @@ import streamlit as st
 import pandas as pd
 import psycopg2
 import os
-from reportlab.lib.pagesizes import letter, A4, landscape
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
 from io import BytesIO
 import base64
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, Union
+import pyarrow as pa
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 # Add project root to path
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 sys.path.insert(0, project_root)
 
-from src.analytics.utils.postgres_connection import execute_query_with_cache
+from src.analytics.utils.postgres_connection import (
+    execute_query_with_cache, get_postgres_connection, stream_query, STREAM_BATCH_ROWS
+)
+from src.analytics.warehouse.partitions import partition_key_filter
+from src.analytics.reports.statement_pdf import write_statement_pdf, PDF_BATCH_ROWS
+from src.analytics.reports.pdf_cache import get_pdf_cache, pdf_cache_key
+from src.analytics.reports.exports import query_batches, render_export_buttons
+from src.analytics.warehouse.account_summary import (
+    ACCOUNT_SUMMARY_SORTS, SUMMARY_PAGE_KEY_COLUMNS, account_summary_enabled, account_summary_export_query,
+    account_summary_page_query, account_summary_totals_query
+)
+from src.analytics.warehouse.transaction_search import SEARCH_PAGE_KEY_COLUMNS, transaction_search_query
 
 # Database configuration
 POSTGRES_CONFIG = {
@@ -31,23 +40,22 @@ POSTGRES_CONFIG = {
     'password': os.getenv('POSTGRES_PASSWORD', 'etsy')
 }
 
+# Background loads of the next statement page
+_prefetch_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='statement_prefetch')
+
 def execute_query(query: str, params: tuple = None) -> pd.DataFrame:
     """Execute SQL query and return DataFrame"""
     return execute_query_with_cache(query, params, ttl=300)
 
-def get_bank_account_table_data() -> pd.DataFrame:
-    """Get Bank Account Table data"""
-    sql = """WITH bank_account_stats AS (
+BANK_ACCOUNT_TABLE_SQL = """WITH bank_account_stats AS (
                 SELECT 
                     fbt.bank_account_key,
                     COUNT(*) as transaction_count,
                     SUM(COALESCE(fbt.credit_amount, 0)) as total_credit,
                     SUM(COALESCE(fbt.debit_amount, 0)) as total_debit,
-                    MIN(dt.full_date) as first_transaction_date,
-                    MAX(dt.full_date) as last_transaction_date,
-                    MAX(fbt.balance_after_transaction) as current_balance
+                    MIN(fbt.transaction_date_key) as first_date_key,
+                    MAX(fbt.transaction_date_key) as last_date_key
                 FROM fact_bank_transactions fbt
-                JOIN dim_time dt ON fbt.transaction_date_key = dt.time_key
                 GROUP BY fbt.bank_account_key
             )
             SELECT 
@@ -60,20 +68,60 @@ def get_bank_account_table_data() -> pd.DataFrame:
                 bas.transaction_count as "Total Transactions",
                 ROUND(bas.total_credit, 2) as "Total Credit (VND)",
                 ROUND(bas.total_debit, 2) as "Total Debit (VND)",
-                ROUND(bas.current_balance, 2) as "Current Balance (VND)",
-                bas.first_transaction_date as "First Transaction Date",
-                bas.last_transaction_date as "Last Transaction Date"
+                ROUND(latest.balance_after_transaction, 2) as "Current Balance (VND)",
+                first_dt.full_date as "First Transaction Date",
+                last_dt.full_date as "Last Transaction Date"
             FROM bank_account_stats bas
             JOIN dim_bank_account dba ON bas.bank_account_key = dba.bank_account_key
+            LEFT JOIN dim_time first_dt ON first_dt.time_key = bas.first_date_key
+            LEFT JOIN dim_time last_dt ON last_dt.time_key = bas.last_date_key
+            -- Balance after the account's last transaction in statement order
+            -- (one backward step on idx_fact_bank_tx_account_date_key)
+            LEFT JOIN LATERAL (
+                SELECT fbt.balance_after_transaction
+                FROM fact_bank_transactions fbt
+                WHERE fbt.bank_account_key = bas.bank_account_key
+                ORDER BY fbt.transaction_date_key DESC, fbt.bank_transaction_key DESC
+                LIMIT 1
+            ) latest ON true
             WHERE dba.account_number IS NOT NULL AND dba.account_number <> ''
             ORDER BY bas.total_credit DESC
             LIMIT 1000"""
-    
-    return execute_query(sql)
 
-def get_bank_account_info(account_number: str) -> dict:
-    """Get bank account information for account statement"""
-    sql = """
+def get_bank_account_table_data() -> pd.DataFrame:
+    """Get Bank Account Table data"""
+    return execute_query(BANK_ACCOUNT_TABLE_SQL)
+
+def get_bank_account_summary_page(search: str = None, sort: str = 'Total Credit', descending: bool = True,
+                                  after: tuple = None, page_size: int = 100) -> pd.DataFrame:
+    """
+    Get one page of the Bank Account Table from bank_account_summary
+    
+    Args:
+        search: Text contained in the account number or name, optional
+        sort: Key of ACCOUNT_SUMMARY_SORTS
+        descending: Sort direction
+        after: SUMMARY_PAGE_KEY_COLUMNS of the previous page's last row
+        page_size: Rows per page
+        
+    Returns:
+        pd.DataFrame: Up to page_size + 1 rows (an extra row means there is a
+            next page), with SUMMARY_PAGE_KEY_COLUMNS last
+    """
+    sql, params = account_summary_page_query(search, None, sort, descending, after, page_size)
+    return execute_query(sql, tuple(params))
+
+def get_bank_account_summary_totals(search: str = None) -> dict:
+    """Account count and credit/debit/transaction totals of the filtered accounts"""
+    sql, params = account_summary_totals_query(search)
+    df = execute_query(sql, tuple(params))
+    if df.empty:
+        return {'accounts': 0, 'total_credit': 0.0, 'total_debit': 0.0, 'transactions': 0}
+    row = df.iloc[0]
+    return {'accounts': int(row['accounts']), 'total_credit': float(row['total_credit']),
+            'total_debit': float(row['total_debit']), 'transactions': int(row['transactions'])}
+
+BANK_ACCOUNT_INFO_SQL = """
     SELECT 
         dba.account_number,
         dba.account_name,
@@ -84,9 +132,9 @@ def get_bank_account_info(account_number: str) -> dict:
     FROM dim_bank_account dba
     WHERE dba.account_number = %s
     """
-    
-    df = execute_query(sql, (account_number,))
-    
+
+def bank_account_info_from_frame(df: pd.DataFrame) -> dict:
+    """Account statement header fields from a BANK_ACCOUNT_INFO_SQL result"""
     if not df.empty:
         row = df.iloc[0]
         
@@ -108,10 +156,11 @@ def get_bank_account_info(account_number: str) -> dict:
         'currency_code': 'VND'
     }
 
-def get_account_statement_data(account_number: str, from_date: str = None, to_date: str = None) -> pd.DataFrame:
-    """Get account statement data for specific bank account"""
-    sql = """
-    SELECT 
+def get_bank_account_info(account_number: str) -> dict:
+    """Get bank account information for account statement"""
+    return bank_account_info_from_frame(execute_query(BANK_ACCOUNT_INFO_SQL, (account_number,)))
+
+STATEMENT_COLUMNS = """
         t.full_date AS "Ngày GD",
         fbt.reference_number AS "Mã giao dịch",
         dba.account_number AS "Số tài khoản truy vấn",
@@ -121,6 +170,16 @@ def get_account_statement_data(account_number: str, from_date: str = None, to_da
         COALESCE(fbt.debit_amount, 0) AS "Phát sinh nợ",
         fbt.balance_after_transaction AS "Số dư",
         fbt.transaction_description AS "Diễn giải"
+"""
+
+# Keyset columns returned with each statement page (hidden in the viewer)
+PAGE_KEY_COLUMNS = ['_date_key', '_transaction_key']
+
+STATEMENT_PAGE_SIZES = [50, 100, 250, 500]
+
+def _account_statement_filters(account_number: str, from_date: str = None, to_date: str = None) -> tuple:
+    """FROM/WHERE clause shared by the statement queries, and its parameters"""
+    sql = """
     FROM fact_bank_transactions fbt
     JOIN dim_time t ON fbt.transaction_date_key = t.time_key
     JOIN dim_bank_account dba ON fbt.bank_account_key = dba.bank_account_key
@@ -137,152 +196,190 @@ def get_account_statement_data(account_number: str, from_date: str = None, to_da
         sql += " AND t.full_date <= %s"
         params.append(to_date)
     
-    sql += " ORDER BY t.full_date, fbt.bank_transaction_key"
+    key_filter, key_params = partition_key_filter('fbt.transaction_date_key', from_date, to_date)
+    sql += key_filter
+    params += key_params
     
+    return sql, params
+
+def account_statement_query(account_number: str, from_date: str = None, to_date: str = None) -> tuple:
+    """Build the account statement SQL and its parameters"""
+    filters, params = _account_statement_filters(account_number, from_date, to_date)
+    sql = f"SELECT {STATEMENT_COLUMNS}{filters} ORDER BY t.full_date, fbt.bank_transaction_key"
+    return sql, tuple(params)
+
+def get_account_statement_page(account_number: str, from_date: str = None, to_date: str = None,
+                               after: tuple = None, page_size: int = 100) -> pd.DataFrame:
+    """
+    Get one page of the account statement (keyset pagination)
+    
+    Pages are read in (transaction_date_key, bank_transaction_key) order
+    starting after the last key of the previous page, so any page costs
+    one index range scan regardless of how deep it is.
+    
+    Args:
+        account_number: Bank account number
+        from_date: Start date (YYYY-MM-DD), optional
+        to_date: End date (YYYY-MM-DD), optional
+        after: (transaction_date_key, bank_transaction_key) of the last row
+            of the previous page, or None for the first page
+        page_size: Rows per page
+        
+    Returns:
+        pd.DataFrame: Up to page_size + 1 rows (an extra row means there is a
+            next page), with PAGE_KEY_COLUMNS first
+    """
+    filters, params = _account_statement_filters(account_number, from_date, to_date)
+    if after:
+        filters += " AND (fbt.transaction_date_key, fbt.bank_transaction_key) > (%s, %s)"
+        params += [int(after[0]), int(after[1])]
+    sql = f"""SELECT fbt.transaction_date_key AS _date_key, fbt.bank_transaction_key AS _transaction_key,
+        {STATEMENT_COLUMNS}{filters}
+    ORDER BY fbt.transaction_date_key, fbt.bank_transaction_key
+    LIMIT %s"""
+    params.append(page_size + 1)
     return execute_query(sql, tuple(params))
 
-def create_pdf_report(account_info: dict, account_data: pd.DataFrame, from_date: str = None, to_date: str = None) -> bytes:
-    """Create PDF report for Account Statement"""
+def get_transaction_search_page(text: str, account_number: str = None, after: tuple = None,
+                                page_size: int = 50) -> pd.DataFrame:
+    """
+    Get one page of bank transactions matching a search, newest first
+    
+    Args:
+        text: Words to find in the description or reference number
+        account_number: Only search this account, optional
+        after: SEARCH_PAGE_KEY_COLUMNS of the previous page's last row
+        page_size: Rows per page
+        
+    Returns:
+        pd.DataFrame: Up to page_size + 1 rows (an extra row means there is a
+            next page), with SEARCH_PAGE_KEY_COLUMNS first
+    """
+    sql, params = transaction_search_query(text, account_number, after, page_size)
+    return execute_query(sql, tuple(params))
+
+def _prefetch_statement_page(*args):
+    """Load a statement page into the query cache on a background thread"""
+    ctx = get_script_run_ctx()
+    
+    def run():
+        add_script_run_ctx(threading.current_thread(), ctx)
+        get_account_statement_page(*args)
+    
+    _prefetch_executor.submit(run)
+
+def get_account_statement_data(account_number: str, from_date: str = None, to_date: str = None) -> pd.DataFrame:
+    """Get account statement data for specific bank account"""
+    sql, params = account_statement_query(account_number, from_date, to_date)
+    return execute_query(sql, params)
+
+def stream_account_statement_data(account_number: str, from_date: str = None, to_date: str = None,
+                                  batch_rows: int = STREAM_BATCH_ROWS) -> Iterator[pa.RecordBatch]:
+    """
+    Stream account statement rows in Arrow batches (server-side cursor)
+    
+    Args:
+        account_number: Bank account number
+        from_date: Start date (YYYY-MM-DD), optional
+        to_date: End date (YYYY-MM-DD), optional
+        batch_rows: Rows per batch
+        
+    Yields:
+        pa.RecordBatch: Statement rows in date order
+    """
+    sql, params = account_statement_query(account_number, from_date, to_date)
+    yield from stream_query(sql, params, batch_rows)
+
+def create_pdf_report(account_info: dict, account_data: Union[pd.DataFrame, Iterable[pa.RecordBatch]],
+                      from_date: str = None, to_date: str = None) -> bytes:
+    """
+    Create PDF report for Account Statement in memory
+    
+    Args:
+        account_info: Result of get_bank_account_info
+        account_data: Statement DataFrame, or Arrow batches from
+            stream_account_statement_data (consumed while the PDF is built)
+        from_date: Start date label
+        to_date: End date label
+        
+    Returns:
+        bytes: PDF document
+    """
     buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=landscape(A4), rightMargin=50, leftMargin=50, topMargin=50, bottomMargin=50)
-
-    # Register Times New Roman font
-    try:
-        # Try to register Times New Roman (common on Windows)
-        pdfmetrics.registerFont(TTFont('Times-Roman', 'times.ttf'))
-        pdfmetrics.registerFont(TTFont('Times-Bold', 'timesbd.ttf'))
-        font_name = 'Times-Roman'
-        font_bold = 'Times-Bold'
-    except:
-        # Fallback to default fonts
-        font_name = 'Helvetica'
-        font_bold = 'Helvetica-Bold'
-
-    # Get styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontName=font_bold,
-        fontSize=16,
-        spaceAfter=20,
-        alignment=1  # Center alignment
-    )
+    write_statement_pdf(buffer, account_info, account_data, from_date, to_date)
+    return buffer.getvalue()
 
-    normal_style = ParagraphStyle(
-        'Normal',
-        parent=styles['Normal'],
-        fontName=font_name,
-        fontSize=14,
-        spaceAfter=6
-    )
+def get_statement_data_version(account_number: str, from_date: str = None, to_date: str = None) -> dict:
+    """
+    Fingerprint of the statement rows, used to address cached PDFs
+    
+    Read without the query cache so a reload is noticed immediately.
+    
+    Args:
+        account_number: Bank account number
+        from_date: Start date (YYYY-MM-DD), optional
+        to_date: End date (YYYY-MM-DD), optional
+        
+    Returns:
+        dict: {'version': str, 'rows': int}
+    """
+    filters, params = _account_statement_filters(account_number, from_date, to_date)
+    sql = f"""SELECT
+        COUNT(*) AS row_count,
+        MAX(fbt.bank_transaction_key) AS max_key,
+        SUM(COALESCE(fbt.credit_amount, 0) - COALESCE(fbt.debit_amount, 0)) AS net_amount,
+        SUM(COALESCE(fbt.balance_after_transaction, 0)) AS balance_total,
+        SUM(hashtext(COALESCE(fbt.reference_number, '') || COALESCE(fbt.transaction_description, ''))) AS text_hash
+    {filters}"""
+    df = get_postgres_connection().execute_query(sql, tuple(params))
+    if df.empty:
+        return {'version': '', 'rows': 0}
+    row = df.iloc[0]
+    return {'version': '|'.join(str(v) for v in row.tolist()), 'rows': int(row['row_count'])}
 
-    # Build content
-    story = []
-
-    # Title
-    story.append(Paragraph("SAO KÊ TÀI KHOẢN/ ACCOUNT STATEMENT", title_style))
-    story.append(Spacer(1, 10))
-
-    # Time generated - centered
-    current_time = pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
-    time_style = ParagraphStyle(
-        'TimeGenerated',
-        parent=styles['Normal'],
-        fontName=font_name,
-        fontSize=14,
-        spaceAfter=10,
-        alignment=1  # Center alignment
-    )
-    story.append(Paragraph(f"Thời gian xuất/ Time generated: {current_time}", time_style))
-    story.append(Spacer(1, 10))
-
-    # Date range - centered and on same line
-    date_range_style = ParagraphStyle(
-        'DateRange',
-        parent=styles['Normal'],
-        fontName=font_name,
-        fontSize=14,
-        spaceAfter=15,
-        alignment=1  # Center alignment
-    )
-    from_date_str = from_date or 'All time'
-    to_date_str = to_date or 'Present'
-    story.append(Paragraph(f"Từ ngày/ From: {from_date_str} &nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp; Đến ngày/ To: {to_date_str}", date_range_style))
-    story.append(Spacer(1, 15))
-
-    # Bank Account Information - Paired format with right alignment
-    # Create a table for better alignment control
-    account_info_data = [
-        [
-            f"Số tài khoản/ Account Number: {account_info['account_number']}", 
-            f"Loại tiền/ Currency: {account_info['currency_code']}"
-        ],
-        [
-            f"Tên tài khoản/ Account Name: {account_info['account_name']}", 
-            f"CIF Number: {account_info['cif_number']}"
-        ],
-        [
-            f"Địa chỉ/ Address: {account_info['customer_address']}", 
-            ""
-        ]
-    ]
-    
-    account_info_table = Table(account_info_data, colWidths=[4*inch, 4*inch])
-    account_info_table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (0, -1), 'LEFT'),    # Left column - left aligned
-        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),   # Right column - right aligned
-        ('FONTNAME', (0, 0), (-1, -1), font_name),
-        ('FONTSIZE', (0, 0), (-1, -1), 14),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-    ]))
-    
-    story.append(account_info_table)
-    story.append(Spacer(1, 15))
-
-    # Transaction Details
-    if not account_data.empty:
-        # Prepare transaction data for table
-        transaction_data = [['Ngày GD\n(Transaction Date)', 'Mã giao dịch\n(Reference No.)', 'Số tài khoản truy vấn\n(Account Number)', 'Tên tài khoản truy vấn\n(Account Name)', 'Ngày mở tài khoản\n(Opening Date)', 'Phát sinh có\n(Credit Amount)', 'Phát sinh nợ\n(Debit Amount)', 'Số dư\n(Balance)', 'Diễn giải\n(Description)']]
-
-        for _, row in account_data.iterrows():
-            # Format amounts based on currency (VND doesn't use $ symbol)
-            currency_symbol = "₫" if account_info.get('currency_code', 'VND') == 'VND' else "$"
-            transaction_data.append([
-                str(row['Ngày GD']),
-                str(row['Mã giao dịch']),
-                str(row['Số tài khoản truy vấn']),
-                str(row['Tên tài khoản truy vấn']),
-                str(row['Ngày mở tài khoản']),
-                f"{currency_symbol}{row['Phát sinh có']:,.0f}" if row['Phát sinh có'] > 0 else "",
-                f"{currency_symbol}{row['Phát sinh nợ']:,.0f}" if row['Phát sinh nợ'] > 0 else "",
-                f"{currency_symbol}{row['Số dư']:,.0f}",
-                str(row['Diễn giải'])[:80] + "..." if len(str(row['Diễn giải'])) > 80 else str(row['Diễn giải'])
-            ])
-
-        # Create transaction table - simple style, no background
-        transaction_table = Table(transaction_data, colWidths=[1*inch, 1.2*inch, 1*inch, 1.2*inch, 1*inch, 1*inch, 1*inch, 1*inch, 2*inch])
-        transaction_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), font_bold),
-            ('FONTNAME', (0, 1), (-1, -1), font_name),
-            ('FONTSIZE', (0, 0), (-1, 0), 8),
-            ('FONTSIZE', (0, 1), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 4),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ]))
-
-        story.append(transaction_table)
+def request_statement_pdf(account_info: dict, account_number: str, from_date: str = None,
+                          to_date: str = None) -> str:
+    """
+    Serve the statement PDF from the shared cache, generating it in the background if needed
+    
+    Args:
+        account_info: Result of get_bank_account_info
+        account_number: Bank account number
+        from_date: Start date (YYYY-MM-DD), optional
+        to_date: End date (YYYY-MM-DD), optional
+        
+    Returns:
+        str: Cache key of the PDF (poll get_pdf_cache() for completion)
+    """
+    version = get_statement_data_version(account_number, from_date, to_date)
+    key = pdf_cache_key(account_number, from_date, to_date, version['version'], account_info)
+    
+    def write(path, on_progress):
+        write_statement_pdf(path, account_info,
+                            stream_account_statement_data(account_number, from_date, to_date, PDF_BATCH_ROWS),
+                            from_date, to_date, on_progress)
+    
+    get_pdf_cache().submit(key, write, total_rows=version['rows'])
+    return key
+
+@st.fragment(run_every=1)
+def _render_pdf_progress(key: str):
+    """Show generation progress until the PDF is in the cache"""
+    cache = get_pdf_cache()
+    job = cache.job(key)
+    if cache.get(key):
+        st.rerun()
+    elif job is None:
+        st.warning("PDF is no longer available, please generate it again")
+    elif job.error:
+        st.error(f"❌ PDF generation failed: {job.error}")
     else:
-        story.append(Paragraph("No transaction data available for the selected period.", normal_style))
+        total = f"{job.total_rows:,}" if job.total_rows else "?"
+        st.progress(job.progress, text=f"Generating PDF report... {job.rows_written:,}/{total} transactions")
 
-    # Build PDF
-    doc.build(story)
-    buffer.seek(0)
-    return buffer.getvalue()
+def _read_file(path: str) -> bytes:
+    with open(path, 'rb') as pdf_file:
+        return pdf_file.read()
 
 def display_pdf_preview(pdf_data: bytes):
     """Display PDF preview in Streamlit"""
@@ -290,8 +387,131 @@ def display_pdf_preview(pdf_data: bytes):
     pdf_display = f'<iframe src="data:application/pdf;base64,{base64_pdf}" width="100%" height="600" type="application/pdf"></iframe>'
     st.markdown(pdf_display, unsafe_allow_html=True)
 
+def _render_account_selection(table: pd.DataFrame, selected_rows):
+    """Remember the selected table row's account and offer the Create Report button"""
+    # Handle row selection
+    if selected_rows.selection.rows:
+        selected_row = selected_rows.selection.rows[0]
+        selected_account = table.iloc[selected_row]["Account Number"]
+        st.session_state.selected_account = selected_account
+        st.success(f"✅ Selected account: {selected_account}")
+    
+    # Create Report button
+    if 'selected_account' in st.session_state and st.session_state.selected_account:
+        st.markdown("---")
+        col1, col2 = st.columns([1, 4])
+        
+        with col1:
+            create_report = st.button("📋 Create Report", type="primary", use_container_width=True, key="create_report_btn")
+        
+        with col2:
+            st.info(f"Selected: **{st.session_state.selected_account}**")
+        
+        if create_report:
+            st.session_state.show_report = True
+            st.rerun()
+
+def render_bank_account_summary_table():
+    """Render the bank account table paged from bank_account_summary"""
+    st.header("🏦 Bank Account Details")
+    
+    # Filters and sorting (applied on the server)
+    col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
+    
+    with col1:
+        search = st.text_input("🔍 Search account number or name", key="bank_account_search").strip() or None
+    
+    with col2:
+        sort = st.selectbox("Sort by", list(ACCOUNT_SUMMARY_SORTS), key="bank_account_sort")
+    
+    with col3:
+        descending = st.checkbox("Descending", value=True, key="bank_account_descending")
+    
+    with col4:
+        page_size = st.selectbox("Rows per page", STATEMENT_PAGE_SIZES, index=1, key="bank_account_page_size")
+    
+    totals = get_bank_account_summary_totals(search)
+    
+    # Summary metrics
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("Total Accounts", f"{totals['accounts']:,}")
+    
+    with col2:
+        st.metric("Total Credit", f"₫{totals['total_credit']:,.0f}")
+    
+    with col3:
+        st.metric("Total Debit", f"₫{totals['total_debit']:,.0f}")
+    
+    with col4:
+        st.metric("Total Transactions", f"{totals['transactions']:,}")
+    
+    # Page start keys of the pages visited so far (None = first page)
+    view_key = (search, sort, descending, page_size)
+    if st.session_state.get('bank_account_view_key') != view_key:
+        st.session_state.bank_account_view_key = view_key
+        st.session_state.bank_account_cursors = [None]
+    cursors = st.session_state.bank_account_cursors
+    
+    with st.spinner("Loading bank account data..."):
+        page = get_bank_account_summary_page(search, sort, descending, cursors[-1], page_size)
+    
+    has_next = len(page) > page_size
+    page = page.iloc[:page_size]
+    # Column by column: a row of mixed dtypes would turn the account key into a float
+    next_after = tuple(page[column].iloc[-1] for column in SUMMARY_PAGE_KEY_COLUMNS) if has_next else None
+    
+    if page.empty:
+        st.warning("🏦 No bank account matches the filters")
+        return
+    
+    # Bank account table
+    st.subheader("📋 Bank Account Table")
+    
+    table = page.drop(columns=SUMMARY_PAGE_KEY_COLUMNS)
+    selected_rows = st.dataframe(
+        table,
+        use_container_width=True,
+        hide_index=True,
+        on_select="rerun",
+        selection_mode="single-row"
+    )
+    
+    # Page navigation
+    first_row = (len(cursors) - 1) * page_size
+    col1, col2, col3 = st.columns([1, 2, 1])
+    
+    with col1:
+        if st.button("◀ Previous", key="bank_account_prev_btn", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun()
+    
+    with col2:
+        st.caption(f"Page {len(cursors)} · accounts {first_row + 1:,}–{first_row + len(page):,} of {totals['accounts']:,}")
+    
+    with col3:
+        if st.button("Next ▶", key="bank_account_next_btn", disabled=not has_next):
+            cursors.append(next_after)
+            st.rerun()
+    
+    _render_account_selection(table, selected_rows)
+    
+    # Download buttons (every filtered account, from a server-side cursor)
+    st.markdown("---")
+    render_export_buttons(
+        "Bank Account Table",
+        "bank_accounts",
+        lambda: query_batches(*account_summary_export_query(search, None, sort, descending)),
+        key="bank_accounts_export"
+    )
+
 def render_bank_account_table():
     """Render bank account table section"""
+    if account_summary_enabled():
+        render_bank_account_summary_table()
+        return
+    
     st.header("🏦 Bank Account Details")
     
     with st.spinner("Loading bank account data..."):
@@ -328,42 +548,87 @@ def render_bank_account_table():
             selection_mode="single-row"
         )
         
-        # Handle row selection
-        if selected_rows.selection.rows:
-            selected_row = selected_rows.selection.rows[0]
-            selected_account = bank_account_data.iloc[selected_row]["Account Number"]
-            st.session_state.selected_account = selected_account
-            st.success(f"✅ Selected account: {selected_account}")
-        
-        # Create Report button
-        if 'selected_account' in st.session_state and st.session_state.selected_account:
-            st.markdown("---")
-            col1, col2 = st.columns([1, 4])
-            
-            with col1:
-                create_report = st.button("📋 Create Report", type="primary", use_container_width=True, key="create_report_btn")
-            
-            with col2:
-                st.info(f"Selected: **{st.session_state.selected_account}**")
-            
-            if create_report:
-                st.session_state.show_report = True
-                st.rerun()
+        _render_account_selection(bank_account_data, selected_rows)
         
-        # Download button
+        # Download buttons (generated on click from a server-side cursor)
         st.markdown("---")
-        csv = bank_account_data.to_csv(index=False)
-        st.download_button(
-            label="📥 Download Bank Account Table CSV",
-            data=csv,
-            file_name=f"bank_accounts_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            mime="text/csv"
+        render_export_buttons(
+            "Bank Account Table",
+            "bank_accounts",
+            lambda: query_batches(BANK_ACCOUNT_TABLE_SQL),
+            key="bank_accounts_export"
         )
         
     else:
         st.warning("🏦 No bank account data available")
         st.info("💡 Make sure PostgreSQL is running and has bank data loaded")
 
+def render_transaction_search():
+    """Render the transaction search box (descriptions and reference numbers, all accounts)"""
+    with st.expander("🔍 Tìm giao dịch/ Search transactions", expanded=bool(st.session_state.get('transaction_search'))):
+        col1, col2 = st.columns([3, 1])
+        
+        with col1:
+            text = st.text_input(
+                "Nội dung hoặc mã giao dịch/ Description or reference:",
+                key="transaction_search"
+            ).strip()
+        
+        with col2:
+            selected_account = st.session_state.get('selected_account')
+            only_selected = st.checkbox(
+                "Chỉ tài khoản đã chọn/ Selected account only",
+                value=False,
+                disabled=not selected_account,
+                key="transaction_search_selected_only"
+            )
+        
+        if not text:
+            return
+        
+        account_number = selected_account if only_selected and selected_account else None
+        page_size = 50
+        
+        # Page start keys of the pages visited so far (None = first page)
+        view_key = (text, account_number)
+        if st.session_state.get('transaction_search_view_key') != view_key:
+            st.session_state.transaction_search_view_key = view_key
+            st.session_state.transaction_search_cursors = [None]
+        cursors = st.session_state.transaction_search_cursors
+        
+        page = get_transaction_search_page(text, account_number, cursors[-1], page_size)
+        
+        has_next = len(page) > page_size
+        page = page.iloc[:page_size]
+        next_after = tuple(int(v) for v in page[SEARCH_PAGE_KEY_COLUMNS].iloc[-1]) if has_next else None
+        
+        if page.empty:
+            st.info("Không tìm thấy giao dịch/ No matching transactions")
+            return
+        
+        st.dataframe(
+            page.drop(columns=SEARCH_PAGE_KEY_COLUMNS),
+            use_container_width=True,
+            hide_index=True
+        )
+        
+        # Page navigation
+        first_row = (len(cursors) - 1) * page_size
+        col1, col2, col3 = st.columns([1, 2, 1])
+        
+        with col1:
+            if st.button("◀ Trang trước/ Previous", key="transaction_search_prev_btn", disabled=len(cursors) == 1):
+                cursors.pop()
+                st.rerun()
+        
+        with col2:
+            st.caption(f"Trang/ Page {len(cursors)} · dòng/ rows {first_row + 1:,}–{first_row + len(page):,}")
+        
+        with col3:
+            if st.button("Trang sau/ Next ▶", key="transaction_search_next_btn", disabled=not has_next):
+                cursors.append(next_after)
+                st.rerun()
+
 def render_account_statement_report():
     """Render account statement report section"""
     if not st.session_state.get('show_report', False) or 'selected_account' not in st.session_state:
@@ -416,65 +681,124 @@ def render_account_statement_report():
             key="to_date"
         )
     
-    # Get account statement data
+    from_date_str = from_date.strftime('%Y-%m-%d') if from_date else None
+    to_date_str = to_date.strftime('%Y-%m-%d') if to_date else None
+    
+    # Page controls
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        page_size = st.selectbox(
+            "Số dòng mỗi trang/ Rows per page:",
+            STATEMENT_PAGE_SIZES,
+            index=1,
+            key="statement_page_size"
+        )
+    
+    with col2:
+        jump_date = st.date_input(
+            "Đi tới ngày/ Jump to date:",
+            value=None,
+            key="statement_jump_date"
+        )
+    
+    jump_date_str = jump_date.strftime('%Y-%m-%d') if jump_date else None
+    # Jumping narrows the start of the range; pages then continue from there
+    page_from = max(filter(None, [from_date_str, jump_date_str]), default=None)
+    
+    # Page start keys of the pages visited so far (None = first page)
+    view_key = (selected_account, page_from, to_date_str, page_size)
+    if st.session_state.get('statement_view_key') != view_key:
+        st.session_state.statement_view_key = view_key
+        st.session_state.statement_cursors = [None]
+    cursors = st.session_state.statement_cursors
+    
+    # Get account statement page
     with st.spinner("Loading account statement..."):
-        from_date_str = from_date.strftime('%Y-%m-%d') if from_date else None
-        to_date_str = to_date.strftime('%Y-%m-%d') if to_date else None
-        account_data = get_account_statement_data(selected_account, from_date_str, to_date_str)
+        page = get_account_statement_page(selected_account, page_from, to_date_str, cursors[-1], page_size)
     
-    if not account_data.empty:
+    has_next = len(page) > page_size
+    page = page.iloc[:page_size]
+    next_after = tuple(int(v) for v in page[PAGE_KEY_COLUMNS].iloc[-1]) if has_next else None
+    if next_after:
+        _prefetch_statement_page(selected_account, page_from, to_date_str, next_after, page_size)
+    
+    if not page.empty or len(cursors) > 1 or jump_date_str:
         # Account statement table
         st.subheader("📋 Chi tiết giao dịch")
         
-        # Display table
-        st.dataframe(
-            account_data,
-            use_container_width=True,
-            hide_index=True
-        )
+        if page.empty:
+            st.info("Không có giao dịch từ ngày đã chọn/ No transactions from the selected date")
+        else:
+            # Display table
+            st.dataframe(
+                page.drop(columns=PAGE_KEY_COLUMNS),
+                use_container_width=True,
+                hide_index=True
+            )
+        
+        # Page navigation
+        first_row = (len(cursors) - 1) * page_size
+        col1, col2, col3 = st.columns([1, 2, 1])
+        
+        with col1:
+            if st.button("◀ Trang trước/ Previous", key="statement_prev_btn", disabled=len(cursors) == 1):
+                cursors.pop()
+                st.rerun()
+        
+        with col2:
+            st.caption(f"Trang/ Page {len(cursors)} · dòng/ rows {first_row + 1:,}–{first_row + len(page):,}")
+        
+        with col3:
+            if st.button("Trang sau/ Next ▶", key="statement_next_btn", disabled=not has_next):
+                cursors.append(next_after)
+                st.rerun()
         
         # Download buttons
         col1, col2 = st.columns(2)
         
         with col1:
-            csv = account_data.to_csv(index=False)
-            st.download_button(
-                label="📥 Download CSV",
-                data=csv,
-                file_name=f"account_statement_{selected_account}_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv"
+            # Generated on click from a server-side cursor, batch by batch
+            render_export_buttons(
+                None,
+                f"account_statement_{selected_account}",
+                lambda: stream_account_statement_data(selected_account, from_date_str, to_date_str),
+                key="statement_export"
             )
         
         with col2:
             if st.button("📄 Generate PDF Report", key="generate_pdf_btn"):
-                with st.spinner("Generating PDF report..."):
-                    pdf_data = create_pdf_report(
-                        account_info, 
-                        account_data, 
-                        from_date_str, 
-                        to_date_str
-                    )
-                    
-                    # Store PDF data in session state for preview
-                    st.session_state.pdf_data = pdf_data
-                    st.session_state.show_pdf_preview = True
-                    st.rerun()
+                # Cached PDFs are served as is; otherwise a background worker builds it
+                st.session_state.pdf_key = request_statement_pdf(
+                    account_info, 
+                    selected_account, 
+                    from_date_str, 
+                    to_date_str
+                )
+                st.session_state.show_pdf_preview = True
+                st.rerun()
         
         # PDF Preview and Download
-        if st.session_state.get('show_pdf_preview', False) and 'pdf_data' in st.session_state:
+        pdf_key = st.session_state.get('pdf_key')
+        if st.session_state.get('show_pdf_preview', False) and pdf_key:
             st.markdown("---")
             st.subheader("📄 PDF Preview")
             
-            # Display PDF preview
-            display_pdf_preview(st.session_state.pdf_data)
-            
-            # Download button
-            st.download_button(
-                label="📥 Download PDF",
-                data=st.session_state.pdf_data,
-                file_name=f"account_statement_{selected_account}_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-                mime="application/pdf"
-            )
+            pdf_path = get_pdf_cache().get(pdf_key)
+            if pdf_path is None:
+                _render_pdf_progress(pdf_key)
+            else:
+                # Display PDF preview
+                display_pdf_preview(_read_file(pdf_path))
+                
+                # Download button (served from the shared cache file)
+                with open(pdf_path, 'rb') as pdf_file:
+                    st.download_button(
+                        label="📥 Download PDF",
+                        data=pdf_file,
+                        file_name=f"account_statement_{selected_account}_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.pdf",
+                        mime="application/pdf"
+                    )
             
             # Close preview button
             if st.button("❌ Close PDF Preview", key="close_pdf_preview_btn"):
@@ -501,6 +825,7 @@ def render_account_statement():
         st.rerun()
     
     # Main content
+    render_transaction_search()
     render_bank_account_table()
     render_account_statement_report()
 
@@ -10,9 +10,12 @@ sys.path.insert(0, project_root)
 from src.analytics.dashboard.streamlit_dashboard import render_dashboard
 from src.analytics.reports.streamlit_account_statement import render_account_statement
 from src.analytics.dashboard.profit_loss_statement.profit_loss_statement import render_profit_loss_statement
+from src.analytics.utils.perf import start_run, mark_section, finish_run
 
 def main():
     """Main Streamlit application with tabs"""
+    start_run()
+    mark_section('page')
     
     # Page config
     st.set_page_config(
@@ -33,10 +36,13 @@ def main():
         render_dashboard()
     
     with tab2:
+        mark_section('account_statement')
         render_account_statement()
     
     with tab3:
         render_profit_loss_statement()
+    
+    finish_run()
 
 if __name__ == "__main__":
     main()
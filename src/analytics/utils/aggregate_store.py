@@ -0,0 +1,265 @@
+"""
+Monthly partial-aggregate store for additive dashboard measures
+"""
+import os
+import threading
+import time
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import streamlit as st
+
+from src.analytics.utils.postgres_connection import PostgreSQLConnection
+
+# Set ANALYTICS_AGGREGATE_STORE=1 to compose monthly charts from partials
+AGGREGATE_STORE_ENV = 'ANALYTICS_AGGREGATE_STORE'
+
+SALES_MEASURES = ['revenue', 'discount_amount', 'item_total', 'orders', 'sales_rows']
+PAYMENT_MEASURES = ['gross_amount', 'fees', 'net_amount', 'payment_rows']
+MEASURES = SALES_MEASURES + PAYMENT_MEASURES
+
+# Orders are counted per month/day range; an Etsy order has a single sale
+# date, so distinct order counts are additive across disjoint ranges.
+SALES_PARTIALS_SQL = """
+SELECT
+    {group_select}
+    COALESCE(SUM(COALESCE(fs.item_total, 0) - COALESCE(fs.discount_amount, 0)), 0) AS revenue,
+    COALESCE(SUM(COALESCE(fs.discount_amount, 0)), 0) AS discount_amount,
+    COALESCE(SUM(COALESCE(fs.item_total, 0)), 0) AS item_total,
+    COUNT(DISTINCT fs.order_key) AS orders,
+    COUNT(*) AS sales_rows
+FROM fact_sales fs
+JOIN dim_time dt ON fs.sale_date_key = dt.time_key
+WHERE dt.full_date >= %s AND dt.full_date <= %s
+{group_by}
+"""
+
+PAYMENT_PARTIALS_SQL = """
+SELECT
+    {group_select}
+    COALESCE(SUM(COALESCE(fp.gross_amount, 0)), 0) AS gross_amount,
+    COALESCE(SUM(COALESCE(fp.fees, 0)), 0) AS fees,
+    COALESCE(SUM(COALESCE(fp.net_amount, 0)), 0) AS net_amount,
+    COUNT(*) AS payment_rows
+FROM fact_payments fp
+JOIN dim_time dt ON fp.payment_date_key = dt.time_key
+WHERE dt.full_date >= %s AND dt.full_date <= %s
+{group_by}
+"""
+
+HISTORY_START = date(1900, 1, 1)
+
+# How often the store checks etl_loads for months changed by the loaders
+ETL_POLL_SECONDS = 30
+
+
+def aggregate_store_enabled() -> bool:
+    """Return True when monthly charts should be composed from stored partials"""
+    return os.getenv(AGGREGATE_STORE_ENV, '0').lower() in ('1', 'true', 'yes')
+
+
+def _parse_date(value) -> Optional[date]:
+    """Parse 'YYYY-MM-DD' (or date) to date"""
+    if value is None or value == '':
+        return None
+    return pd.Timestamp(value).date()
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _month_end(day: date) -> date:
+    next_month = (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return next_month - timedelta(days=1)
+
+
+def _next_month(day: date) -> date:
+    return _month_end(day) + timedelta(days=1)
+
+
+class MonthlyAggregateStore:
+    """Additive per-month partials with raw-fact fallback for edge days.
+
+    Closed months (before the current month) are aggregated once and kept.
+    A range query sums the partials of the months it fully covers and only
+    touches fact tables for the partially covered first/last month and for
+    the current month, which is still receiving data.
+    """
+
+    def __init__(self, connection: Optional[PostgreSQLConnection] = None):
+        """
+        Initialize the store (partials are loaded lazily)
+
+        Args:
+            connection: Connection to use (a dedicated one by default)
+        """
+        self.connection = connection or PostgreSQLConnection()
+        self._closed_months: Optional[pd.DataFrame] = None
+        # Current month when _closed_months was built; it holds every month before it
+        self._closed_before: Optional[date] = None
+        self._lock = threading.Lock()
+        self._etl_load_id: Optional[int] = None
+        self._etl_checked_at = 0.0
+
+    # -------------------------------------------------------------------------
+    # Partials
+    # -------------------------------------------------------------------------
+    def _query_partials(self, start: date, end: date, by_month: bool) -> pd.DataFrame:
+        """Aggregate sales and payment measures between two dates"""
+        if by_month:
+            group_select = "dt.year, dt.month,"
+            group_by = "GROUP BY dt.year, dt.month"
+        else:
+            group_select = ""
+            group_by = ""
+
+        params = (start.isoformat(), end.isoformat())
+        sales = self.connection.execute_query(
+            SALES_PARTIALS_SQL.format(group_select=group_select, group_by=group_by), params)
+        payments = self.connection.execute_query(
+            PAYMENT_PARTIALS_SQL.format(group_select=group_select, group_by=group_by), params)
+
+        if not by_month:
+            row = {m: 0.0 for m in MEASURES}
+            if not sales.empty:
+                row.update({m: float(sales.iloc[0][m] or 0) for m in SALES_MEASURES})
+            if not payments.empty:
+                row.update({m: float(payments.iloc[0][m] or 0) for m in PAYMENT_MEASURES})
+            return pd.DataFrame([row])
+
+        keys = ['year', 'month']
+        if sales.empty:
+            sales = pd.DataFrame(columns=keys + SALES_MEASURES)
+        if payments.empty:
+            payments = pd.DataFrame(columns=keys + PAYMENT_MEASURES)
+        merged = sales.merge(payments, on=keys, how='outer')
+        merged[MEASURES] = merged[MEASURES].apply(pd.to_numeric, errors='coerce').fillna(0.0)
+        merged[keys] = merged[keys].astype(int)
+        return merged.set_index(keys).sort_index()
+
+    def _closed(self, current_month: date) -> pd.DataFrame:
+        """
+        Partials for every month before current_month
+
+        Loaded once per calendar month: when the month rolls over, the
+        month that just closed is not stored yet, so the partials are
+        rebuilt.
+
+        Args:
+            current_month: First day of the month still receiving data
+        """
+        with self._lock:
+            if self._closed_months is None or self._closed_before != current_month:
+                last_closed_day = current_month - timedelta(days=1)
+                self._closed_months = self._query_partials(HISTORY_START, last_closed_day, by_month=True)
+                self._closed_before = current_month
+            return self._closed_months
+
+    def invalidate(self, months: Optional[List[Tuple[int, int]]] = None):
+        """
+        Drop stored partials so they are recomputed on next use
+
+        Args:
+            months: (year, month) pairs that received new data, or None for all
+        """
+        current = (date.today().year, date.today().month)
+        with self._lock:
+            # The current month is never stored, so only older months matter
+            if months is None or any(tuple(m) < current for m in months):
+                self._closed_months = None
+
+    def _apply_etl_changes(self):
+        """Invalidate months touched by ETL loads committed since the last check"""
+        if time.monotonic() - self._etl_checked_at < ETL_POLL_SECONDS:
+            return
+        self._etl_checked_at = time.monotonic()
+
+        from src.analytics.etl.watermarks import months_changed_since
+        changes = months_changed_since(self._etl_load_id, self.connection)
+        if changes['months']:
+            self.invalidate(changes['months'])
+        self._etl_load_id = changes['load_id']
+
+    # -------------------------------------------------------------------------
+    # Range queries
+    # -------------------------------------------------------------------------
+    def monthly(self, start_date: str = None, end_date: str = None) -> pd.DataFrame:
+        """
+        Per-month measures for any date range
+
+        Args:
+            start_date: 'YYYY-MM-DD' or None (all history)
+            end_date: 'YYYY-MM-DD' or None (end of the current month)
+
+        Returns:
+            pd.DataFrame: year, month and MEASURES columns for months with data
+        """
+        self._apply_etl_changes()
+        today = date.today()
+        current_month = _month_start(today)
+        closed = self._closed(current_month)
+
+        # Facts are never future-dated, so the range stops at the current month
+        start = _parse_date(start_date)
+        end = min(_parse_date(end_date) or _month_end(current_month), _month_end(current_month))
+        if start is None:
+            first = closed.index[0] if not closed.empty else (today.year, today.month)
+            start = date(first[0], first[1], 1)
+        if start > end:
+            return pd.DataFrame(columns=['year', 'month'] + MEASURES)
+
+        rows: Dict[Tuple[int, int], pd.Series] = {}
+        month = _month_start(start)
+        while month <= end:
+            key = (month.year, month.month)
+            lo, hi = max(start, month), min(end, _month_end(month))
+            fully_covered = lo == month and hi == _month_end(month)
+
+            if fully_covered and month < current_month:
+                if key in closed.index:
+                    rows[key] = closed.loc[key]
+            else:
+                # Partial edge month or the still-open current month
+                partial = self._query_partials(lo, hi, by_month=False).iloc[0]
+                if partial['sales_rows'] or partial['payment_rows']:
+                    rows[key] = partial
+            month = _next_month(month)
+
+        if not rows:
+            return pd.DataFrame(columns=['year', 'month'] + MEASURES)
+
+        df = pd.DataFrame.from_dict(rows, orient='index')[MEASURES]
+        df.index = pd.MultiIndex.from_tuples(df.index, names=['year', 'month'])
+        return df.sort_index().reset_index()
+
+    def totals(self, start_date: str = None, end_date: str = None) -> Dict[str, float]:
+        """
+        Summed measures for any date range
+
+        Args:
+            start_date: 'YYYY-MM-DD' or None
+            end_date: 'YYYY-MM-DD' or None
+
+        Returns:
+            dict: Measure name -> total
+        """
+        monthly = self.monthly(start_date, end_date)
+        return {m: float(monthly[m].sum()) if not monthly.empty else 0.0 for m in MEASURES}
+
+
+def month_label(df: pd.DataFrame) -> pd.Series:
+    """'YYYY-MM' labels for year/month columns"""
+    return df['year'].astype(int).astype(str) + '-' + df['month'].astype(int).astype(str).str.zfill(2)
+
+
+@st.cache_resource
+def get_aggregate_store() -> MonthlyAggregateStore:
+    """
+    Get the shared aggregate store (one per process)
+
+    Returns:
+        MonthlyAggregateStore: Store instance
+    """
+    return MonthlyAggregateStore()
@@ -0,0 +1,283 @@
+"""
+Mergeable distinct-count sketches (HyperLogLog) for customers and orders
+"""
+import math
+import os
+import threading
+import time
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from src.analytics.utils.postgres_connection import PostgreSQLConnection
+
+# Set ANALYTICS_APPROX_DISTINCT=1 to answer distinct counts from sketches
+APPROX_DISTINCT_ENV = 'ANALYTICS_APPROX_DISTINCT'
+# Target relative standard error of the approximate counts
+APPROX_DISTINCT_ERROR_ENV = 'ANALYTICS_APPROX_DISTINCT_ERROR'
+DEFAULT_ERROR = 0.02
+
+DISTINCT_KEYS_SQL = """
+SELECT dt.full_date, fs.customer_key, fs.order_key
+FROM fact_sales fs
+JOIN dim_time dt ON fs.sale_date_key = dt.time_key
+"""
+
+# Keys of the days an ETL load changed, to rebuild only their sketches
+CHANGED_DAYS_KEYS_SQL = DISTINCT_KEYS_SQL + "WHERE dt.full_date = ANY(%s)\n"
+
+# How often the sketches check etl_loads for days changed by the loaders
+ETL_POLL_SECONDS = 30
+
+_UINT64_MASK = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+def approx_distinct_enabled() -> bool:
+    """Return True when distinct counts may be answered approximately"""
+    return os.getenv(APPROX_DISTINCT_ENV, '0').lower() in ('1', 'true', 'yes')
+
+
+def precision_for_error(error: float) -> int:
+    """
+    Smallest HyperLogLog precision whose standard error is <= error
+
+    Args:
+        error: Relative standard error, e.g. 0.02 for 2%
+
+    Returns:
+        int: Precision p (2**p registers), between 4 and 16
+    """
+    registers = (1.04 / max(error, 1e-4)) ** 2
+    return int(min(16, max(4, math.ceil(math.log2(registers)))))
+
+
+def _hash64(keys: np.ndarray) -> np.ndarray:
+    """SplitMix64 finalizer over int64 keys (uint64 arithmetic wraps)"""
+    x = keys.astype(np.int64).view(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _leading_zeros(x: np.ndarray) -> np.ndarray:
+    """Count leading zero bits of uint64 values (64 for zero)"""
+    x = x.copy()
+    zeros = np.zeros(x.shape, dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        top_clear = x < (np.uint64(1) << np.uint64(64 - shift))
+        zeros += top_clear * shift
+        x = np.where(top_clear, (x << np.uint64(shift)) & _UINT64_MASK, x)
+    zeros[x == 0] = 64
+    return zeros
+
+
+def _registers(keys: np.ndarray, precision: int):
+    """Register index and rank for each key"""
+    hashed = _hash64(keys)
+    index = (hashed >> np.uint64(64 - precision)).astype(np.int64)
+    remainder = (hashed << np.uint64(precision)) & _UINT64_MASK
+    rank = np.minimum(_leading_zeros(remainder) + 1, 64 - precision + 1)
+    return index, rank.astype(np.uint8)
+
+
+def estimate(registers: np.ndarray) -> float:
+    """
+    HyperLogLog cardinality estimate with small-range correction
+
+    Args:
+        registers: One register array (uint8, 2**p entries)
+
+    Returns:
+        float: Estimated number of distinct keys
+    """
+    m = registers.size
+    alpha = 0.7213 / (1 + 1.079 / m) if m >= 128 else {16: 0.673, 32: 0.697, 64: 0.709}[m]
+    raw = alpha * m * m / np.sum(np.ldexp(1.0, -registers.astype(np.int64)))
+    empty = int(np.count_nonzero(registers == 0))
+    if raw <= 2.5 * m and empty:
+        return m * math.log(m / empty)
+    return float(raw)
+
+
+class DailyDistinctSketch:
+    """Per-day HyperLogLog registers for one key column.
+
+    Registers of consecutive days are merged with an element-wise max, so
+    any date range costs one max-reduction over (days x 2**p) bytes.
+    """
+
+    def __init__(self, dates: np.ndarray, keys: np.ndarray, precision: int):
+        """
+        Build per-day sketches
+
+        Args:
+            dates: datetime64[D] per row
+            keys: int64 key per row (NULL keys already removed)
+            precision: HyperLogLog precision p
+        """
+        self.precision = precision
+        self.days, day_codes = np.unique(dates, return_inverse=True)
+        m = 1 << precision
+        self.registers = np.zeros((self.days.size, m), dtype=np.uint8)
+        if keys.size:
+            index, rank = _registers(keys, precision)
+            np.maximum.at(self.registers, (day_codes, index), rank)
+
+    def replace_days(self, days: np.ndarray, dates: np.ndarray, keys: np.ndarray):
+        """
+        Rebuild the registers of some days from all of their current rows
+
+        Args:
+            days: datetime64[D] days to rebuild (days left without rows are removed)
+            dates: datetime64[D] per row, every row of those days
+            keys: int64 key per row
+        """
+        fresh = DailyDistinctSketch(dates, keys, self.precision)
+        keep = ~np.isin(self.days, days)
+        all_days = np.concatenate([self.days[keep], fresh.days])
+        order = np.argsort(all_days, kind='stable')
+        self.days = all_days[order]
+        self.registers = np.concatenate([self.registers[keep], fresh.registers])[order]
+
+    def merged(self, start: Optional[np.datetime64], end: Optional[np.datetime64]) -> np.ndarray:
+        """Union sketch of every day in [start, end]"""
+        lo = int(np.searchsorted(self.days, start, side='left')) if start is not None else 0
+        hi = int(np.searchsorted(self.days, end, side='right')) if end is not None else self.days.size
+        if hi <= lo:
+            return np.zeros(1 << self.precision, dtype=np.uint8)
+        return self.registers[lo:hi].max(axis=0)
+
+    def count(self, start: Optional[np.datetime64], end: Optional[np.datetime64]) -> int:
+        """Approximate distinct keys in [start, end]"""
+        registers = self.merged(start, end)
+        if not registers.any():
+            return 0
+        return int(round(estimate(registers)))
+
+
+def _key_columns(keys: pd.DataFrame):
+    """Dates, customer keys and order keys of DISTINCT_KEYS_SQL rows (NULL keys removed per column)"""
+    if keys.empty:
+        empty_dates = np.array([], dtype='datetime64[D]')
+        empty_keys = np.array([], dtype=np.int64)
+        return (empty_dates, empty_keys), (empty_dates, empty_keys)
+    dates = pd.to_datetime(keys['full_date']).to_numpy(dtype='datetime64[D]')
+    columns = []
+    for column in ('customer_key', 'order_key'):
+        values = pd.to_numeric(keys[column], errors='coerce')
+        present = values.notna().to_numpy()
+        columns.append((dates[present], values[present].to_numpy(dtype=np.int64)))
+    return tuple(columns)
+
+
+class DistinctCountSketches:
+    """Customer and order sketches over fact_sales.
+
+    fact_sales is scanned once when the sketches are built. After that,
+    days changed by ETL loads (etl_loads) are picked up every
+    ETL_POLL_SECONDS, and only those days are read again and rebuilt.
+    """
+
+    def __init__(self, keys: pd.DataFrame, error: float = DEFAULT_ERROR,
+                 connection: Optional[PostgreSQLConnection] = None, load_id: Optional[int] = None):
+        """
+        Build sketches from (full_date, customer_key, order_key) rows
+
+        Args:
+            keys: Rows of DISTINCT_KEYS_SQL
+            error: Target relative standard error
+            connection: Connection for incremental updates (none: never updated)
+            load_id: Newest etl_loads id already reflected in keys
+        """
+        self.error = error
+        precision = precision_for_error(error)
+        customers, orders = _key_columns(keys)
+        self.customers = DailyDistinctSketch(*customers, precision)
+        self.orders = DailyDistinctSketch(*orders, precision)
+
+        self.connection = connection
+        self._lock = threading.Lock()
+        self._etl_load_id = load_id
+        self._etl_checked_at = time.monotonic()
+
+    @classmethod
+    def load(cls, error: Optional[float] = None) -> 'DistinctCountSketches':
+        """
+        Load keys from fact_sales and build sketches
+
+        Args:
+            error: Target relative standard error (env/default when None)
+
+        Returns:
+            DistinctCountSketches: Built sketches
+        """
+        from src.analytics.etl.watermarks import dates_changed_since
+
+        if error is None:
+            error = float(os.getenv(APPROX_DISTINCT_ERROR_ENV, str(DEFAULT_ERROR)))
+        conn = PostgreSQLConnection()
+        # Read before the scan: a load committed during it is applied again, which is harmless
+        load_id = dates_changed_since(None, conn)['load_id']
+        keys = conn.execute_query(DISTINCT_KEYS_SQL)
+        if keys.empty:
+            keys = pd.DataFrame(columns=['full_date', 'customer_key', 'order_key'])
+        return cls(keys, error, conn, load_id)
+
+    def update_days(self, days: List, keys: pd.DataFrame):
+        """
+        Replace the sketches of some days
+
+        Args:
+            days: Days to rebuild (date or 'YYYY-MM-DD')
+            keys: Every DISTINCT_KEYS_SQL row of those days
+        """
+        day_values = np.array([self._day(day) for day in days], dtype='datetime64[D]')
+        customers, orders = _key_columns(keys)
+        with self._lock:
+            self.customers.replace_days(day_values, *customers)
+            self.orders.replace_days(day_values, *orders)
+
+    def _apply_etl_changes(self):
+        """Rebuild the days changed by ETL loads committed since the last check"""
+        if self.connection is None or time.monotonic() - self._etl_checked_at < ETL_POLL_SECONDS:
+            return
+        self._etl_checked_at = time.monotonic()
+
+        from src.analytics.etl.watermarks import dates_changed_since
+        changes = dates_changed_since(self._etl_load_id, self.connection)
+        if changes['dates']:
+            keys = self.connection.execute_query(CHANGED_DAYS_KEYS_SQL, (changes['dates'],))
+            self.update_days(changes['dates'], keys)
+        self._etl_load_id = changes['load_id']
+
+    @staticmethod
+    def _day(value) -> Optional[np.datetime64]:
+        if value is None or value == '':
+            return None
+        return np.datetime64(pd.Timestamp(value).date(), 'D')
+
+    def count_customers(self, start_date: str = None, end_date: str = None) -> int:
+        """Approximate COUNT(DISTINCT customer_key) for a date range"""
+        self._apply_etl_changes()
+        with self._lock:
+            return self.customers.count(self._day(start_date), self._day(end_date))
+
+    def count_orders(self, start_date: str = None, end_date: str = None) -> int:
+        """Approximate COUNT(DISTINCT order_key) for a date range"""
+        self._apply_etl_changes()
+        with self._lock:
+            return self.orders.count(self._day(start_date), self._day(end_date))
+
+
+@st.cache_resource(show_spinner=False)
+def get_distinct_sketches() -> DistinctCountSketches:
+    """
+    Get the shared distinct-count sketches (one per process, kept up to date
+    from etl_loads; the dashboard's Refresh button rebuilds them)
+
+    Returns:
+        DistinctCountSketches: Built sketches
+    """
+    return DistinctCountSketches.load()
@@ -0,0 +1,348 @@
+"""
+In-memory columnar cube over fact_sales for dashboard KPIs
+"""
+import os
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from src.analytics.utils.postgres_connection import PostgreSQLConnection
+
+# Set ANALYTICS_FACT_CUBE=1 to answer fact_sales charts from memory
+FACT_CUBE_ENV = 'ANALYTICS_FACT_CUBE'
+FACT_CUBE_TTL = int(os.getenv('ANALYTICS_FACT_CUBE_TTL', '300'))
+
+FACT_SALES_SQL = """
+SELECT
+    dt.full_date,
+    fs.sale_date_key,
+    fs.customer_key,
+    fs.order_key,
+    fs.product_key,
+    fs.geography_key,
+    COALESCE(fs.item_total, 0) AS item_total,
+    COALESCE(fs.discount_amount, 0) AS discount_amount
+FROM fact_sales fs
+JOIN dim_time dt ON fs.sale_date_key = dt.time_key
+ORDER BY dt.full_date
+"""
+
+CURRENT_PRODUCTS_SQL = """
+SELECT product_key, title
+FROM dim_product
+WHERE is_current = true
+"""
+
+GEOGRAPHY_SQL = """
+SELECT geography_key, state_name, country_name
+FROM dim_geography
+"""
+
+MISSING_KEY = -1
+
+
+def fact_cube_enabled() -> bool:
+    """Return True when chart functions should read from the in-memory cube"""
+    return os.getenv(FACT_CUBE_ENV, '0').lower() in ('1', 'true', 'yes')
+
+
+def _to_day(value: Optional[str]) -> Optional[np.datetime64]:
+    """Convert 'YYYY-MM-DD' (or date) to numpy day precision"""
+    if value is None or value == '':
+        return None
+    return np.datetime64(pd.Timestamp(value).date(), 'D')
+
+
+def _key_array(series: pd.Series) -> np.ndarray:
+    """Surrogate keys as int64, NULL keys mapped to MISSING_KEY"""
+    return pd.to_numeric(series, errors='coerce').fillna(MISSING_KEY).to_numpy(dtype=np.int64)
+
+
+def _count_distinct(keys: np.ndarray) -> int:
+    """COUNT(DISTINCT key) ignoring NULL keys"""
+    keys = keys[keys != MISSING_KEY]
+    return int(np.unique(keys).size)
+
+
+def _group_distinct(groups: np.ndarray, keys: np.ndarray, n_groups: int) -> np.ndarray:
+    """COUNT(DISTINCT key) per group index (0..n_groups-1)"""
+    valid = keys != MISSING_KEY
+    pairs = np.unique(np.stack([groups[valid], keys[valid]]), axis=1)
+    return np.bincount(pairs[0], minlength=n_groups)
+
+
+def _shorten_title(title) -> str:
+    """Same truncation as the product chart SQL (30 characters)"""
+    title = '' if title is None or (isinstance(title, float) and np.isnan(title)) else str(title)
+    return title[:27] + '...' if len(title) > 30 else title
+
+
+class FactCube:
+    """Columnar NumPy copy of fact_sales sorted by sale date.
+
+    Every array has one entry per fact_sales row. Rows are sorted by
+    full_date so any date range is a contiguous slice found with
+    np.searchsorted, and every KPI becomes a vectorized reduction.
+    """
+
+    def __init__(self, sales: pd.DataFrame, products: pd.DataFrame, geography: pd.DataFrame):
+        """
+        Build the cube from query results
+
+        Args:
+            sales: Rows of FACT_SALES_SQL (sorted by full_date)
+            products: Rows of CURRENT_PRODUCTS_SQL
+            geography: Rows of GEOGRAPHY_SQL
+        """
+        sales = sales.sort_values('full_date', kind='stable') if not sales.empty else sales
+
+        self.dates = pd.to_datetime(sales['full_date']).to_numpy(dtype='datetime64[D]') if not sales.empty else np.array([], dtype='datetime64[D]')
+        self.sale_date_key = _key_array(sales['sale_date_key']) if not sales.empty else np.array([], dtype=np.int64)
+        self.customer_key = _key_array(sales['customer_key']) if not sales.empty else np.array([], dtype=np.int64)
+        self.order_key = _key_array(sales['order_key']) if not sales.empty else np.array([], dtype=np.int64)
+        self.product_key = _key_array(sales['product_key']) if not sales.empty else np.array([], dtype=np.int64)
+        self.geography_key = _key_array(sales['geography_key']) if not sales.empty else np.array([], dtype=np.int64)
+
+        item_total = pd.to_numeric(sales['item_total'], errors='coerce').fillna(0).to_numpy(dtype=np.float64) if not sales.empty else np.array([], dtype=np.float64)
+        discount = pd.to_numeric(sales['discount_amount'], errors='coerce').fillna(0).to_numpy(dtype=np.float64) if not sales.empty else np.array([], dtype=np.float64)
+        self.item_total = item_total
+        self.discount_amount = discount
+        self.net_revenue = item_total - discount
+
+        self.customer_order_count = self._build_customer_order_counts()
+        self.product_label_idx, self.product_labels = self._build_product_labels(products)
+        self.us_state_idx, self.state_names = self._build_us_states(geography)
+
+    def __len__(self) -> int:
+        return int(self.dates.size)
+
+    @classmethod
+    def load(cls, connection: Optional[PostgreSQLConnection] = None) -> 'FactCube':
+        """
+        Load fact_sales and the small lookup dimensions into memory
+
+        Args:
+            connection: Connection to use (a fresh one by default)
+
+        Returns:
+            FactCube: Loaded cube
+        """
+        conn = connection or PostgreSQLConnection()
+        # The whole fact table: always large enough for the COPY path
+        sales = conn.copy_query(FACT_SALES_SQL)
+        products = conn.execute_query(CURRENT_PRODUCTS_SQL)
+        geography = conn.execute_query(GEOGRAPHY_SQL)
+        if connection is None:
+            conn.disconnect()
+        if sales.empty:
+            sales = pd.DataFrame(columns=['full_date', 'sale_date_key', 'customer_key', 'order_key',
+                                          'product_key', 'geography_key', 'item_total', 'discount_amount'])
+        return cls(sales, products, geography)
+
+    # -------------------------------------------------------------------------
+    # Precomputed lookups
+    # -------------------------------------------------------------------------
+    def _build_customer_order_counts(self) -> np.ndarray:
+        """Per-row COUNT(DISTINCT order_key) of the row's customer over all history"""
+        counts = np.zeros(self.customer_key.size, dtype=np.int64)
+        valid = (self.customer_key != MISSING_KEY) & (self.order_key != MISSING_KEY)
+        if not valid.any():
+            return counts
+        pairs = np.unique(np.stack([self.customer_key[valid], self.order_key[valid]]), axis=1)
+        customers, orders_per_customer = np.unique(pairs[0], return_counts=True)
+        known = self.customer_key != MISSING_KEY
+        pos = np.searchsorted(customers, self.customer_key[known])
+        pos = np.clip(pos, 0, customers.size - 1)
+        matched = customers[pos] == self.customer_key[known]
+        counts[np.flatnonzero(known)[matched]] = orders_per_customer[pos[matched]]
+        return counts
+
+    def _build_product_labels(self, products: pd.DataFrame):
+        """Per-row index into the truncated current-product titles (-1 if not current)"""
+        row_idx = np.full(self.product_key.size, MISSING_KEY, dtype=np.int64)
+        if products is None or products.empty:
+            return row_idx, np.array([], dtype=object)
+        titles = products['title'].map(_shorten_title)
+        labels, label_codes = np.unique(titles.to_numpy(dtype=object).astype(str), return_inverse=True)
+        keys = _key_array(products['product_key'])
+        order = np.argsort(keys)
+        keys, label_codes = keys[order], label_codes[order]
+        pos = np.clip(np.searchsorted(keys, self.product_key), 0, max(keys.size - 1, 0))
+        matched = keys[pos] == self.product_key
+        row_idx[matched] = label_codes[pos[matched]]
+        return row_idx, labels
+
+    def _build_us_states(self, geography: pd.DataFrame):
+        """Per-row index into US state names (-1 for other countries)"""
+        row_idx = np.full(self.geography_key.size, MISSING_KEY, dtype=np.int64)
+        if geography is None or geography.empty:
+            return row_idx, np.array([], dtype=object)
+        us = geography[geography['country_name'] == 'United States']
+        if us.empty:
+            return row_idx, np.array([], dtype=object)
+        states, state_codes = np.unique(us['state_name'].fillna('').astype(str).to_numpy(), return_inverse=True)
+        keys = _key_array(us['geography_key'])
+        order = np.argsort(keys)
+        keys, state_codes = keys[order], state_codes[order]
+        pos = np.clip(np.searchsorted(keys, self.geography_key), 0, keys.size - 1)
+        matched = keys[pos] == self.geography_key
+        row_idx[matched] = state_codes[pos[matched]]
+        return row_idx, states
+
+    # -------------------------------------------------------------------------
+    # Filtering
+    # -------------------------------------------------------------------------
+    def rows(self, start_date: str = None, end_date: str = None, customer_type: str = 'all') -> Union[slice, np.ndarray]:
+        """
+        Select rows for a date range and customer type
+
+        Args:
+            start_date: 'YYYY-MM-DD' or None
+            end_date: 'YYYY-MM-DD' or None
+            customer_type: 'all', 'new' (one order) or 'return' (several orders)
+
+        Returns:
+            slice or np.ndarray: Row selector usable on every cube array
+        """
+        start, end = _to_day(start_date), _to_day(end_date)
+        lo = int(np.searchsorted(self.dates, start, side='left')) if start is not None else 0
+        hi = int(np.searchsorted(self.dates, end, side='right')) if end is not None else self.dates.size
+        selector = slice(lo, max(lo, hi))
+
+        if customer_type == 'new':
+            return lo + np.flatnonzero(self.customer_order_count[selector] == 1)
+        if customer_type == 'return':
+            return lo + np.flatnonzero(self.customer_order_count[selector] > 1)
+        return selector
+
+    # -------------------------------------------------------------------------
+    # KPIs (same column names as the SQL chart functions)
+    # -------------------------------------------------------------------------
+    def total_revenue(self, start_date: str = None, end_date: str = None, customer_type: str = 'all') -> pd.DataFrame:
+        """Total revenue = SUM(item_total) - SUM(discount_amount)"""
+        rows = self.rows(start_date, end_date, customer_type)
+        return pd.DataFrame({"Total Revenue (USD)": [round(float(self.net_revenue[rows].sum()), 2)]})
+
+    def total_orders(self, start_date: str = None, end_date: str = None, customer_type: str = 'all') -> pd.DataFrame:
+        """Total orders = COUNT(DISTINCT order_key)"""
+        rows = self.rows(start_date, end_date, customer_type)
+        return pd.DataFrame({"Total Orders": [_count_distinct(self.order_key[rows])]})
+
+    def total_customers(self, start_date: str = None, end_date: str = None, customer_type: str = 'all') -> pd.DataFrame:
+        """Total customers = COUNT(DISTINCT customer_key)"""
+        rows = self.rows(start_date, end_date, customer_type)
+        return pd.DataFrame({"Total Customers": [_count_distinct(self.customer_key[rows])]})
+
+    def average_order_value(self, start_date: str = None, end_date: str = None, customer_type: str = 'all') -> pd.DataFrame:
+        """AOV = Total Revenue / Total Orders"""
+        rows = self.rows(start_date, end_date, customer_type)
+        orders = _count_distinct(self.order_key[rows])
+        aov = round(float(self.net_revenue[rows].sum()) / orders, 2) if orders else None
+        return pd.DataFrame({"AOV (USD)": [aov]})
+
+    def revenue_by_month(self, start_date: str = None, end_date: str = None, customer_type: str = 'all') -> pd.DataFrame:
+        """Revenue grouped by 'YYYY-MM'"""
+        rows = self.rows(start_date, end_date, customer_type)
+        months, codes = np.unique(self.dates[rows].astype('datetime64[M]'), return_inverse=True)
+        revenue = np.bincount(codes, weights=self.net_revenue[rows], minlength=months.size)
+        return pd.DataFrame({
+            "Month": np.datetime_as_string(months, unit='M'),
+            "Revenue (USD)": np.round(revenue, 2)
+        })
+
+    def total_orders_by_month(self, start_date: str = None, end_date: str = None, customer_type: str = 'all') -> pd.DataFrame:
+        """COUNT(DISTINCT order_key) grouped by 'YYYY-MM'"""
+        rows = self.rows(start_date, end_date, customer_type)
+        months, codes = np.unique(self.dates[rows].astype('datetime64[M]'), return_inverse=True)
+        orders = _group_distinct(codes, self.order_key[rows], months.size)
+        return pd.DataFrame({
+            "Month": np.datetime_as_string(months, unit='M'),
+            "Orders": orders
+        })
+
+    def average_order_value_over_time(self, start_date: str = None, end_date: str = None, customer_type: str = 'all') -> pd.DataFrame:
+        """Daily AOV = daily revenue / daily distinct orders"""
+        rows = self.rows(start_date, end_date, customer_type)
+        days, codes = np.unique(self.dates[rows], return_inverse=True)
+        revenue = np.bincount(codes, weights=self.net_revenue[rows], minlength=days.size)
+        orders = _group_distinct(codes, self.order_key[rows], days.size)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            aov = np.where(orders > 0, np.round(revenue / np.maximum(orders, 1), 2), np.nan)
+        return pd.DataFrame({"Date": days, "AOV (USD)": aov})
+
+    def new_customers_over_time(self, start_date: str = None, end_date: str = None, customer_type: str = 'all') -> pd.DataFrame:
+        """Distinct one-order customers per day"""
+        rows = self.rows(start_date, end_date, customer_type)
+        rows = np.arange(self.dates.size)[rows]
+        rows = rows[self.customer_order_count[rows] == 1]
+        days, codes = np.unique(self.dates[rows], return_inverse=True)
+        customers = _group_distinct(codes, self.customer_key[rows], days.size)
+        return pd.DataFrame({"Date": days, "New Customers": customers})
+
+    def new_vs_returning_customer_sales(self, start_date: str = None, end_date: str = None, customer_type: str = 'all') -> pd.DataFrame:
+        """Revenue split between one-order and repeat customers"""
+        rows = self.rows(start_date, end_date, customer_type)
+        rows = np.arange(self.dates.size)[rows]
+        rows = rows[self.customer_key[rows] != MISSING_KEY]
+        is_returning = (self.customer_order_count[rows] > 1).astype(np.int64)
+        revenue = np.bincount(is_returning, weights=self.net_revenue[rows], minlength=2)
+        present = np.bincount(is_returning, minlength=2) > 0
+        df = pd.DataFrame({
+            "Customer Type": np.array(['New Customers', 'Returning Customers'])[present],
+            "Revenue (USD)": np.round(revenue[present], 2)
+        })
+        return df.sort_values("Revenue (USD)", ascending=False, kind='stable').reset_index(drop=True)
+
+    def customer_retention_rate(self, start_date: str = None, end_date: str = None, customer_type: str = 'all') -> pd.DataFrame:
+        """Share of customers in range with more than one order (%)"""
+        rows = self.rows(start_date, end_date, customer_type)
+        customers = self.customer_key[rows]
+        repeat = customers[self.customer_order_count[rows] > 1]
+        total = _count_distinct(customers)
+        rate = round(_count_distinct(repeat) * 100.0 / total, 2) if total else None
+        return pd.DataFrame({"Retention Rate (%)": [rate]})
+
+    def customers_by_location(self, start_date: str = None, end_date: str = None, customer_type: str = 'all', limit: int = 12) -> pd.DataFrame:
+        """Top US states by distinct customers"""
+        rows = self.rows(start_date, end_date, customer_type)
+        rows = np.arange(self.dates.size)[rows]
+        rows = rows[self.us_state_idx[rows] != MISSING_KEY]
+        n_states = self.state_names.size
+        state_idx = self.us_state_idx[rows]
+        customers = _group_distinct(state_idx, self.customer_key[rows], n_states)
+        revenue = np.bincount(state_idx, weights=self.net_revenue[rows], minlength=n_states)
+        present = np.flatnonzero(np.bincount(state_idx, minlength=n_states) > 0)
+        top = present[np.argsort(-customers[present], kind='stable')][:limit]
+        return pd.DataFrame({
+            "State": self.state_names[top],
+            "Customers": customers[top],
+            "Revenue (USD)": np.round(revenue[top], 2)
+        })
+
+    def total_sales_by_product(self, start_date: str = None, end_date: str = None, customer_type: str = 'all', limit: int = 10) -> pd.DataFrame:
+        """Top products by net revenue (current product titles only)"""
+        rows = self.rows(start_date, end_date, customer_type)
+        rows = np.arange(self.dates.size)[rows]
+        rows = rows[self.product_label_idx[rows] != MISSING_KEY]
+        n_labels = self.product_labels.size
+        label_idx = self.product_label_idx[rows]
+        revenue = np.bincount(label_idx, weights=self.net_revenue[rows], minlength=n_labels)
+        present = np.flatnonzero(np.bincount(label_idx, minlength=n_labels) > 0)
+        top = present[np.argsort(-revenue[present], kind='stable')][:limit]
+        return pd.DataFrame({
+            "Product": self.product_labels[top],
+            "Revenue (USD)": np.round(revenue[top], 2)
+        })
+
+
+@st.cache_resource(ttl=FACT_CUBE_TTL, show_spinner="Loading sales cube...")
+def get_fact_cube() -> FactCube:
+    """
+    Get the shared in-memory fact cube (one per process, refreshed after TTL)
+
+    Returns:
+        FactCube: Loaded cube
+    """
+    return FactCube.load()
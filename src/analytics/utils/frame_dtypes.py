@@ -0,0 +1,87 @@
+"""
+Compact dtypes for query results kept in the Streamlit cache
+"""
+import os
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+
+# Set ANALYTICS_COMPACT_FRAMES=1 to cache query results with compact dtypes
+COMPACT_FRAMES_ENV = 'ANALYTICS_COMPACT_FRAMES'
+
+# Text columns become categorical when they have at least this many rows
+# and at most this share of distinct values (month names, line items,
+# customer types, states, product titles in top-N lists...)
+CATEGORY_MIN_ROWS = 32
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+_INT32 = np.iinfo(np.int32)
+
+
+def compact_frames_enabled() -> bool:
+    """Return True when cached query results should use compact dtypes"""
+    return os.getenv(COMPACT_FRAMES_ENV, '0').lower() in ('1', 'true', 'yes')
+
+
+def _compact_object(series: pd.Series) -> pd.Series:
+    """Decimal columns to float64, low-cardinality text to category"""
+    values = series.dropna()
+    if values.empty:
+        return series
+    kinds = set(map(type, values))
+    if kinds <= {Decimal, int, float}:
+        return series.astype(object).map(lambda v: np.nan if v is None else float(v)).astype('float64')
+    if kinds == {str}:
+        return _compact_text(series)
+    return series
+
+
+def _compact_text(series: pd.Series) -> pd.Series:
+    if len(series) >= CATEGORY_MIN_ROWS and series.nunique() <= len(series) * CATEGORY_MAX_UNIQUE_RATIO:
+        return series.astype('category')
+    return series
+
+
+def _compact_integer(series: pd.Series) -> pd.Series:
+    if series.dtype.itemsize > 4 and not series.empty and _INT32.min <= series.min() and series.max() <= _INT32.max:
+        return series.astype('int32')
+    return series
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert query results to compact dtypes at the query boundary
+
+    - NUMERIC values still held as Decimal objects become float64
+    - int64 columns whose values fit become int32 (sums still return int64)
+    - low-cardinality text columns become category
+
+    Callers that build strings from a categorical column must convert it
+    with .astype(str) first; comparisons, .isin, groupby and plotly work
+    on categories unchanged.
+
+    Args:
+        df: Query result
+
+    Returns:
+        pd.DataFrame: The same frame with compact column dtypes
+    """
+    if df.empty:
+        return df
+    df = df.copy(deep=False)
+    for position in range(df.shape[1]):
+        series = df.iloc[:, position]
+        if pd.api.types.is_bool_dtype(series.dtype):
+            continue
+        if pd.api.types.is_object_dtype(series.dtype):
+            compacted = _compact_object(series)
+        elif pd.api.types.is_string_dtype(series.dtype):
+            compacted = _compact_text(series)
+        elif pd.api.types.is_signed_integer_dtype(series.dtype):
+            compacted = _compact_integer(series)
+        else:
+            continue
+        if compacted is not series:
+            df.isetitem(position, compacted)
+    return df
@@ -0,0 +1,80 @@
+"""
+Per-section timing of a script run
+"""
+import os
+import threading
+import time
+from typing import Dict
+
+import streamlit as st
+
+# Set ANALYTICS_PERF_SECTIONS=1 to time the sections of each rerun
+PERF_SECTIONS_ENV = 'ANALYTICS_PERF_SECTIONS'
+
+# Session state key holding section -> milliseconds of the session's last finished run
+PERF_SECTIONS_STATE_KEY = '_perf_sections'
+
+# Laps of the run in progress. Streamlit runs each session's script on its
+# own thread, so concurrent sessions keep separate laps.
+_run = threading.local()
+
+
+def perf_sections_enabled() -> bool:
+    """Return True when reruns should record section timings"""
+    return os.getenv(PERF_SECTIONS_ENV, '0').lower() in ('1', 'true', 'yes')
+
+
+def _reset():
+    # (section, milliseconds) per lap, and the (section, start) still open
+    _run.laps = []
+    _run.open_section = None
+
+
+def _close_section(now: float):
+    if getattr(_run, 'open_section', None) is not None:
+        name, started = _run.open_section
+        _run.laps.append((name, (now - started) * 1000))
+        _run.open_section = None
+
+
+def start_run():
+    """Start timing a new run (call at the top of the script)"""
+    if not perf_sections_enabled():
+        return
+    _reset()
+
+
+def mark_section(name: str):
+    """
+    End the current section and start the next one, like a stopwatch lap
+
+    Time until the next mark_section (or finish_run) is attributed to
+    `name`. Does nothing unless ANALYTICS_PERF_SECTIONS is set.
+
+    Args:
+        name: Section name, dotted by tab (e.g. 'dashboard.core_kpis')
+    """
+    if not perf_sections_enabled():
+        return
+    if not hasattr(_run, 'laps'):
+        _reset()
+    now = time.perf_counter()
+    _close_section(now)
+    _run.open_section = (name, now)
+
+
+def finish_run():
+    """Close the last section and publish the run's timings to the session"""
+    if not perf_sections_enabled() or not hasattr(_run, 'laps'):
+        return
+    _close_section(time.perf_counter())
+    run: Dict[str, float] = {}
+    for name, elapsed in _run.laps:
+        run[name] = run.get(name, 0.0) + elapsed
+    _reset()
+    st.session_state[PERF_SECTIONS_STATE_KEY] = run
+
+
+def last_run_sections() -> Dict[str, float]:
+    """Section -> milliseconds of this session's last finished run, in script order"""
+    return dict(st.session_state.get(PERF_SECTIONS_STATE_KEY, {}))
@@ -3,10 +3,92 @@ PostgreSQL Connection Utility for Streamlit Applications
 """
 import psycopg2
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 import os
-from typing import Optional, Dict, Any
+import io
+import json
+import uuid
+from typing import Optional, Dict, Any, Callable, List, Iterator
 import streamlit as st
 
+from src.analytics.utils.frame_dtypes import compact_frame, compact_frames_enabled
+
+# Rows fetched per round trip by streaming queries
+STREAM_BATCH_ROWS = 10_000
+
+# Set ANALYTICS_COPY_RESULTS=1 to fetch large results with COPY TO STDOUT
+COPY_RESULTS_ENV = 'ANALYTICS_COPY_RESULTS'
+# Planner row estimate from which a query is fetched with COPY
+COPY_MIN_ROWS = int(os.getenv('ANALYTICS_COPY_MIN_ROWS', '50000'))
+
+# Arrow types for COPY CSV columns by Postgres type OID; NUMERIC becomes
+# float64 like pd.read_sql_query's coerce_float, other types stay text
+_COPY_COLUMN_TYPES = {
+    16: pa.bool_(),
+    20: pa.int64(), 21: pa.int64(), 23: pa.int64(),
+    700: pa.float64(), 701: pa.float64(), 1700: pa.float64(),
+    1082: pa.date32(),
+    1114: pa.timestamp('us'),
+    1184: pa.timestamp('us', tz='UTC'),
+}
+
+# Streamed batches use the COPY types, plus text (TEXT, VARCHAR, BPCHAR)
+_STREAM_COLUMN_TYPES = {**_COPY_COLUMN_TYPES, 25: pa.string(), 1042: pa.string(), 1043: pa.string()}
+
+def copy_results_enabled() -> bool:
+    """Return True when large query results should be fetched with COPY"""
+    return os.getenv(COPY_RESULTS_ENV, '0').lower() in ('1', 'true', 'yes')
+
+# Callables notified with (query, params) before each query is executed
+_query_listeners: List[Callable[[str, Optional[tuple]], None]] = []
+
+def add_query_listener(listener: Callable[[str, Optional[tuple]], None]):
+    """
+    Register a callable that sees every query sent to the database
+    
+    Args:
+        listener: Called with (query, params) before execution
+    """
+    _query_listeners.append(listener)
+
+def remove_query_listener(listener: Callable[[str, Optional[tuple]], None]):
+    """
+    Unregister a query listener
+    
+    Args:
+        listener: Previously registered callable
+    """
+    if listener in _query_listeners:
+        _query_listeners.remove(listener)
+
+# Callables notified with (query, params, error) when a query fails; most
+# failures are only shown with st.error and answered with an empty frame
+_query_error_listeners: List[Callable[[str, Optional[tuple], Exception], None]] = []
+
+def add_query_error_listener(listener: Callable[[str, Optional[tuple], Exception], None]):
+    """
+    Register a callable that sees every failed query
+    
+    Args:
+        listener: Called with (query, params, error) after the failure
+    """
+    _query_error_listeners.append(listener)
+
+def remove_query_error_listener(listener: Callable[[str, Optional[tuple], Exception], None]):
+    """
+    Unregister a query error listener
+    
+    Args:
+        listener: Previously registered callable
+    """
+    if listener in _query_error_listeners:
+        _query_error_listeners.remove(listener)
+
+def _notify_query_error(query: str, params: Optional[tuple], error: Exception):
+    for listener in list(_query_error_listeners):
+        listener(query, params, error)
+
 class PostgreSQLConnection:
     """PostgreSQL connection manager for Streamlit apps"""
     
@@ -30,6 +112,8 @@ class PostgreSQLConnection:
             }
         
         self.connection = None
+        # Query text -> whether its results are large enough for COPY
+        self._copy_decisions: Dict[str, bool] = {}
     
     def connect(self) -> bool:
         """
@@ -65,15 +149,133 @@ class PostgreSQLConnection:
         try:
             if not self.connection or self.connection.closed:
                 if not self.connect():
+                    _notify_query_error(query, params, ConnectionError("Database connection failed"))
                     return pd.DataFrame()
             
+            if copy_results_enabled() and self._is_large_result(query, params):
+                return self.copy_query(query, params)
+            
+            for listener in list(_query_listeners):
+                listener(query, params)
+            
             df = pd.read_sql_query(query, self.connection, params=params)
             return df
             
         except Exception as e:
             st.error(f"❌ Query execution failed: {e}")
+            _notify_query_error(query, params, e)
             return pd.DataFrame()
     
+    def _is_large_result(self, query: str, params: tuple = None) -> bool:
+        """Decide from the planner's row estimate (once per query text) whether to use COPY"""
+        if query not in self._copy_decisions:
+            try:
+                with self.connection.cursor() as cursor:
+                    cursor.execute("EXPLAIN (FORMAT JSON) " + query, params)
+                    plan = cursor.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                self._copy_decisions[query] = plan[0]['Plan']['Plan Rows'] >= COPY_MIN_ROWS
+            except Exception:
+                self.connection.rollback()
+                self._copy_decisions[query] = False
+        return self._copy_decisions[query]
+    
+    def copy_query(self, query: str, params: tuple = None) -> pd.DataFrame:
+        """
+        Execute SQL query with COPY TO STDOUT and parse the CSV with Arrow
+        
+        Avoids building a Python tuple per row, which dominates
+        pd.read_sql_query on large results. Column types come from the
+        query's result description so text that looks numeric (account
+        numbers, references) stays text. Falls back to pd.read_sql_query
+        if the query cannot be copied.
+        
+        Args:
+            query: SQL query string (a single SELECT)
+            params: Query parameters tuple
+            
+        Returns:
+            pd.DataFrame: Query results
+        """
+        try:
+            if not self.connection or self.connection.closed:
+                if not self.connect():
+                    _notify_query_error(query, params, ConnectionError("Database connection failed"))
+                    return pd.DataFrame()
+            
+            for listener in list(_query_listeners):
+                listener(query, params)
+            
+            buffer = io.BytesIO()
+            with self.connection.cursor() as cursor:
+                statement = cursor.mogrify(query, params).decode(self.connection.encoding_python)
+                cursor.execute(f"SELECT * FROM ({statement}) AS q LIMIT 0")
+                columns = [(column.name, column.type_code) for column in cursor.description]
+                cursor.copy_expert(f"COPY ({statement}) TO STDOUT WITH (FORMAT csv)", buffer)
+        except Exception:
+            if self.connection and not self.connection.closed:
+                self.connection.rollback()
+            try:
+                return pd.read_sql_query(query, self.connection, params=params)
+            except Exception as e:
+                st.error(f"❌ Query execution failed: {e}")
+                _notify_query_error(query, params, e)
+                return pd.DataFrame()
+        
+        return _parse_copy_csv(buffer, columns)
+    
+    def stream_query(self, query: str, params: tuple = None,
+                     batch_rows: int = STREAM_BATCH_ROWS) -> Iterator[pa.RecordBatch]:
+        """
+        Execute SQL query through a server-side cursor and yield Arrow batches
+        
+        Rows stay on the server and are fetched batch_rows at a time, so
+        only one batch is held in memory. The read transaction is rolled
+        back when the iterator is exhausted or closed. A result without
+        rows yields one empty batch so consumers still get the columns.
+        
+        Args:
+            query: SQL query string
+            params: Query parameters tuple
+            batch_rows: Rows per fetch (and per yielded batch)
+            
+        Yields:
+            pa.RecordBatch: Consecutive result rows
+            
+        Raises:
+            ConnectionError: If the database cannot be reached
+            Exception: Any error executing the query or fetching rows, so
+                a failed stream is never mistaken for a complete one
+        """
+        if not self.connection or self.connection.closed:
+            if not self.connect():
+                raise ConnectionError("Database connection failed")
+        
+        for listener in list(_query_listeners):
+            listener(query, params)
+        
+        cursor = self.connection.cursor(name=f"stream_{uuid.uuid4().hex}")
+        cursor.itersize = batch_rows
+        try:
+            cursor.execute(query, params)
+            rows = cursor.fetchmany(batch_rows)
+            names = [column[0] for column in cursor.description]
+            type_codes = [column[1] for column in cursor.description]
+            if not rows:
+                yield _empty_record_batch(names, type_codes)
+            while rows:
+                yield _rows_to_record_batch(rows, names, type_codes)
+                rows = cursor.fetchmany(batch_rows)
+        except Exception as e:
+            st.error(f"❌ Query execution failed: {e}")
+            _notify_query_error(query, params, e)
+            raise
+        finally:
+            if not self.connection.closed:
+                cursor.close()
+                self.connection.rollback()
+    
     def test_connection(self) -> bool:
         """
         Test database connection
@@ -159,6 +361,55 @@ class PostgreSQLConnection:
             st.error(f"❌ Failed to get database summary: {e}")
             return {}
 
+def _rows_to_record_batch(rows: List[tuple], names: List[str],
+                          type_codes: Optional[List[int]] = None) -> pa.RecordBatch:
+    """
+    Build an Arrow batch from fetched rows
+    
+    Columns with a known type OID get the same Arrow type in every batch
+    (NUMERIC as float64, text as string, all-NULL batches included), so
+    consumers such as Parquet writers see one schema. Other columns are
+    inferred per batch.
+    """
+    columns = []
+    for position, values in enumerate(zip(*rows)):
+        column = pa.array(list(values))
+        target = _STREAM_COLUMN_TYPES.get(type_codes[position]) if type_codes else None
+        if target is not None and column.type != target:
+            column = column.cast(target)
+        columns.append(column)
+    return pa.RecordBatch.from_arrays(columns, names=names)
+
+def _empty_record_batch(names: List[str], type_codes: List[int]) -> pa.RecordBatch:
+    """Batch without rows carrying the result columns (unknown types as text, like COPY)"""
+    schema = pa.schema([(name, _STREAM_COLUMN_TYPES.get(oid, pa.string())) for name, oid in zip(names, type_codes)])
+    return pa.RecordBatch.from_pylist([], schema=schema)
+
+def _parse_copy_csv(buffer: io.BytesIO, columns: List[tuple]) -> pd.DataFrame:
+    """Parse COPY CSV output (no header) into a DataFrame with the given (name, type OID) columns"""
+    names = [name for name, _ in columns]
+    if buffer.tell() == 0:
+        return pd.DataFrame(columns=names)
+    buffer.seek(0)
+    # Positional names avoid clashes between duplicate result column names
+    positions = [f"c{i}" for i in range(len(columns))]
+    table = pa_csv.read_csv(
+        buffer,
+        read_options=pa_csv.ReadOptions(column_names=positions),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={position: _COPY_COLUMN_TYPES.get(oid, pa.string())
+                          for position, (_, oid) in zip(positions, columns)},
+            # COPY writes NULL unquoted and '' quoted
+            strings_can_be_null=True,
+            quoted_strings_can_be_null=False,
+            true_values=['t'],
+            false_values=['f'],
+        ),
+    )
+    df = table.to_pandas()
+    df.columns = names
+    return df
+
 # Global connection instance
 _connection_instance = None
 
@@ -194,10 +445,35 @@ def execute_query_with_cache(query: str, params: tuple = None, ttl: int = 300) -
     @st.cache_data(ttl=ttl)
     def _execute_cached_query(sql: str, param_tuple: tuple = None) -> pd.DataFrame:
         conn = get_postgres_connection()
-        return conn.execute_query(sql, param_tuple)
+        df = conn.execute_query(sql, param_tuple)
+        # Compact once before caching so every cache hit shares the small frame
+        return compact_frame(df) if compact_frames_enabled() else df
     
     return _execute_cached_query(query, params)
 
+def stream_query(query: str, params: tuple = None, batch_rows: int = STREAM_BATCH_ROWS,
+                 config: Optional[Dict[str, Any]] = None) -> Iterator[pa.RecordBatch]:
+    """
+    Stream query results on a dedicated connection
+    
+    The shared connection is left free for dashboard queries while a
+    long result (e.g. a multi-year statement) is being consumed.
+    
+    Args:
+        query: SQL query string
+        params: Query parameters tuple
+        batch_rows: Rows per yielded batch
+        config: Database configuration dict
+        
+    Yields:
+        pa.RecordBatch: Consecutive result rows
+    """
+    conn = PostgreSQLConnection(config)
+    try:
+        yield from conn.stream_query(query, params, batch_rows)
+    finally:
+        conn.disconnect()
+
 def test_database_connection(config: Optional[Dict[str, Any]] = None) -> bool:
     """
     Test database connection
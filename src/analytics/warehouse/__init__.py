@@ -0,0 +1,3 @@
+"""
+Warehouse Schema Module
+"""
@@ -0,0 +1,285 @@
+"""
+Per-account summary of bank transactions for the Bank Account Table
+"""
+import argparse
+import numbers
+import os
+import sys
+import time
+from decimal import Decimal
+from typing import Iterable, List, Optional, Tuple
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.insert(0, project_root)
+
+from src.analytics.utils.postgres_connection import PostgreSQLConnection
+
+# Set ANALYTICS_ACCOUNT_SUMMARY=1 once the summary exists to page the
+# Bank Account Table from it
+ACCOUNT_SUMMARY_ENV = 'ANALYTICS_ACCOUNT_SUMMARY'
+
+# Sortable columns are NOT NULL so keyset pagination can compare them
+ACCOUNT_SUMMARY_DDL = """
+CREATE TABLE IF NOT EXISTS bank_account_summary (
+    bank_account_key        BIGINT PRIMARY KEY,
+    account_number          TEXT NOT NULL,
+    account_name            TEXT NOT NULL,
+    cif_number              TEXT,
+    customer_address        TEXT,
+    opening_date            DATE,
+    currency_code           TEXT,
+    transaction_count       BIGINT NOT NULL,
+    total_credit            NUMERIC(18, 2) NOT NULL,
+    total_debit             NUMERIC(18, 2) NOT NULL,
+    current_balance         NUMERIC(18, 2),
+    first_transaction_date  DATE NOT NULL,
+    last_transaction_date   DATE NOT NULL,
+    refreshed_at            TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS idx_bank_account_summary_credit ON bank_account_summary (total_credit, bank_account_key);
+CREATE INDEX IF NOT EXISTS idx_bank_account_summary_debit ON bank_account_summary (total_debit, bank_account_key);
+CREATE INDEX IF NOT EXISTS idx_bank_account_summary_count ON bank_account_summary (transaction_count, bank_account_key);
+CREATE INDEX IF NOT EXISTS idx_bank_account_summary_last ON bank_account_summary (last_transaction_date, bank_account_key);
+CREATE INDEX IF NOT EXISTS idx_bank_account_summary_number ON bank_account_summary (account_number, bank_account_key);
+CREATE INDEX IF NOT EXISTS idx_bank_account_summary_name ON bank_account_summary (account_name, bank_account_key);
+"""
+
+# One row per account with transactions; each account is recomputed from
+# its own range of idx_fact_bank_tx_account_date_key
+_SUMMARY_SELECT = """
+SELECT
+    dba.bank_account_key,
+    dba.account_number,
+    COALESCE(dba.account_name, ''),
+    dba.cif_number,
+    dba.customer_address,
+    dba.opening_date,
+    dba.currency_code,
+    stats.transaction_count,
+    ROUND(stats.total_credit, 2),
+    ROUND(stats.total_debit, 2),
+    ROUND(latest.balance_after_transaction, 2),
+    first_dt.full_date,
+    last_dt.full_date,
+    now()
+FROM dim_bank_account dba
+CROSS JOIN LATERAL (
+    SELECT COUNT(*) AS transaction_count,
+           SUM(COALESCE(fbt.credit_amount, 0)) AS total_credit,
+           SUM(COALESCE(fbt.debit_amount, 0)) AS total_debit,
+           MIN(fbt.transaction_date_key) AS first_date_key,
+           MAX(fbt.transaction_date_key) AS last_date_key
+    FROM fact_bank_transactions fbt
+    WHERE fbt.bank_account_key = dba.bank_account_key
+) stats
+LEFT JOIN LATERAL (
+    SELECT fbt.balance_after_transaction
+    FROM fact_bank_transactions fbt
+    WHERE fbt.bank_account_key = dba.bank_account_key
+    ORDER BY fbt.transaction_date_key DESC, fbt.bank_transaction_key DESC
+    LIMIT 1
+) latest ON true
+JOIN dim_time first_dt ON first_dt.time_key = stats.first_date_key
+JOIN dim_time last_dt ON last_dt.time_key = stats.last_date_key
+WHERE dba.account_number IS NOT NULL AND dba.account_number <> ''
+  AND stats.transaction_count > 0
+  {scope}
+"""
+
+_SUMMARY_COLUMNS = """bank_account_key, account_number, account_name, cif_number, customer_address, opening_date,
+    currency_code, transaction_count, total_credit, total_debit, current_balance,
+    first_transaction_date, last_transaction_date, refreshed_at"""
+
+# Bank Account Table columns, as labelled by the original aggregate query
+SUMMARY_TABLE_COLUMNS = """
+    s.account_number as "Account Number",
+    s.account_name as "Account Name",
+    s.cif_number as "CIF Number",
+    s.customer_address as "Customer Address",
+    s.opening_date as "Opening Date",
+    s.currency_code as "Currency",
+    s.transaction_count as "Total Transactions",
+    s.total_credit as "Total Credit (VND)",
+    s.total_debit as "Total Debit (VND)",
+    s.current_balance as "Current Balance (VND)",
+    s.first_transaction_date as "First Transaction Date",
+    s.last_transaction_date as "Last Transaction Date"
+"""
+
+# Sort label -> summary column
+ACCOUNT_SUMMARY_SORTS = {
+    'Total Credit': 'total_credit',
+    'Total Debit': 'total_debit',
+    'Total Transactions': 'transaction_count',
+    'Last Transaction Date': 'last_transaction_date',
+    'Account Number': 'account_number',
+    'Account Name': 'account_name',
+}
+
+# Hidden columns carrying the keyset of each row
+SUMMARY_PAGE_KEY_COLUMNS = ['_sort_key', '_account_key']
+
+
+def account_summary_enabled() -> bool:
+    """Return True when the Bank Account Table should read from bank_account_summary"""
+    return os.getenv(ACCOUNT_SUMMARY_ENV, '0').lower() in ('1', 'true', 'yes')
+
+
+def refresh_account_summary(account_keys: Optional[Iterable[int]] = None,
+                            connection: Optional[PostgreSQLConnection] = None) -> dict:
+    """
+    Rebuild the summary, either fully or only for the given accounts
+
+    A partial refresh reads only the affected accounts' transactions. It
+    does nothing when the summary has never been built, so a load cannot
+    leave a summary holding only some accounts.
+
+    Args:
+        account_keys: bank_account_key values whose transactions or
+            attributes changed, or None for a full rebuild
+        connection: Connection to use (a fresh one by default)
+
+    Returns:
+        dict: Refresh statistics (full, accounts, seconds), or
+            {'account_summary': 'not installed'}
+    """
+    conn = connection or PostgreSQLConnection()
+    if not conn.connection or conn.connection.closed:
+        conn.connect()
+
+    started = time.perf_counter()
+    full = account_keys is None
+    keys: List[int] = [] if full else sorted({int(k) for k in account_keys})
+    stats = {'full': full, 'accounts': 0}
+    installed = True
+
+    with conn.connection, conn.connection.cursor() as cur:
+        if full:
+            cur.execute(ACCOUNT_SUMMARY_DDL)
+            cur.execute("TRUNCATE bank_account_summary")
+            cur.execute(f"INSERT INTO bank_account_summary ({_SUMMARY_COLUMNS})\n"
+                        + _SUMMARY_SELECT.format(scope=""))
+            stats['accounts'] = cur.rowcount
+        elif keys:
+            cur.execute("SELECT to_regclass('bank_account_summary') IS NOT NULL")
+            installed = cur.fetchone()[0]
+        if keys and installed:
+            cur.execute("DELETE FROM bank_account_summary WHERE bank_account_key = ANY(%s)", (keys,))
+            cur.execute(f"INSERT INTO bank_account_summary ({_SUMMARY_COLUMNS})\n"
+                        + _SUMMARY_SELECT.format(scope="AND dba.bank_account_key = ANY(%s)"), (keys,))
+            stats['accounts'] = cur.rowcount
+
+    if connection is None:
+        conn.disconnect()
+    if not installed:
+        return {'account_summary': 'not installed'}
+    stats['seconds'] = round(time.perf_counter() - started, 3)
+    return stats
+
+
+# =============================================================================
+# READ HELPERS FOR THE BANK ACCOUNT TABLE
+# =============================================================================
+
+def _summary_filters(search: Optional[str] = None, currency: Optional[str] = None) -> Tuple[str, list]:
+    """WHERE clause (starting with 1=1) and params for the table filters"""
+    where = "1=1"
+    params = []
+    if search:
+        where += " AND (s.account_number ILIKE %s OR s.account_name ILIKE %s)"
+        params += [f"%{search}%", f"%{search}%"]
+    if currency:
+        where += " AND s.currency_code = %s"
+        params.append(currency)
+    return where, params
+
+
+def _keyset_param(value):
+    """Page key value read back from a DataFrame, as a query parameter of the column's type"""
+    if isinstance(value, numbers.Integral):
+        return int(value)
+    if isinstance(value, float):
+        # NUMERIC(18, 2) columns come back as float64; compare them as NUMERIC
+        return Decimal(str(float(value)))
+    return value
+
+
+def account_summary_page_query(search: Optional[str] = None, currency: Optional[str] = None,
+                               sort: str = 'Total Credit', descending: bool = True,
+                               after: Optional[tuple] = None, page_size: int = 100) -> Tuple[str, list]:
+    """
+    One page of the Bank Account Table, sorted and filtered on the server
+
+    Pages are addressed by the (sort value, bank_account_key) of the last
+    row of the previous page, so every page costs the same however deep it
+    is. One extra row is fetched to tell whether a next page exists.
+
+    Args:
+        search: Text contained in the account number or name, optional
+        currency: Currency code, optional
+        sort: Key of ACCOUNT_SUMMARY_SORTS
+        descending: Sort direction
+        after: SUMMARY_PAGE_KEY_COLUMNS values of the previous page's last row
+        page_size: Rows per page
+
+    Returns:
+        tuple: (SQL, params)
+    """
+    column = ACCOUNT_SUMMARY_SORTS.get(sort, 'total_credit')
+    where, params = _summary_filters(search, currency)
+    if after is not None:
+        where += f" AND (s.{column}, s.bank_account_key) {'<' if descending else '>'} (%s, %s)"
+        params += [_keyset_param(value) for value in after]
+    direction = 'DESC' if descending else 'ASC'
+    sql = f"""SELECT {SUMMARY_TABLE_COLUMNS.rstrip()},
+        s.{column} AS "_sort_key",
+        s.bank_account_key AS "_account_key"
+    FROM bank_account_summary s
+    WHERE {where}
+    ORDER BY s.{column} {direction}, s.bank_account_key {direction}
+    LIMIT %s"""
+    params.append(page_size + 1)
+    return sql, params
+
+
+def account_summary_export_query(search: Optional[str] = None, currency: Optional[str] = None,
+                                 sort: str = 'Total Credit', descending: bool = True) -> Tuple[str, list]:
+    """Every row matching the filters, in table order (for exports)"""
+    column = ACCOUNT_SUMMARY_SORTS.get(sort, 'total_credit')
+    where, params = _summary_filters(search, currency)
+    direction = 'DESC' if descending else 'ASC'
+    sql = f"""SELECT {SUMMARY_TABLE_COLUMNS}
+    FROM bank_account_summary s
+    WHERE {where}
+    ORDER BY s.{column} {direction}, s.bank_account_key {direction}"""
+    return sql, params
+
+
+def account_summary_totals_query(search: Optional[str] = None, currency: Optional[str] = None) -> Tuple[str, list]:
+    """Account count, credit, debit and transaction totals over the filtered accounts"""
+    where, params = _summary_filters(search, currency)
+    sql = f"""SELECT
+        COUNT(*) AS accounts,
+        COALESCE(SUM(s.total_credit), 0) AS total_credit,
+        COALESCE(SUM(s.total_debit), 0) AS total_debit,
+        COALESCE(SUM(s.transaction_count), 0) AS transactions
+    FROM bank_account_summary s
+    WHERE {where}"""
+    return sql, params
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Create and refresh the bank account summary table")
+    parser.add_argument('--accounts', nargs='*', type=int, default=None,
+                        help="bank_account_key values to refresh incrementally (default: full rebuild)")
+    args = parser.parse_args()
+
+    # Without --accounts the summary is (re)built from every transaction
+    stats = refresh_account_summary(args.accounts)
+    print(f"Account summary refreshed: {stats}")
+
+
+if __name__ == "__main__":
+    main()
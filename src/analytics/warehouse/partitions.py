@@ -0,0 +1,391 @@
+"""
+Monthly range partitioning of fact tables by their date key
+"""
+import argparse
+import os
+import sys
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.insert(0, project_root)
+
+from src.analytics.utils.postgres_connection import PostgreSQLConnection
+from src.analytics.warehouse.schema import INDEXES, index_ddl
+
+# Set ANALYTICS_PARTITION_PRUNING=1 once the fact tables are partitioned to
+# add date-key predicates that let Postgres skip untouched months
+PARTITION_PRUNING_ENV = 'ANALYTICS_PARTITION_PRUNING'
+
+# Fact table -> partition key (a dim_time.time_key reference)
+PARTITION_KEYS: Dict[str, str] = {
+    'fact_sales': 'sale_date_key',
+    'fact_payments': 'payment_date_key',
+    'fact_financial_transactions': 'transaction_date_key',
+    'fact_bank_transactions': 'transaction_date_key',
+}
+
+DEFAULT_MONTHS_AHEAD = 3
+
+# Partition bounds are taken from dim_time, which assumes time_key grows
+# with full_date (true for both YYYYMMDD and sequential surrogate keys).
+MONTH_KEY_BOUNDS_SQL = """
+SELECT dt.year, dt.month, MIN(dt.time_key) AS first_key, MAX(dt.time_key) AS last_key
+FROM dim_time dt
+WHERE dt.full_date >= %s AND dt.full_date <= %s
+GROUP BY dt.year, dt.month
+ORDER BY dt.year, dt.month
+"""
+
+FACT_MONTH_RANGE_SQL = """
+SELECT MIN(dt.full_date) AS first_date, MAX(dt.full_date) AS last_date
+FROM {table} f
+JOIN dim_time dt ON f.{key} = dt.time_key
+"""
+
+
+def partition_pruning_enabled() -> bool:
+    """Return True when query builders should emit partition-key predicates"""
+    return os.getenv(PARTITION_PRUNING_ENV, '0').lower() in ('1', 'true', 'yes')
+
+
+def partition_key_filter(key_column: str, start_date: str = None, end_date: str = None,
+                         inline: bool = False) -> Tuple[str, list]:
+    """
+    Predicate on a fact table's date key matching a full_date range
+
+    Filtering on dim_time.full_date alone cannot prune partitions, because
+    the planner only prunes on the partition key itself. The key bounds
+    come from scalar subqueries, which Postgres evaluates once before
+    choosing partitions (run-time pruning).
+
+    Args:
+        key_column: Qualified key column, e.g. 'fs.sale_date_key'
+        start_date: 'YYYY-MM-DD' or None
+        end_date: 'YYYY-MM-DD' or None
+        inline: Embed the dates as literals (for f-string built queries)
+
+    Returns:
+        tuple: (SQL starting with ' AND ' or empty, params)
+    """
+    if not partition_pruning_enabled():
+        return "", []
+
+    sql = ""
+    params = []
+    for value, op, agg, date_op in ((start_date, '>=', 'MIN', '>='), (end_date, '<=', 'MAX', '<=')):
+        if not value:
+            continue
+        placeholder = f"'{date.fromisoformat(str(value)[:10]).isoformat()}'" if inline else "%s"
+        sql += f" AND {key_column} {op} (SELECT {agg}(time_key) FROM dim_time WHERE full_date {date_op} {placeholder})"
+        if not inline:
+            params.append(value)
+    return sql, params
+
+
+def partition_name(table: str, year: int, month: int) -> str:
+    """Name of the monthly partition of a fact table"""
+    return f"{table}_p{year:04d}{month:02d}"
+
+
+def _add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _connect(connection: Optional[PostgreSQLConnection]) -> PostgreSQLConnection:
+    conn = connection or PostgreSQLConnection()
+    if not conn.connection or conn.connection.closed:
+        conn.connect()
+    return conn
+
+
+def is_partitioned(table: str, connection: Optional[PostgreSQLConnection] = None) -> bool:
+    """
+    Check whether a table is already range-partitioned
+
+    Args:
+        table: Table name
+        connection: Connection to use (a fresh one by default)
+
+    Returns:
+        bool: True for a partitioned parent table
+    """
+    conn = _connect(connection)
+    with conn.connection.cursor() as cur:
+        cur.execute("""
+            SELECT 1 FROM pg_partitioned_table pt
+            JOIN pg_class c ON pt.partrelid = c.oid
+            WHERE c.relname = %s AND c.relnamespace = current_schema()::regnamespace
+        """, (table,))
+        return cur.fetchone() is not None
+
+
+def _existing_partitions(cur, table: str) -> List[str]:
+    cur.execute("""
+        SELECT child.relname
+        FROM pg_inherits i
+        JOIN pg_class parent ON i.inhparent = parent.oid
+        JOIN pg_class child ON i.inhrelid = child.oid
+        WHERE parent.relname = %s AND parent.relnamespace = current_schema()::regnamespace
+    """, (table,))
+    return [row[0] for row in cur.fetchall()]
+
+
+def _month_key_bounds(cur, first_month: date, last_month: date) -> List[Tuple[int, int, int, int]]:
+    """(year, month, lower key, upper key) for every month dim_time covers"""
+    cur.execute(MONTH_KEY_BOUNDS_SQL, (first_month.isoformat(), (_add_months(last_month, 1)).isoformat()))
+    rows = cur.fetchall()
+    bounds = []
+    for i, (year, month, first_key, last_key) in enumerate(rows):
+        if (year, month) > (last_month.year, last_month.month):
+            break
+        # Upper bound is the next month's first key so ranges stay contiguous
+        next_first = rows[i + 1][2] if i + 1 < len(rows) else last_key + 1
+        bounds.append((int(year), int(month), int(first_key), int(next_first)))
+    return bounds
+
+
+def _create_partitions(cur, table: str, first_month: date, last_month: date) -> List[str]:
+    """Create missing monthly partitions, moving matching rows out of the default partition"""
+    key = PARTITION_KEYS[table]
+    default = f"{table}_default"
+    existing = set(_existing_partitions(cur, table))
+    created = []
+    for year, month, lower, upper in _month_key_bounds(cur, first_month, last_month):
+        name = partition_name(table, year, month)
+        if name in existing:
+            continue
+        if default in existing:
+            # Attaching over rows already in DEFAULT would fail, so move them first
+            cur.execute(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS "
+                        f"INCLUDING GENERATED)")
+            columns = _stored_columns(cur, table)
+            cur.execute(f"""
+                WITH moved AS (
+                    DELETE FROM {default} WHERE {key} >= %s AND {key} < %s RETURNING *
+                )
+                INSERT INTO {name} ({columns}) SELECT {columns} FROM moved
+            """, (lower, upper))
+            cur.execute(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)",
+                        (lower, upper))
+        else:
+            cur.execute(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)",
+                        (lower, upper))
+        created.append(name)
+
+    if default not in existing:
+        # Catches keys outside every monthly range (e.g. dim_time not extended yet)
+        cur.execute(f"CREATE TABLE {default} PARTITION OF {table} DEFAULT")
+        created.append(default)
+    return created
+
+
+def ensure_future_partitions(months_ahead: int = DEFAULT_MONTHS_AHEAD,
+                             connection: Optional[PostgreSQLConnection] = None) -> List[str]:
+    """
+    Create partitions from the current month up to months_ahead months out
+
+    Months without dim_time rows are skipped; their facts land in the
+    default partition and are moved once dim_time is extended.
+
+    Args:
+        months_ahead: Number of future months to prepare
+        connection: Connection to use (a fresh one by default)
+
+    Returns:
+        list: Names of the partitions created
+    """
+    conn = _connect(connection)
+    current = date.today().replace(day=1)
+    created = []
+    with conn.connection, conn.connection.cursor() as cur:
+        for table in PARTITION_KEYS:
+            if is_partitioned(table, conn):
+                created += _create_partitions(cur, table, current, _add_months(current, months_ahead))
+    return created
+
+
+def _serial_columns(cur, table: str) -> List[Tuple[str, str]]:
+    cur.execute("""
+        SELECT column_name, pg_get_serial_sequence(%s, column_name)
+        FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = %s
+    """, (table, table))
+    return [(column, sequence) for column, sequence in cur.fetchall() if sequence]
+
+
+def _stored_columns(cur, table: str) -> str:
+    """Column list without generated columns (e.g. search_text), which cannot be inserted"""
+    cur.execute("""
+        SELECT attname FROM pg_attribute
+        WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped AND attgenerated = ''
+        ORDER BY attnum
+    """, (table,))
+    return ', '.join(row[0] for row in cur.fetchall())
+
+
+def _primary_key_columns(cur, table: str) -> List[str]:
+    cur.execute("""
+        SELECT a.attname
+        FROM pg_index i
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+        WHERE i.indrelid = %s::regclass AND i.indisprimary
+        ORDER BY array_position(i.indkey, a.attnum)
+    """, (table,))
+    return [row[0] for row in cur.fetchall()]
+
+
+def _rename_indexes(cur, table: str, suffix: str) -> List[str]:
+    """
+    Add a suffix to every index of a table (constraint indexes rename their constraint)
+
+    A renamed table keeps its index names, which would make the IF NOT
+    EXISTS index statements for the new table silently do nothing.
+    """
+    cur.execute("""
+        SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE i.indrelid = %s::regclass
+    """, (table,))
+    renamed = []
+    for (name,) in cur.fetchall():
+        # Identifiers are limited to 63 bytes
+        new_name = f"{name[:63 - len(suffix)]}{suffix}"
+        cur.execute(f'ALTER INDEX "{name}" RENAME TO "{new_name}"')
+        renamed.append(new_name)
+    return renamed
+
+
+def _foreign_keys(cur, table: str) -> Dict[str, str]:
+    """Constraint name -> definition of every foreign key declared on a table"""
+    cur.execute("""
+        SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype = 'f'
+        ORDER BY conname
+    """, (table,))
+    return dict(cur.fetchall())
+
+
+def _index_names(cur, table: str) -> List[str]:
+    cur.execute("SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = %s",
+                (table,))
+    return [row[0] for row in cur.fetchall()]
+
+
+def migrate_table(table: str, months_ahead: int = DEFAULT_MONTHS_AHEAD,
+                  connection: Optional[PostgreSQLConnection] = None) -> Dict:
+    """
+    Convert a fact table into a monthly range-partitioned table
+
+    Runs in one transaction: the table is renamed to <table>_legacy, a
+    partitioned table with the same columns takes its name, partitions are
+    created for every month with data plus months_ahead future months, rows
+    are copied, and the declared indexes and the foreign keys to the
+    dimension tables are rebuilt on the parent (LIKE does not copy foreign
+    keys). The legacy table's indexes get a _legacy suffix first so the
+    parent's indexes can take their names. The legacy table is kept for
+    verification; drop it manually afterwards.
+
+    Args:
+        table: One of PARTITION_KEYS
+        months_ahead: Number of future months to prepare
+        connection: Connection to use (a fresh one by default)
+
+    Returns:
+        dict: Migration statistics (rows, partitions, indexes, foreign_keys)
+
+    Raises:
+        RuntimeError: If a declared index or a foreign key is missing on the
+            new table (the whole migration is rolled back)
+    """
+    if table not in PARTITION_KEYS:
+        raise ValueError(f"{table} is not a partitionable fact table")
+    conn = _connect(connection)
+    if is_partitioned(table, conn):
+        return {'table': table, 'rows': 0, 'partitions': [], 'skipped': 'already partitioned'}
+
+    key = PARTITION_KEYS[table]
+    legacy = f"{table}_legacy"
+    with conn.connection, conn.connection.cursor() as cur:
+        cur.execute(FACT_MONTH_RANGE_SQL.format(table=table, key=key))
+        first_date, last_date = cur.fetchone()
+        today = date.today().replace(day=1)
+        first_month = (first_date or today).replace(day=1)
+        last_month = max((last_date or today).replace(day=1), _add_months(today, months_ahead))
+
+        primary_key = _primary_key_columns(cur, table)
+        serials = _serial_columns(cur, table)
+        foreign_keys = _foreign_keys(cur, table)
+
+        cur.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+        _rename_indexes(cur, legacy, '_legacy')
+        cur.execute(f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS "
+                    f"INCLUDING GENERATED) PARTITION BY RANGE ({key})")
+        if primary_key:
+            # Unique constraints on a partitioned table must include the partition key
+            columns = primary_key + ([key] if key not in primary_key else [])
+            cur.execute(f"ALTER TABLE {table} ADD PRIMARY KEY ({', '.join(columns)})")
+        for column, sequence in serials:
+            # Keep id sequences alive when the legacy table is dropped later
+            cur.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.{column}")
+
+        partitions = _create_partitions(cur, table, first_month, last_month)
+        columns = _stored_columns(cur, legacy)
+        cur.execute(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {legacy}")
+        rows = cur.rowcount
+
+        expected = [f"idx_{table}_{key}"]
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {expected[0]} ON {table} ({key})")
+        for index in INDEXES:
+            if index['table'] == table:
+                cur.execute(index_ddl(index))
+                expected.append(index['name'])
+        indexes = _index_names(cur, table)
+        missing = [name for name in expected if name not in indexes]
+        if missing:
+            raise RuntimeError(f"{table}: indexes not created on the partitioned table: {', '.join(missing)}")
+
+        # Added after the copy so the rows are validated once, not per insert
+        for name, definition in foreign_keys.items():
+            cur.execute(f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition}')
+        missing = sorted(set(foreign_keys) - set(_foreign_keys(cur, table)))
+        if missing:
+            raise RuntimeError(f"{table}: foreign keys not created on the partitioned table: {', '.join(missing)}")
+        cur.execute(f"ANALYZE {table}")
+
+    return {'table': table, 'rows': rows, 'partitions': partitions, 'indexes': indexes,
+            'foreign_keys': sorted(foreign_keys)}
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Partition fact tables by month")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    migrate_parser = sub.add_parser('migrate', help="Convert fact tables to monthly partitions")
+    migrate_parser.add_argument('tables', nargs='*', default=list(PARTITION_KEYS),
+                                help="Fact tables to migrate (all by default)")
+    migrate_parser.add_argument('--months-ahead', type=int, default=DEFAULT_MONTHS_AHEAD)
+
+    ensure_parser = sub.add_parser('ensure', help="Create partitions for upcoming months")
+    ensure_parser.add_argument('--months-ahead', type=int, default=DEFAULT_MONTHS_AHEAD)
+    args = parser.parse_args()
+
+    conn = PostgreSQLConnection()
+    if args.command == 'migrate':
+        for table in args.tables:
+            stats = migrate_table(table, args.months_ahead, conn)
+            if stats.get('skipped'):
+                print(f"{table}: {stats['skipped']}")
+            else:
+                print(f"{table}: {stats['rows']} rows copied into {len(stats['partitions'])} partitions, "
+                      f"indexes: {', '.join(stats['indexes'])}, "
+                      f"foreign keys: {', '.join(stats['foreign_keys']) or 'none'}")
+    else:
+        created = ensure_future_partitions(args.months_ahead, conn)
+        print(f"Created partitions: {', '.join(created) if created else 'none'}")
+
+
+if __name__ == "__main__":
+    main()
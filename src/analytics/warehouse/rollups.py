@@ -0,0 +1,416 @@
+"""
+Daily and monthly rollup tables for dashboard grains
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.insert(0, project_root)
+
+from src.analytics.utils.postgres_connection import PostgreSQLConnection
+
+# Set ANALYTICS_ROLLUPS=1 once the rollups exist to read charts from them
+ROLLUPS_ENV = 'ANALYTICS_ROLLUPS'
+
+# customer_segment follows the dashboard definition over all history:
+# 'new' = exactly one distinct order, 'return' = more than one,
+# 'unknown' = fact rows without a customer_key.
+ROLLUP_DDL = """
+CREATE TABLE IF NOT EXISTS rollup_sales_daily (
+    sale_date_key     BIGINT NOT NULL,
+    full_date         DATE NOT NULL,
+    year              INTEGER NOT NULL,
+    month             INTEGER NOT NULL,
+    customer_segment  TEXT NOT NULL,
+    product_key       BIGINT,
+    geography_key     BIGINT,
+    revenue           NUMERIC(18, 2) NOT NULL,
+    item_total        NUMERIC(18, 2) NOT NULL,
+    discount_amount   NUMERIC(18, 2) NOT NULL,
+    orders            INTEGER NOT NULL,
+    customers         INTEGER NOT NULL,
+    line_count        INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_rollup_sales_daily_date ON rollup_sales_daily (full_date, customer_segment);
+CREATE INDEX IF NOT EXISTS idx_rollup_sales_daily_key ON rollup_sales_daily (sale_date_key);
+
+CREATE TABLE IF NOT EXISTS rollup_sales_monthly (
+    year              INTEGER NOT NULL,
+    month             INTEGER NOT NULL,
+    customer_segment  TEXT NOT NULL,
+    product_key       BIGINT,
+    geography_key     BIGINT,
+    revenue           NUMERIC(18, 2) NOT NULL,
+    item_total        NUMERIC(18, 2) NOT NULL,
+    discount_amount   NUMERIC(18, 2) NOT NULL,
+    orders            INTEGER NOT NULL,
+    customers         INTEGER NOT NULL,
+    line_count        INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_rollup_sales_monthly_ym ON rollup_sales_monthly (year, month, customer_segment);
+
+-- Segment grain: orders are additive across days (one sale date per order)
+CREATE TABLE IF NOT EXISTS rollup_orders_daily (
+    sale_date_key     BIGINT NOT NULL,
+    full_date         DATE NOT NULL,
+    year              INTEGER NOT NULL,
+    month             INTEGER NOT NULL,
+    customer_segment  TEXT NOT NULL,
+    revenue           NUMERIC(18, 2) NOT NULL,
+    orders            INTEGER NOT NULL,
+    customers         INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_rollup_orders_daily_date ON rollup_orders_daily (full_date, customer_segment);
+CREATE INDEX IF NOT EXISTS idx_rollup_orders_daily_key ON rollup_orders_daily (sale_date_key);
+
+CREATE TABLE IF NOT EXISTS rollup_orders_monthly (
+    year              INTEGER NOT NULL,
+    month             INTEGER NOT NULL,
+    customer_segment  TEXT NOT NULL,
+    revenue           NUMERIC(18, 2) NOT NULL,
+    orders            INTEGER NOT NULL,
+    customers         INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_rollup_orders_monthly_ym ON rollup_orders_monthly (year, month, customer_segment);
+
+CREATE TABLE IF NOT EXISTS rollup_payments_daily (
+    payment_date_key  BIGINT NOT NULL,
+    full_date         DATE NOT NULL,
+    year              INTEGER NOT NULL,
+    month             INTEGER NOT NULL,
+    gross_amount      NUMERIC(18, 2) NOT NULL,
+    fees              NUMERIC(18, 2) NOT NULL,
+    net_amount        NUMERIC(18, 2) NOT NULL,
+    payments          INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_rollup_payments_daily_date ON rollup_payments_daily (full_date);
+CREATE INDEX IF NOT EXISTS idx_rollup_payments_daily_key ON rollup_payments_daily (payment_date_key);
+
+CREATE TABLE IF NOT EXISTS rollup_payments_monthly (
+    year              INTEGER NOT NULL,
+    month             INTEGER NOT NULL,
+    gross_amount      NUMERIC(18, 2) NOT NULL,
+    fees              NUMERIC(18, 2) NOT NULL,
+    net_amount        NUMERIC(18, 2) NOT NULL,
+    payments          INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_rollup_payments_monthly_ym ON rollup_payments_monthly (year, month);
+"""
+
+ROLLUP_TABLES = [
+    'rollup_sales_daily', 'rollup_sales_monthly',
+    'rollup_orders_daily', 'rollup_orders_monthly',
+    'rollup_payments_daily', 'rollup_payments_monthly',
+]
+
+# Work tables holding the date keys / months being refreshed
+_REFRESH_SCOPE_SQL = """
+CREATE TEMP TABLE IF NOT EXISTS rollup_refresh_dates (time_key BIGINT PRIMARY KEY) ON COMMIT DROP;
+CREATE TEMP TABLE IF NOT EXISTS rollup_refresh_months (year INTEGER, month INTEGER, PRIMARY KEY (year, month)) ON COMMIT DROP;
+CREATE TEMP TABLE IF NOT EXISTS rollup_refresh_customers (customer_key BIGINT PRIMARY KEY) ON COMMIT DROP;
+"""
+
+# A new order moves a customer from 'new' to 'return' on every day they
+# bought, so the refresh scope is widened to all dates of touched customers.
+_EXPAND_SCOPE_SQL = """
+INSERT INTO rollup_refresh_customers (customer_key)
+SELECT DISTINCT fs.customer_key
+FROM fact_sales fs
+JOIN rollup_refresh_dates d ON fs.sale_date_key = d.time_key
+WHERE fs.customer_key IS NOT NULL
+ON CONFLICT DO NOTHING;
+
+INSERT INTO rollup_refresh_dates (time_key)
+SELECT DISTINCT fs.sale_date_key
+FROM fact_sales fs
+JOIN rollup_refresh_customers c ON fs.customer_key = c.customer_key
+ON CONFLICT DO NOTHING;
+
+INSERT INTO rollup_refresh_months (year, month)
+SELECT DISTINCT dt.year, dt.month
+FROM dim_time dt
+JOIN rollup_refresh_dates d ON dt.time_key = d.time_key
+ON CONFLICT DO NOTHING;
+"""
+
+_SCOPE_CUSTOMERS_BY_DATE_SQL = """
+INSERT INTO rollup_refresh_customers (customer_key)
+SELECT DISTINCT fs.customer_key
+FROM fact_sales fs
+JOIN rollup_refresh_dates d ON fs.sale_date_key = d.time_key
+WHERE fs.customer_key IS NOT NULL
+ON CONFLICT DO NOTHING
+"""
+
+_SCOPE_CUSTOMERS_BY_MONTH_SQL = """
+INSERT INTO rollup_refresh_customers (customer_key)
+SELECT DISTINCT fs.customer_key
+FROM fact_sales fs
+JOIN dim_time dt ON fs.sale_date_key = dt.time_key
+JOIN rollup_refresh_months m ON dt.year = m.year AND dt.month = m.month
+WHERE fs.customer_key IS NOT NULL
+ON CONFLICT DO NOTHING
+"""
+
+_SEGMENTS_CTE = """
+WITH customer_segments AS (
+    SELECT customer_key,
+           CASE WHEN COUNT(DISTINCT order_key) > 1 THEN 'return' ELSE 'new' END AS customer_segment
+    FROM fact_sales
+    {customer_filter}
+    GROUP BY customer_key
+)
+"""
+
+_SALES_ROLLUP_SELECT = """
+SELECT {keys},
+       COALESCE(cs.customer_segment, 'unknown') AS customer_segment,
+       {grain}
+       SUM(COALESCE(fs.item_total, 0) - COALESCE(fs.discount_amount, 0)) AS revenue,
+       {extra_measures}
+       COUNT(DISTINCT fs.order_key) AS orders,
+       COUNT(DISTINCT fs.customer_key) AS customers
+       {line_count}
+FROM fact_sales fs
+JOIN dim_time dt ON fs.sale_date_key = dt.time_key
+LEFT JOIN customer_segments cs ON fs.customer_key = cs.customer_key
+{scope_join}
+GROUP BY {group_keys}, COALESCE(cs.customer_segment, 'unknown') {grain_group}
+"""
+
+_PAYMENTS_ROLLUP_SELECT = """
+SELECT {keys},
+       SUM(COALESCE(fp.gross_amount, 0)) AS gross_amount,
+       SUM(COALESCE(fp.fees, 0)) AS fees,
+       SUM(COALESCE(fp.net_amount, 0)) AS net_amount,
+       COUNT(*) AS payments
+FROM fact_payments fp
+JOIN dim_time dt ON fp.payment_date_key = dt.time_key
+{scope_join}
+GROUP BY {group_keys}
+"""
+
+DAILY_KEYS = "dt.time_key, dt.full_date, dt.year, dt.month"
+MONTHLY_KEYS = "dt.year, dt.month"
+
+
+def rollups_enabled() -> bool:
+    """Return True when chart functions should read from rollup tables"""
+    return os.getenv(ROLLUPS_ENV, '0').lower() in ('1', 'true', 'yes')
+
+
+def _sales_rollup_sql(daily: bool, product_grain: bool, scoped: bool) -> str:
+    """INSERT ... SELECT for one of the sales rollups"""
+    keys = DAILY_KEYS if daily else MONTHLY_KEYS
+    if scoped:
+        scope_join = ("JOIN rollup_refresh_dates rd ON dt.time_key = rd.time_key" if daily
+                      else "JOIN rollup_refresh_months rm ON dt.year = rm.year AND dt.month = rm.month")
+        customer_filter = "WHERE customer_key IN (SELECT customer_key FROM rollup_refresh_customers)"
+    else:
+        scope_join = ""
+        customer_filter = ""
+
+    if product_grain:
+        table = 'rollup_sales_daily' if daily else 'rollup_sales_monthly'
+        grain = "fs.product_key, fs.geography_key,"
+        grain_group = ", fs.product_key, fs.geography_key"
+        extra = ("SUM(COALESCE(fs.item_total, 0)) AS item_total,\n"
+                 "       SUM(COALESCE(fs.discount_amount, 0)) AS discount_amount,")
+        line_count = ", COUNT(*) AS line_count"
+        columns = "customer_segment, product_key, geography_key, revenue, item_total, discount_amount, orders, customers, line_count"
+    else:
+        table = 'rollup_orders_daily' if daily else 'rollup_orders_monthly'
+        grain, grain_group, extra, line_count = "", "", "", ""
+        columns = "customer_segment, revenue, orders, customers"
+
+    key_columns = "sale_date_key, full_date, year, month" if daily else "year, month"
+    select = _SALES_ROLLUP_SELECT.format(
+        keys=keys, grain=grain, extra_measures=extra, line_count=line_count,
+        scope_join=scope_join, group_keys=keys, grain_group=grain_group)
+    return (f"INSERT INTO {table} ({key_columns}, {columns})\n"
+            + _SEGMENTS_CTE.format(customer_filter=customer_filter) + select)
+
+
+def _payments_rollup_sql(daily: bool, scoped: bool) -> str:
+    """INSERT ... SELECT for one of the payment rollups"""
+    keys = DAILY_KEYS if daily else MONTHLY_KEYS
+    scope_join = ""
+    if scoped:
+        scope_join = ("JOIN rollup_refresh_dates rd ON dt.time_key = rd.time_key" if daily
+                      else "JOIN rollup_refresh_months rm ON dt.year = rm.year AND dt.month = rm.month")
+    table = 'rollup_payments_daily' if daily else 'rollup_payments_monthly'
+    key_columns = "payment_date_key, full_date, year, month" if daily else "year, month"
+    return (f"INSERT INTO {table} ({key_columns}, gross_amount, fees, net_amount, payments)\n"
+            + _PAYMENTS_ROLLUP_SELECT.format(keys=keys, scope_join=scope_join, group_keys=keys))
+
+
+def create_rollup_tables(connection: Optional[PostgreSQLConnection] = None):
+    """
+    Create rollup tables and indexes if they do not exist
+
+    Args:
+        connection: Connection to use (a fresh one by default)
+    """
+    conn = connection or PostgreSQLConnection()
+    if not conn.connection or conn.connection.closed:
+        conn.connect()
+    with conn.connection, conn.connection.cursor() as cur:
+        cur.execute(ROLLUP_DDL)
+
+
+def refresh_rollups(date_keys: Optional[Iterable[int]] = None,
+                    connection: Optional[PostgreSQLConnection] = None) -> dict:
+    """
+    Rebuild rollups, either fully or only for the affected dates
+
+    Args:
+        date_keys: dim_time keys that received new/changed facts, or None
+            for a full rebuild
+        connection: Connection to use (a fresh one by default)
+
+    Returns:
+        dict: Refresh statistics (dates, months, seconds)
+    """
+    conn = connection or PostgreSQLConnection()
+    if not conn.connection or conn.connection.closed:
+        conn.connect()
+
+    started = time.perf_counter()
+    full = date_keys is None
+    keys: List[int] = [] if full else sorted({int(k) for k in date_keys})
+    stats = {'full': full, 'dates': 0, 'months': 0}
+
+    if not full and not keys:
+        stats['seconds'] = 0.0
+        return stats
+
+    with conn.connection, conn.connection.cursor() as cur:
+        cur.execute(ROLLUP_DDL)
+
+        if full:
+            cur.execute("TRUNCATE " + ", ".join(ROLLUP_TABLES))
+            cur.execute(_sales_rollup_sql(daily=True, product_grain=True, scoped=False))
+            cur.execute(_sales_rollup_sql(daily=True, product_grain=False, scoped=False))
+            cur.execute(_sales_rollup_sql(daily=False, product_grain=True, scoped=False))
+            cur.execute(_sales_rollup_sql(daily=False, product_grain=False, scoped=False))
+            cur.execute(_payments_rollup_sql(daily=True, scoped=False))
+            cur.execute(_payments_rollup_sql(daily=False, scoped=False))
+        else:
+            cur.execute(_REFRESH_SCOPE_SQL)
+            cur.execute("INSERT INTO rollup_refresh_dates (time_key) SELECT UNNEST(%s::bigint[]) ON CONFLICT DO NOTHING", (keys,))
+            cur.execute(_EXPAND_SCOPE_SQL)
+
+            cur.execute("""
+                DELETE FROM rollup_sales_daily r USING rollup_refresh_dates d WHERE r.sale_date_key = d.time_key;
+                DELETE FROM rollup_orders_daily r USING rollup_refresh_dates d WHERE r.sale_date_key = d.time_key;
+                DELETE FROM rollup_payments_daily r USING rollup_refresh_dates d WHERE r.payment_date_key = d.time_key;
+                DELETE FROM rollup_sales_monthly r USING rollup_refresh_months m WHERE r.year = m.year AND r.month = m.month;
+                DELETE FROM rollup_orders_monthly r USING rollup_refresh_months m WHERE r.year = m.year AND r.month = m.month;
+                DELETE FROM rollup_payments_monthly r USING rollup_refresh_months m WHERE r.year = m.year AND r.month = m.month;
+            """)
+            # Every row of a refreshed date is rebuilt, so segments are
+            # computed for all customers present on the expanded dates
+            cur.execute(_SCOPE_CUSTOMERS_BY_DATE_SQL)
+            cur.execute(_sales_rollup_sql(daily=True, product_grain=True, scoped=True))
+            cur.execute(_sales_rollup_sql(daily=True, product_grain=False, scoped=True))
+            cur.execute(_SCOPE_CUSTOMERS_BY_MONTH_SQL)
+            cur.execute(_sales_rollup_sql(daily=False, product_grain=True, scoped=True))
+            cur.execute(_sales_rollup_sql(daily=False, product_grain=False, scoped=True))
+            cur.execute(_payments_rollup_sql(daily=True, scoped=True))
+            cur.execute(_payments_rollup_sql(daily=False, scoped=True))
+
+            cur.execute("SELECT COUNT(*) FROM rollup_refresh_dates")
+            stats['dates'] = cur.fetchone()[0]
+            cur.execute("SELECT COUNT(*) FROM rollup_refresh_months")
+            stats['months'] = cur.fetchone()[0]
+
+    if connection is None:
+        conn.disconnect()
+    stats['seconds'] = round(time.perf_counter() - started, 3)
+    return stats
+
+
+# =============================================================================
+# READ HELPERS FOR CHART FUNCTIONS
+# =============================================================================
+
+def _is_month_start(value: str) -> bool:
+    return value[8:10] == '01'
+
+
+def _is_month_end(value: str) -> bool:
+    day = date.fromisoformat(value)
+    return (day + timedelta(days=1)).day == 1
+
+
+def rollup_source(kind: str, start_date: str = None, end_date: str = None,
+                  customer_type: str = 'all') -> Tuple[str, str, list]:
+    """
+    Pick the rollup table and WHERE clause for a chart filter
+
+    Monthly rollups are used when the range is whole months (the Quick
+    Date Selection sidebar), daily rollups otherwise.
+
+    Args:
+        kind: 'sales' (product/geography grain), 'orders' (segment grain)
+            or 'payments'
+        start_date: 'YYYY-MM-DD' or None
+        end_date: 'YYYY-MM-DD' or None
+        customer_type: 'all', 'new' or 'return' (ignored for payments)
+
+    Returns:
+        tuple: (table name, WHERE clause starting with 1=1, params)
+    """
+    whole_months = ((not start_date or _is_month_start(start_date))
+                    and (not end_date or _is_month_end(end_date)))
+    table = f"rollup_{kind}_{'monthly' if whole_months else 'daily'}"
+
+    where = "1=1"
+    params = []
+    if whole_months:
+        if start_date:
+            where += " AND (r.year, r.month) >= (%s, %s)"
+            params += [int(start_date[:4]), int(start_date[5:7])]
+        if end_date:
+            where += " AND (r.year, r.month) <= (%s, %s)"
+            params += [int(end_date[:4]), int(end_date[5:7])]
+    else:
+        if start_date:
+            where += " AND r.full_date >= %s"
+            params.append(start_date)
+        if end_date:
+            where += " AND r.full_date <= %s"
+            params.append(end_date)
+
+    if kind != 'payments':
+        if customer_type == 'new':
+            where += " AND r.customer_segment = 'new'"
+        elif customer_type == 'return':
+            where += " AND r.customer_segment = 'return'"
+
+    return table, where, params
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Create and refresh dashboard rollup tables")
+    parser.add_argument('--full', action='store_true', help="Rebuild every rollup from the fact tables")
+    parser.add_argument('--date-keys', nargs='*', type=int, default=None,
+                        help="dim_time keys to refresh incrementally")
+    args = parser.parse_args()
+
+    create_rollup_tables()
+    if args.full or args.date_keys is None:
+        stats = refresh_rollups(None)
+    else:
+        stats = refresh_rollups(args.date_keys)
+    print(f"Rollups refreshed: {stats}")
+
+
+if __name__ == "__main__":
+    main()
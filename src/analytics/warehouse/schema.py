@@ -0,0 +1,405 @@
+"""
+Index declarations and EXPLAIN-based plan checks for dashboard queries
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.insert(0, project_root)
+
+from src.analytics.utils.postgres_connection import (
+    PostgreSQLConnection, add_query_listener, remove_query_listener
+)
+
+# Indexes the dashboard, P&L and account statement queries rely on
+INDEXES: List[Dict] = [
+    {'name': 'idx_fact_sales_sale_date', 'table': 'fact_sales', 'columns': ['sale_date_key']},
+    {'name': 'idx_fact_sales_customer_order', 'table': 'fact_sales', 'columns': ['customer_key', 'order_key']},
+    {'name': 'idx_fact_payments_payment_date', 'table': 'fact_payments', 'columns': ['payment_date_key']},
+    {'name': 'idx_fact_fin_tx_type_date', 'table': 'fact_financial_transactions',
+     'columns': ['transaction_type', 'transaction_date_key']},
+    # Also serves keyset pagination of the account statement viewer and
+    # the latest-balance lookup of the bank account table
+    {'name': 'idx_fact_bank_tx_account_date_key', 'table': 'fact_bank_transactions',
+     'columns': ['bank_account_key', 'transaction_date_key', 'bank_transaction_key']},
+    {'name': 'idx_dim_bank_account_number', 'table': 'dim_bank_account', 'columns': ['account_number']},
+    {'name': 'idx_dim_time_full_date', 'table': 'dim_time', 'columns': ['full_date']},
+]
+
+# Indexes replaced by a declaration above, dropped by apply_indexes so
+# existing databases stop maintaining them
+RETIRED_INDEXES: List[str] = [
+    # Superseded by idx_fact_bank_tx_account_date_key (same leading columns)
+    'idx_fact_bank_tx_account_date',
+]
+
+# Sequential scans over these tables are reported; dimension tables are
+# small enough that a seq scan is usually the right plan.
+LARGE_TABLES = {
+    'fact_sales', 'fact_payments', 'fact_financial_transactions', 'fact_bank_transactions',
+}
+
+EXPLAIN_PREFIX = "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) "
+
+# Paths that answer from memory or from precomputed partials instead of
+# the fact queries are switched off while capturing, so the checker always
+# sees the queries the indexes are declared for.
+IN_MEMORY_ENVS = ['ANALYTICS_FACT_CUBE', 'ANALYTICS_APPROX_DISTINCT', 'ANALYTICS_AGGREGATE_STORE',
+                  'ANALYTICS_ROLLUPS']
+
+
+def index_ddl(index: Dict, concurrently: bool = False) -> str:
+    """CREATE INDEX statement for one declared index"""
+    return (f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {index['name']} "
+            f"ON {index['table']} ({', '.join(index['columns'])})")
+
+
+def _existing_index_columns(conn: PostgreSQLConnection) -> Dict[str, List[List[str]]]:
+    """Column lists of every valid btree index, per table"""
+    # A failed CREATE INDEX CONCURRENTLY leaves an INVALID index the planner never uses
+    df = conn.execute_query("""
+        SELECT i.tablename, i.indexdef
+        FROM pg_indexes i
+        JOIN pg_namespace n ON n.nspname = i.schemaname
+        JOIN pg_class c ON c.relname = i.indexname AND c.relnamespace = n.oid
+        JOIN pg_index x ON x.indexrelid = c.oid
+        WHERE i.schemaname = current_schema() AND x.indisvalid
+    """)
+    existing: Dict[str, List[List[str]]] = {}
+    for _, row in df.iterrows():
+        match = re.search(r'USING btree \((.*)\)', row['indexdef'])
+        if match:
+            columns = [c.strip().strip('"').split(' ')[0] for c in match.group(1).split(',')]
+            existing.setdefault(row['tablename'], []).append(columns)
+    return existing
+
+
+def missing_indexes(connection: Optional[PostgreSQLConnection] = None) -> List[Dict]:
+    """
+    Declared indexes not covered by an existing index
+
+    An existing valid index covers a declaration when its leading columns
+    are the declared columns, whatever it is called.
+
+    Args:
+        connection: Connection to use (a fresh one by default)
+
+    Returns:
+        list: Index declarations that still need to be created
+    """
+    conn = connection or PostgreSQLConnection()
+    existing = _existing_index_columns(conn)
+    missing = []
+    for index in INDEXES:
+        width = len(index['columns'])
+        if not any(cols[:width] == index['columns'] for cols in existing.get(index['table'], [])):
+            missing.append(index)
+    return missing
+
+
+def _partitioned_tables(cur) -> set:
+    """Partitioned parents in the current schema (CONCURRENTLY is not supported on them)"""
+    cur.execute("SELECT relname FROM pg_class "
+                "WHERE relkind = 'p' AND relnamespace = current_schema()::regnamespace")
+    return {row[0] for row in cur.fetchall()}
+
+
+def _invalid_indexes(cur, names: List[str]) -> Dict[str, str]:
+    """Index name -> table for the given indexes left INVALID by a failed build"""
+    cur.execute("""
+        SELECT i.indexname, i.tablename
+        FROM pg_indexes i
+        JOIN pg_namespace n ON n.nspname = i.schemaname
+        JOIN pg_class c ON c.relname = i.indexname AND c.relnamespace = n.oid
+        JOIN pg_index x ON x.indexrelid = c.oid
+        WHERE i.schemaname = current_schema() AND i.indexname = ANY(%s) AND NOT x.indisvalid
+    """, (names,))
+    return dict(cur.fetchall())
+
+
+def apply_indexes(connection: Optional[PostgreSQLConnection] = None,
+                  concurrently: bool = True) -> Dict[str, List[str]]:
+    """
+    Create every missing declared index, drop retired ones and refresh
+    planner statistics
+
+    Declared indexes left INVALID by an interrupted concurrent build are
+    dropped and built again. Partitioned parents are always indexed
+    without CONCURRENTLY, which PostgreSQL does not support on them.
+    Retired indexes are dropped after the new indexes are built, so the
+    queries they served always have an index.
+
+    Args:
+        connection: Connection to use (a fresh one by default)
+        concurrently: Build and drop without blocking writes (needs autocommit)
+
+    Returns:
+        dict: {'created': index names, 'rebuilt': invalid index names
+            dropped before being created again, 'dropped': retired index names}
+    """
+    conn = connection or PostgreSQLConnection()
+    missing = missing_indexes(conn)
+    if not conn.connection or conn.connection.closed:
+        conn.connect()
+
+    previous_autocommit = conn.connection.autocommit
+    conn.connection.autocommit = True
+    try:
+        with conn.connection.cursor() as cur:
+            partitioned = _partitioned_tables(cur)
+
+            def keyword(table: str) -> str:
+                return 'CONCURRENTLY ' if concurrently and table not in partitioned else ''
+
+            invalid = _invalid_indexes(cur, [index['name'] for index in INDEXES])
+            for name, table in invalid.items():
+                # IF NOT EXISTS would otherwise keep the invalid index
+                cur.execute(f"DROP INDEX {keyword(table)}IF EXISTS {name}")
+            for index in missing:
+                cur.execute(index_ddl(index, concurrently=bool(keyword(index['table']))))
+            for table in sorted({index['table'] for index in missing}):
+                cur.execute(f"ANALYZE {table}")
+            cur.execute("SELECT indexname, tablename FROM pg_indexes WHERE schemaname = current_schema() "
+                        "AND indexname = ANY(%s)", (RETIRED_INDEXES,))
+            retired = dict(cur.fetchall())
+            for name, table in retired.items():
+                cur.execute(f"DROP INDEX {keyword(table)}IF EXISTS {name}")
+    finally:
+        conn.connection.autocommit = previous_autocommit
+    return {'created': [index['name'] for index in missing], 'rebuilt': sorted(invalid),
+            'dropped': sorted(retired)}
+
+
+# -----------------------------------------------------------------------------
+# Plan checks
+# -----------------------------------------------------------------------------
+def capture_queries(start_date: str, end_date: str, account_number: Optional[str] = None) -> List[Dict]:
+    """
+    Run every registered chart function and record the SQL it sends
+
+    Args:
+        start_date: 'YYYY-MM-DD'
+        end_date: 'YYYY-MM-DD'
+        account_number: Bank account for the statement queries (optional)
+
+    Returns:
+        list: {'name', 'query', 'params'} per distinct query
+    """
+    import streamlit as st
+    from src.analytics.dashboard.chart_registry import registered_queries
+
+    saved_env = {name: os.environ.get(name) for name in IN_MEMORY_ENVS}
+    for name in IN_MEMORY_ENVS:
+        os.environ[name] = '0'
+
+    captured: List[Dict] = []
+    seen = set()
+    current = {'name': None}
+
+    def listener(query: str, params: Optional[tuple]):
+        key = (query, tuple(params) if params else None)
+        if key not in seen:
+            seen.add(key)
+            captured.append({'name': current['name'], 'query': query,
+                             'params': list(params) if params else None})
+
+    add_query_listener(listener)
+    try:
+        for name, function, kwargs in registered_queries(
+                start_date, end_date, ('all', 'new', 'return'), account_number):
+            current['name'] = name
+            # Cached results would hide the queries
+            st.cache_data.clear()
+            function(**kwargs)
+    finally:
+        remove_query_listener(listener)
+        for name, value in saved_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+    # Several queries per function get numbered names
+    counts: Dict[str, int] = {}
+    for entry in captured:
+        counts[entry['name']] = counts.get(entry['name'], 0) + 1
+        if counts[entry['name']] > 1:
+            entry['name'] = f"{entry['name']}#{counts[entry['name']]}"
+    return captured
+
+
+def _walk(node: Dict):
+    yield node
+    for child in node.get('Plans', []):
+        yield from _walk(child)
+
+
+def summarize_plan(plan: Dict) -> Dict:
+    """
+    Reduce an EXPLAIN (FORMAT JSON) result to the numbers we compare
+
+    Args:
+        plan: First element of the EXPLAIN JSON output
+
+    Returns:
+        dict: execution_ms, planning_ms, shared buffers and seq scans
+    """
+    root = plan['Plan']
+    seq_scans = []
+    for node in _walk(root):
+        if node.get('Node Type') == 'Seq Scan':
+            seq_scans.append({
+                'relation': node.get('Relation Name'),
+                'rows': int(node.get('Actual Rows', 0)) * int(node.get('Actual Loops', 1)),
+                'removed_by_filter': int(node.get('Rows Removed by Filter', 0)),
+            })
+    return {
+        'execution_ms': float(plan.get('Execution Time', 0.0)),
+        'planning_ms': float(plan.get('Planning Time', 0.0)),
+        'shared_hit_blocks': int(root.get('Shared Hit Blocks', 0)),
+        'shared_read_blocks': int(root.get('Shared Read Blocks', 0)),
+        'seq_scans': seq_scans,
+    }
+
+
+def explain_queries(queries: List[Dict], connection: Optional[PostgreSQLConnection] = None) -> List[Dict]:
+    """
+    Run EXPLAIN (ANALYZE, BUFFERS) for captured queries
+
+    Args:
+        queries: Output of capture_queries
+        connection: Connection to use (a fresh one by default)
+
+    Returns:
+        list: Captured entries extended with a 'plan' summary (or 'error')
+    """
+    conn = connection or PostgreSQLConnection()
+    if not conn.connection or conn.connection.closed:
+        conn.connect()
+
+    results = []
+    for entry in queries:
+        result = dict(entry)
+        try:
+            with conn.connection.cursor() as cur:
+                cur.execute(EXPLAIN_PREFIX + entry['query'],
+                            tuple(entry['params']) if entry['params'] else None)
+                raw = cur.fetchone()[0]
+            plan = raw[0] if isinstance(raw, list) else json.loads(raw)[0]
+            result['plan'] = summarize_plan(plan)
+        except Exception as e:
+            result['error'] = str(e)
+        finally:
+            # EXPLAIN ANALYZE executes the query; never keep its effects
+            conn.connection.rollback()
+        results.append(result)
+    return results
+
+
+def find_problems(results: List[Dict], baseline: Optional[Dict[str, Dict]] = None,
+                  tolerance: float = 0.5, min_regression_ms: float = 5.0) -> List[str]:
+    """
+    Flag seq scans on fact tables, failures and regressions against a baseline
+
+    Args:
+        results: Output of explain_queries
+        baseline: Query name -> plan summary from a previous run
+        tolerance: Allowed relative slowdown (0.5 = 50%)
+        min_regression_ms: Slowdowns smaller than this are ignored
+
+    Returns:
+        list: Human-readable problem descriptions
+    """
+    problems = []
+    for result in results:
+        name = result['name']
+        if 'error' in result:
+            problems.append(f"{name}: EXPLAIN failed: {result['error']}")
+            continue
+
+        plan = result['plan']
+        for scan in plan['seq_scans']:
+            if scan['relation'] in LARGE_TABLES:
+                problems.append(f"{name}: Seq Scan on {scan['relation']} "
+                                f"({scan['rows']} rows kept, {scan['removed_by_filter']} removed by filter)")
+
+        previous = (baseline or {}).get(name)
+        if not previous:
+            continue
+        slower_ms = plan['execution_ms'] - previous['execution_ms']
+        if slower_ms > min_regression_ms and plan['execution_ms'] > previous['execution_ms'] * (1 + tolerance):
+            problems.append(f"{name}: {plan['execution_ms']:.1f} ms vs baseline {previous['execution_ms']:.1f} ms")
+        new_scans = ({s['relation'] for s in plan['seq_scans']}
+                     - {s['relation'] for s in previous.get('seq_scans', [])})
+        for relation in sorted(new_scans & LARGE_TABLES):
+            problems.append(f"{name}: new Seq Scan on {relation} (not in baseline)")
+    return problems
+
+
+def _default_account_number(conn: PostgreSQLConnection) -> Optional[str]:
+    df = conn.execute_query("SELECT account_number FROM dim_bank_account ORDER BY bank_account_key LIMIT 1")
+    return None if df.empty else str(df.iloc[0, 0])
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Apply dashboard indexes and check query plans")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    apply_parser = sub.add_parser('apply', help="Create missing declared indexes and drop retired ones")
+    apply_parser.add_argument('--no-concurrently', action='store_true',
+                              help="Use plain CREATE INDEX (locks writes, faster on an idle database)")
+
+    check_parser = sub.add_parser('check', help="EXPLAIN (ANALYZE, BUFFERS) every registered chart query")
+    check_parser.add_argument('--start', default=f"{date.today().year}-01-01")
+    check_parser.add_argument('--end', default=date.today().isoformat())
+    check_parser.add_argument('--account', default=None, help="Account number for statement queries")
+    check_parser.add_argument('--baseline', default=None, help="Plan summary JSON to compare against")
+    check_parser.add_argument('--save', default=None, help="Write this run's plan summaries to JSON")
+    check_parser.add_argument('--tolerance', type=float, default=0.5)
+    args = parser.parse_args()
+
+    conn = PostgreSQLConnection()
+    if args.command == 'apply':
+        applied = apply_indexes(conn, concurrently=not args.no_concurrently)
+        print(f"Created indexes: {', '.join(applied['created']) if applied['created'] else 'none (all present)'}")
+        if applied['rebuilt']:
+            print(f"Rebuilt invalid indexes: {', '.join(applied['rebuilt'])}")
+        if applied['dropped']:
+            print(f"Dropped retired indexes: {', '.join(applied['dropped'])}")
+        return
+
+    for index in missing_indexes(conn):
+        print(f"Missing index: {index_ddl(index)}")
+
+    account_number = args.account or _default_account_number(conn)
+    results = explain_queries(capture_queries(args.start, args.end, account_number), conn)
+    for result in results:
+        if 'plan' in result:
+            plan = result['plan']
+            print(f"{plan['execution_ms']:9.1f} ms  {plan['shared_hit_blocks'] + plan['shared_read_blocks']:8d} blocks  "
+                  f"{result['name']}")
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({r['name']: r['plan'] for r in results if 'plan' in r}, f, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    problems = find_problems(results, baseline, args.tolerance)
+    for problem in problems:
+        print(f"⚠️ {problem}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
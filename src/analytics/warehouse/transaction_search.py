@@ -0,0 +1,185 @@
+"""
+Trigram search over bank transaction descriptions and references
+"""
+import argparse
+import os
+import sys
+from typing import List, Optional, Tuple
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.insert(0, project_root)
+
+from src.analytics.utils.postgres_connection import PostgreSQLConnection
+
+# Set ANALYTICS_TRANSACTION_SEARCH=1 once the search column and index exist
+TRANSACTION_SEARCH_ENV = 'ANALYTICS_TRANSACTION_SEARCH'
+
+# unaccent() is only STABLE (it depends on the search path), so it cannot
+# be used in a generated column or index; the wrapper pins the dictionary.
+# search_text is lower-cased, accent-free "description reference", so
+# 'Chuyển tiền' and 'chuyen tien' match the same rows.
+TRANSACTION_SEARCH_DDL = """
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$;
+
+ALTER TABLE fact_bank_transactions
+    ADD COLUMN IF NOT EXISTS search_text TEXT GENERATED ALWAYS AS (
+        lower(f_unaccent(COALESCE(transaction_description, '') || ' ' || COALESCE(reference_number, '')))
+    ) STORED;
+"""
+
+SEARCH_INDEX_NAME = 'idx_fact_bank_tx_search_trgm'
+
+# Words shorter than a trigram cannot use the index; they only filter the
+# rows found by the longer words
+TRIGRAM_MIN_CHARS = 3
+
+SEARCH_COLUMNS = """
+        t.full_date AS "Ngày GD",
+        dba.account_number AS "Số tài khoản",
+        dba.account_name AS "Tên tài khoản",
+        fbt.reference_number AS "Mã giao dịch",
+        COALESCE(fbt.credit_amount, 0) AS "Phát sinh có",
+        COALESCE(fbt.debit_amount, 0) AS "Phát sinh nợ",
+        fbt.transaction_description AS "Diễn giải"
+"""
+
+# Keyset columns returned with each result page (hidden in the viewer)
+SEARCH_PAGE_KEY_COLUMNS = ['_date_key', '_transaction_key']
+
+
+def transaction_search_enabled() -> bool:
+    """Return True when searches should use the indexed search_text column"""
+    return os.getenv(TRANSACTION_SEARCH_ENV, '0').lower() in ('1', 'true', 'yes')
+
+
+def apply_transaction_search(connection: Optional[PostgreSQLConnection] = None, concurrently: bool = True):
+    """
+    Install the extensions, the search column and its GIN trigram index
+
+    Adding the stored column rewrites fact_bank_transactions once.
+
+    Args:
+        connection: Connection to use (a fresh one by default)
+        concurrently: Build the index without blocking writes (ignored for
+            partitioned tables, which do not support it)
+    """
+    conn = connection or PostgreSQLConnection()
+    if not conn.connection or conn.connection.closed:
+        conn.connect()
+
+    previous_autocommit = conn.connection.autocommit
+    conn.connection.autocommit = True
+    try:
+        with conn.connection.cursor() as cur:
+            cur.execute(TRANSACTION_SEARCH_DDL)
+            cur.execute("SELECT relkind = 'p' FROM pg_class WHERE oid = 'fact_bank_transactions'::regclass")
+            partitioned = cur.fetchone()[0]
+            cur.execute(f"CREATE INDEX {'CONCURRENTLY ' if concurrently and not partitioned else ''}"
+                        f"IF NOT EXISTS {SEARCH_INDEX_NAME} "
+                        f"ON fact_bank_transactions USING gin (search_text gin_trgm_ops)")
+            cur.execute("ANALYZE fact_bank_transactions")
+    finally:
+        conn.connection.autocommit = previous_autocommit
+
+
+def _like_pattern(word: str) -> str:
+    """LIKE pattern matching a word anywhere, with wildcards in the word escaped"""
+    escaped = word.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+
+def _search_predicates(text: str, indexed: bool) -> Tuple[str, list]:
+    """
+    One condition per word of the search text, all required
+
+    Patterns are normalized on the server with the same expression as
+    search_text; psycopg2 inlines the parameters, so the planner folds
+    them into constants it can match against the trigram index.
+    """
+    words = text.split()
+    sql = ""
+    params: List[str] = []
+    for word in words:
+        if indexed and len(word) >= TRIGRAM_MIN_CHARS:
+            sql += " AND fbt.search_text LIKE lower(f_unaccent(%s))"
+            params.append(_like_pattern(word))
+        elif indexed:
+            sql += " AND strpos(fbt.search_text, lower(f_unaccent(%s))) > 0"
+            params.append(word)
+        else:
+            # Without the search column: accent-sensitive, not indexed
+            sql += " AND (fbt.transaction_description ILIKE %s OR fbt.reference_number ILIKE %s)"
+            params += [_like_pattern(word), _like_pattern(word)]
+    return sql, params
+
+
+def transaction_search_query(text: str, account_number: Optional[str] = None, after: Optional[tuple] = None,
+                             page_size: int = 50, indexed: Optional[bool] = None) -> Tuple[str, list]:
+    """
+    One page of transactions matching every word of a search, newest first
+
+    Args:
+        text: Words to find in the description or reference number
+        account_number: Only search this account, optional
+        after: SEARCH_PAGE_KEY_COLUMNS of the previous page's last row
+        page_size: Rows per page
+        indexed: Use the search_text column (transaction_search_enabled()
+            by default)
+
+    Returns:
+        tuple: (SQL, params); the query returns up to page_size + 1 rows
+            (an extra row means there is a next page)
+    """
+    if indexed is None:
+        indexed = transaction_search_enabled()
+    where, params = _search_predicates(text, indexed)
+    if account_number:
+        where += " AND dba.account_number = %s"
+        params.append(account_number)
+    if after:
+        where += " AND (fbt.transaction_date_key, fbt.bank_transaction_key) < (%s, %s)"
+        params += [int(after[0]), int(after[1])]
+    sql = f"""SELECT fbt.transaction_date_key AS _date_key, fbt.bank_transaction_key AS _transaction_key,
+        {SEARCH_COLUMNS}
+    FROM fact_bank_transactions fbt
+    JOIN dim_time t ON fbt.transaction_date_key = t.time_key
+    JOIN dim_bank_account dba ON fbt.bank_account_key = dba.bank_account_key
+    WHERE 1=1{where}
+    ORDER BY fbt.transaction_date_key DESC, fbt.bank_transaction_key DESC
+    LIMIT %s"""
+    params.append(page_size + 1)
+    return sql, params
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Set up and try trigram search over bank transactions")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    apply_parser = sub.add_parser('apply', help="Create the search column and GIN trigram index")
+    apply_parser.add_argument('--no-concurrently', action='store_true',
+                              help="Use plain CREATE INDEX (locks writes, faster on an idle database)")
+
+    search_parser = sub.add_parser('search', help="Run a search and print the first page")
+    search_parser.add_argument('text')
+    search_parser.add_argument('--account', default=None)
+    args = parser.parse_args()
+
+    conn = PostgreSQLConnection()
+    if args.command == 'apply':
+        apply_transaction_search(conn, concurrently=not args.no_concurrently)
+        print(f"Search column and {SEARCH_INDEX_NAME} ready")
+        return
+
+    sql, params = transaction_search_query(args.text, args.account)
+    print(conn.execute_query(sql, tuple(params)).drop(columns=SEARCH_PAGE_KEY_COLUMNS).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Tests for the monthly partial-aggregate store
+"""
+from datetime import date
+
+import pandas as pd
+
+from src.analytics.utils import aggregate_store
+from src.analytics.utils.aggregate_store import MonthlyAggregateStore
+
+
+class FakeConnection:
+    """Answers the partials queries from per-month revenue"""
+
+    def __init__(self, revenue):
+        self.revenue = revenue
+        self.grouped_queries = 0
+
+    def execute_query(self, query, params=None):
+        if 'fact_payments' in query:
+            return pd.DataFrame()
+        start, end = (date.fromisoformat(p) for p in params)
+        months = {k: v for k, v in self.revenue.items() if start <= date(k[0], k[1], 1) <= end}
+        if 'GROUP BY' in query:
+            self.grouped_queries += 1
+            return pd.DataFrame([{'year': y, 'month': m, 'revenue': v, 'discount_amount': 0, 'item_total': v,
+                                  'orders': 1, 'sales_rows': 1} for (y, m), v in months.items()])
+        return pd.DataFrame([{'revenue': sum(months.values()), 'discount_amount': 0,
+                              'item_total': sum(months.values()), 'orders': len(months),
+                              'sales_rows': len(months)}])
+
+
+def _today(monkeypatch, day: date):
+    class Today(date):
+        @classmethod
+        def today(cls):
+            return day
+    monkeypatch.setattr(aggregate_store, 'date', Today)
+
+
+def test_month_that_just_closed_is_not_dropped(monkeypatch):
+    connection = FakeConnection({(2025, 1): 10.0, (2025, 2): 20.0, (2025, 3): 30.0})
+    store = MonthlyAggregateStore(connection)
+    monkeypatch.setattr(store, '_apply_etl_changes', lambda: None)
+
+    _today(monkeypatch, date(2025, 2, 15))
+    assert store.monthly()['revenue'].tolist() == [10.0, 20.0]
+
+    # February closes; it must come from rebuilt partials, not vanish
+    _today(monkeypatch, date(2025, 3, 2))
+    monthly = store.monthly('2025-01-01', '2025-03-31')
+    assert monthly['revenue'].tolist() == [10.0, 20.0, 30.0]
+    assert connection.grouped_queries == 2
+
+    # Within the same month the partials are reused
+    store.totals('2025-01-01', '2025-02-28')
+    assert connection.grouped_queries == 2
@@ -0,0 +1,93 @@
+"""
+Tests for bank statement parsing, de-duplication and GL classification
+"""
+import datetime
+
+import pandas as pd
+
+from src.analytics.etl.bank_loader import (
+    GLClassifier, combine_statements, parse_amounts, parse_statement, strip_accents, verify_running_balance
+)
+
+HEADER = 'Ngày GD,Mã giao dịch,Phát sinh có,Phát sinh nợ,Số dư,Diễn giải\n'
+
+
+def _write(path, lines):
+    path.write_text(HEADER + ''.join(line + '\n' for line in lines), encoding='utf-8-sig')
+    return str(path)
+
+
+def test_parse_amounts_both_notations():
+    values = pd.Series(['1.000.000,50', '1,000,000.50', '2.500', '2,500', '12,5', '-300', '', None])
+    assert parse_amounts(values).tolist() == [1000000.5, 1000000.5, 2500.0, 2500.0, 12.5, -300.0, 0.0, 0.0]
+
+
+def test_parse_statement(tmp_path):
+    path = _write(tmp_path / 'jan.csv', [
+        '02/01/2025,R1,"1.000.000",,"1.000.000",Khách trả tiền',
+        '03/01/2025,R2,,"250.000","750.000",Mua len',
+    ])
+    df = parse_statement(path, account_number='123')
+    assert df['account_number'].tolist() == ['123', '123']
+    assert df['transaction_date'].tolist() == [datetime.date(2025, 1, 2), datetime.date(2025, 1, 3)]
+    assert df['debit_amount'].tolist() == [0.0, 250000.0]
+    assert df['source_row'].tolist() == [0, 1]
+    assert df['pl_account_number'].isna().all()
+
+
+def test_combine_statements_keeps_latest_copy_in_date_order(tmp_path):
+    older = parse_statement(_write(tmp_path / 'a.csv', [
+        '05/01/2025,R3,,"100",900,Old description',
+        '04/01/2025,R2,,"100",1000,Fee',
+        '04/01/2025,,,"0",1000,No reference',
+    ]), account_number='123')
+    newer = parse_statement(_write(tmp_path / 'b.csv', [
+        '05/01/2025,R3,,"100",900,New description',
+        '01/01/2025,R1,"1.100",,1100,Opening',
+        '04/01/2025,,,"0",1000,No reference',
+    ]), account_number='123')
+
+    df = combine_statements([older, newer])
+    assert df['reference_number'].fillna('').tolist() == ['R1', 'R2', '', '', 'R3']
+    assert df.loc[df['reference_number'] == 'R3', 'transaction_description'].item() == 'New description'
+    assert df['source_row'].tolist() == list(range(5))
+    # Dates are ordered whichever order the files were given in
+    reversed_order = combine_statements([newer, older])
+    assert reversed_order['transaction_date'].is_monotonic_increasing
+    assert reversed_order.loc[reversed_order['reference_number'] == 'R3', 'transaction_description'].item() == 'Old description'
+
+
+def test_verify_running_balance():
+    df = pd.DataFrame({
+        'account_number': ['1', '1', '1', '2'],
+        'source_row': [0, 1, 2, 3],
+        'credit_amount': [0.0, 50.0, 0.0, 0.0],
+        'debit_amount': [0.0, 0.0, 30.0, 0.0],
+        'balance_after_transaction': [100.0, 150.0, 110.0, 5.0],
+    })
+    bad = verify_running_balance(df)
+    assert bad['source_row'].tolist() == [2]
+    assert bad['expected_balance'].tolist() == [120.0]
+
+
+def test_gl_classifier_priority_and_accents():
+    classifier = GLClassifier()
+    descriptions = pd.Series(['Chi phí len', 'chi phi len', 'Mua len cotton', 'Chụp ảnh + quay video',
+                              'Quản lý kênh', 'Tiền lương tháng 5', 'Móc thú bông', 'Facebook ads',
+                              'Khách trả tiền', None])
+    assert classifier.classify(descriptions).tolist() == ['6211', '6211', '6211', '6224', '6428', '6411',
+                                                         '6222', '6428', None, None]
+    assert strip_accents('Đóng gói') == 'dong goi'
+
+
+def test_gl_classifier_ignores_words_that_only_match_without_accents():
+    descriptions = pd.Series([
+        'nap tien len tai khoan',    # lên, not len (yarn)
+        'Nạp tiền lên tài khoản',
+        'rut tien tai quay',         # quầy (counter), not quay (filming)
+        'Phí quản lý tài khoản',     # bank fee, not management salaries
+        'Số lượng đơn tháng 5',      # lượng, not lương (salary)
+        'Đồ gỗ mộc',                 # mộc, not móc (crochet)
+        'Thanh toán hoá đơn',        # contains "toan", "hoa", "don"
+    ])
+    assert GLClassifier().classify(descriptions).isna().all()
@@ -0,0 +1,107 @@
+"""
+Tests for the benchmark regression gate
+"""
+import numpy as np
+import pytest
+
+from benchmarks.compare import (
+    FAILED, IMPROVED, MISSING, NEW, REGRESSION, UNCHANGED, _average_ranks, compare_entry, compare_results,
+    format_report, mann_whitney_u
+)
+
+
+def _results(entries):
+    return {'meta': {'kind': 'queries'}, 'results': entries}
+
+
+def test_average_ranks_share_ties():
+    ranks, ties = _average_ranks(np.array([3.0, 1.0, 2.0, 2.0]))
+    assert ranks.tolist() == [4.0, 1.0, 2.5, 2.5]
+    assert sorted(ties.tolist()) == [1, 1, 2]
+
+
+def test_mann_whitney_u_without_ties():
+    # Every candidate sample is slower: U = n1 * n2, z = (9 - 4.5 - 0.5) / sqrt(5.25)
+    u, p = mann_whitney_u([1, 2, 3], [4, 5, 6])
+    assert u == 9.0
+    assert p == pytest.approx(0.0404278, abs=1e-6)
+
+
+def test_mann_whitney_u_tie_correction():
+    # Tie groups of 3 and 3 reduce the variance to 16/12 * (9 - 48/56)
+    u, p = mann_whitney_u([1, 2, 2, 3], [2, 3, 3, 4])
+    assert u == 13.0
+    assert p == pytest.approx(0.0860169, abs=1e-6)
+
+
+def test_mann_whitney_u_is_one_sided():
+    u_slower, p_slower = mann_whitney_u([1, 2, 3, 4, 5], [6, 7, 8, 9, 10])
+    u_faster, p_faster = mann_whitney_u([6, 7, 8, 9, 10], [1, 2, 3, 4, 5])
+    assert u_slower + u_faster == 25
+    assert p_slower < 0.05 < p_faster
+
+
+def test_mann_whitney_u_degenerate_inputs():
+    assert mann_whitney_u([], [1.0, 2.0]) == (0.0, 1.0)
+    assert mann_whitney_u([5.0] * 4, [5.0] * 4)[1] == 1.0
+
+
+def test_compare_entry_flags_large_significant_slowdown():
+    row = compare_entry([100, 101, 99, 100, 102, 98], [120, 121, 119, 122, 118, 120])
+    assert row['verdict'] == REGRESSION
+    assert row['change'] == pytest.approx(0.2)
+
+
+def test_compare_entry_ignores_small_or_tiny_changes():
+    # Significant but under the 10% threshold
+    assert compare_entry([100, 101, 99, 100, 102], [105, 106, 104, 105, 107])['verdict'] == UNCHANGED
+    # Over the threshold but under min_ms
+    assert compare_entry([1.0, 1.0, 1.0, 1.0, 1.0], [1.5, 1.5, 1.5, 1.5, 1.5], min_ms=1.0)['verdict'] == UNCHANGED
+
+
+def test_compare_entry_flags_improvement():
+    assert compare_entry([120, 121, 119, 122, 118], [100, 101, 99, 100, 102])['verdict'] == IMPROVED
+
+
+def test_compare_results_classifies_every_entry():
+    baseline = _results({
+        'slower': {'samples_ms': [10, 11, 10, 12, 10]},
+        'failed_before': {'samples_ms': [], 'errors': 5},
+        'gone': {'samples_ms': [1, 1, 1]},
+    })
+    candidate = _results({
+        'slower': {'samples_ms': [14, 15, 14, 16, 14]},
+        'failed_before': {'samples_ms': [3, 3, 3, 3, 3]},
+        'added': {'samples_ms': [2, 2, 2]},
+    })
+    verdicts = {row['name']: row['verdict'] for row in compare_results(baseline, candidate)}
+    assert verdicts == {'slower': REGRESSION, 'failed_before': NEW, 'gone': MISSING, 'added': NEW}
+
+
+def test_compare_results_fails_on_candidate_errors():
+    baseline = _results({'query': {'samples_ms': [3, 3, 3, 3, 3]}, 'load': {'samples_ms': [5, 5, 5]}})
+    candidate = _results({
+        # Failed calls are not timed, so the remaining samples can even look faster
+        'query': {'samples_ms': [1, 1, 1, 1, 1], 'errors': 2},
+        # Load test levels count every failure but keep only sample messages
+        'load': {'samples_ms': [], 'error_count': 35, 'errors': ['customer_lifetime_value[all]: boom'] * 20},
+        # Older result files without a count
+        'old_load': {'samples_ms': [], 'errors': ['boom', 'boom']},
+    })
+    rows = {row['name']: row for row in compare_results(baseline, candidate)}
+    assert rows['query']['verdict'] == FAILED and rows['query']['errors'] == 2
+    assert rows['load']['verdict'] == FAILED and rows['load']['errors'] == 35
+    assert rows['old_load']['verdict'] == FAILED and rows['old_load']['errors'] == 2
+
+    report = format_report(baseline, candidate, list(rows.values()), 0.10, 0.05)
+    assert "3 failed" in report
+
+
+def test_compare_results_sections():
+    baseline = _results({'initial_load': {'samples_ms': [100] * 5,
+                                          'sections': {'dashboard.kpis': {'samples_ms': [10, 11, 10, 12, 10]}}}})
+    candidate = _results({'initial_load': {'samples_ms': [100] * 5,
+                                           'sections': {'dashboard.kpis': {'samples_ms': [30, 31, 30, 32, 30]}}}})
+    assert len(compare_results(baseline, candidate)) == 1
+    rows = {row['name']: row['verdict'] for row in compare_results(baseline, candidate, sections=True)}
+    assert rows == {'initial_load': UNCHANGED, 'initial_load / dashboard.kpis': REGRESSION}
@@ -0,0 +1,72 @@
+"""
+Tests for the per-day HyperLogLog sketches
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analytics.etl import watermarks
+from src.analytics.utils import distinct_sketch
+from src.analytics.utils.distinct_sketch import DistinctCountSketches, precision_for_error
+
+
+def _keys(days, customers_per_day=200, offset=0):
+    rows = []
+    for i, day in enumerate(days):
+        for c in range(customers_per_day):
+            rows.append({'full_date': day, 'customer_key': offset + i * 50 + c, 'order_key': offset + i * 1000 + c})
+    return pd.DataFrame(rows)
+
+
+def test_precision_for_error():
+    assert precision_for_error(0.02) == 12
+    assert precision_for_error(0.5) == 4
+    assert precision_for_error(0.0001) == 16
+
+
+def test_counts_are_close_to_exact():
+    keys = _keys(['2025-01-01', '2025-01-02', '2025-01-03'])
+    sketches = DistinctCountSketches(keys, error=0.02)
+    exact = keys[keys['full_date'] <= '2025-01-02']['customer_key'].nunique()
+    assert sketches.count_customers('2025-01-01', '2025-01-02') == pytest.approx(exact, rel=0.06)
+    assert sketches.count_orders('2025-02-01', '2025-02-28') == 0
+
+
+def test_update_days_matches_a_full_rebuild():
+    old = _keys(['2025-01-01', '2025-01-02', '2025-01-03'])
+    sketches = DistinctCountSketches(old)
+
+    # 01-02 gets different rows, 01-03 loses every row, 01-05 is new
+    changed = _keys(['2025-01-02', '2025-01-05'], offset=10_000)
+    sketches.update_days(['2025-01-02', '2025-01-03', '2025-01-05'], changed)
+
+    final = pd.concat([old[old['full_date'] == '2025-01-01'], changed], ignore_index=True)
+    rebuilt = DistinctCountSketches(final)
+    for name in ('customers', 'orders'):
+        updated, expected = getattr(sketches, name), getattr(rebuilt, name)
+        assert updated.days.tolist() == expected.days.tolist()
+        assert np.array_equal(updated.registers, expected.registers)
+
+
+def test_etl_changes_rescan_only_changed_days(monkeypatch):
+    class FakeConnection:
+        def __init__(self):
+            self.params = []
+
+        def execute_query(self, query, params=None):
+            self.params.append(params)
+            return _keys(['2025-01-02'], offset=10_000)
+
+    connection = FakeConnection()
+    sketches = DistinctCountSketches(_keys(['2025-01-01', '2025-01-02']), connection=connection, load_id=7)
+    changes = {'load_id': 8, 'dates': [pd.Timestamp('2025-01-02').date()]}
+    monkeypatch.setattr(watermarks, 'dates_changed_since', lambda load_id, conn: changes)
+
+    # Within the poll interval nothing is read
+    sketches.count_customers()
+    assert connection.params == []
+
+    monkeypatch.setattr(distinct_sketch, 'ETL_POLL_SECONDS', 0)
+    sketches.count_customers()
+    assert connection.params == [(changes['dates'],)]
+    assert sketches._etl_load_id == 8
@@ -0,0 +1,41 @@
+"""
+Tests for chunked CSV and Parquet exports
+"""
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from src.analytics.reports.exports import export_file, frame_batches
+
+
+def _frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({'order_id': range(rows), 'state': ['CA'] * rows})
+
+
+def test_csv_export():
+    output = export_file(frame_batches(_frame(3)), 'csv')
+    assert output.read().decode('utf-8').splitlines() == ['order_id,state', '0,CA', '1,CA', '2,CA']
+
+
+def test_empty_results_keep_columns():
+    assert export_file(frame_batches(_frame(0)), 'csv').read() == b'order_id,state\n'
+    table = pq.read_table(export_file(frame_batches(_frame(0)), 'parquet'))
+    assert table.num_rows == 0
+    assert table.column_names == ['order_id', 'state']
+
+
+def test_parquet_export_casts_null_first_batch():
+    batches = [pa.RecordBatch.from_pylist([{'note': None}]), pa.RecordBatch.from_pylist([{'note': 'x'}])]
+    table = pq.read_table(export_file(iter(batches), 'parquet'))
+    assert table.column('note').to_pylist() == [None, 'x']
+
+
+def test_failed_stream_raises():
+    def batches():
+        yield from frame_batches(_frame(3))
+        raise RuntimeError("connection lost")
+
+    for fmt in ('csv', 'parquet'):
+        with pytest.raises(RuntimeError):
+            export_file(batches(), fmt)
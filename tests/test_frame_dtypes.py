@@ -0,0 +1,61 @@
+"""
+Tests for compact query result dtypes
+"""
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+
+from src.analytics.utils.frame_dtypes import CATEGORY_MIN_ROWS, COMPACT_FRAMES_ENV, compact_frame, compact_frames_enabled
+
+
+def test_decimal_columns_become_float():
+    df = pd.DataFrame({'revenue': [Decimal('1.50'), None, Decimal('2')]}, dtype=object)
+    result = compact_frame(df)
+    assert result['revenue'].dtype == np.float64
+    assert result['revenue'].tolist()[::2] == [1.5, 2.0]
+    assert np.isnan(result['revenue'][1])
+
+
+def test_int64_narrowed_only_when_values_fit():
+    df = pd.DataFrame({'orders': np.array([1, 2, 3], dtype='int64'),
+                       'cents': np.array([1, 2**40, 3], dtype='int64')})
+    result = compact_frame(df)
+    assert result['orders'].dtype == np.int32
+    assert result['cents'].dtype == np.int64
+    assert result['orders'].tolist() == [1, 2, 3]
+
+
+def test_low_cardinality_text_becomes_category():
+    months = ['Jan', 'Feb'] * CATEGORY_MIN_ROWS
+    df = pd.DataFrame({'month': months, 'id': [str(i) for i in range(len(months))]})
+    result = compact_frame(df)
+    assert isinstance(result['month'].dtype, pd.CategoricalDtype)
+    assert result['month'].astype(str).tolist() == months
+    # Mostly distinct values stay text
+    assert not isinstance(result['id'].dtype, pd.CategoricalDtype)
+
+
+def test_short_text_columns_stay_text():
+    df = pd.DataFrame({'state': ['CA', 'CA', 'NY']})
+    assert not isinstance(compact_frame(df)['state'].dtype, pd.CategoricalDtype)
+
+
+def test_bools_and_empty_frames_unchanged():
+    df = pd.DataFrame({'flag': [True, False, True]})
+    assert compact_frame(df)['flag'].dtype == bool
+    empty = pd.DataFrame({'revenue': pd.Series([], dtype=object)})
+    assert compact_frame(empty) is empty
+
+
+def test_input_frame_not_modified():
+    df = pd.DataFrame({'orders': np.array([1, 2, 3], dtype='int64')})
+    compact_frame(df)
+    assert df['orders'].dtype == np.int64
+
+
+def test_compact_frames_off_by_default(monkeypatch):
+    monkeypatch.delenv(COMPACT_FRAMES_ENV, raising=False)
+    assert not compact_frames_enabled()
+    monkeypatch.setenv(COMPACT_FRAMES_ENV, '1')
+    assert compact_frames_enabled()
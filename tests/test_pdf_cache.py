@@ -0,0 +1,97 @@
+"""
+Tests for the content-addressed statement PDF cache
+"""
+import os
+
+import pytest
+
+from src.analytics.reports.pdf_cache import PdfCache, pdf_cache_key
+
+
+def _writer(size: int):
+    def write(path):
+        with open(path, 'wb') as f:
+            f.write(b'%' * size)
+    return write
+
+
+def _age(cache: PdfCache, key: str, mtime: float):
+    os.utime(cache.path(key), (mtime, mtime))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = PdfCache(str(tmp_path), max_bytes=1000, workers=1)
+    yield cache
+    cache._executor.shutdown(wait=True)
+
+
+def test_key_depends_on_every_input():
+    key = pdf_cache_key('123', '2025-01-01', None, 'v1', {'account_name': 'A'})
+    assert key == pdf_cache_key('123', '2025-01-01', None, 'v1', {'account_name': 'A'})
+    assert key != pdf_cache_key('123', '2025-01-01', None, 'v2', {'account_name': 'A'})
+    assert key != pdf_cache_key('123', '2025-01-01', None, 'v1', {'account_name': 'B'})
+    assert key != pdf_cache_key('123', None, None, 'v1', {'account_name': 'A'})
+
+
+def test_put_and_get(cache):
+    assert cache.get('a') is None
+    path = cache.put('a', _writer(10))
+    assert cache.get('a') == path
+    assert os.path.getsize(path) == 10
+
+
+def test_failed_write_caches_nothing(cache):
+    def write(path):
+        _writer(10)(path)
+        raise RuntimeError("query failed mid-stream")
+
+    with pytest.raises(RuntimeError):
+        cache.put('a', write)
+    assert cache.get('a') is None
+    assert os.listdir(cache.directory) == []
+
+
+def test_evicts_least_recently_used(cache):
+    for age, key in enumerate(['old', 'used', 'newer']):
+        cache.put(key, _writer(300))
+        _age(cache, key, 1_000_000 + age)
+    # Reading marks 'used' as the most recent
+    cache.get('used')
+
+    cache.put('latest', _writer(300))
+    assert cache.get('old') is None
+    assert all(cache.get(key) for key in ('used', 'newer', 'latest'))
+
+
+def test_file_over_budget_is_kept(cache):
+    cache.put('small', _writer(100))
+    path = cache.put('huge', _writer(5000))
+    assert os.path.exists(path)
+    assert cache.get('small') is None
+
+
+def test_job_error_is_kept_and_nothing_cached(cache):
+    def write(path, on_progress):
+        on_progress(10)
+        raise RuntimeError("boom")
+
+    job = cache.submit('bad', write, total_rows=100)
+    cache._executor.shutdown(wait=True)
+    assert job.done and job.error == "boom"
+    assert cache.job('bad') is job
+    assert cache.get('bad') is None
+
+
+def test_successful_job_is_served_from_disk(cache):
+    def write(path, on_progress):
+        _writer(10)(path)
+        on_progress(100)
+
+    job = cache.submit('good', write, total_rows=100)
+    cache._executor.shutdown(wait=True)
+    assert job.done and job.error is None and job.progress == 1.0
+    assert cache.job('good') is None
+    assert cache.get('good')
+    # A later request for the same content does not generate it again
+    assert cache.submit('good', write).done
@@ -0,0 +1,80 @@
+"""
+Tests for per-section rerun timings
+"""
+import threading
+
+import pytest
+
+from src.analytics.utils import perf
+
+
+class SessionPerThread:
+    """Stand-in for st: one session state per script thread, like Streamlit sessions"""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    @property
+    def session_state(self):
+        if not hasattr(self._local, 'state'):
+            self._local.state = {}
+        return self._local.state
+
+
+@pytest.fixture(autouse=True)
+def sections_enabled(monkeypatch):
+    monkeypatch.setenv(perf.PERF_SECTIONS_ENV, '1')
+    monkeypatch.setattr(perf, 'st', SessionPerThread())
+
+
+def test_sections_of_one_run():
+    perf.start_run()
+    perf.mark_section('page')
+    perf.mark_section('dashboard.kpis')
+    perf.mark_section('page')
+    perf.finish_run()
+    sections = perf.last_run_sections()
+    assert list(sections) == ['page', 'dashboard.kpis']
+    assert all(ms >= 0 for ms in sections.values())
+
+
+def test_concurrent_sessions_keep_their_own_laps():
+    steps = [threading.Event() for _ in range(4)]
+    results = {}
+
+    def session_a():
+        perf.start_run()
+        perf.mark_section('a.first')
+        steps[0].set()
+        steps[1].wait()
+        perf.mark_section('a.second')
+        steps[2].set()
+        steps[3].wait()
+        perf.finish_run()
+        results['a'] = perf.last_run_sections()
+
+    def session_b():
+        steps[0].wait()
+        perf.start_run()
+        perf.mark_section('b.only')
+        steps[1].set()
+        steps[2].wait()
+        perf.finish_run()
+        results['b'] = perf.last_run_sections()
+        steps[3].set()
+
+    threads = [threading.Thread(target=session_a), threading.Thread(target=session_b)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    assert list(results['a']) == ['a.first', 'a.second']
+    assert list(results['b']) == ['b.only']
+
+
+def test_disabled_records_nothing(monkeypatch):
+    monkeypatch.setenv(perf.PERF_SECTIONS_ENV, '0')
+    perf.start_run()
+    perf.mark_section('page')
+    perf.finish_run()
+    assert perf.last_run_sections() == {}
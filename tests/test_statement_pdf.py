@@ -0,0 +1,84 @@
+"""
+Tests for page-sized statement PDF tables
+"""
+import io
+from decimal import Decimal
+
+import pandas as pd
+import pyarrow as pa
+
+from src.analytics.reports.statement_pdf import (
+    DESCRIPTION_MAX_CHARS, PDF_FRAME_SLACK, PDF_HEADER_HEIGHT, PDF_ROW_HEIGHT, _rows_per_page,
+    _transaction_tables, format_transaction_rows, write_statement_pdf
+)
+
+EMPTY = object()
+
+ACCOUNT_INFO = {'account_number': '123', 'account_name': 'Shop', 'currency_code': 'USD',
+                'cif_number': 'CIF1', 'customer_address': '1 Main St'}
+
+
+def _statement(rows: int, start: int = 0) -> pd.DataFrame:
+    return pd.DataFrame({
+        'Ngày GD': ['2025-01-01'] * rows,
+        'Mã giao dịch': [f"REF{i}" for i in range(start, start + rows)],
+        'Số tài khoản truy vấn': ['123'] * rows,
+        'Tên tài khoản truy vấn': ['Shop'] * rows,
+        'Ngày mở tài khoản': ['2024-01-01'] * rows,
+        'Phát sinh có': [Decimal('1000')] * rows,
+        'Phát sinh nợ': [None] * rows,
+        'Số dư': [Decimal('1000') * (i + 1) for i in range(start, start + rows)],
+        'Diễn giải': ['Payment'] * rows,
+    })
+
+
+def _pages(frames, first_page_rows, page_rows):
+    return list(_transaction_tables(frames, '$', 'Helvetica', 'Helvetica-Bold',
+                                    first_page_rows, page_rows, EMPTY))
+
+
+def _references(table) -> list:
+    # Row 0 of every table is the column header
+    return [row[1] for row in table._cellvalues[1:]]
+
+
+def test_format_transaction_rows():
+    frame = _statement(1)
+    frame.loc[0, 'Diễn giải'] = 'x' * (DESCRIPTION_MAX_CHARS + 5)
+    frame.loc[0, 'Số dư'] = None
+    [row] = format_transaction_rows(frame, '$')
+    assert row[:5] == ['2025-01-01', 'REF0', '123', 'Shop', '2024-01-01']
+    assert row[5:8] == ['$1,000', '', '']
+    assert row[8] == 'x' * DESCRIPTION_MAX_CHARS + '...'
+
+
+def test_rows_per_page():
+    height = PDF_FRAME_SLACK + PDF_HEADER_HEIGHT + 10 * PDF_ROW_HEIGHT
+    assert _rows_per_page(height) == 10
+    assert _rows_per_page(height + PDF_ROW_HEIGHT - 1) == 10
+    assert _rows_per_page(0) == 1
+
+
+def test_first_page_then_full_pages_across_batches():
+    frames = [_statement(4), _statement(7, start=4), _statement(3, start=11)]
+    pages = _pages(frames, first_page_rows=3, page_rows=5)
+    assert [len(_references(page)) for page in pages] == [3, 5, 5, 1]
+    assert sum((_references(page) for page in pages), []) == [f"REF{i}" for i in range(14)]
+
+
+def test_exact_fit_has_no_trailing_table():
+    assert len(_pages([_statement(8)], first_page_rows=3, page_rows=5)) == 2
+
+
+def test_no_rows_yields_empty_flowable():
+    assert _pages([], 3, 5) == [EMPTY]
+    assert _pages([_statement(0)], 3, 5) == [EMPTY]
+
+
+def test_write_statement_pdf_from_batches():
+    batches = [pa.RecordBatch.from_pandas(_statement(60, start=i * 60), preserve_index=False)
+               for i in range(2)]
+    output = io.BytesIO()
+    pages = write_statement_pdf(output, ACCOUNT_INFO, batches)
+    assert pages >= 2
+    assert output.getvalue().startswith(b'%PDF')